@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark: export/import em massa de usuários (db_manager.py)
+
+Gera um export sintético com N usuários (keystores do tamanho real, mas sem
+o scrypt de cada um), importa em um banco vazio, exporta de volta e reporta
+linhas por minuto. Também mede o mesmo volume inserido pelo ORM, um commit
+por lote, para comparação.
+
+Uso:
+    python benchmarks/bench_db_import.py --users 300000
+"""
+import argparse
+import gzip
+import json
+import os
+import secrets
+import shutil
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+WORK_DIR = tempfile.mkdtemp(prefix='estcoin-bench-import-')
+os.environ['ESTCOIN_DB_PATH'] = os.path.join(WORK_DIR, 'users.db')
+# Banco descartável: chave mestra aleatória criada ao lado dele
+os.environ.setdefault('KEY_VAULT_DEV_KEY', '1')
+
+
+def write_synthetic_export(path, count):
+    """Export no formato do db_manager com `count` usuários sintéticos"""
+    from db_manager import EXPORT_COLUMNS, EXPORT_FORMAT, EXPORT_VERSION
+
+    keystore = json.dumps({'address': '', 'crypto': {'ciphertext': secrets.token_hex(32),
+                                                     'cipherparams': {'iv': secrets.token_hex(16)},
+                                                     'kdfparams': {'salt': secrets.token_hex(16)}},
+                           'version': 3})
+    with gzip.open(path, 'wt', compresslevel=1) as out:
+        out.write(json.dumps({'format': EXPORT_FORMAT, 'version': EXPORT_VERSION, 'columns': EXPORT_COLUMNS}) + '\n')
+        for i in range(1, count + 1):
+            address = '0x' + secrets.token_hex(20)
+            out.write(json.dumps([i, f'user{i}', 'pbkdf2:sha256:600000$' + secrets.token_hex(24),
+                                  address, keystore, 0.0], separators=(',', ':')) + '\n')
+        out.write(json.dumps({'count': count}) + '\n')
+
+
+def orm_insert(path, count, batch_size):
+    """Mesmo volume pelo ORM (session.add_all + commit por lote)"""
+    from db_manager import _read_export
+    from src.models.user import SessionLocal, User
+
+    db = SessionLocal()
+    try:
+        batch = []
+        for _, row in _read_export(path):
+            batch.append(User(username=row[1], password_hash=row[2], ethereum_address=row[3],
+                              private_key=row[4], balance=row[5]))
+            if len(batch) >= batch_size:
+                db.add_all(batch)
+                db.commit()
+                batch = []
+        db.add_all(batch)
+        db.commit()
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de export/import de usuários')
+    parser.add_argument('--users', type=int, default=300000)
+    parser.add_argument('--batch-size', type=int, default=10000)
+    parser.add_argument('--orm', type=int, default=50000, help='Usuários no comparativo pelo ORM (0 desativa)')
+    args = parser.parse_args()
+
+    from db_manager import export_users, import_users, delete_database
+    from src.models.user import engine, init_db
+
+    source = os.path.join(WORK_DIR, 'source.jsonl.gz')
+    exported = os.path.join(WORK_DIR, 'exported.jsonl.gz')
+    try:
+        print(f"⏳ Gerando export sintético com {args.users} usuários...")
+        write_synthetic_export(source, args.users)
+
+        init_db()
+        started = time.perf_counter()
+        import_users(source, batch_size=args.batch_size, key_check=False)
+        import_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        export_users(exported)
+        export_seconds = time.perf_counter() - started
+
+        print(f"\n📊 {args.users} usuários")
+        print(f"   import: {import_seconds:.1f}s ({args.users / import_seconds * 60:,.0f} linhas/min)")
+        print(f"   export: {export_seconds:.1f}s ({args.users / export_seconds * 60:,.0f} linhas/min)")
+
+        if args.orm:
+            engine.dispose()
+            delete_database()
+            init_db()
+            orm_source = os.path.join(WORK_DIR, 'orm.jsonl.gz')
+            write_synthetic_export(orm_source, args.orm)
+            started = time.perf_counter()
+            orm_insert(orm_source, args.orm, batch_size=1000)
+            orm_seconds = time.perf_counter() - started
+            print(f"   ORM ({args.orm} usuários, commit a cada 1000): {orm_seconds:.1f}s "
+                  f"({args.orm / orm_seconds * 60:,.0f} linhas/min)")
+    finally:
+        engine.dispose()
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
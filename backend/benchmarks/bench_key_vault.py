@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark: custo do cofre de chaves na latência de /transfer
+
+Mede a derivação scrypt isolada (cifrar, decifrar, acerto no cache) e a
+latência de TransactionController.transfer_funds em uma EVM em processo com o
+cache de chaves desbloqueadas frio (limpo antes de cada transferência) e
+quente.
+
+Uso:
+    python benchmarks/bench_key_vault.py --transfers 30 --scrypt-n 32768
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+WORK_DIR = tempfile.mkdtemp(prefix='estcoin-bench-key-vault-')
+os.environ['ESTCOIN_DB_PATH'] = os.path.join(WORK_DIR, 'users.db')
+os.environ['SHARED_STATE_DB'] = os.path.join(WORK_DIR, 'shared_state.db')
+# Banco descartável: chave mestra aleatória criada ao lado dele
+os.environ.setdefault('KEY_VAULT_DEV_KEY', '1')
+
+
+def measure(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def describe(name, samples):
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"{name:<28} {statistics.median(samples):>10.2f} ms {p95:>10.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do cofre de chaves privadas')
+    parser.add_argument('--transfers', type=int, default=30, help='Transferências por cenário')
+    parser.add_argument('--scrypt-n', type=int, default=None, help='Custo do scrypt (padrão: KEY_VAULT_SCRYPT_N)')
+    args = parser.parse_args()
+
+    from src.blockchain.local_chain import start_in_process_chain
+    from src.blockchain.contract import get_contract
+    from src.blockchain.web3_client import web3
+    from src.blockchain.key_vault import KeyVault, UnlockedKeyCache
+    from src.config import Config
+    from src.controllers.transaction_controller import TransactionController
+    from src.models.user import User, SessionLocal
+    import src.blockchain.key_vault as key_vault_module
+
+    try:
+        start_in_process_chain()
+        vault = KeyVault(
+            'benchmark-master-key',
+            scrypt_n=args.scrypt_n,
+            cache=UnlockedKeyCache(Config.KEY_VAULT_CACHE_SIZE, Config.KEY_VAULT_CACHE_TTL)
+        )
+        key_vault_module._key_vault = vault
+        print(f"🔐 scrypt n = {vault.scrypt_n}")
+
+        # Usuário com ETH para gas e ESTC para transferir
+        account = web3.eth.account.create()
+        faucet = web3.eth.accounts[0]
+        web3.eth.send_transaction({'from': faucet, 'to': account.address, 'value': 10 ** 18})
+        get_contract().functions.transfer(account.address, 10 ** 24).transact({'from': faucet, 'gas': 100000})
+        stored_key = vault.encrypt(account.key)
+
+        db = SessionLocal()
+        user = User(username='bench', password_hash='-', ethereum_address=account.address,
+                    private_key=stored_key, balance=0.0)
+        db.add(user)
+        db.commit()
+        user_id = user.id
+        db.close()
+
+        rows = []
+        rows.append(('encrypt', measure(lambda: vault.encrypt(account.key), 5)))
+        rows.append(('decrypt', measure(lambda: vault.decrypt(stored_key), 5)))
+        vault.unlock(account.address, stored_key)
+        rows.append(('unlock (cache)', measure(lambda: vault.unlock(account.address, stored_key), 1000)))
+
+        controller = TransactionController()
+        recipient = web3.eth.account.create().address
+
+        def transfer():
+            controller.transfer_funds(user_id, recipient, 1)
+
+        def cold_transfer():
+            vault.cache.clear()
+            transfer()
+
+        rows.append(('transfer (cache frio)', measure(cold_transfer, args.transfers)))
+        rows.append(('transfer (cache quente)', measure(transfer, args.transfers)))
+
+        print()
+        print("=" * 52)
+        print(f"{'operação':<28} {'p50':>13} {'p95':>13}")
+        print("-" * 52)
+        for name, samples in rows:
+            describe(name, samples)
+        print("=" * 52)
+        print(f"Cache: {vault.cache.stats()}")
+    finally:
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Benchmark/demonstração do pool de RPC com nós substitutos locais
+
+Três "nós" em processo compartilham a mesma EVM (eth-tester), cada um com uma
+latência artificial, e podem ser derrubados a qualquer momento. O script mede
+a distribuição das leituras, compara com um único nó lento e mostra, com o
+primário fora do ar, transações assinadas passando ao próximo nó enquanto
+eth_sendTransaction (conta desbloqueada só no primário) é recusada.
+
+Uso:
+    python benchmarks/bench_rpc_pool.py --reads 400 --threads 8
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ['ESTCOIN_DB_PATH'] = os.path.join(tempfile.mkdtemp(prefix='estcoin-bench-rpc-'), 'users.db')
+os.environ['ESTCOIN_INDEXER'] = '0'
+
+from web3 import Web3
+from web3.providers.base import BaseProvider
+
+
+class StandInNode(BaseProvider):
+    """Nó substituto: repassa para a EVM compartilhada com atraso e pode ser desligado"""
+
+    def __init__(self, name, backend, delay):
+        self.endpoint_uri = None
+        self.name = name
+        self.delay = delay
+        self.down = False
+        self._backend = backend.request_func(Web3(backend, middlewares=[]), ())
+
+    def make_request(self, method, params):
+        if self.down:
+            raise ConnectionError(f"{self.name} fora do ar")
+        time.sleep(self.delay)
+        return self._backend(method, params)
+
+    def is_connected(self, show_traceback=False):
+        return not self.down
+
+    def __repr__(self):
+        return self.name
+
+
+def run_reads(contract, holder, reads, threads):
+    def read(_):
+        started = time.perf_counter()
+        contract.functions.balanceOf(holder).call()
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        latencies = sorted(executor.map(read, range(reads)))
+    elapsed = time.perf_counter() - started
+    return elapsed, latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99) - 1]
+
+
+def print_stats(pool):
+    for row in pool.stats():
+        latency = f"{row['latency_ms']:.1f}" if row['latency_ms'] is not None else '-'
+        print(f"   {row['name']:<8} saudável={str(row['healthy']):<5} requisições={row['requests']:<5} "
+              f"latência média={latency} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do pool de RPC')
+    parser.add_argument('--reads', type=int, default=400)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    from src.blockchain.local_chain import _make_provider, deploy_token
+    from src.blockchain.rpc_pool import RPCPoolProvider
+    from src.blockchain.web3_client import web3
+    from src.blockchain.contract import get_contract
+    from src.config import Config
+    from src.models.user import SystemConfig, init_db
+
+    backend = _make_provider()
+    nodes = [
+        StandInNode('node-a', backend, 0.002),
+        StandInNode('node-b', backend, 0.005),
+        StandInNode('node-c', backend, 0.030),
+    ]
+
+    init_db()
+    pool = RPCPoolProvider(nodes, health_interval=0.5)
+    web3.provider = pool
+    Config.CHAIN_ID = web3.eth.chain_id
+    SystemConfig.set_value('TOKEN_CONTRACT_ADDRESS', deploy_token())
+    contract = get_contract()
+    faucet = web3.eth.accounts[0]
+
+    print("=" * 70)
+    print("  POOL DE RPC")
+    print("=" * 70)
+
+    # Um único nó lento, como seria com BLOCKCHAIN_URL apontando para ele
+    web3.provider = RPCPoolProvider([nodes[2]], health_interval=0)
+    single = run_reads(contract, faucet, args.reads, args.threads)
+    web3.provider = pool
+    pooled = run_reads(contract, faucet, args.reads, args.threads)
+
+    print(f"📖 {args.reads} leituras (balanceOf) com {args.threads} threads")
+    print(f"   nó único (lento): {single[0]:.2f}s  p50={single[1] * 1000:.1f} ms  p99={single[2] * 1000:.1f} ms")
+    print(f"   pool (3 nós)    : {pooled[0]:.2f}s  p50={pooled[1] * 1000:.1f} ms  p99={pooled[2] * 1000:.1f} ms")
+    print_stats(pool)
+
+    # Conta que assina localmente: nonce conhecido, sem consultar o primário
+    sender = web3.eth.account.create()
+    contract.functions.transfer(sender.address, 10 * 10 ** 18).transact({'from': faucet, 'gas': 100000})
+    web3.eth.send_transaction({'from': faucet, 'to': sender.address, 'value': 10 ** 18})
+
+    print("\n💥 Derrubando o primário (node-a) e enviando escritas...")
+    nodes[0].down = True
+    recipient = web3.eth.account.create().address
+    try:
+        contract.functions.transfer(recipient, 10 ** 18).transact({'from': faucet, 'gas': 100000})
+        print("   ❌ eth_sendTransaction atendida fora do primário")
+    except Exception as e:
+        print(f"   eth_sendTransaction recusada sem failover: {e}")
+    for nonce in range(3):
+        transaction = contract.functions.transfer(recipient, 10 ** 18).build_transaction({
+            'from': sender.address, 'nonce': nonce, 'gas': 100000,
+            'gasPrice': Config.GAS_PRICE, 'chainId': Config.CHAIN_ID
+        })
+        signed = web3.eth.account.sign_transaction(transaction, sender.key)
+        web3.eth.wait_for_transaction_receipt(web3.eth.send_raw_transaction(signed.raw_transaction))
+    balance = contract.functions.balanceOf(recipient).call() / 10 ** 18
+    print(f"   3 transferências assinadas confirmadas via {pool.primary.name}; saldo do destino = {balance} EST")
+    print_stats(pool)
+
+    print("\n🔁 Religando node-a e aguardando o health check...")
+    nodes[0].down = False
+    deadline = time.time() + 10
+    while not pool.endpoints[0].healthy and time.time() < deadline:
+        time.sleep(0.2)
+    pool.check_health()
+    print(f"   primário atual: {pool.primary.name}")
+    print("=" * 70)
+    pool.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark: início a frio do indexador com snapshot vs. reprocessamento completo
+
+Gera transferências em uma EVM em processo (eth-tester), mede o tempo para
+reconstruir o ledger desde o bloco 0 e o tempo para carregar o snapshot e
+reprocessar apenas os blocos posteriores. Também mede gravação/leitura de um
+ledger sintético grande para mostrar o custo por endereço do formato.
+
+Uso:
+    python benchmarks/bench_snapshot.py --transfers 2000 --holders 500 --tail 50
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+WORK_DIR = tempfile.mkdtemp(prefix='estcoin-bench-snapshot-')
+os.environ['ESTCOIN_DB_PATH'] = os.path.join(WORK_DIR, 'users.db')
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def generate_transfers(contract, sender, count, holders, rng):
+    """Envia `count` transferências do faucet para `holders` endereços aleatórios"""
+    from src.blockchain.web3_client import web3
+
+    recipients = [web3.eth.account.create().address for _ in range(holders)]
+    for _ in range(count):
+        contract.functions.transfer(rng.choice(recipients), rng.randint(1, 10 ** 18)).transact({
+            'from': sender,
+            'gas': 100000
+        })
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de snapshot do ledger')
+    parser.add_argument('--transfers', type=int, default=2000, help='Transferências antes do snapshot')
+    parser.add_argument('--tail', type=int, default=50, help='Transferências depois do snapshot')
+    parser.add_argument('--holders', type=int, default=500, help='Endereços distintos')
+    parser.add_argument('--synthetic', type=int, default=200000,
+                        help='Endereços do ledger sintético (0 desativa)')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    from src.blockchain.local_chain import start_in_process_chain
+    from src.blockchain.contract import get_contract
+    from src.blockchain.web3_client import web3
+    from src.indexer.indexer import TransferIndexer
+    from src.indexer.ledger import Ledger
+    from src.indexer.snapshot import write_snapshot, read_snapshot
+
+    rng = random.Random(args.seed)
+    snapshot_dir = os.path.join(WORK_DIR, 'snapshots')
+    huge = 10 ** 9  # nunca grava snapshot automático durante o benchmark
+
+    try:
+        start_in_process_chain()
+        contract = get_contract()
+        faucet = web3.eth.accounts[0]
+
+        print(f"⏳ Gerando {args.transfers} transferências para {args.holders} endereços...")
+        _, gen_time = timed(generate_transfers, contract, faucet, args.transfers, args.holders, rng)
+        print(f"   ({gen_time:.1f}s, bloco atual {web3.eth.block_number})")
+
+        # Estado no momento do snapshot
+        base = TransferIndexer(snapshot_dir=snapshot_dir, snapshot_interval=huge)
+        base.sync()
+        path, write_time = timed(base.snapshot)
+        size = os.path.getsize(path)
+
+        generate_transfers(contract, faucet, args.tail, args.holders, rng)
+        head = web3.eth.block_number
+
+        # Início a frio sem snapshot: reprocessa desde o bloco 0
+        full = TransferIndexer(snapshot_dir=os.path.join(WORK_DIR, 'vazio'), snapshot_interval=huge)
+        full_events, full_time = timed(full.sync)
+
+        # Início a frio com snapshot: carrega o arquivo e reprocessa só a cauda
+        fast = TransferIndexer(snapshot_dir=snapshot_dir, snapshot_interval=huge)
+        tail_events, fast_time = timed(fast.sync)
+
+        assert fast.ledger.balances == full.ledger.balances, "Ledger divergente após snapshot!"
+
+        print()
+        print("=" * 70)
+        print("  INÍCIO A FRIO DO INDEXADOR")
+        print("=" * 70)
+        print(f"Blocos: {head}  |  Endereços: {len(full.ledger)}  |  Snapshot no bloco {base.ledger.last_block}")
+        print(f"Reprocessamento completo : {full_time * 1000:9.1f} ms  ({full_events} eventos)")
+        print(f"Snapshot + cauda         : {fast_time * 1000:9.1f} ms  ({tail_events} eventos)")
+        print(f"Ganho                    : {full_time / fast_time:9.1f}x")
+        print(f"Snapshot                 : {size:,} bytes, gravado em {write_time * 1000:.1f} ms")
+
+        if args.synthetic:
+            ledger = Ledger(contract.address)
+            for _ in range(args.synthetic):
+                address = '0x' + os.urandom(20).hex()
+                ledger.balances[address] = rng.randint(1, 10 ** 24)
+                ledger.last_activity[address] = rng.randint(0, head)
+            ledger.set_checkpoint(head, '0x' + '00' * 32)
+            synthetic_dir = os.path.join(WORK_DIR, 'sintetico')
+            synthetic_path, synthetic_write = timed(write_snapshot, ledger, synthetic_dir)
+            loaded, synthetic_read = timed(read_snapshot, synthetic_path)
+            assert loaded.balances == ledger.balances
+            print("-" * 70)
+            print(f"Ledger sintético         : {args.synthetic:,} endereços, "
+                  f"{os.path.getsize(synthetic_path):,} bytes")
+            print(f"Gravação / leitura       : {synthetic_write * 1000:.1f} ms / {synthetic_read * 1000:.1f} ms")
+        print("=" * 70)
+    finally:
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
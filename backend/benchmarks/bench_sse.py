@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Benchmark: milhares de conexões ociosas em /api/transactions/stream
+
+Abre N conexões SSE autenticadas (endereços distintos, como abas de usuários
+diferentes) sobre uma EVM em processo. Mede a memória e as threads por conexão,
+o uso de CPU com todas ociosas e a latência entre o fim de uma transferência e
+a chegada do evento `transfer` no destinatário.
+
+Servidores (--server):
+    gevent   gunicorn_sse.conf.py em um subprocesso (worker gevent, um worker),
+             lendo a EVM pelo nó JSON-RPC HTTP deste processo; as medidas são
+             do processo do worker
+    threaded servidor do werkzeug com uma thread por conexão, neste processo
+             (a memória medida inclui um socket por cliente)
+
+Uso:
+    python benchmarks/bench_sse.py --server gevent --subscribers 2000 --transfers 20
+"""
+import argparse
+import logging
+import os
+import select
+import shutil
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+WORK_DIR = tempfile.mkdtemp(prefix='estcoin-bench-sse-')
+os.environ['ESTCOIN_DB_PATH'] = os.path.join(WORK_DIR, 'users.db')
+os.environ['SHARED_STATE_DB'] = os.path.join(WORK_DIR, 'shared_state.db')
+os.environ['SNAPSHOT_DIR'] = os.path.join(WORK_DIR, 'snapshots')
+os.environ['RATE_LIMIT_ENABLED'] = '0'
+# Banco descartável: chave mestra aleatória criada ao lado dele
+os.environ.setdefault('KEY_VAULT_DEV_KEY', '1')
+os.environ.setdefault('INDEXER_POLL_INTERVAL', '0.1')
+os.environ.setdefault('SSE_MAX_STREAMS', '100000')
+
+
+def rss_mb():
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+class ThreadedServer:
+    """App servido neste processo, uma thread por conexão"""
+
+    def __init__(self):
+        from werkzeug.serving import make_server
+        from src.app import create_app
+
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        self.server = make_server('127.0.0.1', 0, create_app(warm=False), threaded=True)
+        self.server.daemon_threads = True
+        self.port = self.server.server_port
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def usage(self):
+        """(RSS em MB, threads, segundos de CPU)"""
+        return rss_mb(), threading.active_count(), time.process_time()
+
+    def stop(self):
+        self.server.shutdown()
+
+
+class GeventServer:
+    """gunicorn_sse.conf.py em um subprocesso, lendo a EVM pelo nó JSON-RPC deste processo"""
+
+    def __init__(self, node_url):
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            self.port = sock.getsockname()[1]
+        env = dict(
+            os.environ,
+            BLOCKCHAIN_URL=node_url,
+            BLOCKCHAIN_URLS=node_url,
+            SSE_BIND=f'127.0.0.1:{self.port}',
+            GUNICORN_ACCESS_LOG='/dev/null',
+            ESTCOIN_INDEXER='1',
+        )
+        # Teto do worker fica com o padrão do gunicorn_sse.conf.py
+        env.pop('SSE_MAX_STREAMS')
+        self.log = open(os.path.join(WORK_DIR, 'gunicorn-sse.log'), 'w')
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn_sse.conf.py', 'wsgi:app'],
+            cwd=BACKEND_DIR, env=env, stdout=self.log, stderr=subprocess.STDOUT
+        )
+        deadline = time.monotonic() + 60
+        while True:
+            if self.process.poll() is not None or time.monotonic() > deadline:
+                raise Exception(f"gunicorn_sse não subiu (log em {self.log.name})")
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{self.port}/api/startup', timeout=1):
+                    break
+            except OSError:
+                time.sleep(0.2)
+        with open(f'/proc/{self.process.pid}/task/{self.process.pid}/children') as children:
+            self.worker = int(children.read().split()[0])
+
+    def usage(self):
+        """(RSS em MB, threads, segundos de CPU) do processo do worker"""
+        values = {}
+        with open(f'/proc/{self.worker}/status') as status:
+            for line in status:
+                key, _, value = line.partition(':')
+                values[key] = value.split()[0] if value.split() else ''
+        with open(f'/proc/{self.worker}/stat') as stat:
+            fields = stat.read().rsplit(')', 1)[1].split()
+        cpu = (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+        return int(values['VmRSS']) / 1024, int(values['Threads']), cpu
+
+    def stop(self):
+        self.process.send_signal(signal.SIGTERM)
+        try:
+            self.process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.log.close()
+
+
+def open_stream(port, token):
+    """Abre uma conexão SSE e espera o evento `balance` inicial"""
+    sock = socket.create_connection(('127.0.0.1', port))
+    sock.sendall(
+        f"GET /api/transactions/stream HTTP/1.1\r\nHost: localhost\r\n"
+        f"Authorization: Bearer {token}\r\nAccept: text/event-stream\r\n\r\n".encode()
+    )
+    buffer = b''
+    while b'event: balance' not in buffer:
+        chunk = sock.recv(4096)
+        if not chunk:
+            raise Exception(f"Conexão recusada: {buffer[:200]!r}")
+        buffer += chunk
+    return sock
+
+
+def wait_for(sock, markers, timeout):
+    """Lê do socket até encontrar todos os `markers`; retorna o instante da chegada de cada um"""
+    deadline = time.monotonic() + timeout
+    # poll em vez de select: os descritores passam de FD_SETSIZE (1024)
+    poller = select.poll()
+    poller.register(sock, select.POLLIN)
+    buffer = b''
+    arrivals = {}
+    while len(arrivals) < len(markers):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not poller.poll(remaining * 1000):
+            raise Exception(f"Eventos {markers!r} não chegaram em {timeout}s")
+        buffer += sock.recv(65536)
+        now = time.perf_counter()
+        for marker in markers:
+            if marker in buffer:
+                arrivals.setdefault(marker, now)
+    return arrivals
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de conexões SSE ociosas')
+    parser.add_argument('--subscribers', type=int, default=2000, help='Conexões ociosas')
+    parser.add_argument('--transfers', type=int, default=20, help='Transferências para medir latência')
+    parser.add_argument('--idle', type=float, default=5.0, help='Segundos medindo CPU com tudo ocioso')
+    parser.add_argument('--server', choices=('gevent', 'threaded'), default='gevent')
+    args = parser.parse_args()
+
+    from src.blockchain.local_chain import start_in_process_chain, serve_json_rpc
+    from src.blockchain.contract import get_contract
+    from src.blockchain.web3_client import web3
+    from src.controllers.transaction_controller import TransactionController
+    from src.indexer.indexer import get_indexer, start_indexer
+    from src.indexer.notifier import get_notifier
+    from src.models.user import User, SessionLocal, init_db
+    from src.utils.auth_utils import generate_token
+
+    sockets = []
+    server = None
+    try:
+        start_in_process_chain()
+        init_db()
+
+        # Remetente com ETH e ESTC; destinatário só precisa existir
+        sender = web3.eth.account.create()
+        recipient = web3.eth.account.create()
+        faucet = web3.eth.accounts[0]
+        web3.eth.send_transaction({'from': faucet, 'to': sender.address, 'value': 10 ** 18})
+        get_contract().functions.transfer(sender.address, 10 ** 24).transact({'from': faucet, 'gas': 100000})
+        db = SessionLocal()
+        user = User(username='bench', password_hash='-', ethereum_address=sender.address,
+                    private_key=sender.key.hex(), balance=0.0)
+        db.add(user)
+        db.commit()
+        user_id = user.id
+        db.close()
+
+        if args.server == 'gevent':
+            _, node_url = serve_json_rpc()
+            server = GeventServer(node_url)
+        else:
+            start_indexer(sync_first=True)
+            server = ThreadedServer()
+        port = server.port
+
+        base_rss, base_threads, _ = server.usage()
+        start = time.perf_counter()
+        for _ in range(args.subscribers):
+            address = web3.eth.account.create().address
+            sockets.append(open_stream(port, generate_token(0, 'idle', address)))
+        connect_seconds = time.perf_counter() - start
+        watcher = open_stream(port, generate_token(0, 'recipient', recipient.address))
+        sockets.append(watcher)
+
+        rss, threads, cpu_start = server.usage()
+        per_connection_kb = (rss - base_rss) * 1024 / len(sockets)
+        print(f"🖥️  Servidor: {args.server}")
+        print(f"🔌 {len(sockets)} conexões abertas em {connect_seconds:.2f}s "
+              f"({len(sockets) / connect_seconds:.0f}/s)")
+        print(f"🧠 RSS {base_rss:.1f} MB -> {rss:.1f} MB (~{per_connection_kb:.1f} KB por conexão), "
+              f"threads {base_threads} -> {threads}")
+
+        time.sleep(args.idle)
+        cpu = server.usage()[2] - cpu_start
+        print(f"💤 CPU ociosa: {cpu:.3f}s em {args.idle:.0f}s ({100 * cpu / args.idle:.1f}%)")
+
+        controller = TransactionController()
+        latencies = []
+        for _ in range(args.transfers):
+            controller.transfer_funds(user_id, recipient.address, 1)
+            sent_at = time.perf_counter()
+            arrivals = wait_for(watcher, (b'event: transfer', b'event: balance'), 10)
+            latencies.append((arrivals[b'event: transfer'] - sent_at) * 1000)
+
+        ordered = sorted(latencies)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        print(f"⚡ transferência -> evento: p50 {statistics.median(latencies):.1f} ms, p95 {p95:.1f} ms "
+              f"(INDEXER_POLL_INTERVAL={os.environ['INDEXER_POLL_INTERVAL']}s)")
+        if args.server == 'threaded':
+            print(f"📊 {get_notifier().stats()}")
+    finally:
+        for sock in sockets:
+            sock.close()
+        if server is not None:
+            server.stop()
+        get_indexer().stop(snapshot=False)
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
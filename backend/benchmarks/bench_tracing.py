@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark do custo do tracing (src/utils/tracing.py)
+
+Sobe a EVM em processo e o app Flask (test client, sem rede) e mede a latência
+mediana de /balance e /transfer com TRACE_SAMPLE_RATE 0, 0.1 e 1, além do
+custo de um span isolado e de um `@traced` fora de um trace.
+
+Uso:
+    python benchmarks/bench_tracing.py --requests 200
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+BENCH_DIR = tempfile.mkdtemp(prefix='estcoin-bench-tracing-')
+os.environ['ESTCOIN_DB_PATH'] = os.path.join(BENCH_DIR, 'users.db')
+os.environ['SHARED_STATE_DB'] = os.path.join(BENCH_DIR, 'shared_state.db')
+os.environ['RATE_LIMIT_ENABLED'] = '0'
+os.environ['ESTCOIN_WARMUP'] = '0'
+os.environ['ESTCOIN_INDEXER'] = '0'
+os.environ['KEY_VAULT_SCRYPT_N'] = '1024'
+os.environ.setdefault('KEY_VAULT_DEV_KEY', '1')
+os.environ['KEY_POOL_SIZE'] = '0'
+os.environ['TRACE_FILE'] = os.path.join(BENCH_DIR, 'traces.jsonl')
+
+
+def median_ms(client, method, path, headers, count, **kwargs):
+    latencies = []
+    for _ in range(count):
+        started = time.perf_counter()
+        response = getattr(client, method)(path, headers=headers, **kwargs)
+        latencies.append(time.perf_counter() - started)
+        assert response.status_code == 200, response.get_json()
+    return statistics.median(latencies) * 1000
+
+
+def per_call_us(fn, count):
+    started = time.perf_counter()
+    for _ in range(count):
+        fn()
+    return (time.perf_counter() - started) / count * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do custo do tracing')
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    from src.blockchain.local_chain import start_in_process_chain
+    from src.config import Config
+    from src.utils import tracing
+
+    start_in_process_chain()
+    from src.app import create_app
+
+    client = create_app().test_client()
+    headers = {}
+    for username in ('alice', 'bob'):
+        client.post('/api/auth/register', json={'username': username, 'password': 'secret123'})
+        response = client.post('/api/auth/login', json={'username': username, 'password': 'secret123'})
+        headers[username] = {'Authorization': f"Bearer {response.get_json()['token']}"}
+
+    print("=" * 70)
+    print("  CUSTO DO TRACING")
+    print("=" * 70)
+    print(f"📖 {args.requests} requisições por cenário (mediana)")
+    exporter = tracing.get_exporter()
+    # Aquecimento: caches de contrato, ABI e conexões não entram na primeira medição
+    median_ms(client, 'get', '/api/transactions/balance', headers['alice'], 50)
+    for rate in (0.0, 0.1, 1.0):
+        Config.TRACE_SAMPLE_RATE = rate
+        before = exporter.stats()['spans']
+        balance = median_ms(client, 'get', '/api/transactions/balance', headers['alice'], args.requests)
+        transfer = median_ms(client, 'post', '/api/transactions/transfer', headers['alice'], args.requests,
+                             json={'recipient': 'bob', 'amount': 0.001})
+        exporter.flush(timeout=10)
+        spans = exporter.stats()['spans'] - before
+        print(f"   amostragem {rate:<4}: /balance {balance:6.2f} ms   /transfer {transfer:6.2f} ms   "
+              f"spans={spans}")
+
+    Config.TRACE_SAMPLE_RATE = 1.0
+    root = tracing.start_trace('bench')
+    Config.TRACE_MAX_SPANS = 10 ** 9
+
+    def one_span():
+        with tracing.span('bench.child'):
+            pass
+    inside = per_call_us(one_span, 20000)
+    root.end()
+
+    @tracing.traced('bench.noop')
+    def noop():
+        pass
+    outside = per_call_us(noop, 200000)
+    exporter.flush(timeout=10)
+
+    stats = exporter.stats()
+    print(f"\n⏱️ span dentro de um trace: {inside:.2f} µs   @traced fora de um trace: {outside:.3f} µs")
+    print(f"   gravados={stats['exported']} descartados={stats['dropped']} lotes={stats['batches']} "
+          f"arquivo={os.path.getsize(stats['file']) / 1024:.0f} KiB")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Benchmark: escalabilidade do servidor de produção de 1 a N workers
+
+Sobe uma EVM em processo exposta como nó JSON-RPC HTTP, inicia o Gunicorn com
+gunicorn.conf.py (preload + warm-up por worker) para cada quantidade de
+workers e roda o load_generator.py contra ele. Todos os workers compartilham o
+mesmo banco, o mesmo rate limit e o mesmo estado de nonces/faucet.
+
+O nó em processo é único e serializado, então operações que dependem dele
+(transfer, balance) escalam menos que as que gastam CPU no backend (login e
+registro usam bcrypt).
+
+Uso:
+    python benchmarks/bench_workers.py --workers 1,2,4 --duration 15
+"""
+import argparse
+import json
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+WORK_DIR = tempfile.mkdtemp(prefix='estcoin-bench-workers-')
+os.environ['ESTCOIN_DB_PATH'] = os.path.join(WORK_DIR, 'users.db')
+os.environ['ESTCOIN_INDEXER'] = '0'
+# Banco descartável: chave mestra aleatória criada ao lado dele
+os.environ.setdefault('KEY_VAULT_DEV_KEY', '1')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(url, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise Exception("Gunicorn encerrou antes de ficar pronto")
+        try:
+            with urllib.request.urlopen(url, timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise Exception(f"Gunicorn não respondeu em {timeout}s")
+
+
+def run_round(workers, node_url, chain_id, args):
+    port = free_port()
+    url = f'http://127.0.0.1:{port}'
+    env = dict(
+        os.environ,
+        BLOCKCHAIN_URL=node_url,
+        BLOCKCHAIN_URLS=node_url,
+        CHAIN_ID=str(chain_id),
+        BIND=f'127.0.0.1:{port}',
+        WEB_CONCURRENCY=str(workers),
+        GUNICORN_THREADS=str(args.threads),
+        GUNICORN_ACCESS_LOG='/dev/null',
+        RATE_LIMIT_ENABLED='0',
+        ESTCOIN_INDEXER='1',
+        SNAPSHOT_DIR=os.path.join(WORK_DIR, f'snapshots-{workers}'),
+    )
+    log = open(os.path.join(WORK_DIR, f'gunicorn-{workers}.log'), 'w')
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+        cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+    try:
+        wait_ready(url, process)
+        report_path = os.path.join(WORK_DIR, f'report-{workers}.json')
+        subprocess.run(
+            [sys.executable, 'load_generator.py', '--url', url,
+             '--seed-users', str(args.seed_users), '--duration', str(args.duration),
+             '--concurrency', str(args.concurrency), '--mix', args.mix,
+             '--seed', '42', '--json', report_path],
+            cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, check=True
+        )
+        with open(report_path) as f:
+            return json.load(f)
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        log.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de escalabilidade por workers do Gunicorn')
+    parser.add_argument('--workers', default='1,2,4', help='Quantidades de workers separadas por vírgula')
+    parser.add_argument('--threads', type=int, default=4, help='Threads por worker')
+    parser.add_argument('--duration', type=float, default=15.0, help='Duração de cada rodada (s)')
+    parser.add_argument('--seed-users', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--mix', default='login=3,balance=6,history=2,transfer=1')
+    args = parser.parse_args()
+
+    from src.blockchain.local_chain import start_in_process_chain, serve_json_rpc
+    from src.config import Config
+
+    start_in_process_chain()
+    server, node_url = serve_json_rpc()
+    print(f"✅ Nó JSON-RPC em processo: {node_url} (chain id {Config.CHAIN_ID})")
+    print(f"🖥️  CPUs disponíveis: {os.cpu_count()}")
+
+    results = []
+    try:
+        for workers in [int(value) for value in args.workers.split(',') if value.strip()]:
+            print(f"🚀 {workers} worker(s)...")
+            report = run_round(workers, node_url, Config.CHAIN_ID, args)
+            results.append((workers, report))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    base = results[0][1]['throughput_rps'] if results else 0
+    print()
+    operations = ('login', 'balance', 'history', 'transfer')
+    print("=" * 84)
+    print(f"{'workers':>8} {'req/s':>9} {'ganho':>7} {'erros':>6}  " +
+          ' '.join(f"{op + ' p50':>14}" for op in operations))
+    print("-" * 84)
+    for workers, report in results:
+        gain = report['throughput_rps'] / base if base else 0.0
+        latencies = ' '.join(
+            f"{report['operations'][op]['p50_ms']:>11.1f} ms" if op in report['operations'] else f"{'-':>14}"
+            for op in operations
+        )
+        print(f"{workers:>8} {report['throughput_rps']:>9.1f} {gain:>6.2f}x {report['errors']:>6}  {latencies}")
+    print("=" * 84)
+    print(f"Logs e relatórios em: {WORK_DIR}")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
@@ -1,8 +1,15 @@
 """
 Script para gerenciar o banco de dados SQLite
 """
-from src.models.user import init_db, SessionLocal, User, DB_PATH
+from src.models.user import init_db, SessionLocal, User, DB_PATH, engine
+from sqlalchemy import select
+import argparse
+import csv
+import gzip
+import json
 import os
+import sys
+import time
 
 def create_database():
     """Cria o banco de dados e as tabelas"""
@@ -10,28 +17,443 @@ def create_database():
     init_db()
     print(f"✅ Banco criado em: {DB_PATH}")
 
-def list_users():
-    """Lista todos os usuários"""
+LIST_FORMATS = ('table', 'json', 'csv')
+
+def iter_users(username=None, address=None, limit=None, page_size=1000):
+    """
+    Percorre os usuários em páginas usando paginação por chave (id > último id)
+
+    Apenas as colunas necessárias são lidas (sem montar objetos ORM), então a
+    memória usada é proporcional a uma página, não à tabela inteira.
+
+    Args:
+        username (str): Filtra usernames que contêm o texto
+        address (str): Filtra endereços que começam com o prefixo
+        limit (int): Número máximo de usuários
+        page_size (int): Linhas buscadas por consulta
+
+    Yields:
+        list: Páginas de tuplas (id, username, ethereum_address, balance)
+    """
+    db = SessionLocal()
+    try:
+        last_id = 0
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = page_size if remaining is None else min(page_size, remaining)
+            query = (
+                select(User.id, User.username, User.ethereum_address, User.balance)
+                .where(User.id > last_id)
+            )
+            if username:
+                query = query.where(User.username.contains(username, autoescape=True))
+            if address:
+                query = query.where(User.ethereum_address.istartswith(address, autoescape=True))
+            rows = db.execute(query.order_by(User.id).limit(size)).all()
+            if not rows:
+                break
+            yield rows
+            last_id = rows[-1][0]
+            if remaining is not None:
+                remaining -= len(rows)
+    finally:
+        db.close()
+
+def list_users(output_format='table', username=None, address=None, limit=None,
+               onchain=False, page_size=1000, batch_size=200, out=None):
+    """
+    Lista os usuários em streaming
+
+    Args:
+        output_format (str): table, json ou csv
+        username (str): Filtro por username (contém)
+        address (str): Filtro por prefixo do endereço
+        limit (int): Número máximo de usuários
+        onchain (bool): Busca o saldo real de tokens no contrato (em lotes)
+        page_size (int): Linhas por página do banco
+        batch_size (int): Endereços por requisição de saldo on-chain
+        out: Arquivo de saída (padrão: stdout)
+    """
+    out = out or sys.stdout
+    balance_label = 'onchain_balance' if onchain else 'balance'
+    fields = ['id', 'username', 'ethereum_address', balance_label]
+    total = 0
+
+    if onchain:
+        from src.blockchain.contract import get_token_balances
+        from src.utils.token_amount import TokenAmount
+
+    if output_format == 'csv':
+        writer = csv.writer(out)
+        writer.writerow(fields)
+    elif output_format == 'json':
+        out.write('[')
+    else:
+        print(f"{'ID':>8}  {'Username':<24}  {'Ethereum Address':<42}  {'Balance (EST)':>16}", file=out)
+        print("-" * 96, file=out)
+
+    for page in iter_users(username=username, address=address, limit=limit, page_size=page_size):
+        if onchain:
+            units = get_token_balances([row[2] for row in page], batch_size=batch_size)
+
+        for user_id, name, eth_address, stale_balance in page:
+            if onchain:
+                value = units.get(eth_address)
+                balance = float(TokenAmount(value)) if value is not None else None
+            else:
+                balance = stale_balance
+
+            if output_format == 'csv':
+                writer.writerow([user_id, name, eth_address, '' if balance is None else balance])
+            elif output_format == 'json':
+                out.write(',\n' if total else '\n')
+                out.write(json.dumps(dict(zip(fields, [user_id, name, eth_address, balance]))))
+            else:
+                shown = 'n/d' if balance is None else f'{balance:,.4f}'
+                print(f"{user_id:>8}  {name:<24}  {eth_address:<42}  {shown:>16}", file=out)
+            total += 1
+
+    if output_format == 'json':
+        out.write('\n]\n' if total else ']\n')
+    elif output_format == 'table':
+        print("-" * 96, file=out)
+        if total:
+            print(f"📋 Total de usuários: {total}", file=out)
+        else:
+            print("❌ Nenhum usuário encontrado", file=out)
+
+def parse_list_args(argv):
+    """Lê as opções do comando list"""
+    parser = argparse.ArgumentParser(prog='db_manager.py list')
+    parser.add_argument('--format', choices=LIST_FORMATS, default='table')
+    parser.add_argument('--username', help='Filtra usernames que contêm o texto')
+    parser.add_argument('--address', help='Filtra endereços que começam com o prefixo')
+    parser.add_argument('--limit', type=int, help='Número máximo de usuários')
+    parser.add_argument('--onchain', action='store_true',
+                        help='Mostra o saldo real de tokens no contrato em vez da coluna balance')
+    parser.add_argument('--page-size', type=int, default=1000)
+    parser.add_argument('--batch-size', type=int, default=200)
+    return parser.parse_args(argv)
+
+def encrypt_keys(page_size=200):
+    """
+    Cifra com o cofre de chaves as chaves privadas ainda gravadas em texto puro
+
+    Cada chave custa uma derivação scrypt; usuários já cifrados são ignorados,
+    então o comando pode ser interrompido e executado de novo.
+    """
+    from src.blockchain.key_vault import get_key_vault, is_encrypted
+
+    key_vault = get_key_vault()
+    db = SessionLocal()
+    encrypted = 0
+    try:
+        last_id = 0
+        while True:
+            users = db.execute(
+                select(User).where(User.id > last_id).order_by(User.id).limit(page_size)
+            ).scalars().all()
+            if not users:
+                break
+            for user in users:
+                if not is_encrypted(user.private_key):
+                    user.private_key = key_vault.encrypt(user.private_key)
+                    encrypted += 1
+            db.commit()
+            last_id = users[-1].id
+            print(f"🔐 {encrypted} chave(s) cifrada(s) até o usuário #{last_id}")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    print(f"✅ {encrypted} chave(s) privada(s) cifrada(s)")
+
+def rebuild_summaries(from_block=0):
+    """
+    Recalcula os resumos por endereço (account_summaries) a partir de transfer_events
+
+    Args:
+        from_block (int): Só os endereços com eventos a partir deste bloco (0 = todos)
+    """
+    from src.models.user import engine
+    from src.indexer import summaries
+
+    init_db()
+    with engine.begin() as conn:
+        count = summaries.rebuild(conn, from_block)
+    print(f"✅ {count} resumo(s) recalculado(s) desde o bloco {from_block}")
+
+def fill_key_pool(size=None):
+    """
+    Completa o pool de contas pré-geradas (ex: antes de uma leva de cadastros)
+
+    Args:
+        size (int): Contas no pool ao final (padrão: KEY_POOL_SIZE)
+    """
+    from src.blockchain.key_pool import KeyPool
+
+    pool = KeyPool(size=size)
+    if not pool.enabled:
+        print("❌ Pool de chaves desativado (KEY_POOL_SIZE=0)")
+        return
+    generated = pool.refill()
+    stats = pool.stats()
+    print(f"✅ {generated} conta(s) gerada(s) ({stats['refill_rate'] or 0} contas/s); "
+          f"{stats['depth']} no pool")
+
+EXPORT_FORMAT = 'estcoin-users'
+EXPORT_VERSION = 1
+EXPORT_COLUMNS = ('id', 'username', 'password_hash', 'ethereum_address', 'private_key', 'balance')
+
+def export_users(path, page_size=5000, allow_plaintext=False):
+    """
+    Exporta os usuários em streaming para um arquivo JSON Lines compactado (gzip)
+
+    Formato: uma linha de cabeçalho ({"format", "version", "columns"}), uma
+    lista por usuário na ordem de `columns` e uma linha final {"count": N}
+    que permite ao import detectar um arquivo truncado. As chaves privadas vão
+    como estão no banco (keystore cifrado pelo cofre): o ambiente de destino
+    precisa da mesma KEY_VAULT_MASTER_KEY.
+
+    Args:
+        path (str): Arquivo de saída (ex: users.jsonl.gz)
+        page_size (int): Linhas por consulta (paginação por chave)
+        allow_plaintext (bool): Exporta mesmo com chaves ainda em texto puro
+    """
+    from sqlalchemy import func, not_
+
     db = SessionLocal()
     try:
-        users = db.query(User).all()
-        
-        if not users:
-            print("❌ Nenhum usuário encontrado")
-            return
-        
-        print(f"\n📋 Total de usuários: {len(users)}\n")
-        print("-" * 80)
-        
-        for user in users:
-            print(f"ID: {user.id}")
-            print(f"Username: {user.username}")
-            print(f"Ethereum Address: {user.ethereum_address}")
-            print(f"Balance: {user.balance} EST")
-            print("-" * 80)
-            
+        plaintext = db.execute(
+            select(func.count()).select_from(User).where(not_(User.private_key.like('{%')))
+        ).scalar()
+        if plaintext and not allow_plaintext:
+            raise SystemExit(f"❌ {plaintext} usuário(s) com chave privada em texto puro. "
+                             "Rode 'python db_manager.py encrypt-keys' antes de exportar.")
+
+        started = time.perf_counter()
+        columns = [getattr(User, name) for name in EXPORT_COLUMNS]
+        total = 0
+        with gzip.open(path, 'wt', encoding='utf-8', compresslevel=6) as out:
+            out.write(json.dumps({'format': EXPORT_FORMAT, 'version': EXPORT_VERSION,
+                                  'columns': EXPORT_COLUMNS}) + '\n')
+            last_id = 0
+            while True:
+                rows = db.execute(
+                    select(*columns).where(User.id > last_id).order_by(User.id).limit(page_size)
+                ).all()
+                if not rows:
+                    break
+                out.writelines(json.dumps(list(row), separators=(',', ':')) + '\n' for row in rows)
+                total += len(rows)
+                last_id = rows[-1][0]
+            out.write(json.dumps({'count': total}) + '\n')
     finally:
         db.close()
+    elapsed = time.perf_counter() - started
+    print(f"✅ {total} usuário(s) exportado(s) para {path} em {elapsed:.1f}s "
+          f"({os.path.getsize(path) / 1024:.0f} KB)")
+    return total
+
+def _read_export(path):
+    """
+    Lê um arquivo do export linha a linha
+
+    Yields:
+        tuple: (número da linha, lista de valores na ordem de EXPORT_COLUMNS)
+    """
+    with gzip.open(path, 'rt', encoding='utf-8') as source:
+        header = json.loads(source.readline() or 'null')
+        if not isinstance(header, dict) or header.get('format') != EXPORT_FORMAT:
+            raise SystemExit(f"❌ {path} não é um export de usuários do EstCoin")
+        if header.get('version') != EXPORT_VERSION:
+            raise SystemExit(f"❌ Versão do export não suportada: {header.get('version')}")
+        positions = [header['columns'].index(name) for name in EXPORT_COLUMNS]
+
+        count = 0
+        trailer = None
+        for line_number, line in enumerate(source, start=2):
+            value = json.loads(line)
+            if isinstance(value, dict):
+                trailer = value
+                break
+            count += 1
+            yield line_number, [value[position] for position in positions]
+        if trailer is None or trailer.get('count') != count:
+            raise SystemExit(f"❌ Arquivo truncado: {count} usuário(s) lido(s), "
+                             f"esperado(s) {trailer.get('count') if trailer else '?'}")
+
+def _validate_row(row):
+    """Mensagem de erro da linha, ou None se ela pode ser importada"""
+    _, username, password_hash, address, private_key, _ = row
+    if not username or len(username) > 50:
+        return 'username vazio ou com mais de 50 caracteres'
+    if not password_hash:
+        return 'password_hash vazio'
+    if not isinstance(address, str) or len(address) != 42 or not address.startswith('0x'):
+        return f'endereço inválido: {address!r}'
+    if not private_key:
+        return 'chave privada vazia'
+    return None
+
+# Conflitos verificados depois da carga: (descrição, consulta das linhas do staging em conflito)
+IMPORT_CHECKS = (
+    ('username repetido no arquivo',
+     'SELECT rowid FROM import_users WHERE rowid NOT IN (SELECT MIN(rowid) FROM import_users GROUP BY username)'),
+    ('endereço repetido no arquivo',
+     'SELECT rowid FROM import_users WHERE rowid NOT IN '
+     '(SELECT MIN(rowid) FROM import_users GROUP BY lower(ethereum_address))'),
+    ('username já existe no banco',
+     'SELECT s.rowid FROM import_users s JOIN users u ON u.username = s.username'),
+    ('endereço já existe no banco',
+     'SELECT s.rowid FROM import_users s JOIN users u ON lower(u.ethereum_address) = lower(s.ethereum_address)'),
+)
+KEEP_IDS_CHECKS = (
+    ('id repetido no arquivo',
+     'SELECT rowid FROM import_users WHERE rowid NOT IN (SELECT MIN(rowid) FROM import_users GROUP BY id)'),
+    ('id já existe no banco',
+     'SELECT s.rowid FROM import_users s JOIN users u ON u.id = s.id'),
+)
+
+def import_users(path, batch_size=10000, on_conflict='fail', keep_ids=False, key_check=True):
+    """
+    Importa usuários de um arquivo gerado por export_users
+
+    As linhas são carregadas com executemany em lotes de `batch_size`, dentro
+    de uma única transação, em uma tabela temporária sem índices nem
+    restrições. As verificações (usernames/endereços repetidos no arquivo ou
+    já existentes no banco) rodam uma vez, sobre o conjunto, depois da carga;
+    só então os usuários entram na tabela users com um INSERT ... SELECT.
+    Nada é gravado se alguma verificação falhar (on_conflict='fail').
+
+    Args:
+        path (str): Arquivo do export
+        batch_size (int): Linhas por executemany
+        on_conflict (str): 'fail' aborta sem gravar nada; 'skip' importa só as linhas sem conflito
+        keep_ids (bool): Mantém os ids do arquivo (padrão: novos ids)
+        key_check (bool): Confere se a primeira chave abre com a chave mestra deste ambiente
+
+    Returns:
+        int: Usuários importados
+    """
+    init_db()
+    started = time.perf_counter()
+    invalid = []
+    checked_key = not key_check
+
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.execute('PRAGMA temp_store = FILE')
+        cursor.execute('DROP TABLE IF EXISTS temp.import_users')
+        cursor.execute(
+            'CREATE TEMP TABLE import_users ('
+            ' id INTEGER, username TEXT, password_hash TEXT,'
+            ' ethereum_address TEXT, private_key TEXT, balance REAL)'
+        )
+        insert = 'INSERT INTO import_users VALUES (?, ?, ?, ?, ?, ?)'
+        batch = []
+        loaded = 0
+        for line_number, row in _read_export(path):
+            error = _validate_row(row)
+            if error:
+                invalid.append((line_number, error))
+                continue
+            if not checked_key:
+                _check_master_key(row[3], row[4])
+                checked_key = True
+            batch.append(row)
+            if len(batch) >= batch_size:
+                cursor.executemany(insert, batch)
+                loaded += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(insert, batch)
+            loaded += len(batch)
+        load_seconds = time.perf_counter() - started
+
+        if invalid and on_conflict == 'fail':
+            raw.rollback()
+            for line_number, error in invalid[:10]:
+                print(f"   linha {line_number}: {error}")
+            raise SystemExit(f"❌ {len(invalid)} linha(s) inválida(s); nada foi importado")
+
+        # Restrições adiadas: índices e verificações depois da carga, sobre o conjunto
+        cursor.execute('CREATE INDEX temp.import_users_username ON import_users (username)')
+        cursor.execute('CREATE INDEX temp.import_users_address ON import_users (lower(ethereum_address))')
+        conflicts = {}
+        for description, query in IMPORT_CHECKS + (KEEP_IDS_CHECKS if keep_ids else ()):
+            rowids = [rowid for (rowid,) in cursor.execute(query).fetchall()]
+            if not rowids:
+                continue
+            conflicts[description] = len(rowids)
+            if on_conflict == 'skip':
+                cursor.executemany('DELETE FROM import_users WHERE rowid = ?', [(rowid,) for rowid in rowids])
+
+        if conflicts and on_conflict == 'fail':
+            raw.rollback()
+            for description, count in conflicts.items():
+                print(f"   {description}: {count}")
+            raise SystemExit("❌ Conflitos encontrados; nada foi importado (use --on-conflict skip)")
+
+        id_column = 'id, ' if keep_ids else ''
+        imported = cursor.execute(
+            f'INSERT INTO users ({id_column}username, password_hash, ethereum_address, private_key, balance) '
+            f'SELECT {id_column}username, password_hash, ethereum_address, private_key, balance '
+            'FROM import_users ORDER BY rowid'
+        ).rowcount
+        cursor.execute('DROP TABLE temp.import_users')
+        raw.commit()
+    except BaseException:
+        raw.rollback()
+        raise
+    finally:
+        raw.close()
+
+    elapsed = time.perf_counter() - started
+    skipped = len(invalid) + sum(conflicts.values())
+    print(f"✅ {imported} usuário(s) importado(s) em {elapsed:.1f}s "
+          f"({imported / elapsed * 60:,.0f}/min; carga de {loaded} linha(s) em {load_seconds:.1f}s)"
+          + (f", {skipped} ignorado(s)" if skipped else ''))
+    for description, count in conflicts.items():
+        print(f"   {description}: {count}")
+    return imported
+
+def _check_master_key(address, private_key):
+    """Aborta se a chave do arquivo não abre com a chave mestra deste ambiente"""
+    from eth_account import Account
+    from src.blockchain.key_vault import get_key_vault, is_encrypted
+
+    if not is_encrypted(private_key):
+        return
+    try:
+        valid = Account.from_key(get_key_vault().decrypt(private_key)).address.lower() == address.lower()
+    except Exception:
+        valid = False
+    if not valid:
+        raise SystemExit("❌ As chaves do arquivo não abrem com a KEY_VAULT_MASTER_KEY deste ambiente "
+                         "(use --no-key-check para importar mesmo assim)")
+
+def parse_export_args(argv):
+    """Lê as opções do comando export"""
+    parser = argparse.ArgumentParser(prog='db_manager.py export')
+    parser.add_argument('path', help='Arquivo de saída (ex: users.jsonl.gz)')
+    parser.add_argument('--page-size', type=int, default=5000)
+    parser.add_argument('--allow-plaintext', action='store_true',
+                        help='Exporta mesmo com chaves privadas ainda em texto puro')
+    return parser.parse_args(argv)
+
+def parse_import_args(argv):
+    """Lê as opções do comando import"""
+    parser = argparse.ArgumentParser(prog='db_manager.py import')
+    parser.add_argument('path', help='Arquivo gerado pelo export')
+    parser.add_argument('--batch-size', type=int, default=10000, help='Linhas por executemany')
+    parser.add_argument('--on-conflict', choices=('fail', 'skip'), default='fail')
+    parser.add_argument('--keep-ids', action='store_true', help='Mantém os ids do arquivo')
+    parser.add_argument('--no-key-check', dest='key_check', action='store_false',
+                        help='Não confere a chave mestra com a primeira chave do arquivo')
+    return parser.parse_args(argv)
 
 def delete_database():
     """Deleta o banco de dados"""
@@ -49,12 +471,17 @@ def reset_database():
     print("✅ Banco resetado com sucesso!")
 
 if __name__ == '__main__':
-    import sys
-    
     if len(sys.argv) < 2:
         print("\n📚 Uso:")
         print("  python db_manager.py create    - Cria o banco de dados")
         print("  python db_manager.py list      - Lista todos os usuários")
+        print("      [--format table|json|csv] [--username TXT] [--address 0x..] [--limit N] [--onchain]")
+        print("  python db_manager.py encrypt-keys - Cifra as chaves privadas em texto puro")
+        print("  python db_manager.py rebuild-summaries [BLOCO] - Recalcula os resumos por endereço")
+        print("  python db_manager.py fill-key-pool [N] - Completa o pool de contas pré-geradas")
+        print("  python db_manager.py export ARQUIVO - Exporta os usuários (JSON Lines + gzip)")
+        print("  python db_manager.py import ARQUIVO - Importa usuários de um export")
+        print("      [--on-conflict fail|skip] [--keep-ids] [--batch-size N] [--no-key-check]")
         print("  python db_manager.py delete    - Deleta o banco de dados")
         print("  python db_manager.py reset     - Reseta o banco (deleta e recria)")
         sys.exit(1)
@@ -64,7 +491,29 @@ if __name__ == '__main__':
     if command == 'create':
         create_database()
     elif command == 'list':
-        list_users()
+        args = parse_list_args(sys.argv[2:])
+        list_users(
+            output_format=args.format,
+            username=args.username,
+            address=args.address,
+            limit=args.limit,
+            onchain=args.onchain,
+            page_size=args.page_size,
+            batch_size=args.batch_size
+        )
+    elif command == 'encrypt-keys':
+        encrypt_keys()
+    elif command == 'rebuild-summaries':
+        rebuild_summaries(int(sys.argv[2]) if len(sys.argv) > 2 else 0)
+    elif command == 'fill-key-pool':
+        fill_key_pool(int(sys.argv[2]) if len(sys.argv) > 2 else None)
+    elif command == 'export':
+        args = parse_export_args(sys.argv[2:])
+        export_users(args.path, page_size=args.page_size, allow_plaintext=args.allow_plaintext)
+    elif command == 'import':
+        args = parse_import_args(sys.argv[2:])
+        import_users(args.path, batch_size=args.batch_size, on_conflict=args.on_conflict,
+                     keep_ids=args.keep_ids, key_check=args.key_check)
     elif command == 'delete':
         delete_database()
     elif command == 'reset':
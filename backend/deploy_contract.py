@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 """
-Script para fazer deploy do contrato Token e atualizar o config.py com o endereço
+Script para fazer deploy dos contratos Token e Faucet e salvar os endereços no banco
 """
 import json
 import os
@@ -15,6 +15,7 @@ INITIAL_SUPPLY = 1_000_000  # 1 milhão de tokens
 BACKEND_DIR = Path(__file__).parent
 PROJECT_DIR = BACKEND_DIR.parent
 CONTRACT_BUILD_PATH = PROJECT_DIR / "blockchain" / "build" / "contracts" / "Token.json"
+FAUCET_BUILD_PATH = PROJECT_DIR / "blockchain" / "build" / "contracts" / "Faucet.json"
 CONFIG_PATH = BACKEND_DIR / "src" / "config.py"
 
 def load_contract_data():
@@ -101,7 +102,47 @@ def deploy_contract():
         print(f"❌ Erro ao fazer deploy: {e}")
         return None
 
-def update_config(contract_address):
+def deploy_faucet(token_address):
+    """Faz o deploy do contrato Faucet (ETH + ESTC para contas novas em uma transação)"""
+    print("\n🚰 Fazendo deploy do contrato Faucet...")
+    
+    contract_json = None
+    if FAUCET_BUILD_PATH.exists():
+        with open(FAUCET_BUILD_PATH, 'r') as f:
+            contract_json = json.load(f)
+        # Só artefatos com os dados do compilador (truffle ou py-solc-x) são aceitos
+        if not contract_json.get('compiler') or not contract_json.get('metadata'):
+            contract_json = None
+    
+    if contract_json is None:
+        # Sem artefato do truffle: compila o Faucet.sol com o py-solc-x e grava o
+        # Faucet.json onde o truffle gravaria (o backend lê o ABI dali)
+        try:
+            from src.blockchain.local_chain import compile_faucet
+            
+            contract_json = compile_faucet()
+        except Exception as e:
+            print(f"⚠️  Não foi possível compilar o Faucet.sol ({e}): o cadastro usará duas transações por usuário")
+            return None
+        with open(FAUCET_BUILD_PATH, 'w') as f:
+            json.dump(contract_json, f, indent=2)
+        print(f"✅ Faucet.sol compilado com solc {contract_json['compiler']['version']}")
+    
+    web3 = Web3(Web3.HTTPProvider(BLOCKCHAIN_URL))
+    try:
+        Faucet = web3.eth.contract(abi=contract_json['abi'], bytecode=contract_json['bytecode'])
+        tx_hash = Faucet.constructor(token_address).transact({
+            'from': web3.eth.accounts[0],
+            'gas': 1000000
+        })
+        tx_receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
+        print(f"✅ Faucet deployado: {tx_receipt.contractAddress}")
+        return tx_receipt.contractAddress
+    except Exception as e:
+        print(f"❌ Erro ao fazer deploy do Faucet: {e}")
+        return None
+
+def update_config(contract_address, faucet_address=None):
     """Salva o endereço do contrato no banco de dados"""
     print(f"\n📝 Salvando endereço do contrato no banco de dados...")
     
@@ -114,9 +155,14 @@ def update_config(contract_address):
         # Salva o endereço no banco
         success = SystemConfig.set_value('TOKEN_CONTRACT_ADDRESS', contract_address)
         
+        # Sem Faucet novo, apaga o antigo (ele aponta para o token anterior)
+        success = SystemConfig.set_value('FAUCET_CONTRACT_ADDRESS', faucet_address) and success
+        
         if success:
             print(f"✅ Endereço salvo no banco de dados!")
             print(f"   TOKEN_CONTRACT_ADDRESS = '{contract_address}'")
+            if faucet_address:
+                print(f"   FAUCET_CONTRACT_ADDRESS = '{faucet_address}'")
         else:
             print(f"❌ Erro ao salvar endereço no banco de dados")
             
@@ -140,7 +186,7 @@ def main():
     
     if contract_address:
         # Atualiza o config
-        update_config(contract_address)
+        update_config(contract_address, deploy_faucet(contract_address))
         
         print()
         print("=" * 70)
@@ -148,7 +194,8 @@ def main():
         print("=" * 70)
         print()
         print("Próximos passos:")
-        print("1. Reinicie o servidor backend para carregar o novo endereço")
+        print("1. O backend em execução passa a usar o novo endereço em até "
+              "CONFIG_POLL_INTERVAL segundos (sem reiniciar)")
         print("2. Distribua tokens iniciais para os usuários se necessário")
         print()
     else:
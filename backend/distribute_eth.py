@@ -18,6 +18,9 @@ if 'src.config' in sys.modules:
 from src.models.user import SessionLocal, User
 from src.config import Config
 from src.blockchain.web3_client import web3
+from src.blockchain.contract import get_faucet_contract
+from src.utils.token_utils import faucet_grant_many, FAUCET_BATCH_SIZE
+from src.blockchain.tx_queue import submit_transaction, PRIORITY_PAYOUT
 
 ETH_PER_USER = 1.0  # Quantidade de ETH para cada usuário (para pagar gás)
 
@@ -90,6 +93,12 @@ def distribute_eth():
     success_count = 0
     error_count = 0
     
+    # Com o contrato Faucet os envios são agrupados: uma transação por lote
+    use_faucet = get_faucet_contract() is not None
+    pending = []
+    if use_faucet:
+        print(f"🚰 Contrato Faucet encontrado: envios em lotes de até {FAUCET_BATCH_SIZE} usuários")
+    
     for user in users:
         try:
             address = user.ethereum_address
@@ -111,16 +120,19 @@ def distribute_eth():
             amount_to_send = eth_amount - current_balance_eth
             amount_wei = web3.to_wei(amount_to_send, 'ether')
             
-            # Envia ETH
-            tx_hash = web3.eth.send_transaction({
-                'from': faucet,
+            if use_faucet:
+                print(f"   📦 {amount_to_send:.4f} ETH no próximo lote do faucet")
+                pending.append((address, amount_wei, 0))
+                continue
+            
+            # Envia ETH pela fila de saída do faucet (cadastros passam na frente)
+            receipt = submit_transaction(faucet, {
                 'to': address,
                 'value': amount_wei,
-                'gas': 21000
-            })
-            
-            # Aguarda confirmação
-            receipt = web3.eth.wait_for_transaction_receipt(tx_hash, timeout=30)
+                'gas': 21000,
+                'gasPrice': Config.GAS_PRICE
+            }, PRIORITY_PAYOUT).wait_receipt(timeout=120)
+            tx_hash = receipt.transactionHash
             
             if receipt['status'] == 1:
                 new_balance = web3.eth.get_balance(address)
@@ -138,6 +150,17 @@ def distribute_eth():
             print(f"   ❌ Erro: {e}")
             error_count += 1
     
+    if pending:
+        print(f"\n📦 Enviando para {len(pending)} usuário(s) pelo faucet...")
+        for batch in faucet_grant_many(pending, faucet):
+            count = len(batch['addresses'])
+            if 'tx_hash' in batch:
+                print(f"   ✅ {count} usuário(s) - TX: {batch['tx_hash']}")
+                success_count += count
+            else:
+                print(f"   ❌ {count} usuário(s): {batch['error']}")
+                error_count += count
+    
     print()
     print("=" * 70)
     print("  RESUMO DA DISTRIBUIÇÃO")
@@ -8,6 +8,11 @@ import os
 from pathlib import Path
 from web3 import Web3
 from src.models.user import SessionLocal, User, SystemConfig
+from src.blockchain.contract import get_faucet_contract
+from src.utils.token_utils import faucet_grant_many, FAUCET_BATCH_SIZE
+from src.blockchain.tx_queue import submit_transaction, PRIORITY_PAYOUT
+from src.config import Config
+from src.utils.token_amount import TokenAmount
 
 # Lê as configurações necessárias
 BLOCKCHAIN_URL = 'http://127.0.0.1:8545'
@@ -132,7 +137,8 @@ def distribute_tokens():
         tokens_amount = TOKENS_PER_USER
     
     # Converte para unidades (18 decimais)
-    amount_units = int(tokens_amount * (10 ** 18))
+    amount_units = TokenAmount.parse(tokens_amount).units
+    initial_balance = TokenAmount.parse(10)
     
     print(f"🎁 Distribuindo {tokens_amount} EST para cada usuário (saldo inicial)...")
     print(f"   Cada usuário receberá até 10 ESTCOIN no total...")
@@ -141,45 +147,53 @@ def distribute_tokens():
     success_count = 0
     error_count = 0
     
+    # Com o contrato Faucet os envios são agrupados: uma transação por lote
+    use_faucet = get_faucet_contract() is not None
+    pending = []
+    if use_faucet:
+        print(f"🚰 Contrato Faucet encontrado: envios em lotes de até {FAUCET_BATCH_SIZE} usuários")
+    
     for user in users:
         try:
             # Verifica saldo atual do usuário
-            current_balance = contract.functions.balanceOf(user.ethereum_address).call()
-            current_balance_tokens = current_balance / (10 ** 18)
+            current_balance = TokenAmount(contract.functions.balanceOf(user.ethereum_address).call())
             
             print(f"\n👤 {user.username} ({user.ethereum_address})")
-            print(f"   Saldo atual: {current_balance_tokens:.2f} EST")
+            print(f"   Saldo atual: {float(current_balance):.2f} EST")
             
             # Se já tem 10 ou mais tokens, pula
-            if current_balance_tokens >= 10:
+            if current_balance >= initial_balance:
                 print(f"   ✅ Já possui saldo inicial (10 EST), pulando...")
                 success_count += 1
                 continue
             
             # Se tem menos de 10, completa até 10
-            if current_balance_tokens > 0 and current_balance_tokens < 10:
-                tokens_to_send = 10 - current_balance_tokens
-                amount_units = int(tokens_to_send * (10 ** 18))
-                print(f"   🔄 Completando saldo para 10 EST (enviando {tokens_to_send:.2f} EST)...")
+            if current_balance:
+                tokens_to_send = initial_balance - current_balance
+                print(f"   🔄 Completando saldo para 10 EST (enviando {float(tokens_to_send):.2f} EST)...")
             else:
-                tokens_to_send = tokens_amount
+                tokens_to_send = TokenAmount.parse(tokens_amount)
+            amount_units = tokens_to_send.units
             
-            # Transfere tokens
-            if 'tokens_to_send' not in locals():
-                tokens_to_send = tokens_amount
+            if use_faucet:
+                print(f"   📦 {tokens_to_send} EST no próximo lote do faucet")
+                pending.append((user.ethereum_address, 0, amount_units))
+                continue
                 
             print(f"   📤 Transferindo {tokens_to_send} EST...")
             
-            tx_hash = contract.functions.transfer(
+            # Fila de saída do faucet, como pagamento em lote (cadastros passam na frente)
+            transaction = contract.functions.transfer(
                 user.ethereum_address,
                 amount_units
-            ).transact({
+            ).build_transaction({
                 'from': deployer,
-                'gas': 100000
+                'gas': 100000,
+                'gasPrice': Config.GAS_PRICE,
+                'chainId': Config.CHAIN_ID
             })
-            
-            # Aguarda confirmação
-            tx_receipt = web3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+            tx_receipt = submit_transaction(deployer, transaction, PRIORITY_PAYOUT).wait_receipt(timeout=120)
+            tx_hash = tx_receipt.transactionHash
             
             if tx_receipt.status == 1:
                 print(f"   ✅ Transferência concluída!")
@@ -198,6 +212,17 @@ def distribute_tokens():
             print(f"   ❌ Erro: {e}")
             error_count += 1
     
+    if pending:
+        print(f"\n📦 Enviando para {len(pending)} usuário(s) pelo faucet...")
+        for batch in faucet_grant_many(pending, deployer):
+            count = len(batch['addresses'])
+            if 'tx_hash' in batch:
+                print(f"   ✅ {count} usuário(s) - TX: {batch['tx_hash']}")
+                success_count += count
+            else:
+                print(f"   ❌ {count} usuário(s): {batch['error']}")
+                error_count += count
+    
     print()
     print("=" * 70)
     print("  RESUMO DA DISTRIBUIÇÃO")
@@ -0,0 +1,50 @@
+"""
+Configuracao do Gunicorn para producao
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+O app e carregado uma vez no processo mestre (preload_app): web3, controllers,
+ABI e tabelas sao preparados antes do fork e compartilhados por copy-on-write.
+Cada worker, logo depois do fork, conecta ao no, carrega o contrato e sincroniza
+o seu indexador antes de aceitar requisicoes. Nonces, fila do faucet e rate
+limit sao coordenados entre workers via SQLite (ver SHARED_STATE.md).
+"""
+import multiprocessing
+import os
+
+bind = os.getenv('BIND', f"0.0.0.0:{os.getenv('PORT', '5000')}")
+workers = int(os.getenv('WEB_CONCURRENCY', min(multiprocessing.cpu_count() * 2 + 1, 8)))
+# As rotas passam a maior parte do tempo esperando o no Ethereum
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+# /api/transactions/stream e servido pelo gunicorn_sse.conf.py (worker gevent,
+# milhares de conexoes por processo); o proxy encaminha so essa rota para ele.
+# Se chegar aqui, com gthread cada conexao prende uma thread do worker enquanto
+# estiver aberta: o teto e SSE_MAX_STREAMS por worker (padrao: metade das
+# threads, para sobrar thread para as demais rotas). O valor efetivo aparece no
+# log ao iniciar.
+sse_max_streams = None
+if worker_class == 'gthread':
+    sse_max_streams = int(os.getenv('SSE_MAX_STREAMS', max(1, threads // 2)))
+    if sse_max_streams >= threads:
+        raise RuntimeError(f"SSE_MAX_STREAMS={sse_max_streams} ocuparia todas as {threads} threads "
+                           f"do worker; aumente GUNICORN_THREADS")
+    os.environ['SSE_MAX_STREAMS'] = str(sse_max_streams)
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))
+preload_app = True
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+
+
+def when_ready(server):
+    """Mostra o teto de conexoes SSE da configuracao"""
+    if sse_max_streams is not None:
+        print(f"SSE: ate {sse_max_streams} conexoes por worker, {sse_max_streams * workers} no total "
+              f"(GUNICORN_THREADS={threads})")
+
+
+def post_worker_init(worker):
+    """Warm-up completo em cada worker (depois do fork)"""
+    if os.getenv('ESTCOIN_WARMUP', '1') == '1':
+        from src.app import warm_up
+
+        warm_up(worker.wsgi)
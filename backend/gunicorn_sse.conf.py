@@ -0,0 +1,51 @@
+"""
+Configuracao do Gunicorn para as notificacoes em tempo real (SSE)
+
+    gunicorn -c gunicorn_sse.conf.py wsgi:app
+
+Processo separado que atende /api/transactions/stream com o worker gevent: uma
+conexao ociosa e uma greenlet esperando um threading.Event (com monkey patch),
+nao uma thread do servidor, entao um worker segura milhares de conexoes. O
+proxy reverso encaminha so /api/transactions/stream para este processo e o
+resto da API para o gunicorn.conf.py (ver README.md).
+
+Requer o pacote gevent (requirements.txt).
+"""
+import os
+
+bind = os.getenv('SSE_BIND', f"0.0.0.0:{os.getenv('SSE_PORT', '5001')}")
+# Cada worker tem o proprio indexador seguindo os blocos; um basta para milhares de conexoes
+workers = int(os.getenv('SSE_WORKERS', '1'))
+worker_class = 'gevent'
+worker_connections = int(os.getenv('SSE_WORKER_CONNECTIONS', '10000'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))
+# Streams nao terminam sozinhos: no restart o worker so espera este prazo e os
+# clientes (EventSource) reconectam no novo worker
+graceful_timeout = int(os.getenv('SSE_GRACEFUL_TIMEOUT', '5'))
+# Sem preload: o gevent precisa aplicar o monkey patch antes de o app importar
+# threading, sockets e o web3
+preload_app = False
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+
+# Conexoes por worker abaixo de worker_connections, com folga para os demais requests
+sse_max_streams = int(os.getenv('SSE_MAX_STREAMS', max(1, worker_connections - 100)))
+if sse_max_streams >= worker_connections:
+    raise RuntimeError(f"SSE_MAX_STREAMS={sse_max_streams} ocuparia todas as {worker_connections} "
+                       f"conexoes do worker; aumente SSE_WORKER_CONNECTIONS")
+os.environ['SSE_MAX_STREAMS'] = str(sse_max_streams)
+# Este processo nao atende cadastros: sem pool de contas pre-geradas
+os.environ.setdefault('KEY_POOL_SIZE', '0')
+
+
+def when_ready(server):
+    """Mostra o teto de conexoes SSE da configuracao"""
+    print(f"SSE (gevent): ate {sse_max_streams} conexoes por worker, {sse_max_streams * workers} no total "
+          f"(SSE_WORKER_CONNECTIONS={worker_connections})")
+
+
+def post_worker_init(worker):
+    """Warm-up completo em cada worker (depois do fork)"""
+    if os.getenv('ESTCOIN_WARMUP', '1') == '1':
+        from src.app import warm_up
+
+        warm_up(worker.wsgi)
@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+"""
+Gerador de carga para a API EstCoin
+
+Simula uma população de usuários que se registram, fazem login, consultam saldo
+e histórico e transferem tokens entre si usando a API HTTP real
+(/api/auth/* e /api/transactions/*). As requisições são disparadas com asyncio,
+com mix de operações, taxa de chegada e concorrência configuráveis.
+
+Uso:
+    # Contra um backend já rodando (Ganache + servidor Flask)
+    python load_generator.py --url http://127.0.0.1:5000 --seed-users 200 --duration 60 --rate 50
+
+    # Tudo em processo: EVM do eth-tester + servidor Flask em thread
+    python load_generator.py --in-process --seed-users 50 --duration 20
+
+Opções de mix (pesos relativos):
+    --mix register=1,login=1,balance=6,history=3,transfer=2
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse
+
+# Adiciona o diretório backend ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MIX = 'register=1,login=1,balance=6,history=3,transfer=2'
+OPERATIONS = ('register', 'login', 'balance', 'history', 'transfer')
+USER_PASSWORD = 'carga123'
+
+
+def parse_mix(mix):
+    """
+    Converte 'op=peso,op=peso' em um dicionário de pesos
+
+    Args:
+        mix (str): Mix de operações
+
+    Returns:
+        dict: Peso de cada operação
+    """
+    weights = {}
+    for item in mix.split(','):
+        if not item.strip():
+            continue
+        name, _, weight = item.partition('=')
+        name = name.strip().lower()
+        if name not in OPERATIONS:
+            raise ValueError(f"Operação desconhecida no mix: {name}")
+        weights[name] = float(weight or 1)
+    if not any(weights.values()):
+        raise ValueError("O mix precisa ter pelo menos uma operação com peso > 0")
+    return weights
+
+
+def percentile(sorted_values, pct):
+    """Percentil pelo método nearest-rank (valores já ordenados)"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+async def http_request(host, port, method, path, body=None, token=None, timeout=30.0):
+    """
+    Faz uma requisição HTTP/1.1 usando apenas streams do asyncio
+
+    Returns:
+        tuple: (status, corpo JSON decodificado ou None)
+    """
+    payload = json.dumps(body).encode('utf-8') if body is not None else b''
+    lines = [
+        f'{method} {path} HTTP/1.1',
+        f'Host: {host}:{port}',
+        'Accept: application/json',
+        'Connection: close',
+    ]
+    if body is not None:
+        lines.append('Content-Type: application/json')
+        lines.append(f'Content-Length: {len(payload)}')
+    if token:
+        lines.append(f'Authorization: Bearer {token}')
+
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    try:
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + payload)
+        await writer.drain()
+        raw = await asyncio.wait_for(reader.read(), timeout)
+    finally:
+        writer.close()
+
+    head, _, content = raw.partition(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    try:
+        data = json.loads(content) if content else None
+    except ValueError:
+        data = None
+    return status, data
+
+
+class Stats:
+    """Acumula latências, status e erros por operação"""
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.statuses = {}
+        self.started_at = None
+        self.finished_at = None
+
+    def record(self, op, latency, status):
+        self.latencies.setdefault(op, []).append(latency)
+        key = str(status)
+        self.statuses.setdefault(op, {})
+        self.statuses[op][key] = self.statuses[op].get(key, 0) + 1
+        if status == 'exception' or status >= 400:
+            self.errors[op] = self.errors.get(op, 0) + 1
+
+    def summary(self):
+        """Retorna o relatório como dicionário"""
+        elapsed = (self.finished_at or time.perf_counter()) - (self.started_at or time.perf_counter())
+        total = sum(len(v) for v in self.latencies.values())
+        total_errors = sum(self.errors.values())
+        report = {
+            'elapsed_s': round(elapsed, 3),
+            'requests': total,
+            'errors': total_errors,
+            'error_rate': round(total_errors / total, 4) if total else 0.0,
+            'throughput_rps': round(total / elapsed, 2) if elapsed > 0 else 0.0,
+            'operations': {}
+        }
+        for op, values in sorted(self.latencies.items()):
+            ordered = sorted(values)
+            errors = self.errors.get(op, 0)
+            report['operations'][op] = {
+                'count': len(ordered),
+                'errors': errors,
+                'error_rate': round(errors / len(ordered), 4),
+                'p50_ms': round(percentile(ordered, 50) * 1000, 2),
+                'p90_ms': round(percentile(ordered, 90) * 1000, 2),
+                'p95_ms': round(percentile(ordered, 95) * 1000, 2),
+                'p99_ms': round(percentile(ordered, 99) * 1000, 2),
+                'max_ms': round(ordered[-1] * 1000, 2),
+                'statuses': self.statuses.get(op, {})
+            }
+        return report
+
+
+class LoadGenerator:
+    """
+    População simulada de usuários dirigindo a API real
+    """
+
+    def __init__(self, base_url, weights, concurrency=50, rate=0.0,
+                 min_amount=0.01, max_amount=0.5, timeout=30.0, seed=None):
+        parsed = urlparse(base_url)
+        self.host = parsed.hostname or '127.0.0.1'
+        self.port = parsed.port or 80
+        self.weights = weights
+        self.concurrency = concurrency
+        self.rate = rate
+        self.min_amount = min_amount
+        self.max_amount = max_amount
+        self.timeout = timeout
+        self.rng = random.Random(seed)
+        self.run_id = f'{int(time.time())}{self.rng.randint(0, 9999):04d}'
+        self.users = []
+        self.user_seq = 0
+        self.stats = Stats()
+
+    # ---------- população ----------
+
+    def _new_username(self):
+        self.user_seq += 1
+        return f'load_{self.run_id}_{self.user_seq}'
+
+    def _pick_user(self, exclude=None):
+        if not self.users or (exclude is not None and len(self.users) < 2):
+            return None
+        while True:
+            user = self.rng.choice(self.users)
+            if user is not exclude:
+                return user
+
+    def _choose_operation(self):
+        ops = list(self.weights.keys())
+        op = self.rng.choices(ops, weights=[self.weights[o] for o in ops])[0]
+        # Operações autenticadas só fazem sentido com usuários registrados
+        if op != 'register' and not self.users:
+            return 'register'
+        if op == 'transfer' and len(self.users) < 2:
+            return 'register'
+        return op
+
+    # ---------- operações ----------
+
+    async def _call(self, method, path, body=None, token=None):
+        return await http_request(self.host, self.port, method, path, body, token, self.timeout)
+
+    async def op_register(self):
+        username = self._new_username()
+        status, data = await self._call('POST', '/api/auth/register', {
+            'username': username,
+            'password': USER_PASSWORD
+        })
+        if status == 201 and data:
+            self.users.append({
+                'username': username,
+                'token': data.get('token'),
+                'address': (data.get('user') or {}).get('ethereum_address')
+            })
+        return status
+
+    async def op_login(self):
+        user = self._pick_user()
+        status, data = await self._call('POST', '/api/auth/login', {
+            'username': user['username'],
+            'password': USER_PASSWORD
+        })
+        if status == 200 and data:
+            user['token'] = data.get('token')
+        return status
+
+    async def op_balance(self):
+        user = self._pick_user()
+        status, _ = await self._call('GET', '/api/transactions/balance', token=user['token'])
+        return status
+
+    async def op_history(self):
+        user = self._pick_user()
+        status, _ = await self._call('GET', '/api/transactions/history?limit=10', token=user['token'])
+        return status
+
+    async def op_transfer(self):
+        sender = self._pick_user()
+        recipient = self._pick_user(exclude=sender)
+        amount = round(self.rng.uniform(self.min_amount, self.max_amount), 4)
+        status, _ = await self._call('POST', '/api/transactions/transfer', {
+            'recipient': recipient['address'],
+            'amount': amount
+        }, token=sender['token'])
+        return status
+
+    async def _run_operation(self, op, semaphore, arrived_at):
+        # A latência é medida desde a chegada (inclui espera por concorrência),
+        # evitando o viés de "coordinated omission" no modo de taxa aberta
+        async with semaphore:
+            try:
+                status = await getattr(self, f'op_{op}')()
+            except Exception:
+                status = 'exception'
+        self.stats.record(op, time.perf_counter() - arrived_at, status)
+
+    # ---------- fases ----------
+
+    async def seed_users(self, count):
+        """Registra uma população inicial antes da fase medida"""
+        if count <= 0:
+            return
+        print(f"👥 Registrando {count} usuário(s) iniciais...")
+        semaphore = asyncio.Semaphore(self.concurrency)
+        seed_stats, self.stats = self.stats, Stats()
+        self.stats.started_at = time.perf_counter()
+        await asyncio.gather(*[
+            self._run_operation('register', semaphore, time.perf_counter())
+            for _ in range(count)
+        ])
+        self.stats.finished_at = time.perf_counter()
+        report = self.stats.summary()
+        self.stats = seed_stats
+        print(f"✅ {len(self.users)} usuário(s) prontos em {report['elapsed_s']}s "
+              f"({report['errors']} erro(s))")
+
+    async def run(self, duration=None, total_requests=None):
+        """
+        Executa a fase medida
+
+        Com rate > 0 as chegadas seguem um processo de Poisson (carga aberta);
+        com rate == 0, `concurrency` usuários virtuais disparam em loop fechado.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        deadline = time.perf_counter() + duration if duration else None
+        issued = 0
+
+        def should_continue():
+            if total_requests is not None and issued >= total_requests:
+                return False
+            return deadline is None or time.perf_counter() < deadline
+
+        self.stats.started_at = time.perf_counter()
+
+        if self.rate > 0:
+            tasks = set()
+            next_arrival = time.perf_counter()
+            while should_continue():
+                delay = next_arrival - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                task = asyncio.create_task(
+                    self._run_operation(self._choose_operation(), semaphore, time.perf_counter())
+                )
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                issued += 1
+                next_arrival += self.rng.expovariate(self.rate)
+            if tasks:
+                await asyncio.gather(*tasks)
+        else:
+            async def virtual_user():
+                nonlocal issued
+                while should_continue():
+                    issued += 1
+                    await self._run_operation(self._choose_operation(), semaphore, time.perf_counter())
+
+            await asyncio.gather(*[virtual_user() for _ in range(self.concurrency)])
+
+        self.stats.finished_at = time.perf_counter()
+        return self.stats.summary()
+
+
+def start_in_process_server(rate_limit=False):
+    """
+    Sobe EVM em processo + servidor Flask em uma thread, com banco temporário
+
+    Returns:
+        str: URL base do servidor
+    """
+    db_dir = tempfile.mkdtemp(prefix='estcoin-load-')
+    os.environ['ESTCOIN_DB_PATH'] = os.path.join(db_dir, 'users.db')
+    # Todos os usuários virtuais saem do mesmo IP; o limite por IP de /api/auth/*
+    # transformaria o registro em 429. Use --rate-limit para medir com ele ativo.
+    os.environ['RATE_LIMIT_ENABLED'] = '1' if rate_limit else '0'
+    # Banco descartável: chave mestra aleatória criada ao lado dele
+    os.environ.setdefault('KEY_VAULT_DEV_KEY', '1')
+
+    from src.blockchain.local_chain import start_in_process_chain
+    from werkzeug.serving import make_server
+
+    start_in_process_chain()
+    from src.app import create_app
+    app = create_app(warm=True)
+
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_port}'
+    print(f"✅ Servidor em processo rodando em {url} (banco: {os.environ['ESTCOIN_DB_PATH']})")
+    return url
+
+
+def print_report(report):
+    """Imprime o relatório em formato de tabela"""
+    print()
+    print("=" * 96)
+    print("  RESULTADO DA CARGA")
+    print("=" * 96)
+    print(f"⏱️  Duração: {report['elapsed_s']}s")
+    print(f"📊 Requisições: {report['requests']}  |  Throughput: {report['throughput_rps']} req/s")
+    print(f"❌ Erros: {report['errors']} ({report['error_rate'] * 100:.2f}%)")
+    print("-" * 96)
+    print(f"{'operação':<10} {'qtd':>7} {'erros':>7} {'erro%':>7} {'p50 ms':>9} {'p90 ms':>9} "
+          f"{'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for op, row in report['operations'].items():
+        print(f"{op:<10} {row['count']:>7} {row['errors']:>7} {row['error_rate'] * 100:>6.2f}% "
+              f"{row['p50_ms']:>9.1f} {row['p90_ms']:>9.1f} {row['p95_ms']:>9.1f} "
+              f"{row['p99_ms']:>9.1f} {row['max_ms']:>9.1f}")
+    print("=" * 96)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gerador de carga para a API EstCoin')
+    parser.add_argument('--url', default='http://127.0.0.1:5000', help='URL base do backend')
+    parser.add_argument('--in-process', action='store_true',
+                        help='Sobe EVM (eth-tester) e servidor Flask no próprio processo')
+    parser.add_argument('--rate-limit', action='store_true',
+                        help='Com --in-process, mantém o rate limit ativo (padrão: desativado)')
+    parser.add_argument('--seed-users', type=int, default=20,
+                        help='Usuários registrados antes da fase medida')
+    parser.add_argument('--duration', type=float, default=30.0, help='Duração da fase medida (s)')
+    parser.add_argument('--requests', type=int, default=None,
+                        help='Encerra após N requisições (ignora --duration se informado)')
+    parser.add_argument('--rate', type=float, default=0.0,
+                        help='Chegadas por segundo (Poisson); 0 = loop fechado')
+    parser.add_argument('--concurrency', type=int, default=20, help='Requisições simultâneas máximas')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='Pesos das operações')
+    parser.add_argument('--min-amount', type=float, default=0.01)
+    parser.add_argument('--max-amount', type=float, default=0.5)
+    parser.add_argument('--timeout', type=float, default=30.0, help='Timeout por requisição (s)')
+    parser.add_argument('--seed', type=int, default=None, help='Semente do gerador aleatório')
+    parser.add_argument('--json', dest='json_path', default=None, help='Salva o relatório em JSON')
+    args = parser.parse_args()
+
+    try:
+        weights = parse_mix(args.mix)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+
+    base_url = start_in_process_server(args.rate_limit) if args.in_process else args.url
+
+    generator = LoadGenerator(
+        base_url,
+        weights,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        min_amount=args.min_amount,
+        max_amount=args.max_amount,
+        timeout=args.timeout,
+        seed=args.seed
+    )
+
+    async def scenario():
+        await generator.seed_users(args.seed_users)
+        mode = f'{args.rate} chegadas/s' if args.rate > 0 else 'loop fechado'
+        print(f"🚀 Fase medida: mix={weights}, concorrência={args.concurrency}, {mode}")
+        duration = None if args.requests else args.duration
+        return await generator.run(duration=duration, total_requests=args.requests)
+
+    try:
+        report = asyncio.run(scenario())
+    except KeyboardInterrupt:
+        print("\n⚠️  Carga interrompida pelo usuário")
+        report = generator.stats.summary()
+
+    print_report(report)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Relatório salvo em {args.json_path}")
+
+    sys.exit(0 if report['requests'] and report['error_rate'] < 1.0 else 1)
+
+
+if __name__ == '__main__':
+    main()
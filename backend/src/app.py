@@ -1,29 +1,199 @@
-from flask import Flask
+import os
+import threading
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
+from flask import Flask, g, request
 from flask_cors import CORS
+from src.config import Config
 from src.routes.auth import auth_bp
 from src.routes.transactions import transactions_bp
-from src.models.user import init_db
-
-app = Flask(__name__)
-CORS(app)
-
-# Inicializa o banco de dados
-print("🔄 Inicializando banco de dados...")
-init_db()
-
-app.register_blueprint(auth_bp, url_prefix='/api/auth')
-app.register_blueprint(transactions_bp, url_prefix='/api/transactions')
-
-@app.route('/')
-def home():
-    return {
-        "message": "Welcome to the EstCoin Blockchain API!",
-        "version": "1.0.0",
-        "endpoints": {
-            "auth": "/api/auth",
-            "transactions": "/api/transactions"
-        }
+from src.routes.stats import stats_bp
+from src.utils.startup import StartupReport
+from src.utils import tracing
+
+_IMPORTS_SECONDS = time.perf_counter() - _IMPORT_STARTED
+
+
+def _initialize(app, warm=False):
+    """
+    Inicialização preguiçosa: banco e indexador, uma vez por processo
+
+    Roda no primeiro request (ou no warm-up), depois do fork dos workers, para
+    que conexões e threads não sejam herdadas do processo pai. No warm-up também
+    conecta ao nó, carrega o contrato e deixa o indexador em dia antes de retornar.
+    """
+    state = app.extensions['estcoin']
+    if state['initialized']:
+        return
+    with state['lock']:
+        if state['initialized']:
+            return
+        from src.models.user import ensure_db
+        from src.indexer.indexer import start_indexer
+
+        report = state['report']
+        with report.phase('database'):
+            ensure_db()
+        if warm:
+            from src.blockchain.web3_client import web3
+            from src.blockchain.contract import get_contract
+
+            # Falhas no nó ficam no relatório sem impedir a subida da API
+            with report.phase('web3', required=False):
+                web3.eth.block_number
+            with report.phase('contract', required=False):
+                if get_contract() is None:
+                    raise Exception("contrato não configurado")
+        # Carrega o snapshot do ledger e acompanha apenas os blocos novos
+        with report.phase('indexer', required=False):
+            start_indexer(sync_first=warm)
+        if warm:
+            from src.blockchain.key_pool import get_key_pool
+
+            # Reabastece em segundo plano: o primeiro cadastro já encontra contas prontas
+            with report.phase('key_pool', required=False):
+                get_key_pool().refill_async()
+        state['initialized'] = True
+
+
+def warm_up(app):
+    """
+    Inicializa tudo antes do primeiro request e imprime o relatório de inicialização
+
+    Returns:
+        dict: Relatório de inicialização
+    """
+    _initialize(app, warm=True)
+    report = app.extensions['estcoin']['report']
+    report.print()
+    return report.to_dict()
+
+
+PRELOAD_MODULES = (
+    'src.controllers.user_controller',
+    'src.controllers.transaction_controller',
+    'src.controllers.stats_controller',
+)
+
+
+def preload(app):
+    """
+    Warm-up anterior ao fork (Gunicorn com preload_app)
+
+    Importa web3 e os controllers, lê o ABI do contrato e cria as tabelas no
+    processo mestre: os workers herdam isso por copy-on-write. Nada que abra
+    conexões persistentes ou threads é feito aqui; isso fica para cada worker.
+    """
+    import importlib
+    from src.models.user import ensure_db, engine
+    from src.blockchain.contract import load_contract_abi
+    from src.blockchain.key_vault import get_key_vault
+
+    report = app.extensions['estcoin']['report']
+    with report.phase('preload'):
+        for module in PRELOAD_MODULES:
+            importlib.import_module(module)
+        load_contract_abi()
+        # Sem chave mestra o servidor não sobe (em vez de falhar no primeiro cadastro)
+        get_key_vault()
+        ensure_db()
+        # As conexões abertas pelo mestre não são usadas pelos workers
+        engine.dispose()
+
+
+def create_app(warm=None):
+    """
+    Cria a aplicação Flask
+
+    Nada é conectado aqui: o banco e o indexador são inicializados no primeiro
+    request e o cliente web3/contrato no primeiro uso. Com `warm=True` (ou
+    ESTCOIN_WARMUP=1) tudo é inicializado antes de retornar.
+
+    Args:
+        warm (bool): Faz o warm-up imediatamente (padrão: variável ESTCOIN_WARMUP)
+
+    Returns:
+        Flask: Aplicação configurada
+    """
+    started = time.perf_counter()
+    report = StartupReport()
+    report.record('imports', _IMPORTS_SECONDS)
+
+    app = Flask(__name__)
+    CORS(app)
+    if Config.TRUSTED_PROXY_HOPS:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        # remote_addr passa a ser o cliente visto pelo proxy mais externo confiável
+        hops = Config.TRUSTED_PROXY_HOPS
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops)
+    app.extensions['estcoin'] = {
+        'initialized': False,
+        'lock': threading.Lock(),
+        'report': report
     }
 
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(transactions_bp, url_prefix='/api/transactions')
+    app.register_blueprint(stats_bp, url_prefix='/api/stats')
+
+    # Registrado antes da inicialização: o primeiro request mostra o custo dela no trace
+    @app.before_request
+    def start_trace():
+        rule = request.url_rule.rule if request.url_rule else request.path
+        g.trace_span = tracing.start_trace(f'{request.method} {rule}', attributes={
+            'http.method': request.method,
+            'http.route': rule,
+        })
+
+    @app.before_request
+    def initialize():
+        _initialize(app)
+
+    @app.after_request
+    def record_status(response):
+        span = g.get('trace_span')
+        if span is not None:
+            span.set_attribute('http.status_code', response.status_code)
+            if response.status_code >= 500:
+                span.status = tracing.STATUS_ERROR
+        return response
+
+    @app.teardown_request
+    def end_trace(error=None):
+        span = g.pop('trace_span', None)
+        if span is not None:
+            span.end(error)
+
+    @app.route('/')
+    def home():
+        return {
+            "message": "Welcome to the EstCoin Blockchain API!",
+            "version": "1.0.0",
+            "endpoints": {
+                "auth": "/api/auth",
+                "transactions": "/api/transactions",
+                "stats": "/api/stats",
+                "startup": "/api/startup"
+            }
+        }
+
+    @app.route('/api/startup')
+    def startup():
+        return report.to_dict()
+
+    report.record('create_app', time.perf_counter() - started)
+
+    if warm is None:
+        warm = os.getenv('ESTCOIN_WARMUP', '0') == '1'
+    if warm:
+        warm_up(app)
+    return app
+
+
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    # Importar o módulo não cria app: wsgi.py (Gunicorn/waitress) monta o seu
+    app = create_app()
+    warm_up(app)
+    app.run(debug=True)
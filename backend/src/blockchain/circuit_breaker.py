@@ -0,0 +1,176 @@
+"""
+Circuit breaker das chamadas RPC
+
+Middleware do cliente web3 compartilhado (`circuit_breaker_middleware`). Depois
+de RPC_BREAKER_FAILURES falhas seguidas (erro de conexão, timeout ou chamada
+mais lenta que RPC_SLOW_CALL), o circuito abre: por RPC_BREAKER_RESET segundos toda chamada falha na hora com
+CircuitOpenError, sem esperar o nó. Passado esse tempo uma única chamada de
+teste é liberada (meio-aberto); se ela responder a tempo o circuito fecha, senão
+volta a abrir.
+
+Erros JSON-RPC (ex: execução revertida) são respostas do nó e não contam como
+falha. Este módulo não importa web3: as rotas podem usá-lo sem carregar o cliente.
+"""
+import os
+import threading
+import time
+from src.config import Config
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(ConnectionError):
+    """Chamada recusada porque o circuito está aberto"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Nó Ethereum indisponível, nova tentativa em {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Estado do circuito de um cliente RPC
+
+    Args:
+        failure_threshold (int): Falhas seguidas até abrir
+        reset_timeout (float): Segundos aberto até liberar a chamada de teste
+        slow_call (float): Chamadas mais lentas que isso (s) contam como falha (0 desativa)
+    """
+
+    def __init__(self, failure_threshold=None, reset_timeout=None, slow_call=None):
+        self.failure_threshold = failure_threshold or Config.RPC_BREAKER_FAILURES
+        self.reset_timeout = reset_timeout or Config.RPC_BREAKER_RESET
+        self.slow_call = Config.RPC_SLOW_CALL if slow_call is None else slow_call
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.counters = {'opened': 0, 'rejected': 0, 'slow': 0}
+        self._probe_thread = None
+        self.lock = threading.Lock()
+
+    def allow(self):
+        """
+        Decide se uma chamada pode ir ao nó
+
+        Raises:
+            CircuitOpenError: Circuito aberto (ou chamada de teste já em andamento)
+        """
+        with self.lock:
+            if self.state == CLOSED:
+                return
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN:
+                # A chamada de teste pode fazer chamadas aninhadas (ex: o middleware
+                # de validação consulta eth_chainId); só ela passa
+                if self._probe_thread is None:
+                    self._probe_thread = threading.get_ident()
+                if self._probe_thread == threading.get_ident():
+                    return
+            self.counters['rejected'] += 1
+            raise CircuitOpenError(self.retry_after())
+
+    def retry_after(self):
+        """Segundos até a próxima chamada de teste"""
+        if self.state == CLOSED:
+            return 0.0
+        return max(1.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def record_success(self, elapsed):
+        if self.slow_call and elapsed > self.slow_call:
+            with self.lock:
+                self.counters['slow'] += 1
+            self.record_failure(f"chamada lenta ({elapsed:.1f}s)")
+            return
+        with self.lock:
+            if self.state != CLOSED:
+                print("✅ Nó Ethereum respondendo: circuito RPC fechado")
+            self.state = CLOSED
+            self.failures = 0
+            self._probe_thread = None
+
+    def record_failure(self, error):
+        with self.lock:
+            self.failures += 1
+            self._probe_thread = None
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self.counters['opened'] += 1
+                print(f"🔌 Circuito RPC aberto por {self.reset_timeout:.0f}s "
+                      f"após {self.failures} falha(s): {error}")
+
+    @property
+    def is_open(self):
+        """True enquanto as chamadas estão sendo recusadas"""
+        with self.lock:
+            if self.state == CLOSED:
+                return False
+            return self.state == HALF_OPEN or time.monotonic() - self.opened_at < self.reset_timeout
+
+    def call(self, make_request, method, params):
+        """Faz a requisição RPC passando pelo circuito"""
+        self.allow()
+        started = time.perf_counter()
+        try:
+            response = make_request(method, params)
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            # Uma falha de chamada aninhada sobe pelas camadas externas: conta uma vez
+            if not getattr(e, '_circuit_recorded', False):
+                self.record_failure(e)
+                try:
+                    e._circuit_recorded = True
+                except AttributeError:
+                    pass
+            raise
+        self.record_success(time.perf_counter() - started)
+        return response
+
+    def stats(self):
+        with self.lock:
+            return {
+                'state': self.state,
+                'failures': self.failures,
+                'retry_after': round(self.retry_after(), 1) if self.state != CLOSED else 0,
+                **self.counters
+            }
+
+
+_breaker = None
+_breaker_lock = threading.Lock()
+
+
+def get_circuit_breaker():
+    """Retorna o circuit breaker do cliente web3 do processo"""
+    global _breaker
+    with _breaker_lock:
+        if _breaker is None:
+            _breaker = CircuitBreaker()
+        return _breaker
+
+
+def circuit_breaker_middleware(make_request, w3):
+    """
+    Middleware web3 que passa cada chamada pelo circuit breaker do processo
+
+    O breaker é buscado a cada chamada: um cliente criado antes do fork usa o
+    breaker do worker, não o do processo pai.
+    """
+    def guarded(method, params):
+        return get_circuit_breaker().call(make_request, method, params)
+    return guarded
+
+
+def _reset_after_fork():
+    # Cada worker observa o nó por conta própria
+    global _breaker, _breaker_lock
+    _breaker = None
+    _breaker_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
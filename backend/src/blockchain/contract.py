@@ -1,10 +1,13 @@
 """
-Módulo para interagir com o smart contract Token.sol
+Módulo para interagir com os smart contracts Token.sol e Faucet.sol
 """
 import json
 import os
-from src.blockchain.web3_client import web3
+from src.blockchain.web3_client import batch_request, web3
 from src.config import Config
+from src.blockchain.tx_queue import send_and_wait, TransactionNotSubmitted, PRIORITY_TRANSFER
+from src.utils.token_amount import TokenAmount
+from src.utils.tracing import traced
 
 # Caminho para o arquivo ABI do contrato compilado
 CONTRACT_ABI_PATH = os.path.join(
@@ -16,20 +19,55 @@ CONTRACT_ABI_PATH = os.path.join(
     'Token.json'
 )
 
+# Faucet.sol: ETH para gás + ESTC para várias contas novas em uma transação
+FAUCET_ABI_PATH = os.path.join(os.path.dirname(CONTRACT_ABI_PATH), 'Faucet.json')
+
+# ABI e instância do contrato, carregados no primeiro uso
+_abi = None
+_contract = None
+_faucet_abi = None
+_faucet_contract = None
+
+def load_compiled_artifact(path):
+    """
+    Lê um artefato do truffle, recusando arquivos sem os dados do compilador
+
+    Returns:
+        dict: Artefato, ou None se não existe ou não traz as chaves compiler e metadata
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        artifact = json.load(f)
+    if not artifact.get('compiler') or not artifact.get('metadata'):
+        return None
+    return artifact
+
+def use_faucet_artifact(artifact):
+    """Usa o ABI de um Faucet compilado fora do truffle (ex: py-solc-x na EVM em processo)"""
+    global _faucet_abi, _faucet_contract
+    _faucet_abi = artifact['abi']
+    _faucet_contract = None
+
 def load_contract_abi():
-    """Carrega o ABI do contrato Token"""
+    """Carrega o ABI do contrato Token (lido do disco uma única vez)"""
+    global _abi
+    if _abi is not None:
+        return _abi
     try:
         if os.path.exists(CONTRACT_ABI_PATH):
             with open(CONTRACT_ABI_PATH, 'r') as f:
                 contract_json = json.load(f)
-                return contract_json['abi']
+                _abi = contract_json['abi']
+                return _abi
         return None
     except Exception as e:
         print(f"Erro ao carregar ABI: {e}")
         return None
 
 def get_contract():
-    """Retorna a instância do contrato Token"""
+    """Retorna a instância do contrato Token (reutilizada enquanto o endereço não mudar)"""
+    global _contract
     try:
         # Busca o endereço do contrato do banco de dados
         contract_address = Config.get_token_contract_address()
@@ -37,6 +75,9 @@ def get_contract():
         if not contract_address:
             return None
         
+        if _contract is not None and _contract.address.lower() == contract_address.lower():
+            return _contract
+        
         abi = load_contract_abi()
         if not abi:
             return None
@@ -45,11 +86,35 @@ def get_contract():
             address=contract_address,
             abi=abi
         )
+        _contract = contract
         return contract
     except Exception as e:
         print(f"Erro ao obter contrato: {e}")
         return None
 
+def get_faucet_contract():
+    """Retorna a instância do contrato Faucet ou None se não foi deployado"""
+    global _faucet_abi, _faucet_contract
+    try:
+        faucet_address = Config.get_faucet_contract_address()
+        if not faucet_address:
+            return None
+        
+        if _faucet_contract is not None and _faucet_contract.address.lower() == faucet_address.lower():
+            return _faucet_contract
+        
+        if _faucet_abi is None:
+            artifact = load_compiled_artifact(FAUCET_ABI_PATH)
+            if artifact is None:
+                return None
+            _faucet_abi = artifact['abi']
+        
+        _faucet_contract = web3.eth.contract(address=faucet_address, abi=_faucet_abi)
+        return _faucet_contract
+    except Exception as e:
+        print(f"Erro ao obter contrato do faucet: {e}")
+        return None
+
 def get_token_balance(address):
     """
     Retorna o saldo de tokens de um endereço
@@ -58,20 +123,96 @@ def get_token_balance(address):
         address (str): Endereço Ethereum
         
     Returns:
-        float: Saldo em tokens
+        float: Saldo em tokens (0.0 se o contrato não estiver deployado)
+
+    Raises:
+        Exception: Se o nó não respondeu (o erro não vira saldo zero)
     """
-    try:
-        contract = get_contract()
-        if not contract:
-            return 0.0
-        
-        balance = contract.functions.balanceOf(address).call()
-        # Converte de unidades mínimas (18 decimais) para tokens
-        return balance / (10 ** 18)
-    except Exception as e:
-        print(f"Erro ao obter saldo de tokens: {e}")
+    contract = get_contract()
+    if not contract:
         return 0.0
+    
+    # Converte de unidades mínimas (18 decimais) para tokens
+    return float(TokenAmount(get_token_balance_units(address)))
 
+@traced('contract.balanceOf')
+def get_token_balance_units(address, block_identifier='latest'):
+    """
+    Retorna o saldo exato de um endereço em unidades mínimas
+
+    Args:
+        address (str): Endereço Ethereum
+        block_identifier: Bloco da leitura (número ou 'latest')
+
+    Returns:
+        int: Saldo em unidades mínimas
+
+    Raises:
+        Exception: Se o contrato não estiver deployado ou o nó não respondeu
+    """
+    contract = get_contract()
+    if not contract:
+        raise Exception("Contrato de token não está deployado. Configure TOKEN_CONTRACT_ADDRESS no config.py")
+
+    # `from` explícito: sem ele o web3 consulta eth_coinbase a cada chamada
+    return contract.functions.balanceOf(address).call(
+        {'from': address}, block_identifier=block_identifier
+    )
+
+def get_token_balances(addresses, batch_size=200):
+    """
+    Retorna os saldos de tokens (em unidades mínimas) de vários endereços
+
+    Cada lote de `balanceOf` vai em uma única requisição JSON-RPC em batch
+    (`batch_request`: circuit breaker, pool RPC e tracing, como as demais
+    chamadas); com providers sem batch, as chamadas são feitas uma a uma.
+
+    Args:
+        addresses (list): Endereços Ethereum
+        batch_size (int): Quantidade de chamadas por requisição
+
+    Returns:
+        dict: {endereço: saldo em unidades mínimas (int) ou None se falhar}
+    """
+    contract = get_contract()
+    if not contract:
+        return {address: None for address in addresses}
+
+    balances = {}
+
+    for start in range(0, len(addresses), batch_size):
+        chunk = addresses[start:start + batch_size]
+        calls = [
+            ('eth_call', [{
+                'to': contract.address,
+                'data': contract.encodeABI(fn_name='balanceOf', args=[address])
+            }, 'latest'])
+            for address in chunk
+        ]
+        try:
+            responses = batch_request(calls)
+        except Exception as e:
+            print(f"Erro no batch de saldos: {e}")
+            responses = [None] * len(chunk)
+
+        if responses is None:
+            for address in chunk:
+                try:
+                    balances[address] = contract.functions.balanceOf(address).call()
+                except Exception as e:
+                    print(f"Erro ao obter saldo de {address}: {e}")
+                    balances[address] = None
+            continue
+
+        for address, response in zip(chunk, responses):
+            result = (response or {}).get('result')
+            if isinstance(result, bytes):
+                result = result.hex()
+            balances[address] = int(result, 16) if result and result not in ('0x', '') else None
+
+    return balances
+
+@traced('contract.transfer')
 def transfer_tokens(from_address, to_address, amount, private_key):
     """
     Transfere tokens de um endereço para outro
@@ -79,7 +220,7 @@ def transfer_tokens(from_address, to_address, amount, private_key):
     Args:
         from_address (str): Endereço do remetente
         to_address (str): Endereço do destinatário
-        amount (float): Quantidade de tokens
+        amount (TokenAmount|str|float): Quantidade de tokens
         private_key (str): Chave privada do remetente
         
     Returns:
@@ -90,11 +231,8 @@ def transfer_tokens(from_address, to_address, amount, private_key):
         if not contract:
             raise Exception("Contrato não disponível")
         
-        # Converte tokens para unidades mínimas (18 decimais)
-        amount_in_units = int(amount * (10 ** 18))
-        
-        # Prepara a transação
-        nonce = web3.eth.get_transaction_count(from_address)
+        # Unidades mínimas (18 decimais) exatas, sem passar por float
+        amount_in_units = TokenAmount.parse(amount).units
         
         transaction = contract.functions.transfer(
             to_address,
@@ -103,19 +241,14 @@ def transfer_tokens(from_address, to_address, amount, private_key):
             'chainId': Config.CHAIN_ID,
             'gas': Config.GAS_LIMIT,
             'gasPrice': Config.GAS_PRICE,
-            'nonce': nonce,
         })
         
-        # Assina a transação
-        signed_txn = web3.eth.account.sign_transaction(
-            transaction,
-            private_key=private_key
-        )
-        
-        # Envia a transação
-        # Na web3.py 6.x, o atributo é raw_transaction (com underscore)
-        tx_hash = web3.eth.send_raw_transaction(signed_txn.raw_transaction)
-        
-        return tx_hash.hex()
+        # Fila de saída da conta: nonce reservado no estado compartilhado entre
+        # workers, limite de transações em voo e reenvio se travar. Sem envio no
+        # prazo a transação sai da fila (TransactionNotSubmitted)
+        return send_and_wait(from_address, transaction, PRIORITY_TRANSFER,
+                             private_key=private_key, timeout=Config.TX_STUCK_AFTER)
+    except TransactionNotSubmitted:
+        raise
     except Exception as e:
         raise Exception(f"Erro ao transferir tokens: {str(e)}")
\ No newline at end of file
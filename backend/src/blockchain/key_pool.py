@@ -0,0 +1,218 @@
+"""
+Pool de contas pré-geradas para o cadastro
+
+Gerar a conta é rápido; cifrá-la no cofre (scrypt, ~0,1 s com o N padrão) não
+é. O pool guarda em shared_state.db contas prontas, já no formato keystore V3,
+e o cadastro só retira uma. Quando o estoque cai até KEY_POOL_LOW_WATER, uma
+thread do worker pede a um processo separado (multiprocessing, spawn) que gere
+e cifre lotes de KEY_POOL_BATCH contas até voltar a KEY_POOL_SIZE: o scrypt não
+disputa a GIL com as requisições. Um lock entre processos garante que só um
+worker reabastece por vez.
+
+As chaves ficam cifradas em repouso como em users.private_key. Na primeira
+retirada cada processo decifra a conta mais antiga do pool; se ela não abrir
+com a chave mestra atual (chave trocada), o pool inteiro é descartado.
+
+Com o pool vazio ou desativado (KEY_POOL_SIZE=0) o cadastro gera e cifra a
+conta na hora, como antes.
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from src.config import Config
+from src.utils.shared_state import get_shared_state
+
+
+def generate_keys(count, master_key, scrypt_n):
+    """
+    Gera e cifra `count` contas (roda no processo gerador)
+
+    Returns:
+        list: Pares (endereço, keystore)
+    """
+    from eth_account import Account
+    from src.blockchain.key_vault import KeyVault
+
+    vault = KeyVault(master_key, scrypt_n=scrypt_n)
+    keys = []
+    for _ in range(count):
+        account = Account.create()
+        keys.append((account.address, vault.encrypt(account.key)))
+    return keys
+
+
+class KeyPool:
+    """
+    Estoque de contas cifradas compartilhado entre os workers
+
+    Args:
+        size (int): Contas mantidas no pool (0 desativa)
+        low_water (int): Estoque que dispara o reabastecimento
+        batch (int): Contas por tarefa do processo gerador
+    """
+
+    def __init__(self, size=None, low_water=None, batch=None):
+        self.size = Config.KEY_POOL_SIZE if size is None else size
+        self.low_water = Config.KEY_POOL_LOW_WATER if low_water is None else low_water
+        self.batch = batch or Config.KEY_POOL_BATCH
+        self.counters = {'taken': 0, 'misses': 0, 'generated': 0, 'refills': 0, 'discarded': 0}
+        self.refill_rate = None  # contas/s do último reabastecimento
+        self.verified = False
+        self.lock = threading.Lock()
+        self._refill_thread = None
+
+    @property
+    def enabled(self):
+        return self.size > 0
+
+    def take(self):
+        """
+        Retira uma conta pronta
+
+        Returns:
+            dict: {'address', 'keystore'} ou None se o pool estiver vazio/desativado
+        """
+        accounts = self.take_many(1)
+        return accounts[0] if accounts else None
+
+    def take_many(self, count):
+        """
+        Retira até `count` contas prontas (cadastro em lote)
+
+        Returns:
+            list: Dicts {'address', 'keystore'}; pode ter menos que `count`
+        """
+        if not self.enabled or count <= 0:
+            return []
+        self._verify()
+        shared_state = get_shared_state()
+        keys = shared_state.take_pooled_keys(count)
+        with self.lock:
+            self.counters['taken'] += len(keys)
+            self.counters['misses'] += count - len(keys)
+        if len(keys) < count or shared_state.pooled_key_count() <= self.low_water:
+            self.refill_async()
+        return [{'address': address, 'keystore': keystore} for address, keystore in keys]
+
+    def _verify(self):
+        """Confere uma vez por processo se o pool abre com a chave mestra atual"""
+        if self.verified:
+            return
+        from eth_account import Account
+        from src.blockchain.key_vault import get_key_vault
+
+        shared_state = get_shared_state()
+        with self.lock:
+            if self.verified:
+                return
+            oldest = shared_state.peek_pooled_key()
+            if oldest is not None:
+                try:
+                    valid = Account.from_key(get_key_vault().decrypt(oldest[1])).address == oldest[0]
+                except Exception:
+                    valid = False
+                if not valid:
+                    discarded = shared_state.clear_pooled_keys()
+                    self.counters['discarded'] += discarded
+                    print(f"⚠️ Pool de chaves cifrado com outra chave mestra: {discarded} conta(s) descartada(s)")
+            self.verified = True
+
+    def refill_async(self):
+        """Reabastece em segundo plano (no máximo uma thread por processo)"""
+        if not self.enabled:
+            return
+        with self.lock:
+            if self._refill_thread is not None and self._refill_thread.is_alive():
+                return
+            self._refill_thread = threading.Thread(target=self.refill, name='key-pool-refill', daemon=True)
+            self._refill_thread.start()
+
+    def refill(self):
+        """
+        Completa o pool até `size` contas
+
+        Returns:
+            int: Contas geradas (0 se outro worker já está reabastecendo)
+        """
+        shared_state = get_shared_state()
+        try:
+            with shared_state.lock('key_pool', timeout=0.1):
+                return self._fill(shared_state)
+        except TimeoutError:
+            return 0
+        except Exception as e:
+            print(f"⚠️ Erro ao reabastecer o pool de chaves: {e}")
+            return 0
+
+    def _fill(self, shared_state):
+        missing = self.size - shared_state.pooled_key_count()
+        if missing <= 0:
+            return 0
+        from src.blockchain.key_vault import get_key_vault, master_key
+
+        scrypt_n = get_key_vault().scrypt_n
+        started = time.perf_counter()
+        generated = 0
+        # Processo separado só durante o reabastecimento: não fica ocupando memória ocioso
+        with ProcessPoolExecutor(max_workers=Config.KEY_POOL_PROCESSES,
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            futures = [
+                executor.submit(generate_keys, min(self.batch, missing - start), master_key(), scrypt_n)
+                for start in range(0, missing, self.batch)
+            ]
+            for future in futures:
+                keys = future.result()
+                shared_state.add_pooled_keys(keys)
+                generated += len(keys)
+        elapsed = time.perf_counter() - started
+        with self.lock:
+            self.counters['generated'] += generated
+            self.counters['refills'] += 1
+            self.refill_rate = round(generated / elapsed, 2) if elapsed > 0 else None
+        return generated
+
+    def wait_refill(self, timeout=None):
+        """Espera o reabastecimento em andamento terminar (scripts e testes)"""
+        thread = self._refill_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def stats(self):
+        with self.lock:
+            refilling = self._refill_thread is not None and self._refill_thread.is_alive()
+            counters = dict(self.counters)
+        return {
+            'enabled': self.enabled,
+            'depth': get_shared_state().pooled_key_count(),
+            'size': self.size,
+            'low_water': self.low_water,
+            'refilling': refilling,
+            'refill_rate': self.refill_rate,
+            **counters
+        }
+
+
+_key_pool = None
+_key_pool_lock = threading.Lock()
+
+
+def get_key_pool():
+    """Retorna o pool de contas do processo"""
+    global _key_pool
+    with _key_pool_lock:
+        if _key_pool is None:
+            _key_pool = KeyPool()
+        return _key_pool
+
+
+def _reset_after_fork():
+    # A thread de reabastecimento não existe no processo filho
+    global _key_pool, _key_pool_lock
+    _key_pool = None
+    _key_pool_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,231 @@
+"""
+Cofre das chaves privadas dos usuários
+
+As chaves ficam no banco no formato keystore V3 do Ethereum (o mesmo do geth e
+do MetaMask): scrypt, que exige memória e tempo, deriva a chave de cifra a
+partir da chave mestra (KEY_VAULT_MASTER_KEY) e de um salt aleatório por
+usuário; a chave privada é cifrada com AES-128-CTR e protegida por MAC.
+
+Decifrar custa dezenas de milissegundos de propósito, então as chaves
+desbloqueadas ficam em um cache limitado em tamanho (LRU) e em tempo (TTL).
+Ao sair do cache o buffer da chave é sobrescrito com zeros. As cópias
+temporárias criadas ao assinar uma transação não são cobertas.
+"""
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from src.config import Config
+from src.utils.tracing import traced
+
+
+def is_encrypted(stored_key):
+    """True se o valor do banco é um keystore cifrado (e não uma chave em texto puro)"""
+    return bool(stored_key) and stored_key.lstrip().startswith('{')
+
+
+def _zeroize(buffer):
+    for i in range(len(buffer)):
+        buffer[i] = 0
+
+
+class UnlockedKeyCache:
+    """
+    Chaves desbloqueadas por endereço, com limite de tamanho e de tempo
+    """
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # endereço -> (bytearray, desbloqueada em)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _evict(self, address):
+        buffer, _ = self._entries.pop(address)
+        _zeroize(buffer)
+        self.evictions += 1
+
+    def get(self, address, now=None):
+        """Retorna uma cópia da chave ou None se ausente/expirada"""
+        now = time.monotonic() if now is None else now
+        key = address.lower()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if now - entry[1] > self.ttl:
+                self._evict(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return bytes(entry[0])
+
+    def put(self, address, private_key, now=None):
+        now = time.monotonic() if now is None else now
+        key = address.lower()
+        with self._lock:
+            if key in self._entries:
+                self._evict(key)
+            self._entries[key] = (bytearray(private_key), now)
+            for expired in [a for a, (_, unlocked_at) in self._entries.items() if now - unlocked_at > self.ttl]:
+                self._evict(expired)
+            while len(self._entries) > self.max_size:
+                self._evict(next(iter(self._entries)))
+
+    def discard(self, address):
+        with self._lock:
+            if address.lower() in self._entries:
+                self._evict(address.lower())
+
+    def clear(self):
+        with self._lock:
+            for address in list(self._entries):
+                self._evict(address)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+
+def master_key():
+    """
+    Chave mestra do cofre
+
+    KEY_VAULT_MASTER_KEY é obrigatória. Só com KEY_VAULT_DEV_KEY=1
+    (desenvolvimento) uma chave aleatória é gerada na primeira vez em
+    KEY_VAULT_DEV_KEY_FILE e reutilizada depois.
+
+    Raises:
+        Exception: Chave mestra não configurada
+    """
+    if Config.KEY_VAULT_MASTER_KEY:
+        return Config.KEY_VAULT_MASTER_KEY
+    if not Config.KEY_VAULT_DEV_KEY:
+        raise Exception("Chave mestra do cofre não configurada: defina KEY_VAULT_MASTER_KEY "
+                        "(ou KEY_VAULT_DEV_KEY=1 em desenvolvimento)")
+    return _dev_master_key(Config.KEY_VAULT_DEV_KEY_FILE)
+
+
+def _dev_master_key(path):
+    while True:
+        try:
+            with open(path, encoding='utf-8') as f:
+                key = f.read().strip()
+            if key:
+                return key
+        except FileNotFoundError:
+            pass
+        try:
+            # O_EXCL: com vários workers só um cria o arquivo, os outros leem a mesma chave
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            time.sleep(0.01)
+            continue
+        key = secrets.token_hex(32)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(key)
+        print(f"🔑 Chave mestra de desenvolvimento criada em {path}")
+        return key
+
+
+class KeyVault:
+    """
+    Cifra/decifra chaves privadas com a chave mestra e mantém as desbloqueadas em cache
+    """
+
+    def __init__(self, master_key, scrypt_n=None, cache=None):
+        if not master_key:
+            raise Exception("Chave mestra do cofre não configurada (KEY_VAULT_MASTER_KEY)")
+        self._password = master_key.encode('utf-8')
+        self.scrypt_n = scrypt_n or Config.KEY_VAULT_SCRYPT_N
+        self.cache = cache or UnlockedKeyCache(Config.KEY_VAULT_CACHE_SIZE, Config.KEY_VAULT_CACHE_TTL)
+
+    @traced('key_vault.encrypt')
+    def encrypt(self, private_key):
+        """
+        Cifra uma chave privada para gravar no banco
+
+        Args:
+            private_key (str|bytes): Chave em hex (com ou sem 0x) ou bytes
+
+        Returns:
+            str: Keystore V3 em JSON
+        """
+        from eth_keyfile import create_keyfile_json
+
+        if isinstance(private_key, str):
+            private_key = bytes.fromhex(private_key[2:] if private_key.startswith('0x') else private_key)
+        keystore = create_keyfile_json(private_key, self._password, kdf='scrypt', iterations=self.scrypt_n)
+        return json.dumps(keystore, separators=(',', ':'))
+
+    @traced('key_vault.decrypt')
+    def decrypt(self, stored_key):
+        """
+        Decifra o valor do banco (chaves antigas em texto puro são aceitas)
+
+        Returns:
+            bytes: Chave privada
+        """
+        if not is_encrypted(stored_key):
+            return bytes.fromhex(stored_key[2:] if stored_key.startswith('0x') else stored_key)
+
+        from eth_keyfile import decode_keyfile_json
+
+        try:
+            return decode_keyfile_json(json.loads(stored_key), self._password)
+        except ValueError:
+            raise Exception("Não foi possível decifrar a chave privada (chave mestra incorreta?)")
+
+    def unlock(self, address, stored_key):
+        """
+        Chave privada de `address`, do cache ou decifrada (e guardada no cache)
+
+        Args:
+            address (str): Endereço Ethereum do dono da chave
+            stored_key (str): Valor da coluna users.private_key
+
+        Returns:
+            bytes: Chave privada
+        """
+        private_key = self.cache.get(address)
+        if private_key is None:
+            private_key = self.decrypt(stored_key)
+            self.cache.put(address, private_key)
+        return private_key
+
+    def remember(self, address, private_key):
+        """Coloca no cache uma chave recém-criada (evita decifrá-la no primeiro uso)"""
+        if isinstance(private_key, str):
+            private_key = bytes.fromhex(private_key[2:] if private_key.startswith('0x') else private_key)
+        self.cache.put(address, private_key)
+
+    def lock(self, address):
+        """Remove a chave de `address` do cache (zerando o buffer)"""
+        self.cache.discard(address)
+
+
+_key_vault = None
+_key_vault_lock = threading.Lock()
+
+
+def get_key_vault():
+    """Retorna o cofre de chaves do processo"""
+    global _key_vault
+    with _key_vault_lock:
+        if _key_vault is None:
+            _key_vault = KeyVault(master_key())
+        return _key_vault
@@ -0,0 +1,211 @@
+"""
+Blockchain local em processo (EVM do eth-tester) para desenvolvimento e carga
+
+Substitui o provider do cliente web3 compartilhado por um EthereumTesterProvider,
+faz o deploy do Token.json e do Faucet (compilado com py-solc-x quando não há
+artefato do truffle) e salva os endereços no SystemConfig, de modo que o restante do backend funcione sem Ganache
+rodando. `serve_json_rpc` expõe a mesma EVM por HTTP, para vários processos
+(workers do Gunicorn) a usarem.
+
+Requer o pacote opcional eth-tester:
+    pip install "eth-tester[py-evm]"
+"""
+import json
+import os
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from src.blockchain.web3_client import web3
+from src.blockchain.contract import CONTRACT_ABI_PATH, FAUCET_ABI_PATH, load_compiled_artifact, use_faucet_artifact
+from src.config import Config
+
+INITIAL_SUPPLY = 1_000_000  # Mesmo supply usado por deploy_contract.py
+FAUCET_SOURCE_PATH = os.path.join(os.path.dirname(CONTRACT_ABI_PATH), '..', '..', 'contracts', 'Faucet.sol')
+# Mesmo compilador e opções de blockchain/truffle-config.js
+SOLC_VERSION = '0.8.19'
+SOLC_SETTINGS = {'optimizer': {'enabled': True, 'runs': 200}, 'evmVersion': 'istanbul'}
+
+
+def _make_provider():
+    """Cria um EthereumTesterProvider protegido por lock (o py-evm não é thread-safe)"""
+    try:
+        from web3 import EthereumTesterProvider
+        import eth_tester  # noqa: F401
+    except ImportError:
+        raise Exception('eth-tester não instalado. Execute: pip install "eth-tester[py-evm]"')
+
+    class LockedEthereumTesterProvider(EthereumTesterProvider):
+        _lock = threading.RLock()
+
+        def make_request(self, method, params):
+            with self._lock:
+                return super().make_request(method, params)
+
+    return LockedEthereumTesterProvider()
+
+
+def deploy_token(initial_supply=INITIAL_SUPPLY):
+    """
+    Faz o deploy do contrato Token usando a primeira conta da EVM
+
+    Args:
+        initial_supply (int): Supply inicial em tokens (o contrato multiplica por 10^18)
+
+    Returns:
+        str: Endereço do contrato
+    """
+    with open(CONTRACT_ABI_PATH, 'r') as f:
+        contract_json = json.load(f)
+
+    Token = web3.eth.contract(abi=contract_json['abi'], bytecode=contract_json['bytecode'])
+    tx_hash = Token.constructor(initial_supply).transact({
+        'from': web3.eth.accounts[0],
+        'gas': 3000000
+    })
+    receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
+    return receipt.contractAddress
+
+
+def compile_faucet():
+    """
+    Compila blockchain/contracts/Faucet.sol com o py-solc-x (instala o solc na primeira vez)
+
+    Returns:
+        dict: abi, bytecode, compiler e metadata (as chaves usadas do artefato do truffle)
+    """
+    try:
+        import solcx
+    except ImportError:
+        raise Exception("py-solc-x não instalado. Execute: pip install -r requirements.txt")
+
+    if SOLC_VERSION not in {str(version) for version in solcx.get_installed_solc_versions()}:
+        print(f"⬇️  Instalando solc {SOLC_VERSION} (py-solc-x)...")
+        solcx.install_solc(SOLC_VERSION)
+
+    with open(FAUCET_SOURCE_PATH, 'r') as f:
+        source = f.read()
+    output = solcx.compile_standard({
+        'language': 'Solidity',
+        'sources': {'Faucet.sol': {'content': source}},
+        'settings': dict(SOLC_SETTINGS, outputSelection={
+            '*': {'*': ['abi', 'metadata', 'evm.bytecode.object']}
+        })
+    }, solc_version=SOLC_VERSION)
+    compiled = output['contracts']['Faucet.sol']['Faucet']
+    return {
+        'contractName': 'Faucet',
+        'abi': compiled['abi'],
+        'metadata': compiled['metadata'],
+        'bytecode': '0x' + compiled['evm']['bytecode']['object'],
+        'compiler': {'name': 'solc', 'version': SOLC_VERSION}
+    }
+
+
+def deploy_faucet(token_address):
+    """
+    Faz o deploy do contrato Faucet ligado ao token, usando a primeira conta da EVM
+
+    Usa o Faucet.json do `truffle compile` se existir; senão compila o Faucet.sol
+    com o py-solc-x, com as mesmas opções do truffle-config.js.
+
+    Returns:
+        str: Endereço do contrato
+    """
+    contract_json = load_compiled_artifact(FAUCET_ABI_PATH)
+    if contract_json is None:
+        contract_json = compile_faucet()
+        use_faucet_artifact(contract_json)
+
+    Faucet = web3.eth.contract(abi=contract_json['abi'], bytecode=contract_json['bytecode'])
+    tx_hash = Faucet.constructor(token_address).transact({
+        'from': web3.eth.accounts[0],
+        'gas': 1000000
+    })
+    receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
+    return receipt.contractAddress
+
+
+def start_in_process_chain(deploy=True):
+    """
+    Aponta o cliente web3 para uma EVM em processo e (opcionalmente) faz o deploy dos contratos
+
+    Args:
+        deploy (bool): Se True, faz o deploy do Token e do Faucet e salva os endereços no banco
+
+    Returns:
+        str: Endereço do contrato deployado ou None
+    """
+    from src.models.user import SystemConfig, init_db
+
+    web3.provider = _make_provider()
+    # As transações assinadas precisam do chain id real da EVM de teste
+    Config.CHAIN_ID = web3.eth.chain_id
+
+    if not deploy:
+        return None
+
+    init_db()
+    contract_address = deploy_token()
+    SystemConfig.set_value('TOKEN_CONTRACT_ADDRESS', contract_address)
+    try:
+        faucet_address = deploy_faucet(contract_address)
+    except Exception as e:
+        # Sem solc (ex: sem rede para o py-solc-x baixar) o cadastro usa duas transações
+        print(f"⚠️  Faucet não deployado: {e}")
+        faucet_address = None
+    SystemConfig.set_value('FAUCET_CONTRACT_ADDRESS', faucet_address)
+    print(f"✅ EVM em processo pronta. Token: {contract_address}")
+    return contract_address
+
+
+def _json_default(value):
+    if isinstance(value, (bytes, bytearray)):
+        return '0x' + bytes(value).hex()
+    if hasattr(value, 'items'):
+        return dict(value)
+    raise TypeError(f"Tipo não serializável: {type(value)}")
+
+
+def serve_json_rpc(host='127.0.0.1', port=0):
+    """
+    Expõe a EVM em processo como um nó JSON-RPC HTTP (em uma thread)
+
+    As requisições passam pelos middlewares do web3 (que convertem o formato do
+    eth-tester para o do JSON-RPC), então clientes HTTPProvider comuns funcionam.
+
+    Args:
+        host (str): Interface de escuta
+        port (int): Porta (0 escolhe uma livre)
+
+    Returns:
+        tuple: (servidor, URL do nó)
+    """
+    def handle(payload):
+        try:
+            response = dict(web3.manager._make_request(payload['method'], payload.get('params', [])))
+        except Exception as e:
+            response = {'error': {'code': -32000, 'message': str(e)}}
+        response['id'] = payload.get('id')
+        response['jsonrpc'] = '2.0'
+        return response
+
+    class JSONRPCHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            if isinstance(payload, list):
+                result = [handle(item) for item in payload]
+            else:
+                result = handle(payload)
+            body = json.dumps(result, default=_json_default).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), JSONRPCHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='json-rpc', daemon=True).start()
+    return server, f'http://{host}:{server.server_port}'
@@ -0,0 +1,196 @@
+"""
+Busca de logs com eth_getLogs em blocos, em paralelo
+
+Usado pelo indexador e pelo histórico de transações no lugar de filtros
+instalados no nó (create_filter), que guardam estado por requisição e buscam
+o intervalo inteiro de uma vez.
+
+- O intervalo é dividido em pedaços de `chunk_size` blocos buscados em
+  paralelo; o tamanho se adapta à densidade de logs observada.
+- Se o nó recusar um pedaço por excesso de resultados (ou intervalo grande
+  demais), o pedaço é dividido ao meio até caber.
+- Uma consulta pode ter vários filtros de tópicos unidos por OU (ex: Transfer
+  com from = endereço OU to = endereço). Filtros de tópicos do eth_getLogs só
+  combinam alternativas dentro da mesma posição, então cada filtro vira uma
+  chamada por pedaço e os logs repetidos são descartados na junção.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.blockchain.web3_client import web3
+from src.config import Config
+from src.indexer.ledger import TRANSFER_TOPIC
+
+# Trechos das mensagens de nós/provedores que limitam a resposta do eth_getLogs
+RANGE_ERROR_MARKERS = (
+    'more than',
+    'too many',
+    'limit exceeded',
+    'response size',
+    'block range',
+    'range is too large',
+    'query timeout',
+)
+RANGE_ERROR_CODES = (-32005,)
+
+
+def address_topic(address):
+    """Endereço como tópico indexado (32 bytes)"""
+    return '0x' + '0' * 24 + address.lower()[2:]
+
+
+def transfer_filters(address=None):
+    """
+    Filtros de tópicos para eventos Transfer
+
+    Args:
+        address (str): Se informado, apenas Transfers enviados OU recebidos por ele
+
+    Returns:
+        list: Filtros de tópicos (unidos por OU)
+    """
+    if address is None:
+        return [[TRANSFER_TOPIC]]
+    topic = address_topic(address)
+    return [[TRANSFER_TOPIC, topic], [TRANSFER_TOPIC, None, topic]]
+
+
+def is_range_error(error):
+    """True se o nó recusou o eth_getLogs pelo tamanho do intervalo/resposta"""
+    detail = error.args[0] if error.args else error
+    if isinstance(detail, dict):
+        if detail.get('code') in RANGE_ERROR_CODES:
+            return True
+        detail = detail.get('message', '')
+    message = str(detail).lower()
+    return any(marker in message for marker in RANGE_ERROR_MARKERS)
+
+
+class LogFetcher:
+    """
+    eth_getLogs sem estado no nó, em pedaços paralelos com divisão adaptativa
+    """
+
+    def __init__(self, chunk_size=None, max_chunk_size=None, max_workers=None, target_results=None):
+        self.chunk_size = chunk_size or Config.LOGS_CHUNK_SIZE
+        self.max_chunk_size = max_chunk_size or Config.LOGS_MAX_CHUNK_SIZE
+        self.max_workers = max_workers or Config.LOGS_MAX_WORKERS
+        self.target_results = target_results or Config.LOGS_TARGET_RESULTS
+        self.requests = 0
+        self.bisections = 0
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='get-logs')
+            return self._executor
+
+    def _get_logs(self, address, topics, start, end):
+        with self._lock:
+            self.requests += 1
+        return web3.eth.get_logs({
+            'address': address,
+            'topics': topics,
+            'fromBlock': start,
+            'toBlock': end
+        })
+
+    def _fetch_range(self, address, topics, start, end):
+        """Um pedaço; dividido ao meio enquanto o nó recusar pelo tamanho"""
+        try:
+            return self._get_logs(address, topics, start, end), end - start + 1
+        except ValueError as e:
+            if start == end or not is_range_error(e):
+                raise
+        with self._lock:
+            self.bisections += 1
+        middle = (start + end) // 2
+        left, left_size = self._fetch_range(address, topics, start, middle)
+        right, right_size = self._fetch_range(address, topics, middle + 1, end)
+        return left + right, max(left_size, right_size)
+
+    def _adapt(self, results):
+        """Ajusta o tamanho dos próximos pedaços pelo que aconteceu nesta busca"""
+        ok_sizes = [size for _, size, requested in results if size < requested]
+        with self._lock:
+            if ok_sizes:
+                # Houve divisão: usa o maior pedaço aceito no trecho mais denso
+                self.chunk_size = max(1, min(ok_sizes))
+                return
+            densest = max((len(logs) / requested for logs, _, requested in results), default=0)
+            if densest * self.chunk_size * 2 <= self.target_results:
+                self.chunk_size = min(self.max_chunk_size, self.chunk_size * 2)
+
+    def fetch(self, address, topic_filters, from_block, to_block):
+        """
+        Busca os logs de `address` que casam com algum dos filtros de tópicos
+
+        Args:
+            address (str): Contrato emissor dos logs
+            topic_filters (list): Filtros de tópicos unidos por OU (ver transfer_filters)
+            from_block (int): Primeiro bloco (inclusivo)
+            to_block (int): Último bloco (inclusivo)
+
+        Returns:
+            list: Logs sem repetição, em ordem de bloco e índice
+        """
+        if to_block < from_block:
+            return []
+
+        chunk_size = self.chunk_size
+        jobs = [
+            (topics, start, min(start + chunk_size - 1, to_block))
+            for start in range(from_block, to_block + 1, chunk_size)
+            for topics in topic_filters
+        ]
+
+        def run(job):
+            topics, start, end = job
+            logs, size = self._fetch_range(address, topics, start, end)
+            return logs, size, end - start + 1
+
+        if len(jobs) == 1:
+            results = [run(jobs[0])]
+        else:
+            results = list(self._pool().map(run, jobs))
+        self._adapt(results)
+
+        merged = {}
+        for logs, _, _ in results:
+            for log in logs:
+                merged[(log['blockNumber'], log['logIndex'])] = log
+        return [merged[key] for key in sorted(merged)]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'chunk_size': self.chunk_size,
+                'max_workers': self.max_workers,
+                'requests': self.requests,
+                'bisections': self.bisections
+            }
+
+
+_log_fetcher = None
+_log_fetcher_lock = threading.Lock()
+
+
+def get_log_fetcher():
+    """Retorna o LogFetcher do processo"""
+    global _log_fetcher
+    with _log_fetcher_lock:
+        if _log_fetcher is None:
+            _log_fetcher = LogFetcher()
+        return _log_fetcher
+
+
+def _reset_after_fork():
+    # As threads do pool não existem no processo filho
+    global _log_fetcher
+    _log_fetcher = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
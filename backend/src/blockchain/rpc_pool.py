@@ -0,0 +1,300 @@
+"""
+Pool de endpoints RPC com balanceamento de carga e failover
+
+Leituras (eth_call, eth_getLogs, eth_getBlock*, ...) são distribuídas entre os
+nós saudáveis, escolhendo pela latência observada (média móvel exponencial)
+entre dois candidatos sorteados. eth_sendTransaction (assinada pelo nó, com a
+conta desbloqueada só no primário) e as consultas de nonce vão apenas ao
+primário configurado, sem failover: se ele falha a chamada falha, em vez de um
+timeout depois de o primário já ter aceitado a transação virar um segundo
+envio por outro nó. As demais chamadas (eth_sendRawTransaction, recibos...)
+são idempotentes e passam ao próximo nó saudável; uma transação assinada tem o
+mesmo hash em qualquer nó.
+
+Um endpoint que falha (erro de conexão ou timeout) sai do rodízio por um tempo
+crescente; uma thread de health check consulta eth_blockNumber em todos os
+endpoints, mede latência e retira os que estão atrasados em blocos.
+"""
+import json
+import random
+import threading
+import time
+from web3 import Web3, HTTPProvider
+from web3._utils.request import make_post_request
+from web3.providers.base import BaseProvider
+
+# Métodos que podem ser atendidos por qualquer nó sincronizado
+READ_METHODS = frozenset([
+    'eth_call',
+    'eth_getLogs',
+    'eth_getBlockByNumber',
+    'eth_getBlockByHash',
+    'eth_blockNumber',
+    'eth_getBalance',
+    'eth_getCode',
+    'eth_chainId',
+    'net_version',
+    'web3_clientVersion',
+])
+
+# Métodos atendidos só pelo primário configurado (endpoints[0]), sem failover
+PRIMARY_ONLY_METHODS = frozenset([
+    'eth_sendTransaction',
+    'eth_getTransactionCount',
+    'eth_accounts',
+    'eth_sign',
+    'eth_signTransaction',
+])
+
+EWMA_ALPHA = 0.3
+MIN_BACKOFF = 1.0
+MAX_BACKOFF = 30.0
+
+
+def http_batch_request(provider, calls):
+    """
+    Envia as chamadas em uma única requisição JSON-RPC batch
+
+    Usa a sessão HTTP e o timeout do próprio HTTPProvider.
+
+    Args:
+        provider (HTTPProvider): Nó de destino
+        calls (list): Pares (método, params)
+
+    Returns:
+        list: Respostas JSON-RPC na ordem de `calls` (None se o nó omitiu alguma)
+    """
+    payload = [
+        {'jsonrpc': '2.0', 'id': i, 'method': method, 'params': params}
+        for i, (method, params) in enumerate(calls)
+    ]
+    raw = make_post_request(provider.endpoint_uri, json.dumps(payload).encode(),
+                            **provider.get_request_kwargs())
+    decoded = json.loads(raw)
+    if not isinstance(decoded, list):
+        # Nó sem suporte a batch responde um único erro
+        raise ConnectionError(f"Batch JSON-RPC recusado: {decoded.get('error', decoded)}")
+    by_id = {item.get('id'): item for item in decoded}
+    return [by_id.get(i) for i in range(len(calls))]
+
+
+class Endpoint:
+    """Um nó do pool com suas estatísticas de saúde"""
+
+    def __init__(self, provider, name=None):
+        self.provider = provider
+        self.name = name or getattr(provider, 'endpoint_uri', None) or repr(provider)
+        # Web3 próprio só para montar a cadeia de middlewares do provider
+        # (ex: o EthereumTesterProvider depende dos seus middlewares internos)
+        self._w3 = Web3(provider, middlewares=[])
+        self._request = provider.request_func(self._w3, ())
+        self.latency = None
+        self.inflight = 0
+        self.failures = 0
+        self.down_until = 0.0
+        self.block_number = None
+        self.requests = 0
+
+    @property
+    def healthy(self):
+        return time.monotonic() >= self.down_until
+
+    def score(self):
+        """Menor é melhor: latência média ponderada pelas requisições em andamento"""
+        latency = self.latency if self.latency is not None else 0.0
+        return latency * (1 + self.inflight)
+
+    def request(self, method, params):
+        return self._request(method, params)
+
+    def batch(self, calls):
+        """Várias chamadas: em uma requisição batch com HTTP, senão uma a uma"""
+        if isinstance(self.provider, HTTPProvider):
+            return http_batch_request(self.provider, calls)
+        return [self._request(method, params) for method, params in calls]
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'healthy': self.healthy,
+            'latency_ms': round(self.latency * 1000, 2) if self.latency is not None else None,
+            'inflight': self.inflight,
+            'failures': self.failures,
+            'block_number': self.block_number,
+            'requests': self.requests
+        }
+
+
+class RPCPoolProvider(BaseProvider):
+    """
+    Provider web3 que distribui as chamadas entre vários nós
+
+    Args:
+        providers (list): Providers (ou URLs) na ordem de preferência; o primeiro é o primário
+        health_interval (float): Intervalo do health check em segundos (0 desativa a thread)
+        max_block_lag (int): Atraso máximo em blocos para um nó receber leituras
+    """
+
+    def __init__(self, providers, health_interval=5.0, max_block_lag=2, request_timeout=5.0):
+        if not providers:
+            raise ValueError("O pool precisa de pelo menos um endpoint")
+        self.endpoints = [
+            Endpoint(HTTPProvider(p, request_kwargs={'timeout': request_timeout}) if isinstance(p, str) else p)
+            for p in providers
+        ]
+        self.health_interval = health_interval
+        self.max_block_lag = max_block_lag
+        self.lock = threading.Lock()
+        self._rng = random.Random()
+        self._health_thread = None
+        self._stop = threading.Event()
+        if health_interval:
+            self.start_health_checks()
+
+    # ---------- seleção ----------
+
+    @property
+    def primary(self):
+        """Primeiro endpoint saudável na ordem configurada"""
+        for endpoint in self.endpoints:
+            if endpoint.healthy:
+                return endpoint
+        return None
+
+    def _read_candidates(self):
+        """Endpoints saudáveis e sincronizados, do melhor para o pior"""
+        with self.lock:
+            healthy = [e for e in self.endpoints if e.healthy]
+            known = [e.block_number for e in healthy if e.block_number is not None]
+            if known:
+                tip = max(known)
+                synced = [e for e in healthy
+                          if e.block_number is None or tip - e.block_number <= self.max_block_lag]
+                healthy = synced or healthy
+            if len(healthy) > 1:
+                # Power of two choices: sorteia dois e fica com o de menor score
+                first, second = self._rng.sample(healthy, 2)
+                best = first if first.score() <= second.score() else second
+                rest = sorted((e for e in healthy if e is not best), key=lambda e: e.score())
+                return [best] + rest
+            return healthy
+
+    def _write_candidates(self):
+        """Primário primeiro, depois os demais saudáveis na ordem configurada"""
+        return [e for e in self.endpoints if e.healthy]
+
+    # ---------- saúde ----------
+
+    def _mark_success(self, endpoint, elapsed):
+        with self.lock:
+            endpoint.latency = elapsed if endpoint.latency is None else (
+                EWMA_ALPHA * elapsed + (1 - EWMA_ALPHA) * endpoint.latency
+            )
+            endpoint.failures = 0
+            endpoint.down_until = 0.0
+
+    def _mark_failure(self, endpoint, error):
+        with self.lock:
+            endpoint.failures += 1
+            backoff = min(MAX_BACKOFF, MIN_BACKOFF * (2 ** (endpoint.failures - 1)))
+            endpoint.down_until = time.monotonic() + backoff
+        print(f"⚠️ Endpoint RPC {endpoint.name} indisponível por {backoff:.0f}s: {error}")
+
+    def check_health(self):
+        """Consulta eth_blockNumber em todos os endpoints (inclusive os fora do rodízio)"""
+        for endpoint in self.endpoints:
+            started = time.perf_counter()
+            try:
+                response = endpoint.request('eth_blockNumber', [])
+                if 'error' in response:
+                    raise Exception(response['error'])
+                result = response['result']
+                endpoint.block_number = int(result, 16) if isinstance(result, str) else int(result)
+                self._mark_success(endpoint, time.perf_counter() - started)
+            except Exception as e:
+                if endpoint.healthy:
+                    self._mark_failure(endpoint, e)
+
+    def _health_loop(self):
+        while not self._stop.wait(self.health_interval):
+            self.check_health()
+
+    def start_health_checks(self):
+        if self._health_thread and self._health_thread.is_alive():
+            return
+        self._stop.clear()
+        self._health_thread = threading.Thread(target=self._health_loop, name='rpc-health', daemon=True)
+        self._health_thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    # ---------- interface do provider ----------
+
+    def make_request(self, method, params):
+        if method in PRIMARY_ONLY_METHODS:
+            # Mesmo fora do rodízio: outro nó não tem a conta nem os nonces do primário
+            candidates = self.endpoints[:1]
+        elif method in READ_METHODS:
+            candidates = self._read_candidates()
+        else:
+            candidates = self._write_candidates()
+        if not candidates:
+            # Todos fora do rodízio: tenta mesmo assim, do que volta primeiro
+            candidates = sorted(self.endpoints, key=lambda e: e.down_until)
+
+        last_error = None
+        for endpoint in candidates:
+            with self.lock:
+                endpoint.inflight += 1
+                endpoint.requests += 1
+            started = time.perf_counter()
+            try:
+                response = endpoint.request(method, params)
+            except Exception as e:
+                last_error = e
+                self._mark_failure(endpoint, e)
+                continue
+            finally:
+                with self.lock:
+                    endpoint.inflight -= 1
+            self._mark_success(endpoint, time.perf_counter() - started)
+            return response
+
+        raise ConnectionError(f"Nenhum endpoint RPC respondeu a {method}: {last_error}")
+
+    def make_batch_request(self, calls):
+        """
+        Envia um lote de leituras ao melhor endpoint, com failover como em make_request
+
+        Returns:
+            list: Respostas na ordem de `calls`
+        """
+        candidates = self._read_candidates() or sorted(self.endpoints, key=lambda e: e.down_until)
+        last_error = None
+        for endpoint in candidates:
+            with self.lock:
+                endpoint.inflight += 1
+                endpoint.requests += 1
+            started = time.perf_counter()
+            try:
+                responses = endpoint.batch(calls)
+            except Exception as e:
+                last_error = e
+                self._mark_failure(endpoint, e)
+                continue
+            finally:
+                with self.lock:
+                    endpoint.inflight -= 1
+            self._mark_success(endpoint, time.perf_counter() - started)
+            return responses
+
+        raise ConnectionError(f"Nenhum endpoint RPC respondeu ao batch de {len(calls)} chamadas: {last_error}")
+
+    def is_connected(self, show_traceback=False):
+        return any(e.provider.is_connected() for e in self.endpoints)
+
+    def stats(self):
+        """Estado atual de cada endpoint"""
+        with self.lock:
+            return [e.to_dict() for e in self.endpoints]
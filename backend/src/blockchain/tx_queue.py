@@ -0,0 +1,419 @@
+"""
+Fila de saída de transações por conta que assina
+
+Cada conta (a do faucet, `web3.eth.accounts[0]`, ou a de um usuário) tem uma
+fila no processo, atendida por uma thread que envia uma transação por vez:
+
+- Prioridades: transferência de usuário > cadastro (faucet) > pagamentos em
+  lote; dentro da mesma classe, ordem de chegada.
+- Limite de transações em voo: a diferença entre as contagens 'pending' e
+  'latest' do nó é o que a conta tem no mempool (de qualquer worker); acima de
+  TX_MAX_IN_FLIGHT a fila espera em vez de empilhar nonces atrás de uma
+  transação travada.
+- Transação travada: se o nonce mais baixo em voo continua sem ser minerado
+  depois de TX_STUCK_AFTER segundos, ela é reenviada com o mesmo nonce e
+  gasPrice multiplicado por TX_FEE_BUMP (substituição), até TX_MAX_GAS_PRICE.
+- Desistência: quem não pode mais esperar o envio retira a transação da fila
+  (`cancel`); retirada, ela nunca é assinada nem enviada.
+- Métricas: espera na fila por classe (p50/p95), tempo até a mineração,
+  reenvios, falhas e desistências (`stats()`, `GET /api/stats/outbound`).
+
+Os nonces continuam reservados no estado compartilhado entre workers
+(src/utils/shared_state.py).
+"""
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from src.blockchain.circuit_breaker import CircuitOpenError, get_circuit_breaker
+from src.blockchain.web3_client import web3
+from src.config import Config
+from src.utils import tracing
+from src.utils.shared_state import get_shared_state
+
+PRIORITY_TRANSFER = 0
+PRIORITY_ONBOARDING = 1
+PRIORITY_PAYOUT = 2
+PRIORITY_NAMES = {
+    PRIORITY_TRANSFER: 'transfer',
+    PRIORITY_ONBOARDING: 'onboarding',
+    PRIORITY_PAYOUT: 'payout',
+}
+LATENCY_SAMPLES = 1000  # amostras guardadas por métrica
+RECEIPT_POLL_INTERVAL = 0.1
+
+
+class TransactionNotSubmitted(Exception):
+    """
+    A transação não chegou ao nó e não vai chegar: uma nova tentativa é segura
+
+    Args:
+        message (str): Motivo
+        retry_after (float): Segundos sugeridos até tentar de novo (None: erro do pedido)
+    """
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _hex(tx_hash):
+    # HexBytes.hex() inclui o 0x em algumas versões do hexbytes
+    value = tx_hash.hex()
+    return value[2:] if value.startswith('0x') else value
+
+
+def _percentile(samples, pct):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] * 1000, 2)
+
+
+class QueuedTx:
+    """
+    Transação aguardando envio ou mineração
+
+    `tx_hashes` guarda todos os hashes enviados para o nonce (original e
+    substituições); o que for minerado é o definitivo.
+    """
+
+    def __init__(self, params, priority, private_key=None):
+        self.params = params
+        self.priority = priority
+        self.private_key = private_key
+        self.enqueued_at = time.monotonic()
+        self.sent_at = None
+        self.nonce = None
+        self.gas_price = None
+        self.tx_hashes = []
+        self.error = None
+        # Span de quem enviou: o envio pela thread da fila entra no mesmo trace
+        self.trace_parent = tracing.current_span()
+        self._sent = threading.Event()
+
+    @property
+    def tx_hash(self):
+        return self.tx_hashes[-1] if self.tx_hashes else None
+
+    def wait_sent(self, timeout=None):
+        """
+        Espera a transação ser enviada ao nó
+
+        Returns:
+            str: Hash da transação (hex, sem 0x)
+
+        Raises:
+            Exception: Se o envio falhou ou o tempo acabou
+        """
+        if not self._sent.wait(timeout):
+            raise TimeoutError("Transação ainda na fila de saída")
+        if self.error:
+            raise self.error
+        return self.tx_hash
+
+    def wait_receipt(self, timeout=120):
+        """
+        Espera a mineração de qualquer um dos hashes enviados (original ou substituição)
+
+        Returns:
+            Recibo da transação minerada
+        """
+        deadline = time.monotonic() + timeout
+        self.wait_sent(timeout)
+        while True:
+            for tx_hash in list(self.tx_hashes):
+                try:
+                    return web3.eth.get_transaction_receipt('0x' + tx_hash)
+                except Exception:
+                    continue
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Transação {self.tx_hash} não minerada em {timeout}s")
+            time.sleep(RECEIPT_POLL_INTERVAL)
+
+
+class OutboundQueue:
+    """
+    Fila com prioridade das transações de uma conta
+    """
+
+    def __init__(self, account, max_in_flight=None, stuck_after=None, fee_bump=None, max_gas_price=None):
+        self.account = web3.to_checksum_address(account)
+        self.max_in_flight = max_in_flight or Config.TX_MAX_IN_FLIGHT
+        self.stuck_after = stuck_after or Config.TX_STUCK_AFTER
+        self.fee_bump = fee_bump or Config.TX_FEE_BUMP
+        self.max_gas_price = max_gas_price or Config.TX_MAX_GAS_PRICE
+        self.in_flight = {}  # nonce -> QueuedTx
+        self.counters = {'sent': 0, 'confirmed': 0, 'replaced': 0, 'failed': 0, 'cancelled': 0}
+        self.queue_wait = {name: deque(maxlen=LATENCY_SAMPLES) for name in PRIORITY_NAMES.values()}
+        self.confirm_time = deque(maxlen=LATENCY_SAMPLES)
+        self.mempool = 0
+        self._heap = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self._stop = False
+        self._thread = None
+
+    def submit(self, params, priority=PRIORITY_PAYOUT, private_key=None):
+        """
+        Coloca uma transação na fila
+
+        Args:
+            params (dict): Transação sem nonce (to, data, value, gas; gasPrice opcional)
+            priority (int): PRIORITY_TRANSFER, PRIORITY_ONBOARDING ou PRIORITY_PAYOUT
+            private_key (bytes): Chave para assinar; sem ela a conta é do nó (eth_sendTransaction)
+
+        Returns:
+            QueuedTx
+        """
+        item = QueuedTx(params, priority, private_key)
+        with self._cond:
+            heapq.heappush(self._heap, (priority, next(self._sequence), item))
+            if self._thread is None or not self._thread.is_alive():
+                self._stop = False
+                self._thread = threading.Thread(
+                    target=self._run, name=f'tx-queue-{self.account[:10]}', daemon=True
+                )
+                self._thread.start()
+            self._cond.notify()
+        return item
+
+    def cancel(self, item):
+        """
+        Retira da fila uma transação que a thread de envio ainda não pegou
+
+        Returns:
+            bool: True se retirada (não será assinada nem enviada); False se o
+            envio já começou ou terminou
+        """
+        with self._cond:
+            for i, (_, _, queued) in enumerate(self._heap):
+                if queued is item:
+                    self._heap[i] = self._heap[-1]
+                    self._heap.pop()
+                    heapq.heapify(self._heap)
+                    break
+            else:
+                return False
+            self.counters['cancelled'] += 1
+        item.error = TransactionNotSubmitted("Transação retirada da fila de saída sem ser enviada")
+        item.private_key = None
+        item.trace_parent = None
+        item._sent.set()
+        return True
+
+    def stop(self):
+        with self._cond:
+            self._stop = True
+            self._cond.notify()
+
+    # ---------- thread de envio ----------
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._stop:
+                    return
+                if not self._heap:
+                    if not self.in_flight:
+                        # Nada na fila nem em voo: a thread termina e volta no próximo submit
+                        self._thread = None
+                        return
+                    self._cond.wait(self.stuck_after / 2)
+                    if self._stop:
+                        return
+            try:
+                self._dispatch()
+            except CircuitOpenError:
+                # Nó indisponível: a fila espera o circuito fechar
+                time.sleep(Config.TX_POLL_INTERVAL)
+            except Exception as e:
+                print(f"⚠️ Erro na fila de saída de {self.account}: {e}")
+                time.sleep(Config.TX_POLL_INTERVAL)
+
+    def _dispatch(self):
+        """Confirma o que foi minerado, reenvia o que travou e envia o que couber"""
+        latest = web3.eth.get_transaction_count(self.account, 'latest')
+        pending = web3.eth.get_transaction_count(self.account, 'pending')
+        self._confirm(latest)
+        self._replace_stuck(latest)
+        self.mempool = max(0, pending - latest)
+        # Nós que não expõem o mempool ('pending' == 'latest') não escondem as
+        # transações desta fila: o nonce nunca volta para trás das que estão em voo
+        in_flight = max(self.mempool, len(self.in_flight))
+        next_nonce = max([pending] + [nonce + 1 for nonce in self.in_flight])
+
+        sent = 0
+        while in_flight + sent < self.max_in_flight:
+            with self._cond:
+                if not self._heap:
+                    return
+                _, _, item = heapq.heappop(self._heap)
+            if self._send(item, next_nonce + sent):
+                sent += 1
+        # Limite atingido: espera algo ser minerado antes de tentar de novo
+        time.sleep(Config.TX_POLL_INTERVAL)
+
+    def _confirm(self, latest):
+        now = time.monotonic()
+        for nonce in [nonce for nonce in self.in_flight if nonce < latest]:
+            item = self.in_flight.pop(nonce)
+            self.confirm_time.append(now - item.sent_at)
+            self.counters['confirmed'] += 1
+            item.private_key = None
+
+    def _replace_stuck(self, latest):
+        item = self.in_flight.get(latest)
+        if item is None or time.monotonic() - item.sent_at < self.stuck_after:
+            return
+        gas_price = max(int(item.gas_price * self.fee_bump), item.gas_price + 1)
+        if gas_price > self.max_gas_price:
+            return
+        try:
+            tx_hash = self._broadcast(item, item.nonce, gas_price)
+        except Exception as e:
+            print(f"⚠️ Substituição do nonce {item.nonce} de {self.account} falhou: {e}")
+            return
+        print(f"⛽ Nonce {item.nonce} de {self.account} travado: reenviado com gasPrice "
+              f"{item.gas_price} -> {gas_price} ({tx_hash})")
+        item.gas_price = gas_price
+        item.sent_at = time.monotonic()
+        item.tx_hashes.append(tx_hash)
+        self.counters['replaced'] += 1
+
+    def _send(self, item, chain_nonce):
+        shared_state = get_shared_state()
+        gas_price = item.params.get('gasPrice', Config.GAS_PRICE)
+        try:
+            # Dentro do try: o item já saiu da fila, quem espera precisa ser avisado de qualquer falha
+            nonce = shared_state.next_nonce(self.account, chain_nonce)
+            with tracing.span('tx_queue.send', parent=item.trace_parent, attributes={
+                'tx.nonce': nonce,
+                'tx.priority': PRIORITY_NAMES[item.priority],
+                'tx.queue_wait_ms': round((time.monotonic() - item.enqueued_at) * 1000, 2),
+            }):
+                tx_hash = self._broadcast(item, nonce, gas_price)
+        except Exception as e:
+            # O nonce não foi usado: a próxima reserva volta a partir do nó
+            shared_state.reset_nonce(self.account)
+            item.error = e
+            item.private_key = None
+            item.trace_parent = None
+            self.counters['failed'] += 1
+            item._sent.set()
+            return False
+        item.nonce = nonce
+        item.gas_price = gas_price
+        item.trace_parent = None
+        item.sent_at = time.monotonic()
+        item.tx_hashes.append(tx_hash)
+        self.queue_wait[PRIORITY_NAMES[item.priority]].append(item.sent_at - item.enqueued_at)
+        self.counters['sent'] += 1
+        self.in_flight[nonce] = item
+        item._sent.set()
+        return True
+
+    def _broadcast(self, item, nonce, gas_price):
+        transaction = dict(item.params, nonce=nonce, gasPrice=gas_price)
+        if item.private_key is None:
+            transaction['from'] = self.account
+            return _hex(web3.eth.send_transaction(transaction))
+        transaction.setdefault('chainId', Config.CHAIN_ID)
+        with tracing.span('sign_transaction'):
+            signed = web3.eth.account.sign_transaction(transaction, private_key=item.private_key)
+        return _hex(web3.eth.send_raw_transaction(signed.raw_transaction))
+
+    def stats(self):
+        with self._cond:
+            queued = {name: 0 for name in PRIORITY_NAMES.values()}
+            for priority, _, _ in self._heap:
+                queued[PRIORITY_NAMES[priority]] += 1
+        return {
+            'account': self.account,
+            'queued': queued,
+            'in_flight': len(self.in_flight),
+            'mempool': self.mempool,
+            'max_in_flight': self.max_in_flight,
+            **self.counters,
+            'queue_wait_ms': {
+                name: {'p50': _percentile(samples, 50), 'p95': _percentile(samples, 95)}
+                for name, samples in self.queue_wait.items()
+            },
+            'confirm_ms': {'p50': _percentile(self.confirm_time, 50), 'p95': _percentile(self.confirm_time, 95)}
+        }
+
+
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+def get_tx_queue(account):
+    """Retorna a fila de saída da conta neste processo"""
+    key = account.lower()
+    with _queues_lock:
+        queue = _queues.get(key)
+        if queue is None:
+            queue = _queues[key] = OutboundQueue(account)
+        return queue
+
+
+def submit_transaction(account, params, priority=PRIORITY_PAYOUT, private_key=None):
+    """Atalho: get_tx_queue(account).submit(...)"""
+    return get_tx_queue(account).submit(params, priority, private_key)
+
+
+def send_and_wait(account, params, priority=PRIORITY_PAYOUT, private_key=None, timeout=None):
+    """
+    Enfileira a transação e espera o envio por até `timeout` segundos
+
+    Se o prazo acabar com a transação ainda na fila, ela é retirada: o erro
+    devolvido garante que nada será enviado depois. Se o envio já tinha
+    começado, espera ele terminar (limitado pelo timeout do RPC).
+
+    Returns:
+        str: Hash da transação (hex, sem 0x)
+
+    Raises:
+        TransactionNotSubmitted: Prazo esgotado antes do envio (nada foi enviado)
+        Exception: Falha no envio
+    """
+    queue = get_tx_queue(account)
+    item = queue.submit(params, priority, private_key)
+    try:
+        return item.wait_sent(timeout)
+    except TimeoutError:
+        if not queue.cancel(item):
+            return item.wait_sent()
+    raise TransactionNotSubmitted(
+        f"Transação não enviada em {timeout:g}s (nó indisponível ou fila de saída cheia); "
+        f"nada foi enviado, tente novamente",
+        retry_after=get_circuit_breaker().retry_after() or 1.0
+    )
+
+
+def queue_stats():
+    """Métricas de todas as filas do processo"""
+    with _queues_lock:
+        queues = list(_queues.values())
+    return [queue.stats() for queue in queues]
+
+
+def shutdown():
+    """Para as threads de envio e descarta as filas (ex: entre testes)"""
+    with _queues_lock:
+        queues = list(_queues.values())
+        _queues.clear()
+    for queue in queues:
+        queue.stop()
+
+
+def _reset_after_fork():
+    # As threads de envio não existem no processo filho
+    global _queues
+    _queues = {}
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -1,23 +1,98 @@
 """
 Cliente Web3 para interagir com a blockchain Ethereum local
+
+O pacote web3 e o provider só são carregados no primeiro uso de `web3`, então
+importar este módulo é barato e não abre conexões (nem threads do pool RPC)
+antes do fork dos workers.
 """
-from web3 import Web3
 from src.config import Config
+from src.utils.lazy import LazyObject
+
+def build_provider(urls=None):
+    """
+    Cria o provider a partir da configuração
+
+    Com um único endpoint usa HTTPProvider direto; com vários, um RPCPoolProvider
+    que distribui as leituras e mantém escritas/nonces no primário.
+    """
+    from web3 import Web3
+    from src.blockchain.rpc_pool import RPCPoolProvider
+
+    urls = urls or Config.BLOCKCHAIN_URLS
+    if len(urls) == 1:
+        return Web3.HTTPProvider(urls[0], request_kwargs={'timeout': Config.RPC_TIMEOUT})
+    return RPCPoolProvider(
+        urls,
+        health_interval=Config.RPC_HEALTH_INTERVAL,
+        max_block_lag=Config.RPC_MAX_BLOCK_LAG,
+        request_timeout=Config.RPC_TIMEOUT
+    )
+
+def _create_web3():
+    from web3 import Web3
+    from src.blockchain.circuit_breaker import circuit_breaker_middleware
+    from src.utils.tracing import tracing_middleware
+
+    w3 = Web3(build_provider())
+    # Com o nó fora, as chamadas falham na hora
+    w3.middleware_onion.add(circuit_breaker_middleware, name='circuit_breaker')
+    # Mais externa: o span da chamada RPC inclui a recusa do circuito
+    w3.middleware_onion.add(tracing_middleware, name='tracing')
+    return w3
+
+# Conexão com a blockchain local (criada no primeiro uso)
+web3 = LazyObject(_create_web3)
+
+def batch_request(calls):
+    """
+    Envia várias chamadas JSON-RPC em uma requisição (batch)
+
+    O web3 não faz batch, então esta função cuida do que os middlewares fariam:
+    o lote passa pelo circuit breaker e vira um span `rpc batch`. Com o
+    RPCPoolProvider o lote vai ao melhor nó de leitura, com failover.
 
-# Inicializa a conexão com a blockchain local
-web3 = Web3(Web3.HTTPProvider(Config.BLOCKCHAIN_URL))
+    Args:
+        calls (list): Pares (método, params)
+
+    Returns:
+        list: Respostas na ordem de `calls`, ou None se o provider não faz
+        batch (o chamador faz as chamadas uma a uma)
+    """
+    from web3 import HTTPProvider
+    from src.blockchain.circuit_breaker import get_circuit_breaker
+    from src.blockchain.rpc_pool import http_batch_request
+    from src.utils.tracing import CLIENT, span
+
+    provider = web3.provider
+    send = getattr(provider, 'make_batch_request', None)
+    if send is None:
+        if not isinstance(provider, HTTPProvider):
+            return None
+        send = lambda batch: http_batch_request(provider, batch)
+
+    with span('rpc batch', CLIENT, {'rpc.system': 'jsonrpc', 'rpc.batch_size': len(calls)}):
+        return get_circuit_breaker().call(lambda method, params: send(params), 'batch', calls)
 
 def is_connected():
     """Verifica se está conectado à blockchain"""
     return web3.is_connected()
 
+def get_rpc_stats():
+    """Estado dos endpoints RPC (apenas quando há um pool configurado)"""
+    from src.blockchain.rpc_pool import RPCPoolProvider
+
+    if web3.initialized and isinstance(web3.provider, RPCPoolProvider):
+        return web3.provider.stats()
+    return None
+
 def get_balance(address):
-    """Retorna o saldo em Wei de um endereço"""
-    try:
-        return web3.eth.get_balance(address)
-    except Exception as e:
-        print(f"Erro ao obter saldo: {e}")
-        return 0
+    """
+    Retorna o saldo em Wei de um endereço
+
+    Erros do nó (inclusive CircuitOpenError) são propagados: um saldo zero
+    inventado é indistinguível de uma conta vazia.
+    """
+    return web3.eth.get_balance(address)
 
 def wei_to_ether(wei_amount):
     """Converte Wei para Ether"""
@@ -3,6 +3,16 @@ Configurações da aplicação EstCoin Backend
 """
 import os
 
+
+def _data_path(name):
+    """Arquivo de dados ao lado do users.db (ESTCOIN_DB_PATH ou backend/users.db)"""
+    db_path = os.getenv(
+        'ESTCOIN_DB_PATH',
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'users.db')
+    )
+    return os.path.join(os.path.dirname(db_path), name)
+
+
 class Config:
     # Flask
     DEBUG = True
@@ -14,24 +24,140 @@ class Config:
     
     # Blockchain
     BLOCKCHAIN_URL = os.getenv('BLOCKCHAIN_URL', 'http://127.0.0.1:8545')
-    CHAIN_ID = 1337  # Chain ID do genesis.json
+    # Vários nós separados por vírgula; o primeiro é o primário (escritas e nonces)
+    BLOCKCHAIN_URLS = [
+        url.strip() for url in os.getenv('BLOCKCHAIN_URLS', BLOCKCHAIN_URL).split(',') if url.strip()
+    ]
+    RPC_TIMEOUT = float(os.getenv('RPC_TIMEOUT', '5'))  # segundos por requisição
+    RPC_HEALTH_INTERVAL = float(os.getenv('RPC_HEALTH_INTERVAL', '5'))
+    RPC_MAX_BLOCK_LAG = 2  # nós atrasados mais que isso não recebem leituras
+    # Circuit breaker das chamadas RPC (src/blockchain/circuit_breaker.py)
+    RPC_BREAKER_FAILURES = int(os.getenv('RPC_BREAKER_FAILURES', '5'))  # falhas seguidas até abrir
+    RPC_BREAKER_RESET = float(os.getenv('RPC_BREAKER_RESET', '10'))  # segundos aberto até testar o nó
+    RPC_SLOW_CALL = float(os.getenv('RPC_SLOW_CALL', '2'))  # chamada mais lenta conta como falha (0 desativa)
+    # Último valor conhecido servido como stale com o circuito aberto (src/utils/stale_cache.py)
+    STALE_CACHE_SIZE = int(os.getenv('STALE_CACHE_SIZE', '10000'))
+    STALE_MAX_AGE = float(os.getenv('STALE_MAX_AGE', '3600'))  # segundos
+    STALE_REFRESH_WORKERS = 2
+    CHAIN_ID = int(os.getenv('CHAIN_ID', '1337'))  # Chain ID do genesis.json
+    
+    # eth_getLogs em pedaços paralelos (src/blockchain/logs.py)
+    LOGS_CHUNK_SIZE = int(os.getenv('LOGS_CHUNK_SIZE', '2000'))  # blocos por chamada (inicial)
+    LOGS_MAX_CHUNK_SIZE = int(os.getenv('LOGS_MAX_CHUNK_SIZE', '50000'))
+    LOGS_MAX_WORKERS = int(os.getenv('LOGS_MAX_WORKERS', '4'))  # chamadas simultâneas
+    LOGS_TARGET_RESULTS = 5000  # logs por chamada acima dos quais o pedaço não cresce
+    
+    # Indexador de eventos Transfer e snapshots do ledger
+    INDEXER_ENABLED = os.getenv('ESTCOIN_INDEXER', '1') == '1'
+    INDEXER_POLL_INTERVAL = float(os.getenv('INDEXER_POLL_INTERVAL', '2.0'))  # segundos
+    INDEXER_CHUNK_SIZE = 20000  # blocos por lote aplicado (buscados em pedaços paralelos)
+    SNAPSHOT_DIR = os.getenv(
+        'SNAPSHOT_DIR',
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'snapshots')
+    )
+    SNAPSHOT_INTERVAL_BLOCKS = 1000  # grava um snapshot a cada N blocos processados
+    SNAPSHOT_KEEP = 3
+    
+    # Cache HTTP (ETag) de /balance e /history, derivado do indexador
+    HTTP_CACHE_ENABLED = os.getenv('HTTP_CACHE_ENABLED', '1') == '1'
+    
+    # Notificações em tempo real (SSE) de /api/transactions/stream
+    # Conexões abertas por processo. O gunicorn_sse.conf.py (gevent) usa o seu
+    # worker_connections; gunicorn.conf.py e wsgi.py, onde cada conexão prende
+    # uma thread, usam metade das threads do servidor
+    SSE_MAX_STREAMS = int(os.getenv('SSE_MAX_STREAMS', '5000'))
+    SSE_QUEUE_SIZE = 100  # mensagens pendentes por conexão antes de descartar as antigas
+    SSE_HEARTBEAT = float(os.getenv('SSE_HEARTBEAT', '15'))  # segundos entre comentários keep-alive
+    
+    # Rate limiting (token bucket por usuário/IP, estado compartilhado em SQLite)
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', '1') == '1'
+    RATE_LIMIT_DB = os.getenv('RATE_LIMIT_DB', _data_path('ratelimit.db'))
+    # Proxies reversos confiáveis na frente do app (X-Forwarded-For/-Proto); 0 = acesso direto
+    TRUSTED_PROXY_HOPS = int(os.getenv('TRUSTED_PROXY_HOPS', '0'))
+    RATE_LIMIT_USER_BURST = 30  # fichas no balde de cada usuário
+    RATE_LIMIT_USER_RATE = 3.0  # fichas recarregadas por segundo
+    # /api/auth/* por IP, que pode ser compartilhado (NAT, proxy): 10 cadastros
+    # (custo 5) ou 50 logins de uma vez, depois um cadastro a cada 10 s
+    RATE_LIMIT_IP_BURST = 50
+    RATE_LIMIT_IP_RATE = 0.5
+    RATE_LIMIT_COSTS = {
+        'balance': 1,
+        'history': 3,
+        'summary': 1,
+        'stream': 2,
+        'transfer': 5,
+        'register': 5,
+        'login': 1,
+        'stats': 2,
+        'volume': 3,
+    }
+    
+    # Estado compartilhado entre workers (nonces, locks); ver SHARED_STATE.md
+    SHARED_STATE_DB = os.getenv('SHARED_STATE_DB', _data_path('shared_state.db'))
+    
+    # Idempotency-Key em POST /api/transactions/transfer (tabela em SHARED_STATE_DB)
+    IDEMPOTENCY_TTL = float(os.getenv('IDEMPOTENCY_TTL', str(24 * 3600)))  # validade da resposta gravada
+    IDEMPOTENCY_LEASE = float(os.getenv('IDEMPOTENCY_LEASE', '120'))  # reserva de uma requisição em andamento
+    IDEMPOTENCY_WAIT = float(os.getenv('IDEMPOTENCY_WAIT', '30'))  # espera máxima de uma duplicata concorrente
+    
+    # Cofre de chaves privadas (keystore V3 com scrypt) e cache das chaves desbloqueadas
+    # Obrigatória: sem ela o cofre não cifra nem decifra (nunca cai para SECRET_KEY)
+    KEY_VAULT_MASTER_KEY = os.getenv('KEY_VAULT_MASTER_KEY')
+    # Desenvolvimento: sem KEY_VAULT_MASTER_KEY, usa uma chave aleatória gravada neste arquivo
+    KEY_VAULT_DEV_KEY = os.getenv('KEY_VAULT_DEV_KEY', '0') == '1'
+    KEY_VAULT_DEV_KEY_FILE = os.getenv('KEY_VAULT_DEV_KEY_FILE', _data_path('vault.key'))
+    KEY_VAULT_SCRYPT_N = int(os.getenv('KEY_VAULT_SCRYPT_N', str(2 ** 15)))  # 32 MB, ~0.1 s por chave
+    KEY_VAULT_CACHE_SIZE = int(os.getenv('KEY_VAULT_CACHE_SIZE', '1024'))
+    KEY_VAULT_CACHE_TTL = float(os.getenv('KEY_VAULT_CACHE_TTL', '300'))  # segundos
+    # Contas pré-geradas e cifradas para o cadastro (src/blockchain/key_pool.py)
+    KEY_POOL_SIZE = int(os.getenv('KEY_POOL_SIZE', '64'))  # 0 desativa
+    KEY_POOL_LOW_WATER = int(os.getenv('KEY_POOL_LOW_WATER', '16'))  # estoque que dispara o reabastecimento
+    KEY_POOL_BATCH = int(os.getenv('KEY_POOL_BATCH', '8'))  # contas por tarefa do processo gerador
+    KEY_POOL_PROCESSES = int(os.getenv('KEY_POOL_PROCESSES', '1'))
     
     # Gas Settings
     GAS_LIMIT = 2000000
     GAS_PRICE = 20000000000  # 20 Gwei
     
+    # Fila de saída de transações por conta (src/blockchain/tx_queue.py)
+    TX_MAX_IN_FLIGHT = int(os.getenv('TX_MAX_IN_FLIGHT', '16'))  # transações da conta no mempool
+    TX_STUCK_AFTER = float(os.getenv('TX_STUCK_AFTER', '30'))  # segundos sem mineração até reenviar
+    TX_FEE_BUMP = float(os.getenv('TX_FEE_BUMP', '1.125'))  # substituição exige gasPrice pelo menos 10% maior
+    TX_MAX_GAS_PRICE = int(os.getenv('TX_MAX_GAS_PRICE', str(200 * 10 ** 9)))  # 200 Gwei
+    TX_POLL_INTERVAL = float(os.getenv('TX_POLL_INTERVAL', '0.5'))  # segundos entre verificações com o limite em voo atingido
+    
+    # Tracing de requests em arquivo OTLP/JSON local (src/utils/tracing.py)
+    TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', '0'))  # fração dos requests (0 desativa)
+    TRACE_FILE = os.getenv('TRACE_FILE', _data_path('traces.jsonl'))
+    TRACE_BATCH_SIZE = int(os.getenv('TRACE_BATCH_SIZE', '512'))  # spans por linha do arquivo
+    TRACE_FLUSH_INTERVAL = float(os.getenv('TRACE_FLUSH_INTERVAL', '2'))  # segundos até gravar um lote incompleto
+    TRACE_QUEUE_SIZE = int(os.getenv('TRACE_QUEUE_SIZE', '10000'))  # spans aguardando gravação (cheia: descarta)
+    TRACE_MAX_SPANS = int(os.getenv('TRACE_MAX_SPANS', '256'))  # spans por trace
+    
+    # Cache de system_config (src/models/config_cache.py)
+    CONFIG_POLL_INTERVAL = float(os.getenv('CONFIG_POLL_INTERVAL', '1'))  # segundos entre verificações da versão
+    
     # Token Contract 
     @staticmethod
     def get_token_contract_address():
-        """Busca o endereço do contrato do banco de dados"""
+        """Busca o endereço do contrato (cache da tabela system_config)"""
         try:
-            from src.models.user import SystemConfig
-            address = SystemConfig.get_value('TOKEN_CONTRACT_ADDRESS', None)
-            return address
+            from src.models.config_cache import get_config_cache
+            return get_config_cache().get('TOKEN_CONTRACT_ADDRESS')
         except Exception as e:
             print(f"Erro ao buscar endereço do contrato: {e}")
             return None
     
+    @staticmethod
+    def get_faucet_contract_address():
+        """Busca o endereço do contrato Faucet (None se não deployado)"""
+        try:
+            from src.models.config_cache import get_config_cache
+            return get_config_cache().get('FAUCET_CONTRACT_ADDRESS')
+        except Exception as e:
+            print(f"Erro ao buscar endereço do faucet: {e}")
+            return None
+    
     # Fallback para compatibilidade com código antigo
     @property
     def TOKEN_CONTRACT_ADDRESS(self):
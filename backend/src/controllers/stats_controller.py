@@ -0,0 +1,146 @@
+"""
+Controller para estatísticas do token derivadas do indexador
+"""
+import os
+from src.indexer.indexer import get_indexer
+from src.indexer.holders import get_holder_index
+from src.indexer.event_store import get_event_store
+from src.analytics.volume import load_columns, volume_by_interval
+from src.blockchain.circuit_breaker import get_circuit_breaker
+from src.blockchain.key_pool import get_key_pool
+from src.blockchain.tx_queue import queue_stats
+from src.blockchain.web3_client import get_rpc_stats
+from src.models.config_cache import get_config_cache
+from src.utils.stale_cache import get_stale_cache
+from src.utils.token_amount import TokenAmount
+from src.utils.tracing import get_exporter
+
+DEFAULT_PERCENTILES = (50, 90, 99)
+
+
+class StatsController:
+    def __init__(self):
+        pass
+
+    def get_holders(self, top=10, percentiles=None):
+        """
+        Retorna os maiores holders e a distribuição do supply
+
+        Os dados vêm do índice mantido a partir dos eventos Transfer;
+        nenhuma chamada é feita à blockchain.
+
+        Args:
+            top (int): Quantidade de maiores holders
+            percentiles (iterable): Percentis de saldo a calcular (0-100, padrão: 50, 90, 99)
+
+        Returns:
+            dict: Top holders, percentis, Gini e concentração
+        """
+        percentiles = percentiles or DEFAULT_PERCENTILES
+        indexer = get_indexer()
+        holders = get_holder_index()
+
+        top_holders = holders.top(top)
+        total = holders.total
+        ranking = []
+        for rank, (address, units) in enumerate(top_holders, start=1):
+            ranking.append({
+                'rank': rank,
+                'address': address,
+                **TokenAmount(units).fields('balance'),
+                'share': units / total if total else 0.0
+            })
+
+        return {
+            'block_number': indexer.ledger.last_block,
+            'stale': not indexer.is_fresh(),
+            'holders': holders.count(),
+            **TokenAmount(total).fields('circulating_supply'),
+            'top': ranking,
+            'percentiles': {
+                f'p{pct:g}': float(TokenAmount(holders.percentile(pct))) for pct in percentiles
+            },
+            'gini': round(holders.gini(), 6),
+            'top_10_share': round(holders.top_share(10), 6)
+        }
+
+    def get_volume(self, interval='hour', start=None, end=None, include_mints=False):
+        """
+        Retorna o volume de transferências agrupado por hora ou dia
+
+        Args:
+            interval (str): 'hour' ou 'day'
+            start (int): Timestamp inicial (inclusive)
+            end (int): Timestamp final (exclusivo)
+            include_mints (bool): Inclui emissões do contrato
+
+        Returns:
+            dict: Intervalos com quantidade, volume, média e endereços únicos
+        """
+        indexer = get_indexer()
+        store = get_event_store()
+        columns = load_columns()
+        buckets = volume_by_interval(columns, interval, start, end, include_mints)
+
+        return {
+            'block_number': store.last_block,
+            'stale': not indexer.is_fresh(),
+            'interval': interval,
+            'events': columns.count,
+            'buckets': buckets
+        }
+
+    def get_outbound(self):
+        """
+        Retorna as métricas das filas de saída de transações deste worker
+
+        Returns:
+            dict: Por conta, transações na fila por prioridade, em voo, no
+            mempool, reenvios e latências (espera na fila e até a mineração)
+        """
+        return {'pid': os.getpid(), 'queues': queue_stats()}
+
+    def get_rpc(self):
+        """
+        Retorna a saúde da conexão com o nó vista por este worker
+
+        Returns:
+            dict: Estado do circuit breaker, endpoints do pool (se houver) e
+            uso do cache de últimos valores conhecidos
+        """
+        return {
+            'pid': os.getpid(),
+            'circuit': get_circuit_breaker().stats(),
+            'endpoints': get_rpc_stats(),
+            'stale_cache': get_stale_cache().stats()
+        }
+
+    def get_key_pool(self):
+        """
+        Retorna o estado do pool de contas pré-geradas
+
+        Returns:
+            dict: Estoque atual (compartilhado), tamanho, low water, taxa do
+            último reabastecimento e contadores deste worker
+        """
+        return {'pid': os.getpid(), **get_key_pool().stats()}
+
+    def get_config(self):
+        """
+        Retorna o estado do cache de configuração deste worker
+
+        Returns:
+            dict: Versão carregada, intervalo de verificação e contadores de
+            verificações, recargas e chaves alteradas
+        """
+        return {'pid': os.getpid(), **get_config_cache().stats()}
+
+    def get_tracing(self):
+        """
+        Retorna o estado do tracing deste worker
+
+        Returns:
+            dict: Taxa de amostragem, arquivo, spans na fila e contadores de
+            traces, spans gravados, descartados (fila cheia) e lotes
+        """
+        return {'pid': os.getpid(), **get_exporter().stats()}
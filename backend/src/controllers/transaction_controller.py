@@ -1,14 +1,28 @@
 """
 Controller para gerenciar transações de tokens
 """
-from src.blockchain.web3_client import web3, get_balance, wei_to_ether
-from src.blockchain.contract import get_contract, transfer_tokens, get_token_balance
-from src.models.user import User, SessionLocal
+from sqlalchemy import or_, select
+from src.blockchain.web3_client import web3
+from src.blockchain.circuit_breaker import CircuitOpenError
+from src.blockchain.contract import get_contract, transfer_tokens, get_token_balance_units
+from src.blockchain.key_vault import get_key_vault
+from src.blockchain.tx_queue import TransactionNotSubmitted
+from src.blockchain.logs import get_log_fetcher, transfer_filters
+from src.indexer import summaries
+from src.indexer.indexer import get_indexer
+from src.indexer.ledger import decode_transfer_log
+from src.models.transfer_event import TransferEvent
+from src.models.user import User, SessionLocal, engine
+from src.models.user_directory import get_user_directory
+from src.utils.stale_cache import get_stale_cache
+from src.utils.token_amount import TokenAmount
+from src.utils.tracing import traced
 
 class TransactionController:
     def __init__(self):
         self.web3 = web3
         
+    @traced('TransactionController.transfer_funds')
     def transfer_funds(self, user_id, recipient_address, amount):
         """
         Transfere tokens de um endereço para outro
@@ -16,12 +30,18 @@ class TransactionController:
         Args:
             user_id (int): ID do usuário remetente (para buscar private_key)
             recipient_address (str): Endereço do destinatário
-            amount (float): Quantidade de tokens
+            amount (TokenAmount): Quantidade de tokens
             
         Returns:
             dict: Informações da transação
+
+        Raises:
+            CircuitOpenError: Nó indisponível na leitura do saldo (nada enviado)
+            TransactionNotSubmitted: Falha antes do envio ao nó (nova tentativa é segura)
         """
+        amount = TokenAmount.parse(amount)
         db = SessionLocal()
+        submitting = False
         try:
             # Busca o usuário no banco para obter a private_key
             user = db.query(User).filter_by(id=user_id).first()
@@ -29,7 +49,8 @@ class TransactionController:
                 raise Exception("Usuário não encontrado")
             
             sender_address = user.ethereum_address
-            private_key = user.private_key
+            # Decifra só se a chave não estiver no cache de chaves desbloqueadas
+            private_key = get_key_vault().unlock(sender_address, user.private_key)
             
             # Verifica se o contrato está disponível
             contract = get_contract()
@@ -37,22 +58,31 @@ class TransactionController:
                 raise Exception("Contrato de token não está deployado. Configure TOKEN_CONTRACT_ADDRESS no config.py")
             
             # Verifica saldo antes de transferir
-            balance = get_token_balance(sender_address)
+            balance = TokenAmount(get_token_balance_units(sender_address))
             if balance < amount:
                 raise Exception(f"Saldo insuficiente. Saldo atual: {balance} EST, necessário: {amount} EST")
             
             # Realiza a transferência
+            submitting = True
             tx_hash = transfer_tokens(sender_address, recipient_address, amount, private_key)
             
+            recipient = get_user_directory().get_by_address(recipient_address)
+            
             return {
                 'status': 'success',
                 'from': sender_address,
                 'to': recipient_address,
-                'amount': amount,
+                'to_username': recipient['username'] if recipient else None,
+                **amount.fields('amount'),
                 'tx_hash': tx_hash,
                 'message': 'Transferência realizada com sucesso'
             }
+        except (CircuitOpenError, TransactionNotSubmitted):
+            raise
         except Exception as e:
+            if not submitting:
+                # Falhou antes de enfileirar: nada foi enviado
+                raise TransactionNotSubmitted(f"Erro na transferência: {str(e)}")
             raise Exception(f"Erro na transferência: {str(e)}")
         finally:
             db.close()
@@ -67,18 +97,46 @@ class TransactionController:
         Returns:
             float: Saldo em tokens
         """
+        return self.get_balance_info(address)['balance']
+
+    @traced('TransactionController.get_balance_info')
+    def get_balance_info(self, address):
+        """
+        Retorna o saldo de um endereço com o bloco da leitura
+
+        Com o nó indisponível (circuito aberto ou erro) serve o último saldo
+        lido neste processo, ou o do indexador, marcado como stale.
+
+        Args:
+            address (str): Endereço Ethereum
+
+        Returns:
+            dict: balance, balance_units, block_number, stale e age (segundos desde a leitura)
+
+        Raises:
+            CircuitOpenError: Nó indisponível e nenhum saldo conhecido
+        """
         try:
-            if not address:
-                return 0.0
-            
             # Verifica se o contrato está disponível
             contract = get_contract()
             if not contract:
                 raise Exception("Contrato de token não está deployado. Configure TOKEN_CONTRACT_ADDRESS no config.py")
-            
-            # Obtém saldo real do contrato
-            balance = get_token_balance(address)
-            return balance
+
+            def load():
+                # Saldo e bloco da mesma leitura
+                block_number = self.web3.eth.block_number
+                return get_token_balance_units(address, block_number), block_number
+
+            def from_indexer():
+                ledger = get_indexer().ledger
+                if ledger.last_block < 0 or (ledger.contract_address or '').lower() != contract.address.lower():
+                    return None
+                return ledger.balance_of(address), ledger.last_block
+
+            units, meta = get_stale_cache().get(('balance', address.lower()), load, from_indexer)
+            return {**TokenAmount(units).fields('balance'), **meta}
+        except CircuitOpenError:
+            raise
         except Exception as e:
             raise Exception(f"Erro ao consultar saldo: {str(e)}")
     
@@ -93,64 +151,161 @@ class TransactionController:
         Returns:
             list: Lista de transações
         """
+        return self.get_history_info(address, limit)['transactions']
+
+    @traced('TransactionController.get_history_info')
+    def get_history_info(self, address, limit=10):
+        """
+        Retorna o histórico de um endereço com o bloco da leitura
+
+        Com o nó indisponível serve a última página lida neste processo, ou a
+        montada a partir de transfer_events, marcada como stale.
+
+        Args:
+            address (str): Endereço Ethereum
+            limit (int): Número máximo de transações
+
+        Returns:
+            dict: transactions, block_number, stale e age
+
+        Raises:
+            CircuitOpenError: Nó indisponível e nenhum histórico conhecido
+        """
         try:
             # Verifica se o contrato está disponível
             contract = get_contract()
             if not contract:
                 raise Exception("Contrato de token não está deployado. Configure TOKEN_CONTRACT_ADDRESS no config.py")
-            
-            # Obtém eventos Transfer do contrato
-            # Filtra eventos onde o endereço é from ou to
-            transfer_filter_sent = contract.events.Transfer.create_filter(
-                fromBlock=0,
-                argument_filters={'from': address}
+
+            page, meta = get_stale_cache().get(
+                ('history', address.lower(), limit),
+                lambda: self._load_history(contract, address, limit),
+                lambda: self._history_from_events(address, limit)
             )
-            
-            transfer_filter_received = contract.events.Transfer.create_filter(
-                fromBlock=0,
-                argument_filters={'to': address}
+            # Rotula as contrapartes que são usuários do app (uma consulta ao índice);
+            # fora do cache, para refletir cadastros novos mesmo em uma página stale
+            labels = get_user_directory().labels(
+                [event['from'] for event in page] + [event['to'] for event in page]
             )
-            
-            # Obtém todos os eventos
-            sent_events = transfer_filter_sent.get_all_entries()
-            received_events = transfer_filter_received.get_all_entries()
-            
-            # Combina e processa os eventos
-            all_events = []
-            
-            for event in sent_events:
-                all_events.append({
-                    'type': 'sent',
-                    'from': event['args']['from'],
-                    'to': event['args']['to'],
-                    'amount': event['args']['value'] / (10 ** 18),  # Converte de wei para tokens
-                    'tx_hash': event['transactionHash'].hex(),
-                    'block_number': event['blockNumber'],
-                    'timestamp': self._get_block_timestamp(event['blockNumber'])
-                })
-            
-            for event in received_events:
-                # Evita duplicatas (quando from == to)
-                if event['args']['from'] != address:
-                    all_events.append({
-                        'type': 'received',
-                        'from': event['args']['from'],
-                        'to': event['args']['to'],
-                        'amount': event['args']['value'] / (10 ** 18),
-                        'tx_hash': event['transactionHash'].hex(),
-                        'block_number': event['blockNumber'],
-                        'timestamp': self._get_block_timestamp(event['blockNumber'])
-                    })
-            
-            # Ordena por número de bloco (mais recente primeiro)
-            all_events.sort(key=lambda x: x['block_number'], reverse=True)
-            
-            # Limita a quantidade de resultados
-            return all_events[:limit]
-            
+            transactions = [
+                dict(event, from_username=labels.get(event['from'].lower()),
+                     to_username=labels.get(event['to'].lower()))
+                for event in page
+            ]
+            return {'transactions': transactions, **meta}
+        except CircuitOpenError:
+            raise
         except Exception as e:
             raise Exception(f"Erro ao consultar histórico: {str(e)}")
+
+    def _load_history(self, contract, address, limit):
+        """Página do histórico lida do nó; retorna (eventos, bloco)"""
+        to_block = self.web3.eth.block_number
+        # Transfers enviados OU recebidos pelo endereço, via eth_getLogs sem estado no nó
+        logs = get_log_fetcher().fetch(
+            contract.address,
+            transfer_filters(address),
+            0,
+            to_block
+        )
+        
+        # Processa os eventos
+        all_events = []
+        
+        for log in logs:
+            event = decode_transfer_log(log)
+            all_events.append({
+                # Transferência para si mesmo aparece uma vez, como enviada
+                'type': 'sent' if event['from'].lower() == address.lower() else 'received',
+                'from': event['from'],
+                'to': event['to'],
+                **TokenAmount(event['value']).fields('amount'),
+                'tx_hash': event['tx_hash'][2:],
+                'block_number': event['block_number']
+            })
+        
+        # Ordena por número de bloco (mais recente primeiro)
+        all_events.sort(key=lambda x: x['block_number'], reverse=True)
+        
+        # Limita a quantidade de resultados
+        page = all_events[:limit]
+        
+        # Timestamps só dos eventos retornados, uma consulta por bloco
+        timestamps = {}
+        for event in page:
+            block_number = event['block_number']
+            if block_number not in timestamps:
+                timestamps[block_number] = self._get_block_timestamp(block_number)
+            event['timestamp'] = timestamps[block_number]
+        
+        return page, to_block
+
+    def _history_from_events(self, address, limit):
+        """Página do histórico a partir dos eventos indexados; None se não houver"""
+        # Os eventos são gravados com o endereço em checksum
+        address = self.web3.to_checksum_address(address)
+        with engine.connect() as conn:
+            block_number = summaries.get_checkpoint(conn)
+            if block_number is None or block_number < 0:
+                return None
+            rows = conn.execute(
+                select(TransferEvent)
+                .where(or_(TransferEvent.from_address == address, TransferEvent.to_address == address))
+                .order_by(TransferEvent.block_number.desc(), TransferEvent.log_index.desc())
+                .limit(limit)
+            ).fetchall()
+
+        page = [
+            {
+                'type': 'sent' if row.from_address.lower() == address.lower() else 'received',
+                'from': row.from_address,
+                'to': row.to_address,
+                **TokenAmount.from_limbs(row.value_hi, row.value_lo).fields('amount'),
+                'tx_hash': row.tx_hash[2:],
+                'block_number': row.block_number,
+                'timestamp': row.timestamp
+            }
+            for row in rows
+        ]
+        return page, block_number
     
+    @traced('TransactionController.get_summary')
+    def get_summary(self, address):
+        """
+        Retorna os totais enviados/recebidos de um endereço
+
+        Lidos da tabela account_summaries (uma linha por endereço, mantida pelo
+        indexador), sem percorrer o histórico.
+
+        Args:
+            address (str): Endereço Ethereum
+
+        Returns:
+            dict: Totais em tokens e em unidades mínimas, contagens e última atividade
+        """
+        try:
+            with engine.connect() as conn:
+                row = summaries.get_summary(conn, address)
+                block_number = summaries.get_checkpoint(conn)
+
+            sent = TokenAmount.from_limbs(row.sent_hi, row.sent_lo) if row else TokenAmount()
+            received = TokenAmount.from_limbs(row.received_hi, row.received_lo) if row else TokenAmount()
+            return {
+                'block_number': block_number,
+                'stale': not get_indexer().is_fresh(),
+                # Valores exatos em unidades mínimas nos campos *_units (strings: não cabem em um double)
+                **sent.fields('sent'),
+                **received.fields('received'),
+                **(received - sent).fields('net'),
+                'sent_count': row.sent_count if row else 0,
+                'received_count': row.received_count if row else 0,
+                'first_block': row.first_block if row else None,
+                'last_block': row.last_block if row else None,
+                'last_activity': row.last_timestamp if row else None
+            }
+        except Exception as e:
+            raise Exception(f"Erro ao consultar resumo: {str(e)}")
+
     def _get_block_timestamp(self, block_number):
         """
         Obtém o timestamp de um bloco
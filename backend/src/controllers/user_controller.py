@@ -3,13 +3,18 @@ Controller para gerenciar usuários com SQLite
 """
 from src.utils.auth_utils import hash_password, check_password, generate_token
 from src.blockchain.web3_client import create_account
+from src.blockchain.key_vault import get_key_vault
+from src.blockchain.key_pool import get_key_pool
 from src.models.user import User, get_db, SessionLocal
+from src.models.user_directory import get_user_directory
 from src.utils.token_utils import auto_distribute_initial_tokens
+from src.utils.tracing import traced
 
 class UserController:
     def __init__(self):
         pass
     
+    @traced('UserController.register')
     def register(self, username, password):
         """
         Registra um novo usuário no banco de dados
@@ -29,24 +34,32 @@ class UserController:
             if existing_user:
                 raise Exception('Usuário já existe')
             
-            # Cria conta Ethereum
-            eth_account = create_account()
+            # Conta Ethereum já cifrada do pool; sem estoque, gera e cifra na hora
+            key_vault = get_key_vault()
+            eth_account = get_key_pool().take()
+            if eth_account is None:
+                eth_account = create_account()
+                eth_account['keystore'] = key_vault.encrypt(eth_account['private_key'])
             
             # Hash da senha
             password_hash = hash_password(password)
             
-            # Cria usuário no banco
+            # Cria usuário no banco (chave privada cifrada pelo cofre)
             new_user = User(
                 username=username,
                 password_hash=password_hash,
                 ethereum_address=eth_account['address'],
-                private_key=eth_account['private_key'],
+                private_key=eth_account['keystore'],
                 balance=10.0
             )
             
             db.add(new_user)
             db.commit()
             db.refresh(new_user)
+            if 'private_key' in eth_account:
+                # Conta do pool fica cifrada: é decifrada na primeira transferência
+                key_vault.remember(eth_account['address'], eth_account['private_key'])
+            get_user_directory().add(new_user.id, username, eth_account['address'])
             
             print(f'✅ Usuário criado: {username} - {eth_account["address"]}')
             
@@ -81,6 +94,7 @@ class UserController:
         finally:
             db.close()
     
+    @traced('UserController.login')
     def login(self, username, password):
         """
         Autentica um usuário
@@ -157,10 +171,15 @@ class UserController:
         Returns:
             dict: Dados do usuário
         """
+        # Endereços externos são descartados pelo índice, sem consultar o banco
+        entry = get_user_directory().get_by_address(ethereum_address)
+        if entry is None:
+            return None
+
         db = SessionLocal()
         
         try:
-            user = db.query(User).filter_by(ethereum_address=ethereum_address).first()
+            user = db.get(User, entry['id'])
             
             if not user:
                 return None
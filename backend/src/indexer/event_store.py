@@ -0,0 +1,122 @@
+"""
+Armazenamento dos eventos Transfer indexados (tabela transfer_events)
+
+Listener do TransferIndexer: grava cada lote de eventos com o timestamp do
+bloco, em uma única transação com INSERT OR IGNORE. Quando o indexador volta
+a processar blocos já gravados (reinício a partir de snapshot, blockchain
+reiniciada) as linhas desses blocos são substituídas; quando começa depois
+do ponto em que o armazenamento parou, o intervalo faltante é buscado antes.
+
+Os resumos por endereço (account_summaries) são atualizados na mesma
+transação, ver src/indexer/summaries.py.
+"""
+import threading
+from sqlalchemy import insert, delete
+from src.blockchain.web3_client import web3
+from src.models.user import engine, SystemConfig
+from src.models.transfer_event import TransferEvent
+from src.indexer import summaries
+from src.utils.token_amount import UNITS
+
+CHECKPOINT_KEY = 'EVENT_STORE_LAST_BLOCK'
+CONTRACT_KEY = 'EVENT_STORE_CONTRACT'
+
+
+class EventStore:
+    """
+    Persiste os eventos do indexador para consultas analíticas
+    """
+
+    def __init__(self, indexer):
+        self.indexer = indexer
+        self.last_block = None
+        self.contract_address = None
+        self.lock = threading.Lock()
+
+    def _load_checkpoint(self):
+        self.contract_address = SystemConfig.get_value(CONTRACT_KEY)
+        self.last_block = int(SystemConfig.get_value(CHECKPOINT_KEY, -1))
+
+    def _save_checkpoint(self, block_number):
+        self.last_block = block_number
+        SystemConfig.set_value(CHECKPOINT_KEY, str(block_number))
+
+    def _timestamps(self, events):
+        """Timestamp de cada bloco distinto que aparece nos eventos"""
+        return {
+            block_number: web3.eth.get_block(block_number)['timestamp']
+            for block_number in sorted({event['block_number'] for event in events})
+        }
+
+    def _write(self, events, from_block, to_block):
+        timestamps = self._timestamps(events)
+        rows = [
+            {
+                'block_number': event['block_number'],
+                'log_index': event['log_index'],
+                'tx_hash': event['tx_hash'],
+                'from_address': event['from'],
+                'to_address': event['to'],
+                'value_hi': event['value'] // UNITS,
+                'value_lo': event['value'] % UNITS,
+                'timestamp': timestamps[event['block_number']],
+            }
+            for event in events
+        ]
+        with engine.begin() as conn:
+            summary_block = summaries.lock(conn)
+            touched = set()
+            if from_block <= self.last_block:
+                touched = summaries.touched_addresses(conn, from_block)
+                conn.execute(delete(TransferEvent).where(TransferEvent.block_number >= from_block))
+            if rows:
+                conn.execute(insert(TransferEvent).prefix_with('OR IGNORE'), rows)
+            if from_block <= summary_block:
+                # Blocos já somados: recalcula os endereços envolvidos
+                touched.update(row['from_address'] for row in rows)
+                touched.update(row['to_address'] for row in rows)
+                summaries.recompute(conn, touched)
+            else:
+                summaries.apply_rows(conn, rows)
+            summaries.save_checkpoint(conn, to_block)
+        self._save_checkpoint(to_block)
+
+    def on_events(self, events, from_block, to_block):
+        """Listener do TransferIndexer"""
+        with self.lock:
+            if self.last_block is None:
+                self._load_checkpoint()
+
+            contract_address = self.indexer.ledger.contract_address
+            if (self.contract_address or '').lower() != (contract_address or '').lower():
+                # Contrato novo: os eventos gravados pertencem ao anterior
+                with engine.begin() as conn:
+                    conn.execute(delete(TransferEvent))
+                    summaries.clear(conn)
+                SystemConfig.set_value(CONTRACT_KEY, contract_address)
+                self.contract_address = contract_address
+                self._save_checkpoint(-1)
+
+            # Preenche o buraco entre o armazenamento e o lote (ex: ledger veio de snapshot)
+            gap_start = self.last_block + 1
+            while gap_start < from_block:
+                gap_end = min(gap_start + self.indexer.chunk_size - 1, from_block - 1)
+                gap_events = self.indexer.fetch_events(contract_address, gap_start, gap_end)
+                self._write(gap_events, gap_start, gap_end)
+                gap_start = gap_end + 1
+
+            self._write(events, from_block, to_block)
+
+
+_event_store = None
+_event_store_lock = threading.Lock()
+
+
+def get_event_store(indexer=None):
+    """Retorna o armazenamento de eventos do processo"""
+    global _event_store
+    with _event_store_lock:
+        if _event_store is None:
+            from src.indexer.indexer import get_indexer
+            _event_store = EventStore(indexer or get_indexer())
+        return _event_store
@@ -0,0 +1,139 @@
+"""
+Índice ordenado de holders do token
+
+Mantém a lista (saldo, endereço) ordenada por saldo, atualizada a cada lote
+de eventos do indexador apenas para os endereços tocados. Top-N e percentis
+são leituras diretas na lista; o Gini é recalculado no máximo uma vez por
+lote novo (O(n)) e fica em cache até o próximo.
+"""
+import threading
+from bisect import bisect_left, insort
+from src.indexer.ledger import checksum_address
+
+
+class HolderIndex:
+    """
+    Distribuição de saldos derivada do Ledger
+    """
+
+    def __init__(self, ledger):
+        self.ledger = ledger
+        self.generation = None
+        self.balances = {}
+        self.sorted = []  # (saldo, endereço) em ordem crescente, apenas saldos > 0
+        self.total = 0
+        self.lock = threading.RLock()
+        self._gini = None
+
+    def rebuild(self):
+        """Reconstrói tudo a partir do Ledger (início, snapshot ou reset)"""
+        with self.ledger.lock:
+            balances = {address: value for address, value in self.ledger.balances.items() if value > 0}
+            generation = self.ledger.generation
+        with self.lock:
+            self.balances = balances
+            self.sorted = sorted((value, address) for address, value in balances.items())
+            self.total = sum(balances.values())
+            self.generation = generation
+            self._gini = None
+
+    def _ensure_current(self):
+        if self.generation != self.ledger.generation:
+            self.rebuild()
+
+    def on_events(self, events, from_block, to_block):
+        """Listener do TransferIndexer: reposiciona só os endereços tocados"""
+        with self.lock:
+            if self.generation != self.ledger.generation:
+                self.rebuild()
+                return
+
+            touched = set()
+            for event in events:
+                touched.add(event['from'].lower())
+                touched.add(event['to'].lower())
+
+            for address in touched:
+                new = self.ledger.balance_of(address)
+                old = self.balances.get(address, 0)
+                if new == old:
+                    continue
+                if old > 0:
+                    index = bisect_left(self.sorted, (old, address))
+                    if index < len(self.sorted) and self.sorted[index] == (old, address):
+                        del self.sorted[index]
+                if new > 0:
+                    insort(self.sorted, (new, address))
+                    self.balances[address] = new
+                else:
+                    self.balances.pop(address, None)
+                self.total += new - old
+                self._gini = None
+
+    # ---------- consultas ----------
+
+    def top(self, n):
+        """
+        Maiores holders
+
+        Returns:
+            list: Tuplas (endereço checksum, saldo em unidades mínimas), do maior para o menor
+        """
+        with self.lock:
+            self._ensure_current()
+            chosen = self.sorted[-n:] if n > 0 else []
+        return [(checksum_address(bytes.fromhex(address[2:])), value) for value, address in reversed(chosen)]
+
+    def percentile(self, pct):
+        """Saldo no percentil `pct` (0-100, nearest-rank) entre os holders"""
+        with self.lock:
+            self._ensure_current()
+            count = len(self.sorted)
+            if not count:
+                return 0
+            rank = min(count, max(1, int(-(-pct * count // 100))))
+            return self.sorted[rank - 1][0]
+
+    def top_share(self, n):
+        """Fração do supply em circulação detida pelos `n` maiores holders"""
+        with self.lock:
+            self._ensure_current()
+            if not self.total:
+                return 0.0
+            return sum(value for value, _ in self.sorted[-n:]) / self.total if n > 0 else 0.0
+
+    def gini(self):
+        """Coeficiente de Gini dos saldos (0 = igualitário, 1 = concentrado)"""
+        with self.lock:
+            self._ensure_current()
+            if self._gini is None:
+                count = len(self.sorted)
+                if count == 0 or not self.total:
+                    self._gini = 0.0
+                else:
+                    weighted = sum(i * value for i, (value, _) in enumerate(self.sorted, start=1))
+                    self._gini = (2 * weighted) / (count * self.total) - (count + 1) / count
+            return self._gini
+
+    def count(self):
+        with self.lock:
+            self._ensure_current()
+            return len(self.sorted)
+
+
+_holder_index = None
+_holder_lock = threading.Lock()
+
+
+def get_holder_index():
+    """Retorna o índice de holders do processo, ligado ao indexador compartilhado"""
+    global _holder_index
+    with _holder_lock:
+        if _holder_index is None:
+            from src.indexer.indexer import get_indexer
+            indexer = get_indexer()
+            _holder_index = HolderIndex(indexer.ledger)
+            # Registra antes de reconstruir para não perder um lote aplicado no meio
+            indexer.add_listener(_holder_index.on_events)
+            _holder_index.rebuild()
+        return _holder_index
@@ -0,0 +1,243 @@
+"""
+Indexador incremental dos eventos Transfer do contrato Token
+
+Mantém um Ledger atualizado lendo apenas os blocos novos desde o último
+checkpoint. Na inicialização carrega o snapshot mais recente e reprocessa
+somente os blocos posteriores a ele, em vez de repetir tudo desde o bloco 0.
+"""
+import atexit
+import threading
+import time
+from web3.exceptions import BlockNotFound
+from src.blockchain.web3_client import web3
+from src.config import Config
+from src.blockchain.logs import get_log_fetcher, transfer_filters
+from src.indexer.ledger import Ledger, decode_transfer_log
+from src.indexer.snapshot import load_latest_snapshot, write_snapshot
+
+
+class TransferIndexer:
+    """
+    Segue a blockchain e aplica os eventos Transfer ao Ledger
+    """
+
+    def __init__(self, ledger=None, snapshot_dir=None, snapshot_interval=None,
+                 chunk_size=None, poll_interval=None):
+        self.ledger = ledger or Ledger()
+        self.snapshot_dir = snapshot_dir or Config.SNAPSHOT_DIR
+        self.snapshot_interval = snapshot_interval or Config.SNAPSHOT_INTERVAL_BLOCKS
+        self.chunk_size = chunk_size or Config.INDEXER_CHUNK_SIZE
+        self.poll_interval = poll_interval or Config.INDEXER_POLL_INTERVAL
+        self.listeners = []
+        self.last_snapshot_block = -1
+        self.restored = False
+        self.last_synced_at = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._sync_lock = threading.Lock()
+
+    def add_listener(self, listener):
+        """
+        Registra um callback chamado após cada lote aplicado
+
+        O callback recebe (events, from_block, to_block), com os eventos já
+        decodificados do intervalo [from_block, to_block].
+        """
+        if listener not in self.listeners:
+            self.listeners.append(listener)
+
+    # ---------- snapshot ----------
+
+    def restore(self):
+        """
+        Restaura o Ledger a partir do snapshot mais recente do contrato atual
+
+        O snapshot só é aceito se o hash do bloco salvo ainda existir na
+        blockchain (uma blockchain local reiniciada invalida os snapshots).
+
+        Returns:
+            bool: True se um snapshot foi carregado
+        """
+        contract_address = Config.get_token_contract_address()
+        if not contract_address:
+            return False
+
+        snapshot = load_latest_snapshot(self.snapshot_dir, contract_address)
+        if not snapshot:
+            self.ledger.reset(contract_address)
+            self.restored = True
+            return False
+
+        # Se a blockchain estiver fora do ar a exceção sobe e a restauração é tentada de novo
+        try:
+            current_hash = web3.to_hex(web3.eth.get_block(snapshot.last_block)['hash'])
+        except BlockNotFound:
+            current_hash = None
+
+        self.restored = True
+        if current_hash != snapshot.last_block_hash:
+            print(f"⚠️ Snapshot do bloco {snapshot.last_block} não corresponde à blockchain atual, "
+                  f"reprocessando desde o bloco 0")
+            self.ledger.reset(contract_address)
+            return False
+
+        self.ledger.load(snapshot)
+        self.last_snapshot_block = snapshot.last_block
+        print(f"✅ Snapshot carregado: bloco {snapshot.last_block}, {len(snapshot)} endereço(s)")
+        return True
+
+    def snapshot(self):
+        """Grava um snapshot do estado atual"""
+        if self.ledger.last_block < 0 or not self.ledger.contract_address:
+            return None
+        path = write_snapshot(self.ledger, self.snapshot_dir, keep=Config.SNAPSHOT_KEEP)
+        self.last_snapshot_block = self.ledger.last_block
+        return path
+
+    # ---------- sincronização ----------
+
+    def fetch_events(self, contract_address, from_block, to_block):
+        """Busca e decodifica os eventos Transfer de um intervalo de blocos"""
+        logs = get_log_fetcher().fetch(contract_address, transfer_filters(), from_block, to_block)
+        return [decode_transfer_log(log) for log in logs]
+
+    def sync(self, to_block=None):
+        """
+        Processa os blocos entre o checkpoint e `to_block` (padrão: último bloco)
+
+        Returns:
+            int: Quantidade de eventos aplicados
+        """
+        with self._sync_lock:
+            if not self.restored:
+                self.restore()
+
+            contract_address = Config.get_token_contract_address()
+            if not contract_address:
+                return 0
+
+            if (self.ledger.contract_address or '').lower() != contract_address.lower():
+                # Contrato novo (redeploy): o estado anterior não vale mais
+                self.ledger.reset(contract_address)
+                self.last_snapshot_block = -1
+
+            head = web3.eth.block_number if to_block is None else to_block
+            applied = 0
+
+            if head < self.ledger.last_block:
+                # A blockchain voltou para trás (ex: Ganache reiniciado)
+                print(f"⚠️ Blockchain reiniciada (bloco {head} < checkpoint {self.ledger.last_block}), "
+                      f"reprocessando desde o bloco 0")
+                self.ledger.reset(contract_address)
+                self.last_snapshot_block = -1
+
+            start = self.ledger.last_block + 1
+            while start <= head:
+                end = min(start + self.chunk_size - 1, head)
+                events = self.fetch_events(contract_address, start, end)
+                self.ledger.apply(events)
+                block_hash = web3.to_hex(web3.eth.get_block(end)['hash'])
+                self.ledger.set_checkpoint(end, block_hash)
+                for listener in self.listeners:
+                    try:
+                        listener(events, start, end)
+                    except Exception as e:
+                        print(f"⚠️ Erro em listener do indexador: {e}")
+                applied += len(events)
+                start = end + 1
+
+            if self.ledger.last_block - self.last_snapshot_block >= self.snapshot_interval:
+                self.snapshot()
+
+            self.last_synced_at = time.monotonic()
+            return applied
+
+    def is_fresh(self, max_age=None):
+        """
+        Indica se o ledger acompanhou a blockchain recentemente
+
+        Dados derivados do indexador (ex: ETags) só devem ser usados quando
+        a última sincronização bem-sucedida é mais nova que `max_age` segundos.
+        """
+        if self.last_synced_at is None or self.ledger.last_block < 0:
+            return False
+        max_age = max_age if max_age is not None else max(5.0, 3 * self.poll_interval)
+        return time.monotonic() - self.last_synced_at <= max_age
+
+    # ---------- execução em segundo plano ----------
+
+    def _run(self):
+        failing = False
+        while not self._stop.is_set():
+            try:
+                self.sync()
+                if failing:
+                    print("✅ Indexador reconectado à blockchain")
+                failing = False
+            except Exception as e:
+                if not failing:
+                    print(f"⚠️ Indexador sem acesso à blockchain: {e}")
+                failing = True
+            self._stop.wait(self.poll_interval)
+
+    def is_running(self):
+        return bool(self._thread and self._thread.is_alive())
+
+    def start(self):
+        """Inicia o acompanhamento da blockchain em uma thread daemon"""
+        if self.is_running():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='transfer-indexer', daemon=True)
+        self._thread.start()
+
+    def stop(self, snapshot=True):
+        """Para a thread e (opcionalmente) grava um snapshot final"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.poll_interval + 5)
+        if snapshot:
+            self.snapshot()
+
+
+_indexer = None
+_indexer_lock = threading.Lock()
+
+
+def get_indexer():
+    """Retorna o indexador compartilhado do processo"""
+    global _indexer
+    with _indexer_lock:
+        if _indexer is None:
+            _indexer = TransferIndexer()
+        return _indexer
+
+
+def start_indexer(sync_first=False):
+    """
+    Inicia o indexador compartilhado (carrega snapshot e segue novos blocos)
+
+    Pode ser chamado várias vezes; só o primeiro chamado inicia a thread.
+
+    Args:
+        sync_first (bool): Sincroniza até o último bloco antes de retornar
+    """
+    if not Config.INDEXER_ENABLED:
+        return None
+    from src.indexer.event_store import get_event_store
+    from src.indexer.notifier import get_notifier
+
+    indexer = get_indexer()
+    if indexer.is_running():
+        return indexer
+    indexer.add_listener(get_event_store(indexer).on_events)
+    indexer.add_listener(get_notifier(indexer).on_events)
+    try:
+        if sync_first:
+            indexer.sync()
+    finally:
+        # Mesmo sem acesso ao nó agora, a thread continua tentando
+        indexer.start()
+        # Grava um snapshot ao encerrar para o próximo início ser rápido
+        atexit.register(indexer.stop)
+    return indexer
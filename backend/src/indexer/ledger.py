@@ -0,0 +1,139 @@
+"""
+Estado derivado dos eventos Transfer do contrato Token
+
+O Ledger guarda o saldo (em unidades mínimas, inteiros exatos) de cada
+endereço e o checkpoint do último bloco processado. É alimentado pelo
+TransferIndexer e pode ser salvo/restaurado por snapshot.
+"""
+import threading
+from functools import lru_cache
+from web3 import Web3
+
+# keccak('Transfer(address,address,uint256)')
+TRANSFER_TOPIC = '0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef'
+ZERO_ADDRESS = '0x0000000000000000000000000000000000000000'
+
+
+@lru_cache(maxsize=65536)
+def checksum_address(raw_address):
+    """Endereço checksum a partir dos 20 bytes (com cache: o checksum custa um keccak)"""
+    return Web3.to_checksum_address(raw_address)
+
+
+def _topic_to_address(topic):
+    """Converte um tópico indexado (32 bytes) em endereço checksum"""
+    raw = bytes(topic) if not isinstance(topic, str) else bytes.fromhex(topic[2:] if topic.startswith('0x') else topic)
+    return checksum_address(raw[-20:])
+
+
+def decode_transfer_log(log):
+    """
+    Decodifica um log bruto de Transfer sem passar pelo ABI do web3
+
+    Args:
+        log (dict): Log retornado por eth_getLogs
+
+    Returns:
+        dict: block_number, log_index, tx_hash, from, to, value (int)
+    """
+    data = log['data']
+    if isinstance(data, str):
+        value = int(data, 16) if data not in ('0x', '') else 0
+    else:
+        value = int.from_bytes(bytes(data), 'big')
+
+    return {
+        'block_number': log['blockNumber'],
+        'log_index': log['logIndex'],
+        'tx_hash': Web3.to_hex(log['transactionHash']),
+        'from': _topic_to_address(log['topics'][1]),
+        'to': _topic_to_address(log['topics'][2]),
+        'value': value
+    }
+
+
+class Ledger:
+    """
+    Saldos por endereço derivados dos eventos Transfer + checkpoint de bloco
+
+    As chaves de `balances` são endereços em minúsculas (sem checksum), o que
+    torna a aplicação de eventos e a leitura de snapshots baratas.
+    """
+
+    def __init__(self, contract_address=None):
+        self.contract_address = contract_address
+        self.balances = {}
+        self.last_activity = {}
+        self.last_block = -1
+        self.last_block_hash = None
+        self.event_count = 0
+        # Incrementado sempre que o estado é trocado por inteiro (reset/snapshot)
+        self.generation = 0
+        self.lock = threading.RLock()
+
+    def apply(self, events):
+        """
+        Aplica eventos decodificados (em ordem de bloco/log) aos saldos
+
+        Args:
+            events (list): Eventos retornados por decode_transfer_log
+        """
+        with self.lock:
+            balances = self.balances
+            activity = self.last_activity
+            for event in events:
+                value = event['value']
+                sender = event['from'].lower()
+                recipient = event['to'].lower()
+                activity[sender] = activity[recipient] = event['block_number']
+                # Mint (from = 0x0) não debita ninguém
+                if sender != ZERO_ADDRESS:
+                    remaining = balances.get(sender, 0) - value
+                    if remaining:
+                        balances[sender] = remaining
+                    else:
+                        balances.pop(sender, None)
+                if recipient != ZERO_ADDRESS:
+                    balances[recipient] = balances.get(recipient, 0) + value
+            self.event_count += len(events)
+
+    def set_checkpoint(self, block_number, block_hash=None):
+        """Marca o último bloco totalmente processado"""
+        with self.lock:
+            self.last_block = block_number
+            self.last_block_hash = block_hash
+
+    def balance_of(self, address):
+        """Saldo indexado de um endereço (unidades mínimas)"""
+        with self.lock:
+            return self.balances.get(address.lower(), 0)
+
+    def activity_block(self, address):
+        """Último bloco com um Transfer envolvendo o endereço (-1 se nenhum)"""
+        with self.lock:
+            return self.last_activity.get(address.lower(), -1)
+
+    def reset(self, contract_address=None):
+        """Descarta todo o estado (ex: após redeploy ou reinício da blockchain)"""
+        with self.lock:
+            self.contract_address = contract_address
+            self.balances = {}
+            self.last_activity = {}
+            self.last_block = -1
+            self.last_block_hash = None
+            self.event_count = 0
+            self.generation += 1
+
+    def load(self, other):
+        """Substitui todo o estado pelo de outro Ledger (ex: lido de um snapshot)"""
+        with self.lock:
+            self.contract_address = other.contract_address
+            self.balances = other.balances
+            self.last_activity = other.last_activity
+            self.event_count = other.event_count
+            self.last_block = other.last_block
+            self.last_block_hash = other.last_block_hash
+            self.generation += 1
+
+    def __len__(self):
+        return len(self.balances)
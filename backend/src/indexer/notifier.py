@@ -0,0 +1,172 @@
+"""
+Notificações de transferências por endereço (Server-Sent Events)
+
+Listener do TransferIndexer: a cada lote aplicado ao Ledger, envia para as
+assinaturas dos endereços envolvidos um evento `transfer` por Transfer e um
+evento `balance` com o novo saldo indexado. Um único seguidor de blocos (o
+indexador do processo) atende todas as conexões; uma assinatura é só uma fila
+e um threading.Event, então conexões ociosas não custam consultas ao nó.
+Com o worker gevent (gunicorn_sse.conf.py) a espera de uma conexão é uma
+greenlet, não uma thread do servidor, e um processo segura milhares delas
+(SSE_MAX_STREAMS).
+"""
+import threading
+from collections import deque
+from src.config import Config
+from src.utils.token_amount import TokenAmount
+
+
+class Subscription:
+    """
+    Fila de mensagens de uma conexão
+
+    Se o cliente não consumir a tempo, as mensagens mais antigas são descartadas
+    (o evento `balance` seguinte sempre traz o saldo atual).
+    """
+    __slots__ = ('address', 'dropped', '_messages', '_ready')
+
+    def __init__(self, address, queue_size):
+        self.address = address.lower()
+        self.dropped = 0
+        self._messages = deque(maxlen=queue_size)
+        self._ready = threading.Event()
+
+    def push(self, message):
+        if len(self._messages) == self._messages.maxlen:
+            self.dropped += 1
+        self._messages.append(message)
+        self._ready.set()
+
+    def get(self, timeout):
+        """
+        Espera mensagens por até `timeout` segundos
+
+        Returns:
+            list: Mensagens pendentes (vazia se o tempo acabou)
+        """
+        if not self._messages:
+            self._ready.wait(timeout)
+        self._ready.clear()
+        messages = []
+        while self._messages:
+            messages.append(self._messages.popleft())
+        return messages
+
+
+class TransferNotifier:
+    """
+    Distribui os eventos do indexador para as assinaturas de cada endereço
+    """
+
+    def __init__(self, indexer, max_subscribers=None, queue_size=None):
+        self.indexer = indexer
+        self.max_subscribers = max_subscribers or Config.SSE_MAX_STREAMS
+        self.queue_size = queue_size or Config.SSE_QUEUE_SIZE
+        self.subscribers = {}  # endereço (minúsculas) -> set de Subscription
+        self.count = 0
+        self.delivered = 0
+        self.lock = threading.Lock()
+
+    def subscribe(self, address):
+        """
+        Cria uma assinatura para o endereço
+
+        Returns:
+            Subscription ou None se o limite de conexões do processo foi atingido
+        """
+        subscription = Subscription(address, self.queue_size)
+        with self.lock:
+            if self.count >= self.max_subscribers:
+                return None
+            self.subscribers.setdefault(subscription.address, set()).add(subscription)
+            self.count += 1
+        return subscription
+
+    def is_full(self):
+        return self.count >= self.max_subscribers
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscriptions = self.subscribers.get(subscription.address)
+            if not subscriptions or subscription not in subscriptions:
+                return
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self.subscribers[subscription.address]
+            self.count -= 1
+
+    def on_events(self, events, from_block, to_block):
+        """Listener do TransferIndexer"""
+        if not self.count or not events:
+            return
+
+        with self.lock:
+            targets = {}
+            for event in events:
+                for address in (event['from'].lower(), event['to'].lower()):
+                    if address in self.subscribers:
+                        targets[address] = tuple(self.subscribers[address])
+        if not targets:
+            return
+
+        from src.models.user_directory import get_user_directory
+
+        matched = [event for event in events if event['from'].lower() in targets or event['to'].lower() in targets]
+        labels = get_user_directory().labels(
+            [event['from'] for event in matched] + [event['to'] for event in matched]
+        )
+
+        delivered = 0
+        for event in matched:
+            message = {
+                'from': event['from'],
+                'to': event['to'],
+                'from_username': labels.get(event['from'].lower()),
+                'to_username': labels.get(event['to'].lower()),
+                **TokenAmount(event['value']).fields('amount'),
+                'tx_hash': event['tx_hash'][2:],
+                'block_number': event['block_number']
+            }
+            sender = event['from'].lower()
+            for address in {sender, event['to'].lower()}:
+                subscriptions = targets.get(address)
+                if not subscriptions:
+                    continue
+                # Transferência para si mesmo chega uma vez, como enviada
+                body = dict(message, type='sent' if address == sender else 'received')
+                for subscription in subscriptions:
+                    subscription.push(('transfer', to_block, body))
+                    delivered += 1
+
+        for address, subscriptions in targets.items():
+            units = self.indexer.ledger.balance_of(address)
+            body = {**TokenAmount(units).fields('balance'), 'block_number': to_block}
+            for subscription in subscriptions:
+                subscription.push(('balance', to_block, body))
+                delivered += 1
+
+        with self.lock:
+            self.delivered += delivered
+
+    def stats(self):
+        with self.lock:
+            return {
+                'subscribers': self.count,
+                'addresses': len(self.subscribers),
+                'max_subscribers': self.max_subscribers,
+                'delivered': self.delivered
+            }
+
+
+_notifier = None
+_notifier_lock = threading.Lock()
+
+
+def get_notifier(indexer=None):
+    """Retorna o distribuidor de notificações do processo"""
+    global _notifier
+    with _notifier_lock:
+        if _notifier is None:
+            from src.indexer.indexer import get_indexer
+            _notifier = TransferNotifier(indexer or get_indexer())
+        return _notifier
@@ -0,0 +1,177 @@
+"""
+Snapshots binários do Ledger para reinício rápido
+
+Formato v2 (big-endian):
+    cabeçalho  : magic 'ESTSNAP2' (8) | contrato (20) | bloco (8) | hash do bloco (32)
+                 | eventos aplicados (8) | número de linhas (8)
+    linhas     : endereço (20) | saldo uint256 (32) | último bloco com atividade (8)
+                 -> 60 bytes fixos por endereço (uma linha por endereço com
+                 atividade, inclusive os de saldo zero)
+    rodapé     : CRC32 de tudo acima (4)
+
+Snapshots v1 ('ESTSNAP1', linhas de 52 bytes sem o último bloco) são recusados
+como formato desconhecido: o indexador reprocessa os eventos desde o bloco 0.
+
+O arquivo é escrito em um temporário e renomeado, então um snapshot parcial
+nunca é lido. O nome carrega a altura do bloco: ledger-000000001234.snap
+"""
+import os
+import re
+import struct
+import zlib
+from web3 import Web3
+from src.indexer.ledger import Ledger
+
+MAGIC = b'ESTSNAP2'
+HEADER = struct.Struct('>8s20sQ32sQQ')
+ROW = struct.Struct('>20s32sQ')
+FOOTER = struct.Struct('>I')
+SNAPSHOT_PATTERN = re.compile(r'^ledger-(\d{12})\.snap$')
+
+
+def _address_bytes(address):
+    return bytes.fromhex(address[2:]) if address else b'\x00' * 20
+
+
+def _hash_bytes(block_hash):
+    if not block_hash:
+        return b'\x00' * 32
+    if isinstance(block_hash, str):
+        return bytes.fromhex(block_hash[2:] if block_hash.startswith('0x') else block_hash)
+    return bytes(block_hash)
+
+
+def snapshot_path(directory, block_number):
+    """Caminho do snapshot para uma altura de bloco"""
+    return os.path.join(directory, f'ledger-{block_number:012d}.snap')
+
+
+def write_snapshot(ledger, directory, keep=3):
+    """
+    Grava o estado atual do Ledger em disco
+
+    Args:
+        ledger (Ledger): Estado a ser salvo
+        directory (str): Diretório dos snapshots
+        keep (int): Quantos snapshots mais recentes manter
+
+    Returns:
+        str: Caminho do arquivo gravado
+    """
+    os.makedirs(directory, exist_ok=True)
+
+    with ledger.lock:
+        block_number = ledger.last_block
+        balances = ledger.balances
+        rows = [
+            (address, balances.get(address, 0), last_block)
+            for address, last_block in ledger.last_activity.items()
+        ]
+        header = HEADER.pack(
+            MAGIC,
+            _address_bytes(ledger.contract_address),
+            block_number,
+            _hash_bytes(ledger.last_block_hash),
+            ledger.event_count,
+            len(rows)
+        )
+
+    body = bytearray(header)
+    for address, balance, last_block in rows:
+        body += ROW.pack(bytes.fromhex(address[2:]), balance.to_bytes(32, 'big'), last_block)
+    body += FOOTER.pack(zlib.crc32(body))
+
+    path = snapshot_path(directory, block_number)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(body)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+    for old in list_snapshots(directory)[keep:]:
+        try:
+            os.remove(old[1])
+        except OSError:
+            pass
+
+    return path
+
+
+def read_snapshot(path):
+    """
+    Lê um snapshot do disco
+
+    Args:
+        path (str): Caminho do arquivo
+
+    Returns:
+        Ledger: Estado restaurado
+
+    Raises:
+        ValueError: Se o arquivo estiver corrompido ou em formato desconhecido
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    if len(data) < HEADER.size + FOOTER.size:
+        raise ValueError(f"Snapshot truncado: {path}")
+
+    (crc,) = FOOTER.unpack_from(data, len(data) - FOOTER.size)
+    if zlib.crc32(data[:-FOOTER.size]) != crc:
+        raise ValueError(f"Snapshot corrompido (CRC inválido): {path}")
+
+    magic, contract, block_number, block_hash, event_count, row_count = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError(f"Formato de snapshot desconhecido: {path}")
+    if HEADER.size + row_count * ROW.size + FOOTER.size != len(data):
+        raise ValueError(f"Tamanho do snapshot inconsistente: {path}")
+
+    ledger = Ledger(Web3.to_checksum_address(contract))
+    balances = ledger.balances
+    activity = ledger.last_activity
+    for address, balance, last_block in ROW.iter_unpack(data[HEADER.size:len(data) - FOOTER.size]):
+        key = '0x' + address.hex()
+        activity[key] = last_block
+        if balance != b'\x00' * 32:
+            balances[key] = int.from_bytes(balance, 'big')
+
+    ledger.set_checkpoint(block_number, Web3.to_hex(block_hash))
+    ledger.event_count = event_count
+    return ledger
+
+
+def list_snapshots(directory):
+    """
+    Lista os snapshots de um diretório, do mais recente para o mais antigo
+
+    Returns:
+        list: Tuplas (bloco, caminho)
+    """
+    if not os.path.isdir(directory):
+        return []
+    found = []
+    for name in os.listdir(directory):
+        match = SNAPSHOT_PATTERN.match(name)
+        if match:
+            found.append((int(match.group(1)), os.path.join(directory, name)))
+    return sorted(found, reverse=True)
+
+
+def load_latest_snapshot(directory, contract_address=None):
+    """
+    Carrega o snapshot válido mais recente (do mesmo contrato, se informado)
+
+    Returns:
+        Ledger: Estado restaurado ou None
+    """
+    for _, path in list_snapshots(directory):
+        try:
+            ledger = read_snapshot(path)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignorando snapshot inválido: {e}")
+            continue
+        if contract_address and ledger.contract_address.lower() != contract_address.lower():
+            continue
+        return ledger
+    return None
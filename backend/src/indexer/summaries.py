@@ -0,0 +1,243 @@
+"""
+Resumos por endereço (enviado, recebido, contagens, última atividade)
+
+Mantidos pelo EventStore na mesma transação que grava transfer_events, então
+a tabela account_summaries é sempre o agregado exato da tabela de eventos:
+
+- lote novo (depois do checkpoint): soma só os eventos do lote;
+- lote que regrava blocos já somados (snapshot antigo, blockchain reiniciada,
+  outro worker gravou o mesmo intervalo): os endereços afetados são
+  recalculados a partir de transfer_events.
+
+A primeira instrução é uma escrita na linha de checkpoint, o que reserva o
+banco para a transação: dois workers não somam o mesmo lote duas vezes.
+"""
+from sqlalchemy import select, delete, insert, func, or_
+from src.models.account_summary import AccountSummary, AccountSummaryState
+from src.models.transfer_event import TransferEvent
+from src.utils.token_amount import UNITS
+ZERO_ADDRESS = '0x0000000000000000000000000000000000000000'
+IN_CHUNK = 400  # endereços por cláusula IN (limite de variáveis do SQLite)
+
+# Posições em cada entrada de totais
+SENT, RECEIVED, SENT_COUNT, RECEIVED_COUNT, FIRST_BLOCK, LAST_BLOCK, LAST_TIMESTAMP = range(7)
+
+
+def _chunks(values):
+    values = list(values)
+    for start in range(0, len(values), IN_CHUNK):
+        yield values[start:start + IN_CHUNK]
+
+
+def _touch(totals, address, block_number, timestamp):
+    entry = totals.get(address)
+    if entry is None:
+        entry = totals[address] = [0, 0, 0, 0, block_number, block_number, timestamp]
+    entry[FIRST_BLOCK] = min(entry[FIRST_BLOCK], block_number)
+    if block_number >= entry[LAST_BLOCK]:
+        entry[LAST_BLOCK] = block_number
+        entry[LAST_TIMESTAMP] = timestamp
+    return entry
+
+
+def _accumulate(totals, from_address, to_address, value, block_number, timestamp, only=None):
+    """Soma um evento aos totais (endereços em minúsculas; `only` restringe os endereços)"""
+    sender = from_address.lower()
+    recipient = to_address.lower()
+    if sender != ZERO_ADDRESS and (only is None or sender in only):
+        entry = _touch(totals, sender, block_number, timestamp)
+        entry[SENT] += value
+        entry[SENT_COUNT] += 1
+    if recipient != ZERO_ADDRESS and (only is None or recipient in only):
+        entry = _touch(totals, recipient, block_number, timestamp)
+        entry[RECEIVED] += value
+        entry[RECEIVED_COUNT] += 1
+
+
+def _row(address, entry):
+    sent_hi, sent_lo = divmod(entry[SENT], UNITS)
+    received_hi, received_lo = divmod(entry[RECEIVED], UNITS)
+    return {
+        'address': address,
+        'sent_hi': sent_hi,
+        'sent_lo': sent_lo,
+        'received_hi': received_hi,
+        'received_lo': received_lo,
+        'sent_count': entry[SENT_COUNT],
+        'received_count': entry[RECEIVED_COUNT],
+        'first_block': entry[FIRST_BLOCK],
+        'last_block': entry[LAST_BLOCK],
+        'last_timestamp': entry[LAST_TIMESTAMP],
+    }
+
+
+def _write(conn, totals):
+    if totals:
+        conn.execute(
+            insert(AccountSummary).prefix_with('OR REPLACE'),
+            [_row(address, entry) for address, entry in totals.items()]
+        )
+
+
+def lock(conn):
+    """
+    Reserva o banco para a transação e retorna o checkpoint dos resumos
+
+    Na primeira vez (tabela nova em um banco que já tinha eventos) os resumos
+    são calculados a partir de todos os eventos gravados.
+
+    Returns:
+        int: Último bloco coberto pelos resumos (-1 se vazio)
+    """
+    result = conn.execute(insert(AccountSummaryState).prefix_with('OR IGNORE').values(id=1, last_block=-1))
+    if result.rowcount == 1:
+        _rebuild_all(conn)
+        save_checkpoint(conn, -1)
+    return conn.execute(select(AccountSummaryState.last_block).where(AccountSummaryState.id == 1)).scalar()
+
+
+def save_checkpoint(conn, to_block):
+    """Checkpoint = maior bloco já gravado em transfer_events (ou `to_block`)"""
+    stored = conn.execute(select(func.max(TransferEvent.block_number))).scalar()
+    last_block = max(to_block, stored if stored is not None else -1)
+    conn.execute(
+        AccountSummaryState.__table__.update().where(AccountSummaryState.id == 1).values(last_block=last_block)
+    )
+    return last_block
+
+
+def apply_rows(conn, rows):
+    """
+    Soma linhas novas de transfer_events aos resumos existentes
+
+    Args:
+        rows (list): Linhas no formato gravado pelo EventStore
+    """
+    batch = {}
+    for row in rows:
+        _accumulate(batch, row['from_address'], row['to_address'],
+                    row['value_hi'] * UNITS + row['value_lo'], row['block_number'], row['timestamp'])
+    if not batch:
+        return
+
+    for chunk in _chunks(batch):
+        for summary in conn.execute(select(AccountSummary).where(AccountSummary.address.in_(chunk))):
+            entry = batch[summary.address]
+            entry[SENT] += summary.sent_hi * UNITS + summary.sent_lo
+            entry[RECEIVED] += summary.received_hi * UNITS + summary.received_lo
+            entry[SENT_COUNT] += summary.sent_count
+            entry[RECEIVED_COUNT] += summary.received_count
+            entry[FIRST_BLOCK] = min(entry[FIRST_BLOCK], summary.first_block)
+            if summary.last_block > entry[LAST_BLOCK]:
+                entry[LAST_BLOCK] = summary.last_block
+                entry[LAST_TIMESTAMP] = summary.last_timestamp
+    _write(conn, batch)
+
+
+def touched_addresses(conn, from_block):
+    """Endereços (como gravados, com checksum) com eventos a partir de `from_block`"""
+    addresses = set()
+    query = select(TransferEvent.from_address, TransferEvent.to_address).where(
+        TransferEvent.block_number >= from_block
+    )
+    for from_address, to_address in conn.execute(query):
+        addresses.add(from_address)
+        addresses.add(to_address)
+    return addresses
+
+
+def recompute(conn, addresses):
+    """
+    Recalcula do zero os resumos de `addresses` a partir de transfer_events
+
+    Args:
+        addresses (iterable): Endereços como gravados em transfer_events (checksum)
+    """
+    addresses = {address for address in addresses if address.lower() != ZERO_ADDRESS}
+    if not addresses:
+        return
+    only = {address.lower() for address in addresses}
+    totals = {}
+    seen = set()
+    columns = (TransferEvent.id, TransferEvent.from_address, TransferEvent.to_address,
+               TransferEvent.value_hi, TransferEvent.value_lo, TransferEvent.block_number,
+               TransferEvent.timestamp)
+
+    for chunk in _chunks(addresses):
+        query = select(*columns).where(or_(
+            TransferEvent.from_address.in_(chunk),
+            TransferEvent.to_address.in_(chunk)
+        ))
+        for event_id, from_address, to_address, value_hi, value_lo, block_number, timestamp in conn.execute(query):
+            # Um evento entre dois endereços de pedaços diferentes aparece duas vezes
+            if event_id in seen:
+                continue
+            seen.add(event_id)
+            _accumulate(totals, from_address, to_address, value_hi * UNITS + value_lo,
+                        block_number, timestamp, only=only)
+
+    for chunk in _chunks(only):
+        conn.execute(delete(AccountSummary).where(AccountSummary.address.in_(chunk)))
+    _write(conn, totals)
+
+
+def _rebuild_all(conn):
+    conn.execute(delete(AccountSummary))
+    totals = {}
+    query = select(TransferEvent.from_address, TransferEvent.to_address, TransferEvent.value_hi,
+                   TransferEvent.value_lo, TransferEvent.block_number, TransferEvent.timestamp)
+    for from_address, to_address, value_hi, value_lo, block_number, timestamp in conn.execute(query):
+        _accumulate(totals, from_address, to_address, value_hi * UNITS + value_lo, block_number, timestamp)
+    _write(conn, totals)
+    return len(totals)
+
+
+def rebuild(conn, from_block=0):
+    """
+    Recalcula os resumos a partir de um checkpoint
+
+    Args:
+        from_block (int): Recalcula os endereços com eventos a partir deste bloco
+                          (0 refaz a tabela inteira)
+
+    Returns:
+        int: Quantidade de endereços recalculados
+    """
+    lock(conn)
+    if from_block > 0:
+        addresses = touched_addresses(conn, from_block)
+        recompute(conn, addresses)
+        count = len(addresses)
+    else:
+        count = _rebuild_all(conn)
+    save_checkpoint(conn, -1)
+    return count
+
+
+def clear(conn):
+    """Apaga todos os resumos (contrato novo)"""
+    lock(conn)
+    conn.execute(delete(AccountSummary))
+    conn.execute(
+        AccountSummaryState.__table__.update().where(AccountSummaryState.id == 1).values(last_block=-1)
+    )
+
+
+def get_checkpoint(conn):
+    """Último bloco coberto pelos resumos (-1 se ainda não há resumos)"""
+    last_block = conn.execute(
+        select(AccountSummaryState.last_block).where(AccountSummaryState.id == 1)
+    ).scalar()
+    return -1 if last_block is None else last_block
+
+
+def get_summary(conn, address):
+    """
+    Resumo de um endereço (leitura pela chave primária)
+
+    Returns:
+        AccountSummary row ou None se o endereço nunca apareceu em um Transfer
+    """
+    return conn.execute(
+        select(AccountSummary).where(AccountSummary.address == address.lower())
+    ).first()
@@ -0,0 +1,49 @@
+"""
+Modelo dos resumos por endereço (totais enviados/recebidos)
+"""
+from sqlalchemy import Column, Integer, String, BigInteger
+from src.models.user import Base
+from src.utils.token_amount import TokenAmount
+
+class AccountSummary(Base):
+    """
+    Totais acumulados de um endereço, mantidos a partir dos eventos Transfer
+
+    Valores exatos em duas colunas inteiras, como em transfer_events:
+    tokens inteiros (hi) e o resto em unidades mínimas (lo < 10^18).
+    """
+    __tablename__ = 'account_summaries'
+
+    address = Column(String(42), primary_key=True)  # minúsculas
+    sent_hi = Column(BigInteger, nullable=False, default=0)
+    sent_lo = Column(BigInteger, nullable=False, default=0)
+    received_hi = Column(BigInteger, nullable=False, default=0)
+    received_lo = Column(BigInteger, nullable=False, default=0)
+    sent_count = Column(Integer, nullable=False, default=0)
+    received_count = Column(Integer, nullable=False, default=0)
+    first_block = Column(Integer, nullable=False)
+    last_block = Column(Integer, nullable=False)
+    last_timestamp = Column(Integer, nullable=False)
+
+    @property
+    def sent(self):
+        """Total enviado (TokenAmount)"""
+        return TokenAmount.from_limbs(self.sent_hi, self.sent_lo)
+
+    @property
+    def received(self):
+        """Total recebido (TokenAmount)"""
+        return TokenAmount.from_limbs(self.received_hi, self.received_lo)
+
+    def __repr__(self):
+        return f"<AccountSummary(address='{self.address}', sent={self.sent}, received={self.received})>"
+
+
+class AccountSummaryState(Base):
+    """
+    Checkpoint dos resumos: último bloco já somado (linha única, id = 1)
+    """
+    __tablename__ = 'account_summary_state'
+
+    id = Column(Integer, primary_key=True)
+    last_block = Column(Integer, nullable=False, default=-1)
@@ -0,0 +1,124 @@
+"""
+Cache versionado da tabela system_config
+
+Cada SystemConfig.set_value incrementa, na mesma transação, a linha
+CONFIG_VERSION. As leituras (ex: endereço do contrato, consultado a cada
+chamada ao token) saem de um dicionário em memória; no máximo a cada
+CONFIG_POLL_INTERVAL segundos o worker lê só a versão e, se ela mudou, relê a
+tabela (poucas linhas) e avisa os interessados nas chaves que mudaram. Um
+redeploy (deploy_contract.py) passa a valer em todos os workers sem reiniciar.
+"""
+import os
+import threading
+import time
+from sqlalchemy import text
+from src.config import Config
+from src.models.user import engine
+
+VERSION_KEY = 'CONFIG_VERSION'
+
+
+class ConfigCache:
+    """
+    Valores de system_config em memória, recarregados quando a versão muda
+
+    Args:
+        poll_interval (float): Segundos entre as verificações da versão
+    """
+
+    def __init__(self, poll_interval=None):
+        self.poll_interval = Config.CONFIG_POLL_INTERVAL if poll_interval is None else poll_interval
+        self.values = None  # chave -> valor (substituído inteiro a cada recarga)
+        self.version = None
+        self.next_check = 0.0
+        self.counters = {'checks': 0, 'reloads': 0, 'changed_keys': 0}
+        self.listeners = {}  # chave -> [callback(antigo, novo)]
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Valor da chave (lido da memória entre as verificações de versão)"""
+        if self.values is None or time.monotonic() >= self.next_check:
+            self._check()
+        values = self.values
+        if values is None:
+            return default
+        value = values.get(key)
+        return default if value is None else value
+
+    def subscribe(self, key, callback):
+        """Registra callback(valor_antigo, valor_novo) chamado quando a chave muda"""
+        with self.lock:
+            self.listeners.setdefault(key, []).append(callback)
+
+    def invalidate(self):
+        """Força a verificação da versão na próxima leitura (escrita neste processo)"""
+        self.next_check = 0.0
+
+    def _check(self):
+        with self.lock:
+            if self.values is not None and time.monotonic() < self.next_check:
+                return
+            try:
+                with engine.connect() as conn:
+                    version = conn.execute(
+                        text('SELECT value FROM system_config WHERE key = :key'), {'key': VERSION_KEY}
+                    ).scalar()
+                    self.counters['checks'] += 1
+                    if self.values is not None and version == self.version:
+                        self.next_check = time.monotonic() + self.poll_interval
+                        return
+                    rows = conn.execute(text('SELECT key, value FROM system_config')).all()
+            except Exception as e:
+                # Banco ainda sem tabelas ou ocupado: mantém os valores conhecidos
+                if self.values is not None:
+                    print(f"⚠️ Erro ao verificar a versão da configuração: {e}")
+                    self.next_check = time.monotonic() + self.poll_interval
+                return
+            previous = self.values
+            self.values = {key: value for key, value in rows if key != VERSION_KEY}
+            self.version = version
+            self.next_check = time.monotonic() + self.poll_interval
+            self.counters['reloads'] += 1
+            changed = [] if previous is None else [
+                key for key in set(previous) | set(self.values) if previous.get(key) != self.values.get(key)
+            ]
+            self.counters['changed_keys'] += len(changed)
+            notify = [(callback, previous.get(key), self.values.get(key))
+                      for key in changed for callback in self.listeners.get(key, ())]
+        for callback, old, new in notify:
+            try:
+                callback(old, new)
+            except Exception as e:
+                print(f"⚠️ Erro ao aplicar mudança de configuração: {e}")
+
+    def stats(self):
+        with self.lock:
+            return {
+                'version': int(self.version) if self.version is not None else 0,
+                'keys': len(self.values or ()),
+                'poll_interval': self.poll_interval,
+                **self.counters
+            }
+
+
+_config_cache = None
+_config_cache_lock = threading.Lock()
+
+
+def get_config_cache():
+    """Retorna o cache de configuração do processo"""
+    global _config_cache
+    with _config_cache_lock:
+        if _config_cache is None:
+            _config_cache = ConfigCache()
+        return _config_cache
+
+
+def _reset_after_fork():
+    global _config_cache, _config_cache_lock
+    _config_cache = None
+    _config_cache_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
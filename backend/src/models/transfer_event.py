@@ -0,0 +1,41 @@
+"""
+Modelo dos eventos Transfer indexados
+"""
+from sqlalchemy import Column, Integer, String, BigInteger, Index, UniqueConstraint
+from src.models.user import Base
+from src.utils.token_amount import TokenAmount
+
+class TransferEvent(Base):
+    """
+    Evento Transfer do contrato Token, gravado pelo indexador
+
+    O valor é guardado em duas colunas inteiras exatas (tokens inteiros e o
+    resto em unidades mínimas), pois 10^18 unidades por token não cabem
+    em um INTEGER de 64 bits para saldos grandes.
+    """
+    __tablename__ = 'transfer_events'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    block_number = Column(Integer, nullable=False)
+    log_index = Column(Integer, nullable=False)
+    tx_hash = Column(String(66), nullable=False)
+    from_address = Column(String(42), nullable=False)
+    to_address = Column(String(42), nullable=False)
+    value_hi = Column(BigInteger, nullable=False)  # value // 10**18
+    value_lo = Column(BigInteger, nullable=False)  # value % 10**18
+    timestamp = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('block_number', 'log_index', name='uq_transfer_events_position'),
+        Index('ix_transfer_events_timestamp', 'timestamp'),
+        Index('ix_transfer_events_from', 'from_address'),
+        Index('ix_transfer_events_to', 'to_address'),
+    )
+
+    @property
+    def value(self):
+        """Valor exato (TokenAmount)"""
+        return TokenAmount.from_limbs(self.value_hi, self.value_lo)
+
+    def __repr__(self):
+        return f"<TransferEvent(block={self.block_number}, log={self.log_index}, value={self.value})>"
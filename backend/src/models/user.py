@@ -1,21 +1,33 @@
 """
 Modelo de dados do usuário
 """
-from sqlalchemy import Column, Integer, String, Float, create_engine
+from sqlalchemy import Column, Integer, String, Float, create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
+import threading
+from src.utils.tracing import instrument_engine
 
 Base = declarative_base()
 
-# Caminho para o banco de dados
-DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'users.db')
+# Caminho para o banco de dados (ESTCOIN_DB_PATH permite usar um banco alternativo)
+DB_PATH = os.getenv(
+    'ESTCOIN_DB_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'users.db')
+)
 DATABASE_URL = f'sqlite:///{DB_PATH}'
 
-# Cria engine e sessão
+# Cria engine e sessão (a conexão só é aberta no primeiro uso)
 engine = create_engine(DATABASE_URL, echo=False)
 SessionLocal = sessionmaker(bind=engine)
 
+# Um span por comando SQL dentro de um request amostrado
+instrument_engine(engine)
+
+# Workers criados por fork (Gunicorn com preload) não reutilizam as conexões do pai
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=lambda: engine.dispose(close=False))
+
 class User(Base):
     """
     Modelo de usuário com autenticação e carteira Ethereum
@@ -26,7 +38,7 @@ class User(Base):
     username = Column(String(50), unique=True, nullable=False)
     password_hash = Column(String(255), nullable=False)
     ethereum_address = Column(String(42), unique=True, nullable=False)
-    private_key = Column(String(66), nullable=False)  # Armazenado criptografado em produção
+    private_key = Column(String(1024), nullable=False)  # Keystore V3 cifrado (ver src/blockchain/key_vault.py)
     balance = Column(Float, default=10.0)
 
     def __repr__(self):
@@ -66,7 +78,12 @@ class SystemConfig(Base):
 
     @staticmethod
     def set_value(key, value):
-        """Define um valor de configuração"""
+        """
+        Define um valor de configuração
+
+        Incrementa a versão da configuração na mesma transação: os workers em
+        execução recarregam os valores (ver src/models/config_cache.py).
+        """
         db = SessionLocal()
         try:
             config = db.query(SystemConfig).filter_by(key=key).first()
@@ -75,7 +92,13 @@ class SystemConfig(Base):
             else:
                 config = SystemConfig(key=key, value=value)
                 db.add(config)
+            db.execute(text(
+                "INSERT INTO system_config (key, value) VALUES ('CONFIG_VERSION', '1') "
+                "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+            ))
             db.commit()
+            from src.models.config_cache import get_config_cache
+            get_config_cache().invalidate()
             return True
         except Exception as e:
             db.rollback()
@@ -86,8 +109,24 @@ class SystemConfig(Base):
 
 def init_db():
     """Inicializa o banco de dados criando as tabelas"""
+    global _db_ready
+    # Registra os demais modelos no metadata antes de criar as tabelas
+    import src.models.transfer_event  # noqa: F401
+    import src.models.account_summary  # noqa: F401
     Base.metadata.create_all(bind=engine)
     print(f"✅ Banco de dados criado em: {DB_PATH}")
+    _db_ready = True
+
+_db_ready = False
+_db_lock = threading.Lock()
+
+def ensure_db():
+    """Cria as tabelas na primeira chamada do processo; as seguintes não fazem nada"""
+    if _db_ready:
+        return
+    with _db_lock:
+        if not _db_ready:
+            init_db()
 
 def get_db():
     """Retorna uma sessão do banco de dados"""
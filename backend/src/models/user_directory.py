@@ -0,0 +1,130 @@
+"""
+Índice em memória dos usuários: endereço -> usuário e username -> endereço
+
+Transferências entre usuários do app são o caso comum, então a validação do
+destinatário, o "enviar para username" e os rótulos do histórico consultam
+este índice em vez de buscar uma linha por vez no SQLite.
+
+O índice é carregado na primeira consulta e atualizado no cadastro. Usuários
+criados por outro worker aparecem na primeira busca que não os encontrar: a
+falha relê apenas as linhas com id maior que o último carregado.
+"""
+import threading
+from sqlalchemy import select
+from src.models.user import User, SessionLocal
+
+
+class UserDirectory:
+    """
+    Endereços e usernames conhecidos, derivados da tabela users
+    """
+
+    def __init__(self):
+        self._by_address = {}   # endereço em minúsculas -> (id, username, endereço)
+        self._by_username = {}  # username -> endereço
+        self._last_id = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _add(self, user_id, username, address):
+        self._by_address[address.lower()] = (user_id, username, address)
+        self._by_username[username] = address
+        self._last_id = max(self._last_id, user_id)
+
+    def refresh(self):
+        """
+        Carrega os usuários ainda não indexados (todos, na primeira chamada)
+
+        Returns:
+            int: Quantidade de usuários novos
+        """
+        with self._lock:
+            db = SessionLocal()
+            try:
+                rows = db.execute(
+                    select(User.id, User.username, User.ethereum_address)
+                    .where(User.id > self._last_id)
+                    .order_by(User.id)
+                ).all()
+            finally:
+                db.close()
+            for user_id, username, address in rows:
+                self._add(user_id, username, address)
+            self._loaded = True
+            return len(rows)
+
+    def add(self, user_id, username, address):
+        """Registra um usuário recém-criado (chamado após o commit do cadastro)"""
+        with self._lock:
+            self._add(user_id, username, address)
+
+    def clear(self):
+        """Esquece tudo; a próxima consulta recarrega a tabela"""
+        with self._lock:
+            self._by_address = {}
+            self._by_username = {}
+            self._last_id = 0
+            self._loaded = False
+
+    def _lookup(self, table, key):
+        if not self._loaded:
+            self.refresh()
+        value = table.get(key)
+        if value is None and self.refresh():
+            value = table.get(key)
+        return value
+
+    def get_by_address(self, address):
+        """
+        Returns:
+            dict: {'id', 'username', 'ethereum_address'} ou None se não for usuário do app
+        """
+        if not address:
+            return None
+        entry = self._lookup(self._by_address, address.lower())
+        if entry is None:
+            return None
+        return {'id': entry[0], 'username': entry[1], 'ethereum_address': entry[2]}
+
+    def is_user_address(self, address):
+        return self.get_by_address(address) is not None
+
+    def resolve_username(self, username):
+        """
+        Returns:
+            str: Endereço Ethereum do usuário ou None se o username não existir
+        """
+        if not username:
+            return None
+        return self._lookup(self._by_username, username)
+
+    def labels(self, addresses):
+        """
+        Usernames de vários endereços de uma vez (no máximo uma releitura da tabela)
+
+        Returns:
+            dict: endereço em minúsculas -> username (endereços externos ficam de fora)
+        """
+        if not self._loaded:
+            self.refresh()
+        keys = {address.lower() for address in addresses if address}
+        if any(key not in self._by_address for key in keys):
+            self.refresh()
+        by_address = self._by_address
+        return {key: by_address[key][1] for key in keys if key in by_address}
+
+    def stats(self):
+        return {'users': len(self._by_address), 'last_id': self._last_id, 'loaded': self._loaded}
+
+
+_user_directory = None
+_user_directory_lock = threading.Lock()
+
+
+def get_user_directory():
+    """Retorna o índice de usuários do processo"""
+    global _user_directory
+    with _user_directory_lock:
+        if _user_directory is None:
+            _user_directory = UserDirectory()
+        return _user_directory
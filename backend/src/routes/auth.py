@@ -1,10 +1,14 @@
 from flask import Blueprint, request, jsonify
-from src.controllers.user_controller import UserController
+from src.config import Config
+from src.utils.rate_limit import rate_limit
+from src.utils.lazy import lazy_instance
 
 auth_bp = Blueprint('auth', __name__)
-user_controller = UserController()
+# Criado no primeiro request: importar a rota não carrega web3 nem o contrato
+user_controller = lazy_instance('src.controllers.user_controller', 'UserController')
 
 @auth_bp.route('/register', methods=['POST'])
+@rate_limit(cost=Config.RATE_LIMIT_COSTS['register'], per='ip')
 def register():
     data = request.json
     username = data.get('username')
@@ -27,6 +31,7 @@ def register():
         return jsonify({'error': str(e)}), 400
 
 @auth_bp.route('/login', methods=['POST'])
+@rate_limit(cost=Config.RATE_LIMIT_COSTS['login'], per='ip')
 def login():
     data = request.json
     username = data.get('username')
@@ -0,0 +1,173 @@
+from flask import Blueprint, request, jsonify
+from src.config import Config
+from src.analytics.volume import INTERVALS
+from src.utils.auth_utils import token_required
+from src.utils.rate_limit import rate_limit
+from src.utils.lazy import lazy_instance
+
+stats_bp = Blueprint('stats', __name__)
+# Criado no primeiro request: importar a rota não carrega web3 nem o contrato
+stats_controller = lazy_instance('src.controllers.stats_controller', 'StatsController')
+
+MAX_TOP = 1000
+
+
+@stats_bp.route('/holders', methods=['GET'])
+@token_required
+@rate_limit(cost=Config.RATE_LIMIT_COSTS['stats'])
+def get_holders(current_user):
+    """
+    Rota para consultar os maiores holders e a concentração do supply
+    Requer autenticação via token JWT
+
+    Query params opcionais:
+        - top (int): Quantidade de maiores holders (padrão: 10, máximo: 1000)
+        - percentiles (str): Percentis separados por vírgula (padrão: 50,90,99)
+
+    Returns:
+        JSON com top holders, percentis de saldo, Gini e participação do top 10
+    """
+    top = request.args.get('top', 10, type=int)
+    if top is None or top < 1 or top > MAX_TOP:
+        return jsonify({'error': f'top deve estar entre 1 e {MAX_TOP}'}), 400
+
+    raw_percentiles = request.args.get('percentiles')
+    if raw_percentiles:
+        try:
+            percentiles = [float(p) for p in raw_percentiles.split(',') if p.strip()]
+        except ValueError:
+            return jsonify({'error': 'Percentis inválidos'}), 400
+        if any(p <= 0 or p > 100 for p in percentiles):
+            return jsonify({'error': 'Percentis devem estar entre 0 e 100'}), 400
+    else:
+        percentiles = None
+
+    try:
+        return jsonify(stats_controller.get_holders(top, percentiles)), 200
+    except Exception as e:
+        return jsonify({'error': f'Erro ao consultar holders: {str(e)}'}), 500
+
+
+@stats_bp.route('/volume', methods=['GET'])
+@token_required
+@rate_limit(cost=Config.RATE_LIMIT_COSTS['volume'])
+def get_volume(current_user):
+    """
+    Rota para consultar o volume de transferências por hora ou dia
+    Requer autenticação via token JWT
+
+    Query params opcionais:
+        - interval (str): 'hour' ou 'day' (padrão: hour)
+        - from (int): Timestamp Unix inicial (inclusive)
+        - to (int): Timestamp Unix final (exclusivo)
+        - mints (bool): Inclui emissões do contrato (padrão: false)
+
+    Returns:
+        JSON com quantidade, volume, média e remetentes/destinatários únicos por intervalo
+    """
+    interval = request.args.get('interval', 'hour')
+    if interval not in INTERVALS:
+        return jsonify({'error': f'interval deve ser um de: {", ".join(INTERVALS)}'}), 400
+
+    start = request.args.get('from', type=int)
+    end = request.args.get('to', type=int)
+    if ('from' in request.args and start is None) or ('to' in request.args and end is None):
+        return jsonify({'error': 'from e to devem ser timestamps Unix'}), 400
+    if start is not None and end is not None and start >= end:
+        return jsonify({'error': 'from deve ser menor que to'}), 400
+    include_mints = request.args.get('mints', 'false').lower() in ('1', 'true', 'yes')
+
+    try:
+        return jsonify(stats_controller.get_volume(interval, start, end, include_mints)), 200
+    except Exception as e:
+        return jsonify({'error': f'Erro ao consultar volume: {str(e)}'}), 500
+
+
+@stats_bp.route('/outbound', methods=['GET'])
+@token_required
+@rate_limit(cost=Config.RATE_LIMIT_COSTS['stats'])
+def get_outbound(current_user):
+    """
+    Rota para consultar as filas de saída de transações do worker
+    Requer autenticação via token JWT
+
+    Returns:
+        JSON com transações na fila por prioridade, em voo, reenvios por taxa
+        e latências p50/p95 da fila
+    """
+    try:
+        return jsonify(stats_controller.get_outbound()), 200
+    except Exception as e:
+        return jsonify({'error': f'Erro ao consultar filas de saída: {str(e)}'}), 500
+
+
+@stats_bp.route('/rpc', methods=['GET'])
+@token_required
+@rate_limit(cost=Config.RATE_LIMIT_COSTS['stats'])
+def get_rpc(current_user):
+    """
+    Rota para consultar a saúde da conexão com o nó
+    Requer autenticação via token JWT
+
+    Returns:
+        JSON com o estado do circuit breaker (closed, open, half_open), os
+        endpoints do pool RPC e o uso do cache de valores stale
+    """
+    try:
+        return jsonify(stats_controller.get_rpc()), 200
+    except Exception as e:
+        return jsonify({'error': f'Erro ao consultar RPC: {str(e)}'}), 500
+
+
+@stats_bp.route('/key-pool', methods=['GET'])
+@token_required
+@rate_limit(cost=Config.RATE_LIMIT_COSTS['stats'])
+def get_key_pool(current_user):
+    """
+    Rota para consultar o pool de contas pré-geradas para o cadastro
+    Requer autenticação via token JWT
+
+    Returns:
+        JSON com estoque, low water, taxa de reabastecimento (contas/s),
+        contas retiradas e cadastros que encontraram o pool vazio
+    """
+    try:
+        return jsonify(stats_controller.get_key_pool()), 200
+    except Exception as e:
+        return jsonify({'error': f'Erro ao consultar pool de chaves: {str(e)}'}), 500
+
+
+@stats_bp.route('/config', methods=['GET'])
+@token_required
+@rate_limit(cost=Config.RATE_LIMIT_COSTS['stats'])
+def get_config(current_user):
+    """
+    Rota para consultar o cache de configuração (system_config) do worker
+    Requer autenticação via token JWT
+
+    Returns:
+        JSON com a versão carregada, o intervalo de verificação e quantas
+        recargas e chaves alteradas o worker já aplicou
+    """
+    try:
+        return jsonify(stats_controller.get_config()), 200
+    except Exception as e:
+        return jsonify({'error': f'Erro ao consultar configuração: {str(e)}'}), 500
+
+
+@stats_bp.route('/tracing', methods=['GET'])
+@token_required
+@rate_limit(cost=Config.RATE_LIMIT_COSTS['stats'])
+def get_tracing(current_user):
+    """
+    Rota para consultar o tracing (spans em arquivo OTLP/JSON) do worker
+    Requer autenticação via token JWT
+
+    Returns:
+        JSON com a taxa de amostragem, o arquivo de saída e os contadores de
+        spans gravados e descartados
+    """
+    try:
+        return jsonify(stats_controller.get_tracing()), 200
+    except Exception as e:
+        return jsonify({'error': f'Erro ao consultar tracing: {str(e)}'}), 500
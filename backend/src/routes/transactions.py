@@ -1,20 +1,45 @@
-from flask import Blueprint, request, jsonify
-from src.controllers.transaction_controller import TransactionController
+import json
+import math
+import time
+from flask import Blueprint, Response, request, jsonify
+from src.config import Config
+from src.blockchain.circuit_breaker import CircuitOpenError
+from src.blockchain.tx_queue import TransactionNotSubmitted
 from src.utils.auth_utils import token_required
+from src.utils.rate_limit import rate_limit
+from src.utils.idempotency import idempotent, not_submitted
+from src.utils.lazy import lazy_instance
+from src.utils.http_cache import account_etag, summary_etag, conditional, mark_stale
+from src.utils.token_amount import TokenAmount
 
 transactions_bp = Blueprint('transactions', __name__)
-transaction_controller = TransactionController()
+# Criado no primeiro request: importar a rota não carrega web3 nem o contrato
+transaction_controller = lazy_instance('src.controllers.transaction_controller', 'TransactionController')
+
+
+def _node_unavailable(error):
+    """503 com Retry-After quando o circuito RPC está aberto e não há valor conhecido"""
+    response = jsonify({'error': str(error)})
+    response.headers['Retry-After'] = str(int(error.retry_after))
+    return response, 503
+
 
 @transactions_bp.route('/transfer', methods=['POST'])
 @token_required
+@rate_limit(cost=Config.RATE_LIMIT_COSTS['transfer'])
+@idempotent
 def transfer(current_user):
     """
     Rota para transferir tokens entre usuários
     Requer autenticação via token JWT
     
+    Com o cabeçalho Idempotency-Key, uma nova tentativa recebe a resposta
+    original em vez de enviar outra transferência.
+    
     Body JSON:
-        - recipient (str): Endereço Ethereum do destinatário
-        - amount (float): Quantidade de tokens a transferir
+        - recipient (str): Endereço Ethereum ou username do destinatário
+        - amount (str|float): Quantidade de tokens a transferir; um texto decimal
+          ("0.3") é convertido sem arredondamento, até 18 casas
     
     Returns:
         JSON com dados da transação ou erro
@@ -31,18 +56,27 @@ def transfer(current_user):
     if not recipient:
         return jsonify({'error': 'Endereço do destinatário é obrigatório'}), 400
     
-    if not amount:
+    if amount is None or amount == '':
         return jsonify({'error': 'Quantidade é obrigatória'}), 400
     
     try:
-        amount = float(amount)
-        if amount <= 0:
-            return jsonify({'error': 'A quantidade deve ser maior que zero'}), 400
-    except ValueError:
-        return jsonify({'error': 'Quantidade inválida'}), 400
+        amount = TokenAmount.parse(amount)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if amount.units <= 0:
+        return jsonify({'error': 'A quantidade deve ser maior que zero'}), 400
     
+    # Sem prefixo 0x o destinatário é o username de um usuário do app
+    if not recipient.startswith('0x'):
+        from src.models.user_directory import get_user_directory
+
+        address = get_user_directory().resolve_username(recipient)
+        if address is None:
+            return jsonify({'error': 'Usuário destinatário não encontrado'}), 404
+        recipient = address
+
     # Validação de endereço Ethereum (básica)
-    if not recipient.startswith('0x') or len(recipient) != 42:
+    if len(recipient) != 42:
         return jsonify({'error': 'Endereço Ethereum inválido'}), 400
 
     try:
@@ -53,38 +87,64 @@ def transfer(current_user):
             'transaction': transaction,
             'from': sender,
             'to': recipient,
-            'amount': amount,
+            'to_username': transaction.get('to_username'),
+            **amount.fields('amount'),
             'user': current_user.get('username')
         }), 200
+    except CircuitOpenError as e:
+        # Saldo não pôde ser lido: nada foi enfileirado
+        not_submitted()
+        return _node_unavailable(e)
+    except TransactionNotSubmitted as e:
+        not_submitted()
+        if e.retry_after is None:
+            return jsonify({'error': f'Erro ao realizar transferência: {str(e)}'}), 500
+        response = jsonify({'error': str(e), 'submitted': False})
+        response.headers['Retry-After'] = str(math.ceil(e.retry_after))
+        return response, 503
     except Exception as e:
         return jsonify({'error': f'Erro ao realizar transferência: {str(e)}'}), 500
 
 
 @transactions_bp.route('/balance', methods=['GET'])
 @token_required
+@rate_limit(cost=Config.RATE_LIMIT_COSTS['balance'])
 def get_balance(current_user):
     """
     Rota para consultar o saldo do usuário autenticado
     Requer autenticação via token JWT
     
+    Responde 304 quando o If-None-Match bate com a ETag da conta
+    (nenhum bloco novo tocou o endereço desde a última resposta).
+    Com o nó indisponível, responde o último saldo conhecido com
+    `stale: true`, o bloco em que foi lido e sem ETag (503 se não houver nenhum).
+    
     Returns:
         JSON com o saldo do usuário
     """
-    try:
-        ethereum_address = current_user.get('ethereum_address')
-        balance = transaction_controller.get_balance(ethereum_address)
-        
-        return jsonify({
-            'username': current_user.get('username'),
-            'ethereum_address': ethereum_address,
-            'balance': balance
-        }), 200
-    except Exception as e:
-        return jsonify({'error': f'Erro ao consultar saldo: {str(e)}'}), 500
+    ethereum_address = current_user.get('ethereum_address')
+    etag = account_etag(ethereum_address, 'balance', current_user.get('username'))
+
+    def build():
+        try:
+            balance = transaction_controller.get_balance_info(ethereum_address)
+            
+            return mark_stale(jsonify({
+                'username': current_user.get('username'),
+                'ethereum_address': ethereum_address,
+                **balance
+            }), balance['stale']), 200
+        except CircuitOpenError as e:
+            return _node_unavailable(e)
+        except Exception as e:
+            return jsonify({'error': f'Erro ao consultar saldo: {str(e)}'}), 500
+
+    return conditional(etag, build)
 
 
 @transactions_bp.route('/history', methods=['GET'])
 @token_required
+@rate_limit(cost=Config.RATE_LIMIT_COSTS['history'])
 def get_transaction_history(current_user):
     """
     Rota para consultar histórico de transações do usuário
@@ -93,23 +153,141 @@ def get_transaction_history(current_user):
     Query params opcionais:
         - limit (int): Número máximo de transações (padrão: 10)
     
+    Responde 304 quando o If-None-Match bate com a ETag da conta.
+    Com o nó indisponível, responde a última página conhecida com `stale: true`
+    (sem ETag).
+    
     Returns:
         JSON com lista de transações
     """
-    try:
-        ethereum_address = current_user.get('ethereum_address')
-        limit = request.args.get('limit', 10, type=int)
-        
-        transactions = transaction_controller.get_transaction_history(
-            ethereum_address, 
-            limit
-        )
-        
-        return jsonify({
-            'username': current_user.get('username'),
-            'ethereum_address': ethereum_address,
-            'transactions': transactions,
-            'count': len(transactions)
-        }), 200
-    except Exception as e:
-        return jsonify({'error': f'Erro ao consultar histórico: {str(e)}'}), 500
\ No newline at end of file
+    ethereum_address = current_user.get('ethereum_address')
+    limit = request.args.get('limit', 10, type=int)
+    etag = account_etag(ethereum_address, 'history', limit, current_user.get('username'))
+
+    def build():
+        try:
+            history = transaction_controller.get_history_info(
+                ethereum_address, 
+                limit
+            )
+            
+            return mark_stale(jsonify({
+                'username': current_user.get('username'),
+                'ethereum_address': ethereum_address,
+                **history,
+                'count': len(history['transactions'])
+            }), history['stale']), 200
+        except CircuitOpenError as e:
+            return _node_unavailable(e)
+        except Exception as e:
+            return jsonify({'error': f'Erro ao consultar histórico: {str(e)}'}), 500
+
+    return conditional(etag, build)
+
+
+@transactions_bp.route('/summary', methods=['GET'])
+@token_required
+@rate_limit(cost=Config.RATE_LIMIT_COSTS['summary'])
+def get_summary(current_user):
+    """
+    Rota para consultar os totais enviados e recebidos pelo usuário
+    Requer autenticação via token JWT
+    
+    Responde 304 quando o If-None-Match bate com a ETag do resumo gravado
+    (último bloco do endereço em account_summaries).
+    
+    Returns:
+        JSON com totais, contagens e última atividade
+    """
+    ethereum_address = current_user.get('ethereum_address')
+    etag = summary_etag(ethereum_address, 'summary', current_user.get('username'))
+
+    def build():
+        try:
+            summary = transaction_controller.get_summary(ethereum_address)
+            
+            return jsonify({
+                'username': current_user.get('username'),
+                'ethereum_address': ethereum_address,
+                **summary
+            }), 200
+        except Exception as e:
+            return jsonify({'error': f'Erro ao consultar resumo: {str(e)}'}), 500
+
+    return conditional(etag, build)
+
+
+
+def _sse(event, block_number, data):
+    """Formata uma mensagem Server-Sent Events"""
+    return f"id: {block_number}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@transactions_bp.route('/stream', methods=['GET'])
+@token_required
+@rate_limit(cost=Config.RATE_LIMIT_COSTS['stream'])
+def stream(current_user):
+    """
+    Rota de notificações em tempo real (Server-Sent Events)
+    Requer autenticação via token JWT
+    
+    Substitui o polling de /balance e /history: envia `balance` ao conectar e,
+    a cada bloco com Transfers do usuário, um `transfer` por evento seguido do
+    novo `balance`. Um comentário keep-alive é enviado a cada SSE_HEARTBEAT
+    segundos; a conexão é encerrada quando o token expira.
+    
+    Returns:
+        text/event-stream, ou 503 se o processo não puder aceitar a conexão
+    """
+    from src.indexer.indexer import get_indexer
+    from src.indexer.notifier import get_notifier
+
+    ethereum_address = current_user.get('ethereum_address')
+    indexer = get_indexer()
+    if not indexer.is_running():
+        return jsonify({'error': 'Notificações indisponíveis: indexador desativado'}), 503
+
+    notifier = get_notifier(indexer)
+    if notifier.is_full():
+        response = jsonify({'error': 'Limite de conexões de notificação atingido, use /balance e /history'})
+        response.headers['Retry-After'] = '30'
+        return response, 503
+    expires_at = current_user.get('exp') or time.time() + 86400
+
+    def initial_balance():
+        block_number = indexer.ledger.last_block
+        if indexer.is_fresh():
+            units = indexer.ledger.balance_of(ethereum_address)
+            return block_number, {**TokenAmount(units).fields('balance'), 'block_number': block_number}
+        try:
+            balance = transaction_controller.get_balance_info(ethereum_address)
+        except Exception:
+            return block_number, {'balance': None, 'balance_units': None, 'block_number': block_number,
+                                  'stale': True}
+        return block_number, balance
+
+    def events():
+        # A assinatura nasce com o gerador: se o cliente sair antes do primeiro
+        # byte nada fica registrado, e o finally sempre a remove
+        subscription = notifier.subscribe(ethereum_address)
+        if subscription is None:
+            yield _sse('error', -1, {'error': 'Limite de conexões de notificação atingido'})
+            return
+        try:
+            yield "retry: 5000\n\n"
+            # Saldo lido depois de assinar: nenhum bloco fica entre os dois
+            yield _sse('balance', *initial_balance())
+            while time.time() < expires_at:
+                messages = subscription.get(timeout=Config.SSE_HEARTBEAT)
+                if not messages:
+                    yield ": keep-alive\n\n"
+                for event, event_block, data in messages:
+                    yield _sse(event, event_block, data)
+        finally:
+            # Cliente desconectado (escrita falhou) ou token expirado
+            notifier.unsubscribe(subscription)
+
+    return Response(events(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
@@ -0,0 +1,113 @@
+"""
+Cache HTTP condicional (ETag / If-None-Match) para respostas por conta
+
+A ETag é derivada do endereço e do último bloco em que o indexador viu um
+Transfer envolvendo esse endereço. Enquanto nenhum bloco novo tocar a conta,
+o cliente recebe 304 sem que a rota consulte a blockchain ou serialize JSON.
+
+Respostas montadas com valores stale (nó indisponível) saem com o cabeçalho
+Warning e sem ETag: o bloco da conta pode já ter avançado, e guardar o valor
+antigo sob a ETag atual faria o cliente receber 304 para ele depois que o nó
+voltar.
+"""
+import hashlib
+from flask import request, make_response
+from src.config import Config
+
+CACHE_CONTROL = 'private, no-cache'
+STALE_WARNING = '110 - "Response is Stale"'
+
+
+def account_etag(address, *extra):
+    """
+    Calcula a ETag de uma resposta que depende apenas do estado da conta
+
+    Args:
+        address (str): Endereço Ethereum
+        *extra: Outros valores que alteram a resposta (ex: rota, limit, username)
+
+    Returns:
+        str: ETag (sem aspas) ou None se o indexador não estiver em dia
+    """
+    from src.indexer.indexer import get_indexer
+
+    indexer = get_indexer()
+    if not address or not indexer.is_fresh():
+        return None
+
+    ledger = indexer.ledger
+    return _etag(ledger.contract_address, address, ledger.activity_block(address), extra)
+
+
+def summary_etag(address, *extra):
+    """
+    Calcula a ETag de /summary a partir do resumo gravado para o endereço
+
+    A tabela account_summaries é gravada depois que o ledger avança; com o bloco
+    do ledger um resumo ainda antigo ficaria guardado sob a ETag nova. Aqui o
+    bloco vem da própria linha de account_summaries (uma leitura pela chave).
+
+    Returns:
+        str: ETag (sem aspas) ou None se o indexador não estiver em dia
+    """
+    from src.indexer import summaries
+    from src.indexer.indexer import get_indexer
+    from src.models.user import engine
+
+    indexer = get_indexer()
+    if not address or not indexer.is_fresh():
+        return None
+
+    with engine.connect() as conn:
+        row = summaries.get_summary(conn, address)
+    return _etag(indexer.ledger.contract_address, address, row.last_block if row else -1, extra)
+
+
+def _etag(contract_address, address, block_number, extra):
+    parts = [contract_address or '', address.lower(), str(block_number)]
+    parts.extend(str(value) for value in extra)
+    return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
+
+
+def mark_stale(response, stale=True):
+    """
+    Marca uma resposta montada com valores stale (não recebe ETag nem Cache-Control)
+
+    Args:
+        response (Response): Resposta da rota
+        stale (bool): Se o corpo veio do último valor conhecido
+
+    Returns:
+        Response: A mesma resposta
+    """
+    if stale:
+        response.headers['Warning'] = STALE_WARNING
+    return response
+
+
+def conditional(etag, build_response):
+    """
+    Responde 304 se o cliente já tem a versão `etag`; senão monta a resposta
+
+    Args:
+        etag (str): ETag atual (None desativa o cache)
+        build_response (callable): Retorna a resposta completa da rota
+
+    Returns:
+        Response: 304 vazio ou a resposta montada, com ETag e Cache-Control
+        (exceto respostas de erro ou marcadas por `mark_stale`)
+    """
+    if not Config.HTTP_CACHE_ENABLED or etag is None:
+        return build_response()
+
+    if etag in request.if_none_match:
+        response = make_response('', 304)
+    else:
+        response = make_response(build_response())
+        if response.status_code != 200 or 'Warning' in response.headers:
+            return response
+
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    response.vary.add('Authorization')
+    return response
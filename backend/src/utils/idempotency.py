@@ -0,0 +1,152 @@
+"""
+Idempotency-Key para rotas POST que enviam transações
+
+Um cliente que desiste de esperar o /transfer (o handler aguarda o nó) e tenta
+de novo pode transmitir uma segunda transferência. Com o cabeçalho
+Idempotency-Key a primeira resposta fica gravada em shared_state.db junto com
+o hash da requisição e o hash da transação:
+
+- nova tentativa com a mesma chave e o mesmo corpo: devolve a resposta
+  original (cabeçalho Idempotent-Replayed: true) sem assinar nem enviar nada;
+- duplicata concorrente: espera a primeira terminar (até IDEMPOTENCY_WAIT s),
+  senão 409;
+- mesma chave com outro corpo: 422.
+
+Só respostas 2xx e 4xx são gravadas (por IDEMPOTENCY_TTL segundos, por
+usuário). Um 5xx libera a chave apenas se o handler provou que nada foi
+enviado (`not_submitted()`); sem essa prova a transação pode estar na fila ou
+no nó, então a reserva continua até IDEMPOTENCY_LEASE e as novas tentativas
+recebem 409 nesse meio tempo. Sem o cabeçalho a rota funciona como antes.
+"""
+import hashlib
+import json
+import sqlite3
+import time
+from functools import wraps
+from flask import g, request, jsonify, make_response, Response
+from src.config import Config
+from src.utils.shared_state import get_shared_state
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+POLL_INTERVAL = 0.05
+CLEANUP_EVERY = 200  # reservas entre duas limpezas das chaves expiradas
+
+_claims = 0
+
+
+def _request_hash():
+    body = request.get_json(silent=True)
+    if body is None:
+        payload = request.get_data()
+    else:
+        payload = json.dumps(body, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    digest = hashlib.sha256(f'{request.method} {request.path}\n'.encode('utf-8'))
+    digest.update(payload)
+    return digest.hexdigest()
+
+
+def _tx_hash(body):
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    transaction = data.get('transaction')
+    if isinstance(transaction, dict) and transaction.get('tx_hash'):
+        return transaction['tx_hash']
+    return data.get('tx_hash')
+
+
+def _error(message, status_code, retry_after=None):
+    response = jsonify({'error': message})
+    response.status_code = status_code
+    if retry_after is not None:
+        response.headers['Retry-After'] = str(retry_after)
+    return response
+
+
+def _replay(record):
+    status_code, body = record
+    response = Response(body, status=status_code, mimetype='application/json')
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def not_submitted():
+    """Marca o erro da requisição atual como "nada foi enviado": a chave é liberada"""
+    g.idempotency_not_submitted = True
+
+
+def idempotent(f):
+    """
+    Decorator de idempotência (deve vir depois do token_required)
+
+    Uso:
+        @transactions_bp.route('/transfer', methods=['POST'])
+        @token_required
+        @rate_limit(cost=5)
+        @idempotent
+        def transfer(current_user): ...
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        global _claims
+
+        client_key = request.headers.get(HEADER)
+        if client_key is None:
+            return f(*args, **kwargs)
+        client_key = client_key.strip()
+        if not client_key or len(client_key) > MAX_KEY_LENGTH:
+            return _error(f'{HEADER} inválida (1 a {MAX_KEY_LENGTH} caracteres)', 400)
+
+        scope = args[0].get('user_id') if args and isinstance(args[0], dict) else request.remote_addr
+        key = f'{scope}:{client_key}'
+        request_hash = _request_hash()
+        shared_state = get_shared_state()
+
+        try:
+            deadline = time.monotonic() + Config.IDEMPOTENCY_WAIT
+            while True:
+                state, record = shared_state.claim_idempotency_key(key, request_hash, Config.IDEMPOTENCY_LEASE)
+                if state != 'pending':
+                    break
+                if time.monotonic() >= deadline:
+                    return _error('Requisição com esta Idempotency-Key ainda em andamento', 409, retry_after=1)
+                time.sleep(POLL_INTERVAL)
+        except sqlite3.Error as e:
+            # Sem o armazenamento a rota segue, como no rate limit
+            print(f"⚠️ Idempotência indisponível: {e}")
+            return f(*args, **kwargs)
+
+        if state == 'done':
+            return _replay(record)
+        if state == 'mismatch':
+            return _error(f'{HEADER} já usada com outra requisição', 422)
+
+        _claims += 1
+        if _claims % CLEANUP_EVERY == 0:
+            shared_state.cleanup_idempotency_keys()
+
+        try:
+            response = make_response(f(*args, **kwargs))
+        except Exception:
+            if g.pop('idempotency_not_submitted', False):
+                shared_state.release_idempotency_key(key)
+            raise
+
+        if response.status_code >= 500:
+            # Erro transitório: não é gravado. Sem prova de que nada foi enviado,
+            # a reserva fica até expirar em vez de liberar um segundo envio
+            if g.pop('idempotency_not_submitted', False):
+                shared_state.release_idempotency_key(key)
+            return response
+
+        body = response.get_data(as_text=True)
+        shared_state.complete_idempotency_key(
+            key, response.status_code, body, _tx_hash(body), Config.IDEMPOTENCY_TTL
+        )
+        return response
+
+    return decorated
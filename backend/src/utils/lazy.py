@@ -0,0 +1,58 @@
+"""
+Inicialização preguiçosa de objetos compartilhados
+
+Objetos caros (cliente web3, controllers) são criados no primeiro acesso em vez
+de no import do módulo, para que scripts, testes e workers importem a
+aplicação rapidamente e sem depender do nó Ethereum.
+"""
+import importlib
+import threading
+
+
+class LazyObject:
+    """
+    Proxy que cria o objeto real no primeiro acesso a um atributo
+
+    Leituras e atribuições de atributos são repassadas para o objeto real.
+
+    Uso:
+        user_controller = LazyObject(lambda: UserController())
+        user_controller.register(...)  # cria o controller aqui
+    """
+
+    def __init__(self, factory):
+        object.__setattr__(self, '_factory', factory)
+        object.__setattr__(self, '_instance', None)
+        object.__setattr__(self, '_lock', threading.Lock())
+
+    @property
+    def initialized(self):
+        return self._instance is not None
+
+    def get(self):
+        """Retorna o objeto real, criando-o se necessário"""
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                instance = self._instance
+                if instance is None:
+                    instance = self._factory()
+                    object.__setattr__(self, '_instance', instance)
+        return instance
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self.get(), name, value)
+
+
+def lazy_instance(module_path, class_name):
+    """
+    Proxy para `module_path.class_name()`; o módulo só é importado no primeiro uso
+
+    Args:
+        module_path (str): Caminho do módulo (ex: 'src.controllers.user_controller')
+        class_name (str): Classe a instanciar sem argumentos
+    """
+    return LazyObject(lambda: getattr(importlib.import_module(module_path), class_name)())
@@ -0,0 +1,179 @@
+"""
+Limitação de taxa por usuário (token bucket) compartilhada entre workers
+
+Cada chave (usuário do JWT ou IP) tem um balde com capacidade `burst` que se
+recarrega a `rate` fichas por segundo. Cada rota consome um custo diferente
+(/transfer e /history custam mais que /balance). O estado fica em um arquivo
+SQLite separado, atualizado dentro de uma transação IMMEDIATE, então todos os
+processos do servidor enxergam o mesmo saldo de fichas.
+"""
+import math
+import os
+import sqlite3
+import threading
+import time
+from functools import wraps
+from flask import request, jsonify
+from src.config import Config
+
+CLEANUP_EVERY = 1000  # chamadas entre limpezas de baldes parados
+STALE_AFTER = 3600  # segundos sem uso para um balde ser removido
+
+
+class SQLiteBucketStore:
+    """
+    Baldes de fichas persistidos em SQLite (uma conexão por thread)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._calls = 0
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            # Perder alguns milissegundos de estado em um crash não importa aqui
+            conn.execute('PRAGMA synchronous=OFF')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS rate_limit_buckets ('
+                ' key TEXT PRIMARY KEY,'
+                ' tokens REAL NOT NULL,'
+                ' updated_at REAL NOT NULL)'
+            )
+            self._local.conn = conn
+        return conn
+
+    def consume(self, key, cost, burst, rate, now=None):
+        """
+        Tenta consumir `cost` fichas do balde `key`
+
+        Returns:
+            tuple: (permitido, fichas restantes, segundos até haver fichas suficientes)
+        """
+        now = time.time() if now is None else now
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                tokens = float(burst)
+            else:
+                tokens = min(float(burst), row[0] + max(0.0, now - row[1]) * rate)
+
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            conn.execute(
+                'INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, updated_at) VALUES (?, ?, ?)',
+                (key, tokens, now)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        self._calls += 1
+        if self._calls % CLEANUP_EVERY == 0:
+            self.cleanup(now)
+
+        retry_after = 0.0 if allowed else (cost - tokens) / rate if rate > 0 else float('inf')
+        return allowed, tokens, retry_after
+
+    def cleanup(self, now=None):
+        """Remove baldes sem uso há mais de STALE_AFTER segundos"""
+        now = time.time() if now is None else now
+        try:
+            self._connection().execute(
+                'DELETE FROM rate_limit_buckets WHERE updated_at < ?', (now - STALE_AFTER,)
+            )
+        except sqlite3.Error as e:
+            print(f"⚠️ Erro ao limpar baldes de rate limit: {e}")
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Retorna o armazenamento de baldes do processo"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SQLiteBucketStore(Config.RATE_LIMIT_DB)
+        return _store
+
+
+def _reset_after_fork():
+    # Conexões SQLite não podem atravessar um fork: cada worker abre as suas
+    global _store
+    _store = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _client_ip():
+    # Só o endereço da conexão: cabeçalhos do cliente (X-Real-IP, X-Forwarded-For)
+    # podem ser forjados. Atrás de proxy, TRUSTED_PROXY_HOPS liga o ProxyFix
+    # (create_app), que reescreve remote_addr a partir dos saltos confiáveis.
+    return request.remote_addr or 'desconhecido'
+
+
+def rate_limit(cost=1, per='user'):
+    """
+    Decorator de limitação de taxa
+
+    Args:
+        cost (int): Fichas consumidas por requisição
+        per (str): 'user' (usa o current_user do token_required, deve vir depois dele)
+                   ou 'ip' (rotas públicas como /api/auth/*)
+
+    Uso:
+        @transactions_bp.route('/transfer', methods=['POST'])
+        @token_required
+        @rate_limit(cost=5)
+        def transfer(current_user): ...
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if not Config.RATE_LIMIT_ENABLED:
+                return f(*args, **kwargs)
+
+            if per == 'user' and args and isinstance(args[0], dict) and args[0].get('user_id') is not None:
+                key = f"user:{args[0]['user_id']}"
+                burst, rate = Config.RATE_LIMIT_USER_BURST, Config.RATE_LIMIT_USER_RATE
+            else:
+                key = f"ip:{_client_ip()}"
+                burst, rate = Config.RATE_LIMIT_IP_BURST, Config.RATE_LIMIT_IP_RATE
+
+            try:
+                allowed, _, retry_after = get_store().consume(key, cost, burst, rate)
+            except sqlite3.Error as e:
+                # Falha no armazenamento não pode derrubar a API
+                print(f"⚠️ Rate limit indisponível: {e}")
+                return f(*args, **kwargs)
+
+            if not allowed:
+                seconds = max(1, int(math.ceil(retry_after)))
+                response = jsonify({
+                    'error': 'Muitas requisições. Tente novamente em alguns segundos.',
+                    'retry_after': seconds
+                })
+                response.status_code = 429
+                response.headers['Retry-After'] = str(seconds)
+                return response
+
+            return f(*args, **kwargs)
+
+        return decorated
+    return decorator
@@ -0,0 +1,302 @@
+"""
+Estado compartilhado entre os workers do servidor
+
+Com vários processos (Gunicorn) cada worker tem sua própria memória; o que
+precisa ser coordenado entre eles passa por aqui:
+
+- Nonces: o próximo nonce de cada conta que assina transações fica em SQLite
+  (WAL, transação IMMEDIATE), então dois workers nunca usam o mesmo nonce.
+- Locks nomeados: exclusão mútua entre processos via flock em arquivos
+  (ex: a fila do faucet, para que só um worker distribua por vez).
+- Chaves de idempotência: a resposta de cada POST com Idempotency-Key, para
+  que uma nova tentativa em qualquer worker receba a resposta original.
+- Pool de chaves: contas pré-geradas e já cifradas, retiradas no cadastro
+  (src/blockchain/key_pool.py).
+
+Ver SHARED_STATE.md para a lista do que é compartilhado e do que é por processo.
+"""
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from src.config import Config
+
+try:
+    import fcntl
+except ImportError:  # Windows: Waitress roda um único processo, lock de thread basta
+    fcntl = None
+
+LOCK_POLL_INTERVAL = 0.01
+
+
+class SharedState:
+    """
+    Estado persistido em SQLite (uma conexão por thread) e locks em arquivo
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock_dir = os.path.dirname(path) or '.'
+        self._local = threading.local()
+        self._thread_locks = {}
+        self._thread_locks_guard = threading.Lock()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(self.lock_dir, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS nonces ('
+                ' address TEXT PRIMARY KEY,'
+                ' next_nonce INTEGER NOT NULL,'
+                ' updated_at REAL NOT NULL)'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS idempotency_keys ('
+                ' key TEXT PRIMARY KEY,'
+                ' request_hash TEXT NOT NULL,'
+                ' status_code INTEGER,'  # NULL enquanto a primeira requisição está em andamento
+                ' response TEXT,'
+                ' tx_hash TEXT,'
+                ' created_at REAL NOT NULL,'
+                ' expires_at REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_idempotency_expires ON idempotency_keys (expires_at)')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS key_pool ('
+                ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+                ' address TEXT NOT NULL,'
+                ' keystore TEXT NOT NULL,'  # keystore V3 cifrado pelo cofre
+                ' created_at REAL NOT NULL)'
+            )
+            self._local.conn = conn
+        return conn
+
+    # ---------- nonces ----------
+
+    def next_nonce(self, address, chain_nonce):
+        """
+        Reserva o próximo nonce de `address`
+
+        Args:
+            address (str): Conta que vai assinar a transação
+            chain_nonce (int): Contagem de transações pendentes da conta no nó
+
+        Returns:
+            int: Nonce reservado (nenhum outro worker recebe o mesmo)
+        """
+        key = address.lower()
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT next_nonce FROM nonces WHERE address = ?', (key,)).fetchone()
+            # O nó pode estar à frente (transações enviadas por fora do backend)
+            nonce = max(chain_nonce, row[0] if row else 0)
+            conn.execute(
+                'INSERT OR REPLACE INTO nonces (address, next_nonce, updated_at) VALUES (?, ?, ?)',
+                (key, nonce + 1, time.time())
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return nonce
+
+    def reset_nonce(self, address):
+        """
+        Esquece o nonce reservado de `address`
+
+        Chamado quando um envio falha: a próxima reserva volta a partir da
+        contagem do nó, sem deixar um buraco que travaria as transações seguintes.
+        """
+        self._connection().execute('DELETE FROM nonces WHERE address = ?', (address.lower(),))
+
+    # ---------- idempotência ----------
+
+    def claim_idempotency_key(self, key, request_hash, lease, now=None):
+        """
+        Tenta reservar `key` para a requisição atual
+
+        Args:
+            key (str): Chave já com o escopo (ex: "user:7:<Idempotency-Key>")
+            request_hash (str): Hash do método, rota e corpo da requisição
+            lease (float): Segundos que a reserva vale enquanto a requisição roda
+            now (float): Horário atual (time.time())
+
+        Returns:
+            tuple: (estado, registro) com estado 'claimed' (seguir com a
+                   requisição), 'pending' (outra requisição em andamento),
+                   'done' (registro = (status_code, response)) ou 'mismatch'
+                   (mesma chave com outro corpo)
+        """
+        now = time.time() if now is None else now
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT request_hash, status_code, response, expires_at FROM idempotency_keys WHERE key = ?',
+                (key,)
+            ).fetchone()
+            if row is not None and row[3] > now:
+                conn.execute('COMMIT')
+                if row[0] != request_hash:
+                    return 'mismatch', None
+                if row[1] is None:
+                    return 'pending', None
+                return 'done', (row[1], row[2])
+            conn.execute(
+                'INSERT OR REPLACE INTO idempotency_keys'
+                ' (key, request_hash, status_code, response, tx_hash, created_at, expires_at)'
+                ' VALUES (?, ?, NULL, NULL, NULL, ?, ?)',
+                (key, request_hash, now, now + lease)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return 'claimed', None
+
+    def complete_idempotency_key(self, key, status_code, response, tx_hash, ttl, now=None):
+        """Grava a resposta final de `key`, válida por `ttl` segundos"""
+        now = time.time() if now is None else now
+        self._connection().execute(
+            'UPDATE idempotency_keys SET status_code = ?, response = ?, tx_hash = ?, expires_at = ? WHERE key = ?',
+            (status_code, response, tx_hash, now + ttl, key)
+        )
+
+    def release_idempotency_key(self, key):
+        """Libera uma reserva cuja requisição falhou sem resposta (a próxima tentativa executa de novo)"""
+        self._connection().execute(
+            'DELETE FROM idempotency_keys WHERE key = ? AND status_code IS NULL', (key,)
+        )
+
+    def cleanup_idempotency_keys(self, now=None):
+        """Remove as chaves expiradas"""
+        now = time.time() if now is None else now
+        return self._connection().execute(
+            'DELETE FROM idempotency_keys WHERE expires_at <= ?', (now,)
+        ).rowcount
+
+    # ---------- pool de chaves ----------
+
+    def add_pooled_keys(self, keys, now=None):
+        """
+        Guarda contas prontas (já cifradas) no pool
+
+        Args:
+            keys (list): Pares (endereço, keystore)
+        """
+        now = time.time() if now is None else now
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany(
+                'INSERT INTO key_pool (address, keystore, created_at) VALUES (?, ?, ?)',
+                [(address, keystore, now) for address, keystore in keys]
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def take_pooled_keys(self, count=1):
+        """
+        Retira até `count` contas do pool (as mais antigas primeiro)
+
+        Returns:
+            list: Pares (endereço, keystore); nenhum outro worker recebe os mesmos
+        """
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            rows = conn.execute(
+                'SELECT id, address, keystore FROM key_pool ORDER BY id LIMIT ?', (count,)
+            ).fetchall()
+            if rows:
+                conn.execute('DELETE FROM key_pool WHERE id <= ?', (rows[-1][0],))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return [(address, keystore) for _, address, keystore in rows]
+
+    def peek_pooled_key(self):
+        """Conta mais antiga do pool sem retirá-la (None se vazio)"""
+        return self._connection().execute(
+            'SELECT address, keystore FROM key_pool ORDER BY id LIMIT 1'
+        ).fetchone()
+
+    def pooled_key_count(self):
+        return self._connection().execute('SELECT COUNT(*) FROM key_pool').fetchone()[0]
+
+    def clear_pooled_keys(self):
+        """Descarta o pool (ex: cifrado com outra chave mestra)"""
+        return self._connection().execute('DELETE FROM key_pool').rowcount
+
+    # ---------- locks ----------
+
+    def _thread_lock(self, name):
+        with self._thread_locks_guard:
+            return self._thread_locks.setdefault(name, threading.Lock())
+
+    @contextmanager
+    def lock(self, name, timeout=60.0):
+        """
+        Lock exclusivo entre todos os processos e threads
+
+        Args:
+            name (str): Nome do lock (vira o arquivo <name>.lock)
+            timeout (float): Segundos máximos de espera
+
+        Raises:
+            TimeoutError: Se o lock não for obtido a tempo
+        """
+        thread_lock = self._thread_lock(name)
+        if not thread_lock.acquire(timeout=timeout):
+            raise TimeoutError(f"Lock '{name}' ocupado")
+        try:
+            if fcntl is None:
+                yield
+                return
+            deadline = time.monotonic() + timeout
+            with open(os.path.join(self.lock_dir, f'{name}.lock'), 'a') as handle:
+                while True:
+                    try:
+                        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        break
+                    except BlockingIOError:
+                        if time.monotonic() >= deadline:
+                            raise TimeoutError(f"Lock '{name}' ocupado")
+                        time.sleep(LOCK_POLL_INTERVAL)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+        finally:
+            thread_lock.release()
+
+
+_shared_state = None
+_shared_state_lock = threading.Lock()
+
+
+def get_shared_state():
+    """Retorna o estado compartilhado do processo"""
+    global _shared_state
+    with _shared_state_lock:
+        if _shared_state is None:
+            _shared_state = SharedState(Config.SHARED_STATE_DB)
+        return _shared_state
+
+
+def _reset_after_fork():
+    # Conexões SQLite não podem atravessar um fork: cada worker abre as suas
+    global _shared_state
+    _shared_state = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,160 @@
+"""
+Último valor conhecido das leituras da blockchain (stale-while-revalidate)
+
+Com o nó respondendo, a leitura vai ao nó e o resultado fica guardado com o
+bloco em que foi lido. Quando o circuito RPC está aberto (ou a leitura falha),
+a rota recebe o último valor guardado marcado como `stale`, com o bloco de
+origem, e a atualização é disparada em segundo plano; a resposta sai na hora
+em vez de esperar um nó lento ou virar um saldo zero.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from src.blockchain.circuit_breaker import CircuitOpenError, get_circuit_breaker
+from src.config import Config
+
+
+class StaleCache:
+    """
+    Valores por chave (LRU) com o bloco e o instante da leitura
+
+    Args:
+        max_entries (int): Chaves guardadas
+        max_age (float): Segundos em que um valor ainda pode ser servido como stale
+    """
+
+    def __init__(self, max_entries=None, max_age=None):
+        self.max_entries = max_entries or Config.STALE_CACHE_SIZE
+        self.max_age = max_age or Config.STALE_MAX_AGE
+        self.entries = OrderedDict()  # chave -> (valor, bloco, time.monotonic())
+        self.counters = {'fresh': 0, 'stale': 0, 'refreshed': 0}
+        self.lock = threading.Lock()
+        self._refreshing = set()
+        self._executor = None
+
+    def get(self, key, loader, fallback=None):
+        """
+        Lê do nó ou, se ele estiver indisponível, serve o último valor conhecido
+
+        Args:
+            key: Chave do valor (ex: ('balance', endereço))
+            loader (callable): Lê do nó; retorna (valor, bloco)
+            fallback (callable): Alternativa sem o nó quando não há valor guardado;
+                retorna (valor, bloco) ou None
+
+        Returns:
+            tuple: (valor, {'stale': bool, 'block_number': int, 'age': segundos})
+
+        Raises:
+            CircuitOpenError: Nó indisponível e nenhum valor conhecido
+            Exception: Erro do loader, quando não há valor conhecido
+        """
+        breaker = get_circuit_breaker()
+        if not breaker.is_open:
+            try:
+                value, block_number = loader()
+            except Exception:
+                served = self._last_known(key, fallback)
+                if served is None:
+                    raise
+                return served
+            self._store(key, value, block_number)
+            with self.lock:
+                self.counters['fresh'] += 1
+            return value, {'stale': False, 'block_number': block_number, 'age': 0}
+
+        served = self._last_known(key, fallback)
+        if served is None:
+            raise CircuitOpenError(breaker.retry_after())
+        self._refresh_later(key, loader)
+        return served
+
+    def _store(self, key, value, block_number):
+        with self.lock:
+            current = self.entries.get(key)
+            # Uma atualização atrasada não substitui uma leitura mais nova
+            if current is None or block_number is None or current[1] is None or block_number >= current[1]:
+                self.entries[key] = (value, block_number, time.monotonic())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def _last_known(self, key, fallback):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and time.monotonic() - entry[2] <= self.max_age:
+                self.counters['stale'] += 1
+                value, block_number, stored_at = entry
+                return value, {'stale': True, 'block_number': block_number,
+                               'age': round(time.monotonic() - stored_at, 1)}
+        fallback_value = fallback() if fallback else None
+        if fallback_value is None:
+            return None
+        with self.lock:
+            self.counters['stale'] += 1
+        value, block_number = fallback_value
+        return value, {'stale': True, 'block_number': block_number, 'age': None}
+
+    def _refresh_later(self, key, loader):
+        with self.lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=Config.STALE_REFRESH_WORKERS, thread_name_prefix='stale-refresh'
+                )
+        self._executor.submit(self._refresh, key, loader)
+
+    def _refresh(self, key, loader):
+        try:
+            value, block_number = loader()
+        except Exception:
+            # Circuito ainda aberto (recusa imediata) ou o nó falhou de novo:
+            # a próxima leitura stale tenta outra vez
+            return
+        finally:
+            with self.lock:
+                self._refreshing.discard(key)
+        self._store(key, value, block_number)
+        with self.lock:
+            self.counters['refreshed'] += 1
+
+    def clear(self, *_):
+        """Esquece os valores guardados (ex: contrato redeployado)"""
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            return {'entries': len(self.entries), 'refreshing': len(self._refreshing), **self.counters}
+
+
+_stale_cache = None
+_stale_cache_lock = threading.Lock()
+
+
+def get_stale_cache():
+    """Retorna o cache de últimos valores conhecidos do processo"""
+    global _stale_cache
+    with _stale_cache_lock:
+        if _stale_cache is None:
+            from src.models.config_cache import get_config_cache
+
+            _stale_cache = StaleCache()
+            # Saldos e históricos guardados são do contrato anterior
+            get_config_cache().subscribe('TOKEN_CONTRACT_ADDRESS', _stale_cache.clear)
+        return _stale_cache
+
+
+def _reset_after_fork():
+    # A thread de atualização não existe no processo filho
+    global _stale_cache, _stale_cache_lock
+    _stale_cache = None
+    _stale_cache_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,62 @@
+"""
+Medição do tempo de inicialização da aplicação
+
+Cada etapa (imports, criação do app, banco, web3, contrato, indexador) é
+registrada com sua duração e resultado, e o relatório pode ser impresso no
+console ou consultado em JSON.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StartupReport:
+    """
+    Etapas da inicialização com duração em milissegundos
+    """
+
+    def __init__(self):
+        self.phases = []
+        self.lock = threading.Lock()
+
+    def record(self, name, seconds, ok=True, error=None):
+        with self.lock:
+            self.phases.append({
+                'phase': name,
+                'ms': round(seconds * 1000, 2),
+                'ok': ok,
+                'error': error
+            })
+
+    @contextmanager
+    def phase(self, name, required=True):
+        """
+        Mede o bloco como uma etapa
+
+        Args:
+            name (str): Nome da etapa
+            required (bool): Se False, uma falha é registrada e não interrompe a inicialização
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.record(name, time.perf_counter() - start, ok=False, error=str(e))
+            if required:
+                raise
+        else:
+            self.record(name, time.perf_counter() - start)
+
+    def to_dict(self):
+        with self.lock:
+            phases = list(self.phases)
+        return {'total_ms': round(sum(phase['ms'] for phase in phases), 2), 'phases': phases}
+
+    def print(self):
+        """Imprime o relatório no console"""
+        report = self.to_dict()
+        print("⏱️ Inicialização:")
+        for phase in report['phases']:
+            status = '✅' if phase['ok'] else f"⚠️ {phase['error']}"
+            print(f"   {phase['phase']:<12} {phase['ms']:>9.1f} ms  {status}")
+        print(f"   {'total':<12} {report['total_ms']:>9.1f} ms")
@@ -0,0 +1,178 @@
+"""
+Quantidades de token em unidades mínimas (inteiros exatos)
+
+O contrato trabalha com inteiros de 18 casas decimais. TokenAmount carrega
+esse inteiro pelos controllers e índices; a conversão para float ou texto só
+acontece na borda da API. A entrada (`"2.3"`, `2.5`, `10`) é convertida sem
+passar pela multiplicação em float: `int(2.3 * 10**18)` daria 2299999999999999744.
+
+No banco os valores ficam em duas colunas inteiras (hi = tokens inteiros,
+lo = resto em unidades mínimas < 10^18), e nas somas vetorizadas em três limbs
+int64 de 10^9 (`split_units`/`join_units`), sem perda nem overflow.
+"""
+from decimal import Decimal, InvalidOperation, localcontext
+from functools import total_ordering
+
+DECIMALS = 18
+UNITS = 10 ** DECIMALS
+LIMB = 10 ** 9
+MAX_UNITS = 2 ** 256 - 1  # uint256 do contrato
+
+
+def _numpy():
+    try:
+        import numpy as np
+    except ImportError:
+        raise Exception("NumPy não instalado. Execute: pip install numpy")
+    return np
+
+
+@total_ordering
+class TokenAmount:
+    """
+    Quantidade exata de tokens
+
+    Args:
+        units (int): Valor em unidades mínimas (10^-18 token)
+    """
+    __slots__ = ('units',)
+
+    def __init__(self, units=0):
+        if isinstance(units, bool) or not isinstance(units, int):
+            raise TypeError(f"Unidades devem ser um inteiro, não {type(units).__name__}")
+        self.units = units
+
+    @classmethod
+    def parse(cls, value):
+        """
+        Converte a quantidade recebida (texto, int, float ou Decimal) sem arredondar
+
+        Raises:
+            ValueError: Valor não numérico, com mais de 18 casas decimais ou
+                fora do alcance de um uint256
+        """
+        if isinstance(value, TokenAmount):
+            return value
+        if isinstance(value, bool) or value is None:
+            raise ValueError("Quantidade inválida")
+        try:
+            # repr(float) é o menor texto que volta ao mesmo float: 0.3 -> '0.3'
+            number = Decimal(repr(value) if isinstance(value, float) else str(value).strip())
+        except InvalidOperation:
+            raise ValueError("Quantidade inválida")
+        # "1e999999" não chega a virar um inteiro gigante
+        if not number.is_finite() or number.adjusted() > 60:
+            raise ValueError("Quantidade inválida")
+        with localcontext() as context:
+            context.prec = 100  # o padrão (28 dígitos) arredondaria valores grandes
+            units = number.scaleb(DECIMALS)
+        if units != units.to_integral_value():
+            raise ValueError(f"Quantidade com mais de {DECIMALS} casas decimais")
+        if abs(units) > MAX_UNITS:
+            raise ValueError("Quantidade inválida")
+        return cls(int(units))
+
+    @classmethod
+    def from_limbs(cls, hi, lo):
+        """Valor gravado em duas colunas (hi * 10^18 + lo)"""
+        return cls(int(hi) * UNITS + int(lo))
+
+    def limbs(self):
+        """
+        Returns:
+            tuple: (hi, lo) para as colunas value_hi/value_lo
+        """
+        return divmod(self.units, UNITS)
+
+    def __float__(self):
+        # Divisão de inteiros: arredondamento correto para o float mais próximo
+        return self.units / UNITS
+
+    def __int__(self):
+        return self.units
+
+    def __str__(self):
+        sign = '-' if self.units < 0 else ''
+        whole, fraction = divmod(abs(self.units), UNITS)
+        if not fraction:
+            return f"{sign}{whole}"
+        return f"{sign}{whole}.{fraction:018d}".rstrip('0')
+
+    def __repr__(self):
+        return f"TokenAmount('{self}')"
+
+    def __bool__(self):
+        return self.units != 0
+
+    def __hash__(self):
+        return hash(self.units)
+
+    def __eq__(self, other):
+        if isinstance(other, TokenAmount):
+            return self.units == other.units
+        return NotImplemented
+
+    def __lt__(self, other):
+        if isinstance(other, TokenAmount):
+            return self.units < other.units
+        return NotImplemented
+
+    def __add__(self, other):
+        if isinstance(other, TokenAmount):
+            return TokenAmount(self.units + other.units)
+        return NotImplemented
+
+    def __radd__(self, other):
+        # sum() começa em 0
+        if other == 0:
+            return self
+        return NotImplemented
+
+    def __sub__(self, other):
+        if isinstance(other, TokenAmount):
+            return TokenAmount(self.units - other.units)
+        return NotImplemented
+
+    def __neg__(self):
+        return TokenAmount(-self.units)
+
+    def fields(self, name):
+        """
+        Campos da resposta da API: valor em tokens e o exato em unidades mínimas
+
+        Returns:
+            dict: {name: float, name_units: str}
+        """
+        return {name: float(self), f'{name}_units': str(self.units)}
+
+
+def split_units(hi, lo):
+    """
+    Divide valores (hi * 10^18 + lo) em três limbs de base 10^9
+
+    Args:
+        hi: array int64 com os tokens inteiros
+        lo: array int64 com o resto em unidades mínimas (< 10^18)
+
+    Returns:
+        tuple: (hi, mid, low) arrays int64, cada limb < 10^9 exceto hi
+    """
+    np = _numpy()
+    lo = np.asarray(lo, dtype=np.int64)
+    return np.asarray(hi, dtype=np.int64), lo // LIMB, lo % LIMB
+
+
+def join_units(hi, mid, low):
+    """Recompõe o valor exato em unidades mínimas (int Python) a partir dos limbs"""
+    return int(hi) * LIMB * LIMB + int(mid) * LIMB + int(low)
+
+
+def sum_units(hi, lo):
+    """
+    Soma exata de colunas hi/lo em int64 (até ~9 bilhões de linhas sem overflow)
+
+    Returns:
+        TokenAmount: Total
+    """
+    hi, mid, low = split_units(hi, lo)
+    return TokenAmount(join_units(hi.sum(), mid.sum(), low.sum()))
@@ -1,12 +1,135 @@
 """
 Utilitários para distribuição automática de tokens
+
+Com o contrato Faucet deployado, ETH para gás e ESTC vão para uma ou várias
+contas em uma única transação (`faucet_grant`). Sem ele, o cadastro volta ao
+envio antigo: uma transação de ETH e outra de tokens por usuário.
+
+Tudo o que sai da conta do faucet passa pela fila de saída dela
+(src/blockchain/tx_queue.py): cadastros têm prioridade sobre pagamentos em lote.
 """
+from collections import defaultdict
 from src.blockchain.web3_client import web3
-from src.blockchain.contract import get_contract
+from src.blockchain.contract import get_contract, get_faucet_contract
+from src.blockchain.tx_queue import submit_transaction, PRIORITY_ONBOARDING, PRIORITY_PAYOUT
 from src.config import Config
+from src.utils.shared_state import get_shared_state
+from src.utils.token_amount import TokenAmount
 
 INITIAL_USER_BALANCE = 10  # Saldo inicial para cada novo usuário (10 ESTCOIN)
 INITIAL_ETH_BALANCE = 1.0  # ETH inicial para pagar gás (1 ETH)
+FAUCET_LOCK_TIMEOUT = 60  # segundos esperando a vez na fila do faucet
+FAUCET_ETH_RESERVE = 0.1  # ETH que fica na conta do faucet para o próprio gás
+FAUCET_BATCH_SIZE = 50  # contas por transação do Faucet (~62 mil de gás por conta nova)
+FAUCET_GAS_BASE = 60000
+FAUCET_GAS_PER_ACCOUNT = 80000
+MAX_UINT256 = 2 ** 256 - 1
+FAUCET_TX_TIMEOUT = 120  # segundos esperando a mineração (inclui a espera na fila)
+
+def _send_from_faucet(faucet_account, params, priority):
+    """
+    Envia uma transação pela fila de saída da conta do faucet e espera a mineração
+    
+    Returns:
+        Recibo da transação (o hash minerado pode ser o de uma substituição)
+    """
+    params = dict(params, gasPrice=params.get('gasPrice', Config.GAS_PRICE))
+    return submit_transaction(faucet_account, params, priority).wait_receipt(timeout=FAUCET_TX_TIMEOUT)
+
+def _contract_call(function, faucet_account, gas, value=0):
+    """Transação de uma chamada de contrato, sem nonce (definido pela fila)"""
+    return function.build_transaction({
+        'from': faucet_account,
+        'value': value,
+        'gas': gas,
+        'gasPrice': Config.GAS_PRICE,
+        'chainId': Config.CHAIN_ID
+    })
+
+def _ensure_faucet_allowance(token, faucet, faucet_account, needed_units, priority=PRIORITY_ONBOARDING):
+    """Aprova o contrato Faucet a gastar os tokens da conta do faucet (uma vez só)"""
+    if token.functions.allowance(faucet_account, faucet.address).call() >= needed_units:
+        return
+    _send_from_faucet(
+        faucet_account,
+        _contract_call(token.functions.approve(faucet.address, MAX_UINT256), faucet_account, 100000),
+        priority
+    )
+
+def faucet_grant(addresses, eth_wei, token_units, faucet_account=None, priority=PRIORITY_ONBOARDING):
+    """
+    Envia `eth_wei` e `token_units` para cada endereço em uma transação do Faucet
+    
+    Args:
+        addresses (list): Endereços (até FAUCET_BATCH_SIZE)
+        eth_wei (int): ETH por endereço, em wei (0 para só tokens)
+        token_units (int): Tokens por endereço, em unidades mínimas (0 para só ETH)
+        faucet_account (str): Conta que paga (padrão: primeira conta do nó)
+        priority (int): Classe na fila de saída (cadastro ou pagamento em lote)
+        
+    Returns:
+        str: Hash da transação
+        
+    Raises:
+        Exception: Se o Faucet não estiver deployado ou a transação falhar
+    """
+    if len(addresses) > FAUCET_BATCH_SIZE:
+        raise Exception(f"Máximo de {FAUCET_BATCH_SIZE} contas por transação do faucet")
+    
+    faucet = get_faucet_contract()
+    token = get_contract()
+    if not faucet or not token:
+        raise Exception("Contrato Faucet não deployado")
+    
+    faucet_account = faucet_account or web3.eth.accounts[0]
+    if token_units:
+        _ensure_faucet_allowance(token, faucet, faucet_account, token_units * len(addresses), priority)
+    
+    tx_receipt = _send_from_faucet(
+        faucet_account,
+        _contract_call(
+            faucet.functions.grant(list(addresses), eth_wei, token_units),
+            faucet_account,
+            FAUCET_GAS_BASE + FAUCET_GAS_PER_ACCOUNT * len(addresses),
+            value=eth_wei * len(addresses)
+        ),
+        priority
+    )
+    tx_hash = tx_receipt.transactionHash.hex()
+    if tx_receipt.status != 1:
+        raise Exception(f"Transação do faucet revertida: {tx_hash}")
+    return tx_hash
+
+def faucet_grant_many(grants, faucet_account=None, priority=PRIORITY_PAYOUT):
+    """
+    Distribui quantias possivelmente diferentes para várias contas
+    
+    Contas que recebem as mesmas quantias são agrupadas em lotes de até
+    FAUCET_BATCH_SIZE, uma transação do Faucet por lote.
+    
+    Args:
+        grants (list): Tuplas (endereço, eth_wei, token_units)
+        priority (int): Classe na fila de saída (padrão: pagamento em lote)
+        
+    Returns:
+        list: Um dict por lote: {'addresses', 'eth_wei', 'token_units', 'tx_hash' ou 'error'}
+    """
+    groups = defaultdict(list)
+    for address, eth_wei, token_units in grants:
+        if eth_wei or token_units:
+            groups[(eth_wei, token_units)].append(address)
+    
+    batches = []
+    for (eth_wei, token_units), addresses in groups.items():
+        for start in range(0, len(addresses), FAUCET_BATCH_SIZE):
+            chunk = addresses[start:start + FAUCET_BATCH_SIZE]
+            batch = {'addresses': chunk, 'eth_wei': eth_wei, 'token_units': token_units}
+            try:
+                batch['tx_hash'] = faucet_grant(chunk, eth_wei, token_units, faucet_account, priority)
+            except Exception as e:
+                batch['error'] = str(e)
+            batches.append(batch)
+    return batches
 
 def distribute_eth_for_gas(user_address):
     """
@@ -43,22 +166,19 @@ def distribute_eth_for_gas(user_address):
         # Converte para Wei
         amount_wei = web3.to_wei(amount_to_send, 'ether')
         
-        # Envia ETH
-        tx_hash = web3.eth.send_transaction({
-            'from': faucet_account,
+        # Envia ETH e aguarda confirmação
+        tx_receipt = _send_from_faucet(faucet_account, {
             'to': user_address,
             'value': amount_wei,
             'gas': 21000  # Gas padrão para transferência ETH
-        })
-        
-        # Aguarda confirmação
-        tx_receipt = web3.eth.wait_for_transaction_receipt(tx_hash, timeout=30)
+        }, PRIORITY_ONBOARDING)
+        tx_hash = tx_receipt.transactionHash
         
         if tx_receipt.status == 1:
             print(f"✅ {amount_to_send} ETH distribuídos para {user_address} (para pagar gás)")
             return {
                 'success': True,
-                'amount': amount_to_send,
+                'amount': float(amount_to_send),
                 'tx_hash': tx_hash.hex(),
                 'message': f'{amount_to_send} ETH distribuídos para pagar taxas de gás'
             }
@@ -74,12 +194,77 @@ def auto_distribute_initial_tokens(user_address):
     """
     Distribui automaticamente 10 ESTCOIN e 1 ETH para um novo usuário
     
+    As distribuições passam por um lock compartilhado entre os workers: o faucet
+    atende um cadastro por vez, sem dois processos lendo o mesmo saldo do faucet.
+    
     Args:
         user_address (str): Endereço Ethereum do novo usuário
         
     Returns:
         dict: Informações da distribuição ou None se falhar
     """
+    try:
+        with get_shared_state().lock('faucet', timeout=FAUCET_LOCK_TIMEOUT):
+            return _distribute_initial_tokens(user_address)
+    except TimeoutError:
+        print(f"⚠️ Faucet ocupado, tokens não distribuídos para {user_address}")
+        return None
+
+def _distribute_initial_tokens(user_address):
+    if get_faucet_contract() is not None:
+        return _grant_initial_balance(user_address)
+    return _distribute_separately(user_address)
+
+def _grant_initial_balance(user_address):
+    """ETH e ESTC iniciais em uma única transação do Faucet"""
+    try:
+        contract = get_contract()
+        accounts = web3.eth.accounts
+        if not contract or not accounts:
+            print("⚠️ Aviso: Contrato ou conta do faucet indisponível, tokens não distribuídos")
+            return None
+        
+        faucet_account = accounts[0]
+        
+        # Mesmas regras do envio separado: distribui o que houver disponível
+        faucet_balance_eth = float(web3.from_wei(web3.eth.get_balance(faucet_account), 'ether'))
+        eth_amount = min(INITIAL_ETH_BALANCE, faucet_balance_eth - FAUCET_ETH_RESERVE)
+        if eth_amount < 0.1:
+            print(f"⚠️ Aviso: Faucet tem apenas {faucet_balance_eth} ETH disponíveis")
+            eth_amount = 0.0
+        
+        faucet_balance = TokenAmount(contract.functions.balanceOf(faucet_account).call())
+        amount = min(TokenAmount.parse(INITIAL_USER_BALANCE), faucet_balance)
+        if amount.units <= 0:
+            print(f"⚠️ Aviso: Faucet tem apenas {faucet_balance} EST disponíveis")
+            return None
+        
+        tx_hash = faucet_grant(
+            [user_address],
+            web3.to_wei(eth_amount, 'ether'),
+            amount.units,
+            faucet_account
+        )
+        print(f"✅ {amount} ESTCOIN + {eth_amount} ETH distribuídos para {user_address} (1 transação)")
+        
+        result = {
+            'success': True,
+            'amount': float(amount),
+            'tx_hash': tx_hash,
+            'message': f'{amount} ESTCOIN distribuídos automaticamente'
+        }
+        if eth_amount:
+            result['eth_amount'] = eth_amount
+            result['eth_tx_hash'] = tx_hash
+            result['message'] += f' + {eth_amount} ETH para gás'
+        return result
+        
+    except Exception as e:
+        print(f"⚠️ Erro ao distribuir tokens: {e}")
+        return None
+
+def _distribute_separately(user_address):
+    """Envio antigo (sem o contrato Faucet): uma transação de ETH e outra de tokens"""
     try:
         # Primeiro, distribui ETH para pagar gás
         eth_result = distribute_eth_for_gas(user_address)
@@ -99,32 +284,28 @@ def auto_distribute_initial_tokens(user_address):
         faucet_account = accounts[0]
         
         # Verifica se o faucet tem tokens suficientes
-        faucet_balance = contract.functions.balanceOf(faucet_account).call()
-        faucet_balance_tokens = faucet_balance / (10 ** 18)
+        faucet_balance = TokenAmount(contract.functions.balanceOf(faucet_account).call())
+        initial_balance = TokenAmount.parse(INITIAL_USER_BALANCE)
         
-        if faucet_balance_tokens < INITIAL_USER_BALANCE:
-            print(f"⚠️ Aviso: Faucet tem apenas {faucet_balance_tokens} EST disponíveis")
-            if faucet_balance_tokens == 0:
+        if faucet_balance < initial_balance:
+            print(f"⚠️ Aviso: Faucet tem apenas {faucet_balance} EST disponíveis")
+            if not faucet_balance:
                 return None
             # Distribui o que tem disponível
-            amount_to_send = faucet_balance_tokens
+            amount_to_send = faucet_balance
         else:
-            amount_to_send = INITIAL_USER_BALANCE
-        
-        # Converte para unidades (18 decimais)
-        amount_units = int(amount_to_send * (10 ** 18))
+            amount_to_send = initial_balance
         
-        # Transfere tokens
-        tx_hash = contract.functions.transfer(
-            user_address,
-            amount_units
-        ).transact({
-            'from': faucet_account,
-            'gas': 100000
-        })
+        # Unidades mínimas (18 decimais)
+        amount_units = amount_to_send.units
         
-        # Aguarda confirmação
-        tx_receipt = web3.eth.wait_for_transaction_receipt(tx_hash, timeout=30)
+        # Transfere tokens e aguarda confirmação
+        tx_receipt = _send_from_faucet(
+            faucet_account,
+            _contract_call(contract.functions.transfer(user_address, amount_units), faucet_account, 100000),
+            PRIORITY_ONBOARDING
+        )
+        tx_hash = tx_receipt.transactionHash
         
         if tx_receipt.status == 1:
             print(f"✅ {amount_to_send} ESTCOIN distribuídos para {user_address}")
@@ -132,7 +313,7 @@ def auto_distribute_initial_tokens(user_address):
             # Retorna informações combinadas
             result = {
                 'success': True,
-                'amount': amount_to_send,
+                'amount': float(amount_to_send),
                 'tx_hash': tx_hash.hex(),
                 'message': f'{amount_to_send} ESTCOIN distribuídos automaticamente'
             }
@@ -169,7 +350,7 @@ def check_faucet_balance():
         
         faucet_account = accounts[0]
         balance = contract.functions.balanceOf(faucet_account).call()
-        return balance / (10 ** 18)
+        return float(TokenAmount(balance))
         
     except Exception as e:
         print(f"Erro ao verificar saldo do faucet: {e}")
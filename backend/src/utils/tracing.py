@@ -0,0 +1,379 @@
+"""
+Tracing leve: spans de request -> controller -> banco -> RPC em arquivo local
+
+Cada request amostrado (TRACE_SAMPLE_RATE) abre um trace; dentro dele os
+controllers, o contrato, as consultas SQLite e as chamadas RPC viram spans
+filhos. A fila de saída de transações leva o span do request para a sua
+thread, então a assinatura e o eth_sendRawTransaction aparecem no mesmo trace.
+
+Os spans terminados vão para uma fila limitada (TRACE_QUEUE_SIZE; cheia, o
+span é descartado e contado) e uma thread grava lotes de até TRACE_BATCH_SIZE
+em TRACE_FILE, uma linha JSON por lote no formato OTLP/JSON
+(ExportTraceServiceRequest), o mesmo que o receiver `otlpjsonfile` do
+OpenTelemetry Collector lê. Nada é escrito no caminho do request.
+
+Sem trace amostrado em andamento, `span()` e os hooks não fazem nada além de
+ler uma ContextVar: com TRACE_SAMPLE_RATE=0 (padrão) o custo é desprezível.
+Este módulo não importa web3.
+"""
+import contextvars
+import functools
+import json
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from src.config import Config
+
+INTERNAL = 1
+SERVER = 2
+CLIENT = 3
+
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+SERVICE_NAME = 'estcoin-backend'
+MAX_STATEMENT = 200  # caracteres do SQL guardados no span
+
+_current = contextvars.ContextVar('estcoin_span', default=None)
+_random = random.Random()
+
+
+class Trace:
+    """Spans de um request amostrado"""
+    __slots__ = ('trace_id', 'spans')
+
+    def __init__(self):
+        self.trace_id = f'{_random.getrandbits(128):032x}'
+        self.spans = 0
+
+
+class Span:
+    """
+    Intervalo de tempo de uma operação dentro de um trace
+
+    Args:
+        trace (Trace): Trace do span
+        name (str): Nome da operação
+        kind (int): INTERNAL, SERVER (request) ou CLIENT (SQLite, RPC)
+        parent (Span): Span pai (None na raiz)
+        attributes (dict): Atributos iniciais
+    """
+    __slots__ = ('trace', 'span_id', 'parent_id', 'name', 'kind', 'start_ns', 'end_ns',
+                 'attributes', 'status', 'message', '_token')
+
+    def __init__(self, trace, name, kind=INTERNAL, parent=None, attributes=None):
+        self.trace = trace
+        self.span_id = f'{_random.getrandbits(64):016x}'
+        self.parent_id = parent.span_id if parent is not None else None
+        self.name = name
+        self.kind = kind
+        self.attributes = dict(attributes) if attributes else {}
+        self.status = 0
+        self.message = None
+        self._token = None
+        self.end_ns = None
+        self.start_ns = time.time_ns()
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def activate(self):
+        """Torna o span o atual do contexto (filhos se penduram nele)"""
+        self._token = _current.set(self)
+        return self
+
+    def end(self, error=None):
+        """Fecha o span (com erro, status ERROR) e entrega ao exportador"""
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if error is not None:
+            self.status = STATUS_ERROR
+            self.message = f'{type(error).__name__}: {error}'[:500]
+        if self._token is not None:
+            try:
+                _current.reset(self._token)
+            except ValueError:
+                # Fechado em outro contexto (ex: resposta em streaming)
+                pass
+            self._token = None
+        get_exporter().record(self)
+
+
+def current_span():
+    """Span em andamento neste contexto (None fora de um trace amostrado)"""
+    return _current.get()
+
+
+def start_trace(name, kind=SERVER, attributes=None):
+    """
+    Abre o span raiz de um request, se ele for amostrado
+
+    Returns:
+        Span: Span já ativo (feche com `end()`), ou None se não amostrado
+    """
+    rate = Config.TRACE_SAMPLE_RATE
+    if rate <= 0 or (rate < 1 and _random.random() >= rate):
+        return None
+    exporter = get_exporter()
+    exporter.count('traces')
+    trace = Trace()
+    trace.spans = 1
+    return Span(trace, name, kind, attributes=attributes).activate()
+
+
+def start_span(name, kind=INTERNAL, attributes=None, parent=None):
+    """
+    Abre um span filho do span atual (ou de `parent`, vindo de outra thread)
+
+    Returns:
+        Span: Span já ativo, ou None fora de um trace amostrado ou acima de
+        TRACE_MAX_SPANS spans no trace
+    """
+    parent = parent if parent is not None else _current.get()
+    if parent is None:
+        return None
+    trace = parent.trace
+    if trace.spans >= Config.TRACE_MAX_SPANS:
+        get_exporter().count('truncated')
+        return None
+    trace.spans += 1
+    return Span(trace, name, kind, parent, attributes).activate()
+
+
+@contextmanager
+def span(name, kind=INTERNAL, attributes=None, parent=None):
+    """Context manager de start_span; entrega None quando não há trace"""
+    current = start_span(name, kind, attributes, parent)
+    if current is None:
+        yield None
+        return
+    try:
+        yield current
+    except BaseException as e:
+        current.end(e)
+        raise
+    current.end()
+
+
+def traced(name):
+    """Decorator: a chamada vira um span (sem custo fora de um trace)"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return fn(*args, **kwargs)
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def tracing_middleware(make_request, w3):
+    """Middleware web3: um span CLIENT por chamada RPC"""
+    def request(method, params):
+        if _current.get() is None:
+            return make_request(method, params)
+        with span(f'rpc {method}', CLIENT, {'rpc.system': 'jsonrpc', 'rpc.method': method}) as current:
+            response = make_request(method, params)
+            if current is not None and isinstance(response, dict) and 'error' in response:
+                current.status = STATUS_ERROR
+                current.message = str(response['error'])[:500]
+            return response
+    return request
+
+
+def instrument_engine(engine):
+    """Registra os hooks do SQLAlchemy: um span CLIENT por comando SQL"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current.get() is None:
+            return
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else 'SQL'
+        current = start_span(f'sqlite {operation}', CLIENT, {
+            'db.system': 'sqlite',
+            'db.statement': statement[:MAX_STATEMENT],
+        })
+        if current is not None and context is not None:
+            context._trace_span = current
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        current = getattr(context, '_trace_span', None)
+        if current is not None:
+            context._trace_span = None
+            current.end()
+
+    @event.listens_for(engine, 'handle_error')
+    def handle_error(exception_context):
+        context = exception_context.execution_context
+        current = getattr(context, '_trace_span', None)
+        if current is not None:
+            context._trace_span = None
+            current.end(exception_context.original_exception)
+
+
+def _attribute(key, value):
+    if isinstance(value, bool):
+        encoded = {'boolValue': value}
+    elif isinstance(value, int):
+        encoded = {'intValue': str(value)}
+    elif isinstance(value, float):
+        encoded = {'doubleValue': value}
+    else:
+        encoded = {'stringValue': str(value)}
+    return {'key': key, 'value': encoded}
+
+
+def _encode_span(span_):
+    encoded = {
+        'traceId': span_.trace.trace_id,
+        'spanId': span_.span_id,
+        'name': span_.name,
+        'kind': span_.kind,
+        'startTimeUnixNano': str(span_.start_ns),
+        'endTimeUnixNano': str(span_.end_ns),
+        'attributes': [_attribute(key, value) for key, value in span_.attributes.items()],
+    }
+    if span_.parent_id:
+        encoded['parentSpanId'] = span_.parent_id
+    if span_.status:
+        encoded['status'] = {'code': span_.status, **({'message': span_.message} if span_.message else {})}
+    return encoded
+
+
+class SpanExporter:
+    """
+    Fila limitada de spans terminados e a thread que grava os lotes
+
+    Args:
+        path (str): Arquivo OTLP/JSON (uma linha por lote, em append)
+        batch_size (int): Spans por linha
+        flush_interval (float): Segundos máximos até gravar um lote incompleto
+        queue_size (int): Spans aguardando gravação antes de descartar
+    """
+
+    def __init__(self, path=None, batch_size=None, flush_interval=None, queue_size=None):
+        self.path = path or Config.TRACE_FILE
+        self.batch_size = batch_size or Config.TRACE_BATCH_SIZE
+        self.flush_interval = flush_interval or Config.TRACE_FLUSH_INTERVAL
+        self.queue = queue.Queue(maxsize=queue_size or Config.TRACE_QUEUE_SIZE)
+        self.counters = {'traces': 0, 'spans': 0, 'exported': 0, 'dropped': 0, 'truncated': 0,
+                         'batches': 0, 'errors': 0}
+        self.lock = threading.Lock()
+        self._thread = None
+        self._resource = {'attributes': [
+            _attribute('service.name', SERVICE_NAME),
+            _attribute('process.pid', os.getpid()),
+        ]}
+
+    def count(self, name):
+        with self.lock:
+            self.counters[name] += 1
+
+    def record(self, span_):
+        """Entrega um span terminado (nunca bloqueia o request)"""
+        try:
+            self.queue.put_nowait(span_)
+        except queue.Full:
+            self.count('dropped')
+            return
+        self.count('spans')
+        if self._thread is None:
+            self._start()
+
+    def _start(self):
+        with self.lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='trace-exporter', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = []
+            flushed = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if isinstance(item, threading.Event):
+                    flushed.append(item)
+                    break
+                batch.append(item)
+            if batch:
+                self._write(batch)
+            for event in flushed:
+                event.set()
+
+    def _write(self, batch):
+        line = json.dumps({'resourceSpans': [{
+            'resource': self._resource,
+            'scopeSpans': [{
+                'scope': {'name': 'estcoin'},
+                'spans': [_encode_span(span_) for span_ in batch],
+            }],
+        }]}, separators=(',', ':')) + '\n'
+        try:
+            # Uma única escrita em append por lote: linhas de workers diferentes não se misturam
+            with open(self.path, 'a', encoding='utf-8') as out:
+                out.write(line)
+        except OSError as e:
+            self.count('errors')
+            print(f"⚠️ Erro ao gravar spans em {self.path}: {e}")
+            return
+        with self.lock:
+            self.counters['exported'] += len(batch)
+            self.counters['batches'] += 1
+
+    def flush(self, timeout=5):
+        """Espera os spans já entregues serem gravados (scripts e testes)"""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self.queue.put(done)
+        return done.wait(timeout)
+
+    def stats(self):
+        with self.lock:
+            counters = dict(self.counters)
+        return {
+            'sample_rate': Config.TRACE_SAMPLE_RATE,
+            'file': self.path,
+            'queued': self.queue.qsize(),
+            **counters
+        }
+
+
+_exporter = None
+_exporter_lock = threading.Lock()
+
+
+def get_exporter():
+    """Retorna o exportador de spans do processo"""
+    global _exporter
+    if _exporter is None:
+        with _exporter_lock:
+            if _exporter is None:
+                _exporter = SpanExporter()
+    return _exporter
+
+
+def _reset_after_fork():
+    # A thread de gravação não existe no processo filho
+    global _exporter, _exporter_lock
+    _exporter = None
+    _exporter_lock = threading.Lock()
+    # Com preload_app os workers herdam o estado do gerador: sem nova semente
+    # todos gerariam os mesmos trace e span ids
+    _random.seed()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
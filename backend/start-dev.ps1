@@ -11,6 +11,8 @@ $env:FLASK_APP = "src.app:app"
 $env:FLASK_ENV = "development"
 $env:FLASK_DEBUG = "1"
 $env:PYTHONPATH = "$PWD"
+# Chave mestra aleatoria do cofre em vault.key (em producao defina KEY_VAULT_MASTER_KEY)
+$env:KEY_VAULT_DEV_KEY = "1"
 
 Write-Host "[INFO] Modo: Desenvolvimento (auto-reload ativado)" -ForegroundColor Cyan
 Write-Host "Servidor rodando em: http://localhost:5000" -ForegroundColor Green
@@ -43,4 +43,5 @@ echo "Pressione Ctrl+C para parar"
 echo ""
 
 # Inicia o servidor com Gunicorn (funciona melhor no Linux/Mac)
-gunicorn --bind 0.0.0.0:5000 --workers 4 --reload wsgi:app
+# Workers, threads e warm-up em gunicorn.conf.py (WEB_CONCURRENCY=4 fixa 4 workers)
+gunicorn -c gunicorn.conf.py wsgi:app
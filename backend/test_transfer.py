@@ -11,6 +11,7 @@ sys.path.insert(0, os.path.dirname(__file__))
 from src.blockchain.web3_client import web3
 from src.blockchain.contract import get_contract, transfer_tokens, get_token_balance
 from src.config import Config
+from src.utils.token_amount import TokenAmount
 
 def test_transfer():
     """Testa a função de transferência"""
@@ -80,7 +81,7 @@ def test_transfer():
         # usando as contas desbloqueadas do Ganache
         tx_hash_simple = contract.functions.transfer(
             to_account,
-            int(amount * 10**18)
+            TokenAmount.parse(amount).units
         ).transact({'from': from_account})
         
         receipt = web3.eth.wait_for_transaction_receipt(tx_hash_simple)
@@ -0,0 +1,228 @@
+"""
+Fixtures dos testes: EVM em processo com snapshot/revert e banco temporário por teste
+
+O Token e o Faucet são deployados uma vez por sessão. Antes de cada teste a EVM
+volta ao snapshot tirado logo após o deploy, o banco SQLite é trocado por uma
+cópia limpa (já com os endereços dos contratos) e os singletons do processo
+(indexador, diretório de usuários, estado compartilhado...) são descartados,
+então cada teste começa do mesmo estado em poucos milissegundos.
+
+Requer o pacote opcional eth-tester:
+    pip install "eth-tester[py-evm]"
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+
+# Ambiente isolado: precisa estar definido antes de importar src.*
+SESSION_DIR = tempfile.mkdtemp(prefix='estcoin-tests-')
+os.environ['ESTCOIN_DB_PATH'] = os.path.join(SESSION_DIR, 'users.db')
+os.environ['SHARED_STATE_DB'] = os.path.join(SESSION_DIR, 'shared_state.db')
+os.environ['SNAPSHOT_DIR'] = os.path.join(SESSION_DIR, 'snapshots')
+os.environ['RATE_LIMIT_ENABLED'] = '0'
+os.environ['ESTCOIN_WARMUP'] = '0'
+# Sem thread do indexador: os testes sincronizam quando precisam (fixture `indexer`)
+os.environ['ESTCOIN_INDEXER'] = '0'
+# scrypt barato: o custo real é medido em benchmarks/bench_key_vault.py
+os.environ['KEY_VAULT_SCRYPT_N'] = '1024'
+os.environ.setdefault('KEY_VAULT_MASTER_KEY', 'estcoin-tests')
+# Sem pool de contas: cada cadastro cifra a sua (tests/test_key_pool.py liga o pool)
+os.environ['KEY_POOL_SIZE'] = '0'
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import pytest  # noqa: E402
+
+TEMPLATE_DB = os.path.join(SESSION_DIR, 'template.db')
+
+
+@pytest.fixture(scope='session')
+def chain():
+    """
+    EVM em processo com os contratos deployados
+
+    Returns:
+        tuple: (web3, id do snapshot tirado após o deploy)
+    """
+    pytest.importorskip('eth_tester', reason='eth-tester não instalado')
+    from src.blockchain.local_chain import start_in_process_chain
+    from src.blockchain.web3_client import web3
+    from src.models.user import engine, DB_PATH
+
+    start_in_process_chain()
+    # Cópia do banco recém-criado, reaplicada antes de cada teste
+    engine.dispose()
+    shutil.copyfile(DB_PATH, TEMPLATE_DB)
+    snapshot_id = web3.provider.ethereum_tester.take_snapshot()
+    yield web3, snapshot_id
+    engine.dispose()
+    shutil.rmtree(SESSION_DIR, ignore_errors=True)
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(chain, tmp_path, monkeypatch):
+    """Volta a EVM ao snapshot e dá ao teste um banco e um estado compartilhado novos"""
+    import src.analytics.volume as volume
+    import src.blockchain.tx_queue as tx_queue
+    import src.blockchain.circuit_breaker as circuit_breaker
+    import src.blockchain.key_pool as key_pool
+    import src.blockchain.key_vault as key_vault
+    import src.indexer.event_store as event_store
+    import src.indexer.holders as holders
+    import src.indexer.indexer as indexer
+    import src.indexer.notifier as notifier
+    import src.models.config_cache as config_cache
+    import src.models.user_directory as user_directory
+    import src.utils.shared_state as shared_state
+    import src.utils.stale_cache as stale_cache
+    import src.utils.tracing as tracing
+    from src.config import Config
+    from src.models.user import engine, DB_PATH
+
+    web3, snapshot_id = chain
+    web3.provider.ethereum_tester.revert_to_snapshot(snapshot_id)
+
+    engine.dispose()
+    shutil.copyfile(TEMPLATE_DB, DB_PATH)
+
+    monkeypatch.setattr(Config, 'SHARED_STATE_DB', str(tmp_path / 'shared_state.db'))
+    monkeypatch.setattr(Config, 'SNAPSHOT_DIR', str(tmp_path / 'snapshots'))
+    for module, name in (
+        (shared_state, '_shared_state'),
+        (indexer, '_indexer'),
+        (event_store, '_event_store'),
+        (holders, '_holder_index'),
+        (notifier, '_notifier'),
+        (user_directory, '_user_directory'),
+        (key_vault, '_key_vault'),
+        (key_pool, '_key_pool'),
+        (volume, '_columns'),
+        (circuit_breaker, '_breaker'),
+        (stale_cache, '_stale_cache'),
+        (config_cache, '_config_cache'),
+        (tracing, '_exporter'),
+    ):
+        monkeypatch.setattr(module, name, None)
+    yield
+    # Threads de envio não podem sobreviver ao revert da EVM
+    tx_queue.shutdown()
+    engine.dispose()
+
+
+@pytest.fixture
+def app():
+    from src.app import create_app
+
+    app = create_app(warm=False)
+    app.config['TESTING'] = True
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def register(client):
+    """
+    Registra um usuário pela API (recebe ETH e ESTC do faucet)
+
+    Returns:
+        function: register(username) -> dict com id, username, address e headers
+    """
+    from src.models.user import SessionLocal, User
+    from src.utils.auth_utils import generate_token
+
+    def register_user(username, password='secret123'):
+        response = client.post('/api/auth/register', json={'username': username, 'password': password})
+        assert response.status_code == 201, response.get_json()
+        db = SessionLocal()
+        try:
+            user = db.query(User).filter_by(username=username).one()
+            token = generate_token(user.id, user.username, user.ethereum_address)
+            return {
+                'id': user.id,
+                'username': user.username,
+                'address': user.ethereum_address,
+                'headers': {'Authorization': f'Bearer {token}'}
+            }
+        finally:
+            db.close()
+
+    return register_user
+
+
+@pytest.fixture
+def indexer():
+    """Indexador do processo com os listeners de produção, sincronizado até o último bloco"""
+    from src.indexer.event_store import get_event_store
+    from src.indexer.indexer import get_indexer
+    from src.indexer.notifier import get_notifier
+
+    indexer = get_indexer()
+    indexer.add_listener(get_event_store(indexer).on_events)
+    indexer.add_listener(get_notifier(indexer).on_events)
+    indexer.sync()
+    return indexer
+
+
+class RPCCounter:
+    """Conta as chamadas JSON-RPC feitas pelo cliente web3 compartilhado"""
+
+    def __init__(self):
+        self.calls = Counter()
+
+    def middleware(self, make_request, w3):
+        def count(method, params):
+            self.calls[method] += 1
+            return make_request(method, params)
+        return count
+
+    @property
+    def total(self):
+        return sum(self.calls.values())
+
+    def reset(self):
+        self.calls.clear()
+
+
+@pytest.fixture
+def rpc_calls(chain):
+    """
+    Contador de chamadas RPC (middleware mais externo do web3)
+
+    Uso:
+        rpc_calls.reset(); client.get(...); assert rpc_calls.total <= N
+    """
+    web3, _ = chain
+    counter = RPCCounter()
+    web3.middleware_onion.add(counter.middleware, name='rpc_counter')
+    yield counter
+    web3.middleware_onion.remove('rpc_counter')
+
+
+@pytest.fixture
+def elapsed():
+    """
+    Cronômetro para limites de tempo
+
+    Uso:
+        with elapsed() as timer: ...
+        assert timer.seconds < LIMITE
+    """
+    class Timer:
+        seconds = None
+
+        def __enter__(self):
+            self._start = time.perf_counter()
+            return self
+
+        def __exit__(self, *exc):
+            self.seconds = time.perf_counter() - self._start
+
+    return Timer
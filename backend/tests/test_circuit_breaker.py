@@ -0,0 +1,194 @@
+"""
+Testes do circuit breaker RPC e das leituras stale com o nó indisponível
+"""
+import time
+
+import pytest
+
+from src.config import Config
+
+
+@pytest.fixture
+def node(chain, monkeypatch):
+    """
+    Liga e desliga o nó: com `node.down()` toda chamada RPC falha com erro de conexão
+
+    O middleware que falha fica na camada mais interna, abaixo do circuit breaker.
+    """
+    web3, _ = chain
+    monkeypatch.setattr(Config, 'RPC_BREAKER_FAILURES', 2)
+    monkeypatch.setattr(Config, 'RPC_BREAKER_RESET', 0.3)
+
+    class Node:
+        available = True
+
+        def middleware(self, make_request, w3):
+            def request(method, params):
+                if not self.available:
+                    raise ConnectionError('nó fora do ar')
+                return make_request(method, params)
+            return request
+
+        def down(self):
+            self.available = False
+
+        def up(self):
+            self.available = True
+
+    node = Node()
+    web3.middleware_onion.inject(node.middleware, name='node_switch', layer=0)
+    yield node
+    web3.middleware_onion.remove('node_switch')
+
+
+def open_circuit():
+    from src.blockchain.circuit_breaker import get_circuit_breaker
+
+    breaker = get_circuit_breaker()
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure('teste')
+    return breaker
+
+
+def test_balance_is_served_stale_while_the_node_is_down(client, register, node):
+    alice = register('alice')
+    fresh = client.get('/api/transactions/balance', headers=alice['headers']).get_json()
+
+    node.down()
+    open_circuit()
+    started = time.perf_counter()
+    response = client.get('/api/transactions/balance', headers=alice['headers'])
+    seconds = time.perf_counter() - started
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['balance'] == fresh['balance'] == 10.0
+    assert body['stale'] is True
+    assert body['block_number'] == fresh['block_number']
+    assert seconds < 0.5
+
+
+def test_failed_read_falls_back_before_the_circuit_opens(client, register, node):
+    alice = register('alice')
+    client.get('/api/transactions/balance', headers=alice['headers'])
+
+    node.down()
+    body = client.get('/api/transactions/balance', headers=alice['headers']).get_json()
+
+    assert body['stale'] is True
+    assert body['balance'] == 10.0
+
+
+def test_unknown_balance_is_503_not_zero(client, register, node):
+    alice = register('alice')
+
+    node.down()
+    open_circuit()
+    response = client.get('/api/transactions/balance', headers=alice['headers'])
+
+    assert response.status_code == 503
+    assert int(response.headers['Retry-After']) >= 1
+    assert 'balance' not in response.get_json()
+
+
+def test_history_falls_back_to_indexed_events(client, register, indexer, node):
+    alice = register('alice')
+    register('bob')
+    client.post('/api/transactions/transfer', json={'recipient': 'bob', 'amount': 2}, headers=alice['headers'])
+    indexer.sync()
+    expected = client.get('/api/transactions/history', headers=alice['headers']).get_json()['transactions']
+    from src.utils.stale_cache import get_stale_cache
+    get_stale_cache().entries.clear()
+
+    node.down()
+    open_circuit()
+    body = client.get('/api/transactions/history', headers=alice['headers']).get_json()
+
+    assert body['stale'] is True
+    assert [(t['type'], t['amount'], t['tx_hash'], t['to_username']) for t in body['transactions']] == \
+        [(t['type'], t['amount'], t['tx_hash'], t['to_username']) for t in expected]
+
+
+def test_circuit_closes_and_value_refreshes_when_the_node_returns(client, register, node):
+    alice = register('alice')
+    bob = register('bob')
+    client.get('/api/transactions/balance', headers=bob['headers'])
+
+    node.down()
+    breaker = open_circuit()
+    assert client.get('/api/transactions/balance', headers=bob['headers']).get_json()['stale'] is True
+
+    node.up()
+    # Circuito ainda aberto: a transferência é recusada sem ir ao nó
+    rejected = client.post('/api/transactions/transfer', json={'recipient': 'bob', 'amount': 1},
+                           headers=alice['headers'])
+    time.sleep(Config.RPC_BREAKER_RESET)
+    sent = client.post('/api/transactions/transfer', json={'recipient': 'bob', 'amount': 1},
+                       headers=alice['headers'])
+    body = client.get('/api/transactions/balance', headers=bob['headers']).get_json()
+
+    assert rejected.status_code == 503
+    assert sent.status_code == 200
+    assert breaker.stats()['state'] == 'closed'
+    assert body['stale'] is False
+    assert body['balance'] == 11.0
+
+
+def test_balance_batch_uses_the_pool_failover_and_the_circuit(client, register, chain, monkeypatch):
+    from web3.providers.base import BaseProvider
+    from src.blockchain.contract import get_token_balances
+    from src.blockchain.rpc_pool import RPCPoolProvider
+
+    web3, _ = chain
+    alice = register('alice')
+    bob = register('bob')
+
+    class DownNode(BaseProvider):
+        def make_request(self, method, params):
+            raise ConnectionError('nó fora do ar')
+
+    pool = RPCPoolProvider([DownNode(), web3.provider], health_interval=0)
+    # O nó fora do ar parece o mais rápido: é o primeiro a receber o lote
+    pool.endpoints[1].latency = 1.0
+    monkeypatch.setattr(web3, 'provider', pool)
+    addresses = [alice['address'], bob['address']]
+
+    assert get_token_balances(addresses) == {address: 10 * 10 ** 18 for address in addresses}
+    assert [endpoint.requests for endpoint in pool.endpoints] == [1, 1]
+    assert pool.endpoints[0].failures == 1
+
+    # Circuito aberto: o lote é recusado sem chegar aos nós
+    open_circuit()
+    assert get_token_balances(addresses) == {address: None for address in addresses}
+    assert [endpoint.requests for endpoint in pool.endpoints] == [1, 1]
+
+
+def test_stale_balance_is_not_cached_under_the_current_etag(client, register, node, indexer):
+    alice = register('alice')
+    bob = register('bob')
+    client.get('/api/transactions/balance', headers=bob['headers'])
+    client.post('/api/transactions/transfer', json={'recipient': 'bob', 'amount': 1}, headers=alice['headers'])
+    indexer.sync()
+
+    node.down()
+    open_circuit()
+    stale = client.get('/api/transactions/balance', headers=bob['headers'])
+
+    assert stale.get_json()['stale'] is True
+    assert stale.get_json()['balance'] == 10.0
+    assert 'ETag' not in stale.headers
+    assert 'Warning' in stale.headers
+
+    node.up()
+    time.sleep(Config.RPC_BREAKER_RESET)
+    # A primeira leitura ainda é stale e dispara a atualização em segundo plano
+    deadline = time.monotonic() + 2
+    fresh = client.get('/api/transactions/balance', headers=bob['headers'])
+    while fresh.get_json()['stale'] and time.monotonic() < deadline:
+        time.sleep(0.05)
+        fresh = client.get('/api/transactions/balance', headers=bob['headers'])
+    cached = client.get('/api/transactions/balance',
+                        headers=dict(bob['headers'], **{'If-None-Match': fresh.headers['ETag']}))
+
+    assert fresh.get_json()['balance'] == 11.0
+    assert cached.status_code == 304
@@ -0,0 +1,62 @@
+"""
+Testes do cache versionado de system_config (src/models/config_cache.py)
+"""
+import sqlite3
+import time
+
+from sqlalchemy import event
+
+from src.config import Config
+
+
+def write_from_another_worker(key, value):
+    """Grava como outro processo faria: sem passar pelo cache deste"""
+    from src.models.user import DB_PATH
+
+    conn = sqlite3.connect(DB_PATH)
+    with conn:
+        conn.execute('UPDATE system_config SET value = ? WHERE key = ?', (value, key))
+        conn.execute("UPDATE system_config SET value = CAST(value AS INTEGER) + 1 WHERE key = 'CONFIG_VERSION'")
+    conn.close()
+
+
+def test_address_lookups_are_served_from_memory():
+    from src.models.user import engine
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    address = Config.get_token_contract_address()
+    event.listen(engine, 'before_cursor_execute', listener)
+    try:
+        for _ in range(1000):
+            assert Config.get_token_contract_address() == address
+    finally:
+        event.remove(engine, 'before_cursor_execute', listener)
+
+    assert address
+    assert statements == []
+
+
+def test_redeploy_takes_effect_without_restart(client, register, monkeypatch):
+    from src.blockchain.contract import get_contract
+    from src.blockchain.local_chain import deploy_token
+    from src.models.config_cache import get_config_cache
+
+    monkeypatch.setattr(get_config_cache(), 'poll_interval', 0.05)
+    alice = register('alice')
+    assert client.get('/api/transactions/balance', headers=alice['headers']).get_json()['balance'] == 10.0
+    changes = []
+    get_config_cache().subscribe('TOKEN_CONTRACT_ADDRESS', lambda old, new: changes.append((old, new)))
+    old_address = Config.get_token_contract_address()
+
+    new_address = deploy_token()
+    write_from_another_worker('TOKEN_CONTRACT_ADDRESS', new_address)
+    time.sleep(0.1)
+    body = client.get('/api/transactions/balance', headers=alice['headers']).get_json()
+
+    assert get_contract().address == new_address
+    assert body['balance'] == 0.0
+    assert changes == [(old_address, new_address)]
+    stats = get_config_cache().stats()
+    assert stats['changed_keys'] == 1
+    assert stats['reloads'] == 2
@@ -0,0 +1,124 @@
+"""
+Testes do export/import de usuários do db_manager.py
+"""
+import gzip
+import json
+
+import pytest
+
+
+@pytest.fixture
+def users():
+    """
+    Cria usuários direto no banco, com chaves cifradas pelo cofre
+
+    Returns:
+        function: users(*nomes) -> lista de endereços
+    """
+    from eth_account import Account
+    from src.blockchain.key_vault import get_key_vault
+    from src.models.user import SessionLocal, User
+
+    def create(*usernames):
+        db = SessionLocal()
+        try:
+            addresses = []
+            for username in usernames:
+                account = Account.create()
+                db.add(User(username=username, password_hash=f'hash-{username}',
+                            ethereum_address=account.address,
+                            private_key=get_key_vault().encrypt(account.key), balance=1.5))
+                addresses.append(account.address)
+            db.commit()
+            return addresses
+        finally:
+            db.close()
+    return create
+
+
+def all_users():
+    from src.models.user import SessionLocal, User
+
+    db = SessionLocal()
+    try:
+        return [(u.username, u.password_hash, u.ethereum_address, u.private_key, u.balance)
+                for u in db.query(User).order_by(User.username)]
+    finally:
+        db.close()
+
+
+def delete_users():
+    from src.models.user import SessionLocal, User
+
+    db = SessionLocal()
+    try:
+        db.query(User).delete()
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_export_import_round_trip(users, tmp_path):
+    from db_manager import export_users, import_users
+
+    users('alice', 'bob', 'carol')
+    exported = all_users()
+    path = str(tmp_path / 'users.jsonl.gz')
+
+    assert export_users(path, page_size=2) == 3
+    delete_users()
+    assert import_users(path, batch_size=2) == 3
+
+    assert all_users() == exported
+    with gzip.open(path, 'rt') as source:
+        lines = source.read().splitlines()
+    assert json.loads(lines[0])['format'] == 'estcoin-users'
+    assert json.loads(lines[-1]) == {'count': 3}
+
+
+def test_import_checks_conflicts_after_loading(users, tmp_path):
+    from db_manager import export_users, import_users
+
+    users('alice', 'bob')
+    path = str(tmp_path / 'users.jsonl.gz')
+    export_users(path)
+    delete_users()
+    users('bob')
+
+    with pytest.raises(SystemExit):
+        import_users(path)
+    assert [row[0] for row in all_users()] == ['bob']
+
+    assert import_users(path, on_conflict='skip') == 1
+    assert [row[0] for row in all_users()] == ['alice', 'bob']
+
+
+def test_import_rejects_truncated_file_and_another_master_key(users, tmp_path, monkeypatch):
+    from db_manager import export_users, import_users
+    import src.blockchain.key_vault as key_vault
+    from src.blockchain.key_vault import KeyVault
+
+    users('alice', 'bob')
+    path = str(tmp_path / 'users.jsonl.gz')
+    export_users(path)
+    delete_users()
+
+    truncated = str(tmp_path / 'truncated.jsonl.gz')
+    with gzip.open(path, 'rt') as source, gzip.open(truncated, 'wt') as out:
+        out.writelines(source.read().splitlines(keepends=True)[:-2])
+    with pytest.raises(SystemExit):
+        import_users(truncated)
+
+    monkeypatch.setattr(key_vault, '_key_vault', KeyVault('outra-chave-mestra', scrypt_n=1024))
+    with pytest.raises(SystemExit):
+        import_users(path)
+    assert all_users() == []
+
+
+def test_list_filters_match_wildcards_literally(users):
+    from db_manager import iter_users
+
+    users('a_b', 'axb', '50%off')
+
+    assert [row[1] for page in iter_users(username='_') for row in page] == ['a_b']
+    assert [row[1] for page in iter_users(username='%') for row in page] == ['50%off']
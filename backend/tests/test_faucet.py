@@ -0,0 +1,73 @@
+"""
+Testes do contrato Faucet (blockchain/contracts/Faucet.sol) e dos lotes de faucet_grant_many
+
+Sem artefato do truffle, a EVM em processo compila o Faucet.sol com o py-solc-x.
+"""
+import pytest
+
+UNITS = 10 ** 18
+
+
+@pytest.fixture
+def faucet(chain):
+    from src.blockchain.contract import get_faucet_contract
+
+    faucet = get_faucet_contract()
+    assert faucet is not None, 'Faucet não deployado (py-solc-x sem solc 0.8.19)'
+    return faucet
+
+
+def new_accounts(web3, count):
+    return [web3.eth.account.create().address for _ in range(count)]
+
+
+def test_grant_many_batches_eth_and_token_payouts(chain, faucet):
+    from src.blockchain.contract import get_contract
+    from src.utils.token_utils import faucet_grant_many
+
+    web3, _ = chain
+    token = get_contract()
+    eth_only, token_only, both = new_accounts(web3, 2), new_accounts(web3, 2), new_accounts(web3, 1)
+    eth_wei = web3.to_wei(0.5, 'ether')
+
+    # Formatos usados por distribute_eth.py (só ETH) e distribute_tokens.py (só tokens)
+    batches = faucet_grant_many(
+        [(address, eth_wei, 0) for address in eth_only]
+        + [(address, 0, 3 * UNITS) for address in token_only]
+        + [(address, eth_wei, UNITS) for address in both],
+        web3.eth.accounts[0]
+    )
+
+    assert [sorted(batch['addresses']) for batch in batches] == [sorted(eth_only), sorted(token_only), both]
+    assert all('tx_hash' in batch for batch in batches), batches
+    for address in eth_only:
+        assert web3.eth.get_balance(address) == eth_wei
+        assert token.functions.balanceOf(address).call() == 0
+    for address in token_only:
+        assert web3.eth.get_balance(address) == 0
+        assert token.functions.balanceOf(address).call() == 3 * UNITS
+    assert web3.eth.get_balance(both[0]) == eth_wei
+    assert token.functions.balanceOf(both[0]).call() == UNITS
+
+
+def test_grant_splits_large_payouts_into_batches(chain, faucet, monkeypatch):
+    import src.utils.token_utils as token_utils
+
+    web3, _ = chain
+    monkeypatch.setattr(token_utils, 'FAUCET_BATCH_SIZE', 2)
+    addresses = new_accounts(web3, 5)
+
+    batches = token_utils.faucet_grant_many([(address, 1000, 0) for address in addresses], web3.eth.accounts[0])
+
+    assert [len(batch['addresses']) for batch in batches] == [2, 2, 1]
+    assert all(web3.eth.get_balance(address) == 1000 for address in addresses)
+
+
+def test_grant_reverts_when_value_does_not_match(chain, faucet):
+    web3, _ = chain
+    recipients = new_accounts(web3, 2)
+
+    with pytest.raises(Exception):
+        faucet.functions.grant(recipients, 1000, 0).transact({'from': web3.eth.accounts[0], 'value': 1000})
+
+    assert all(web3.eth.get_balance(address) == 0 for address in recipients)
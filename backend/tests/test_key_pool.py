@@ -0,0 +1,77 @@
+"""
+Testes do pool de contas pré-geradas (src/blockchain/key_pool.py)
+"""
+import pytest
+
+from src.config import Config
+
+
+@pytest.fixture
+def key_pool(monkeypatch):
+    from src.blockchain.key_pool import KeyPool
+    import src.blockchain.key_pool as key_pool_module
+
+    monkeypatch.setattr(Config, 'KEY_POOL_SIZE', 6)
+    monkeypatch.setattr(Config, 'KEY_POOL_LOW_WATER', 2)
+    monkeypatch.setattr(Config, 'KEY_POOL_BATCH', 3)
+    pool = KeyPool()
+    monkeypatch.setattr(key_pool_module, '_key_pool', pool)
+    yield pool
+    pool.wait_refill(timeout=30)
+
+
+def test_refill_generates_encrypted_accounts_in_a_separate_process(key_pool):
+    from eth_account import Account
+    from src.blockchain.key_vault import get_key_vault, is_encrypted
+
+    assert key_pool.refill() == 6
+
+    account = key_pool.take()
+    assert is_encrypted(account['keystore'])
+    assert Account.from_key(get_key_vault().decrypt(account['keystore'])).address == account['address']
+    stats = key_pool.stats()
+    assert stats['depth'] == 5
+    assert stats['generated'] == 6
+    assert stats['refill_rate'] > 0
+
+
+def test_register_takes_account_from_pool_and_refills_at_low_water(client, key_pool):
+    from src.models.user import SessionLocal, User
+
+    key_pool.refill()
+    pooled = [key_pool.take()['address'] for _ in range(3)]
+    assert key_pool.stats()['depth'] == 3
+    key_pool.wait_refill(timeout=30)
+
+    response = client.post('/api/auth/register', json={'username': 'alice', 'password': 'secret123'})
+    key_pool.wait_refill(timeout=30)
+
+    assert response.status_code == 201
+    db = SessionLocal()
+    try:
+        alice = db.query(User).filter_by(username='alice').one()
+    finally:
+        db.close()
+    assert alice.ethereum_address not in pooled
+    stats = key_pool.stats()
+    assert stats['taken'] == 4
+    assert stats['misses'] == 0
+    # Estoque chegou a 2 (low water): o pool voltou ao tamanho configurado
+    assert stats['depth'] == 6
+    assert stats['refills'] == 2
+
+
+def test_pool_encrypted_with_another_master_key_is_discarded(key_pool, monkeypatch):
+    from src.blockchain.key_pool import generate_keys
+    from src.utils.shared_state import get_shared_state
+
+    get_shared_state().add_pooled_keys(generate_keys(2, 'outra-chave-mestra', 1024))
+    monkeypatch.setattr(Config, 'KEY_POOL_SIZE', 2)
+    key_pool.size = 2
+
+    taken = key_pool.take()
+    key_pool.wait_refill(timeout=30)
+
+    assert taken is None
+    assert key_pool.stats()['discarded'] == 2
+    assert key_pool.stats()['misses'] == 1
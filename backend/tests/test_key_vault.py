@@ -0,0 +1,38 @@
+"""
+Testes da chave mestra do cofre (src/blockchain/key_vault.py)
+"""
+import os
+import stat
+
+import pytest
+
+from src.config import Config
+
+
+def test_vault_refuses_to_start_without_a_master_key(monkeypatch):
+    from src.app import create_app, preload
+    from src.blockchain.key_vault import get_key_vault
+
+    monkeypatch.setattr(Config, 'KEY_VAULT_MASTER_KEY', None)
+    monkeypatch.setattr(Config, 'KEY_VAULT_DEV_KEY', False)
+
+    with pytest.raises(Exception, match='KEY_VAULT_MASTER_KEY'):
+        get_key_vault()
+    with pytest.raises(Exception, match='KEY_VAULT_MASTER_KEY'):
+        preload(create_app(warm=False))
+
+
+def test_dev_key_is_random_private_and_reused(tmp_path, monkeypatch):
+    import src.blockchain.key_vault as key_vault
+
+    path = tmp_path / 'vault.key'
+    monkeypatch.setattr(Config, 'KEY_VAULT_MASTER_KEY', None)
+    monkeypatch.setattr(Config, 'KEY_VAULT_DEV_KEY', True)
+    monkeypatch.setattr(Config, 'KEY_VAULT_DEV_KEY_FILE', str(path))
+
+    keystore = key_vault.get_key_vault().encrypt('0x' + '11' * 32)
+    monkeypatch.setattr(key_vault, '_key_vault', None)
+
+    assert key_vault.master_key() not in (Config.SECRET_KEY, '')
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert key_vault.get_key_vault().decrypt(keystore) == bytes.fromhex('11' * 32)
@@ -0,0 +1,119 @@
+"""
+Limites de desempenho: chamadas RPC por rota e tempo de N transferências
+
+Os limites ficam um pouco acima do medido hoje; um teste falhando aqui indica
+que uma mudança voltou a fazer consultas ao nó que antes eram evitadas. Em
+máquinas lentas os limites de tempo podem ser multiplicados por
+PERF_TIME_FACTOR (ex: PERF_TIME_FACTOR=3 python -m pytest -m perf).
+"""
+import os
+import pytest
+
+pytestmark = pytest.mark.perf
+
+TIME_FACTOR = float(os.getenv('PERF_TIME_FACTOR', '1'))
+
+HISTORY_LIMIT = 10
+# eth_blockNumber + eth_getLogs (from OU to) + um bloco por evento da página
+MAX_HISTORY_RPC = 3 + HISTORY_LIMIT
+# eth_blockNumber + eth_call (saldo nesse bloco) + eth_chainId; `from` explícito evita eth_coinbase
+MAX_BALANCE_RPC = 3
+# A fila de saída lê as contagens 'latest' e 'pending' (mempool) antes de enviar
+MAX_TRANSFER_RPC = 5
+MAX_REGISTER_RPC = 16
+TRANSFERS = 20
+MAX_TRANSFERS_SECONDS = 6.0  # medido: ~1,5 s
+
+
+def transfer(client, user, recipient, amount=0.1):
+    response = client.post('/api/transactions/transfer', json={'recipient': recipient, 'amount': amount},
+                           headers=user['headers'])
+    assert response.status_code == 200, response.get_json()
+
+
+def test_history_rpc_calls(client, register, rpc_calls):
+    alice = register('alice')
+    register('bob')
+    for _ in range(HISTORY_LIMIT + 5):
+        transfer(client, alice, 'bob')
+
+    rpc_calls.reset()
+    response = client.get(f'/api/transactions/history?limit={HISTORY_LIMIT}', headers=alice['headers'])
+
+    assert response.get_json()['count'] == HISTORY_LIMIT
+    assert rpc_calls.calls['eth_getLogs'] <= 2, dict(rpc_calls.calls)
+    assert rpc_calls.calls['eth_getBlockByNumber'] <= HISTORY_LIMIT, dict(rpc_calls.calls)
+    assert rpc_calls.total <= MAX_HISTORY_RPC, dict(rpc_calls.calls)
+
+
+def test_balance_rpc_calls(client, register, rpc_calls):
+    alice = register('alice')
+
+    rpc_calls.reset()
+    client.get('/api/transactions/balance', headers=alice['headers'])
+
+    assert rpc_calls.calls['eth_call'] == 1, dict(rpc_calls.calls)
+    assert rpc_calls.total <= MAX_BALANCE_RPC, dict(rpc_calls.calls)
+
+
+def test_not_modified_and_summary_skip_the_node(client, register, rpc_calls, indexer):
+    alice = register('alice')
+    register('bob')
+    transfer(client, alice, 'bob')
+    indexer.sync()
+    etag = client.get('/api/transactions/balance', headers=alice['headers']).headers['ETag']
+
+    rpc_calls.reset()
+    cached = client.get('/api/transactions/balance', headers=dict(alice['headers'], **{'If-None-Match': etag}))
+    summary = client.get('/api/transactions/summary', headers=alice['headers'])
+
+    assert cached.status_code == 304
+    assert summary.status_code == 200
+    assert rpc_calls.total == 0, dict(rpc_calls.calls)
+
+
+def test_transfer_rpc_calls(client, register, rpc_calls):
+    alice = register('alice')
+    register('bob')
+    transfer(client, alice, 'bob')
+
+    rpc_calls.reset()
+    transfer(client, alice, 'bob')
+
+    assert rpc_calls.calls['eth_sendRawTransaction'] == 1, dict(rpc_calls.calls)
+    assert rpc_calls.total <= MAX_TRANSFER_RPC, dict(rpc_calls.calls)
+
+
+def test_register_uses_one_faucet_transaction(chain, register, rpc_calls):
+    from src.blockchain.contract import get_contract, get_faucet_contract
+    web3, _ = chain
+    register('alice')
+    assert get_faucet_contract() is not None, 'Faucet não deployado (py-solc-x sem solc 0.8.19)'
+
+    rpc_calls.reset()
+    bob = register('bob')
+
+    sent = rpc_calls.calls['eth_sendTransaction'] + rpc_calls.calls['eth_sendRawTransaction']
+    assert sent == 1, dict(rpc_calls.calls)
+    assert rpc_calls.total <= MAX_REGISTER_RPC, dict(rpc_calls.calls)
+    assert web3.eth.get_balance(bob['address']) == web3.to_wei(1, 'ether')
+    assert get_contract().functions.balanceOf(bob['address']).call() == 10 * 10 ** 18
+
+
+def test_transfers_time(client, register, elapsed):
+    alice = register('alice')
+    register('bob')
+    transfer(client, alice, 'bob')
+
+    with elapsed() as timer:
+        for _ in range(TRANSFERS):
+            transfer(client, alice, 'bob')
+
+    assert timer.seconds <= MAX_TRANSFERS_SECONDS * TIME_FACTOR, f"{TRANSFERS} transferências em {timer.seconds:.2f}s"
+
+
+def test_importing_the_app_module_builds_no_app():
+    import src.app
+
+    # wsgi.py (Gunicorn/waitress) monta o único app do processo
+    assert not hasattr(src.app, 'app')
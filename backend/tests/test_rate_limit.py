@@ -0,0 +1,58 @@
+"""
+Testes do rate limit por IP (src/utils/rate_limit.py)
+"""
+import pytest
+
+from src.config import Config
+
+
+@pytest.fixture
+def ip_limit(tmp_path, monkeypatch):
+    """Rate limit ligado, com balde de 2 logins por IP e armazenamento novo"""
+    import src.utils.rate_limit as rate_limit
+
+    monkeypatch.setattr(Config, 'RATE_LIMIT_ENABLED', True)
+    monkeypatch.setattr(Config, 'RATE_LIMIT_DB', str(tmp_path / 'ratelimit.db'))
+    monkeypatch.setattr(Config, 'RATE_LIMIT_IP_BURST', 2)
+    monkeypatch.setattr(Config, 'RATE_LIMIT_IP_RATE', 0.001)
+    monkeypatch.setattr(rate_limit, '_store', None)
+
+
+def login(client, **headers):
+    return client.post('/api/auth/login', json={'username': 'ninguem', 'password': 'x'},
+                       headers=headers).status_code
+
+
+def register(client):
+    # Sem senha a rota responde 400 sem tocar no nó, mas o balde já foi cobrado
+    return client.post('/api/auth/register', json={'username': 'ninguem'}).status_code
+
+
+def test_forged_ip_headers_do_not_bypass_the_limit(client, ip_limit):
+    statuses = [login(client, **{'X-Real-IP': f'10.0.0.{i}', 'X-Forwarded-For': f'10.0.1.{i}'})
+                for i in range(3)]
+
+    assert statuses == [401, 401, 429]
+
+
+def test_trusted_proxy_hop_keys_on_the_forwarded_client(ip_limit, monkeypatch):
+    from src.app import create_app
+
+    monkeypatch.setattr(Config, 'TRUSTED_PROXY_HOPS', 1)
+    client = create_app(warm=False).test_client()
+
+    # Cada cliente real (visto pelo proxy) tem o seu balde
+    assert [login(client, **{'X-Forwarded-For': f'10.0.1.{i}'}) for i in range(3)] == [401, 401, 401]
+    # O proxy acrescenta o IP de quem se conectou a ele; um valor forjado à esquerda não conta
+    assert [login(client, **{'X-Forwarded-For': f'1.2.3.{i}, 10.0.1.0'}) for i in range(2)] == [401, 429]
+
+
+def test_shared_ip_allows_ten_registrations(client, tmp_path, monkeypatch):
+    import src.utils.rate_limit as rate_limit
+
+    # Balde por IP da configuração padrão
+    monkeypatch.setattr(Config, 'RATE_LIMIT_ENABLED', True)
+    monkeypatch.setattr(Config, 'RATE_LIMIT_DB', str(tmp_path / 'ratelimit.db'))
+    monkeypatch.setattr(rate_limit, '_store', None)
+
+    assert [register(client) for _ in range(11)] == [400] * 10 + [429]
@@ -0,0 +1,50 @@
+"""
+Testes do failover do pool de RPC (src/blockchain/rpc_pool.py) com nós substitutos
+"""
+import pytest
+from web3.providers.base import BaseProvider
+
+
+class StandInNode(BaseProvider):
+    """Nó que registra os métodos recebidos; com `down` falha como um timeout"""
+
+    def __init__(self, name, down=False):
+        self.name = name
+        self.down = down
+        self.calls = []
+
+    def make_request(self, method, params):
+        self.calls.append(method)
+        if self.down:
+            raise TimeoutError(f"{self.name} não respondeu")
+        return {'jsonrpc': '2.0', 'id': 1, 'result': f'0x{self.name}'}
+
+
+@pytest.fixture
+def nodes():
+    from src.blockchain.rpc_pool import RPCPoolProvider
+
+    primary, secondary = StandInNode('a', down=True), StandInNode('b')
+    return RPCPoolProvider([primary, secondary], health_interval=0), primary, secondary
+
+
+@pytest.mark.parametrize('method', ['eth_sendTransaction', 'eth_getTransactionCount'])
+def test_failed_primary_does_not_send_on_a_secondary(nodes, method):
+    pool, primary, secondary = nodes
+
+    # A segunda chamada, com o primário já fora do rodízio, também não muda de nó
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            pool.make_request(method, [])
+
+    assert primary.calls == [method, method]
+    assert secondary.calls == []
+
+
+def test_signed_transaction_fails_over_to_the_next_node(nodes):
+    pool, primary, secondary = nodes
+
+    response = pool.make_request('eth_sendRawTransaction', ['0x00'])
+
+    assert response['result'] == '0xb'
+    assert primary.calls == secondary.calls == ['eth_sendRawTransaction']
@@ -0,0 +1,49 @@
+"""
+Testes das quantidades exatas de token (src/utils/token_amount.py)
+"""
+import pytest
+
+from src.utils.token_amount import TokenAmount, UNITS
+
+
+def test_parse_is_exact_and_rejects_extra_decimals():
+    assert TokenAmount.parse('2.3').units == 23 * 10 ** 17
+    assert TokenAmount.parse(2.3).units == 23 * 10 ** 17
+    assert TokenAmount.parse('123456789012.123456789012345678').units == 123456789012123456789012345678
+    assert str(TokenAmount.parse('0.000000000000000001')) == '0.000000000000000001'
+    assert str(TokenAmount(10 * UNITS)) == '10'
+    assert sum([TokenAmount.parse('0.1'), TokenAmount.parse('0.2')]) == TokenAmount.parse('0.3')
+    for invalid in ('0.0000000000000000001', 'abc', 'nan', '1e999999', True):
+        with pytest.raises(ValueError):
+            TokenAmount.parse(invalid)
+
+
+def test_sum_units_over_limb_columns_is_exact():
+    np = pytest.importorskip('numpy')
+    from src.utils.token_amount import sum_units
+
+    values = [TokenAmount.parse('9223372036.854775807'), TokenAmount(UNITS - 1)] * 50000
+    hi, lo = zip(*(value.limbs() for value in values))
+
+    assert sum_units(np.array(hi), np.array(lo)) == sum(values)
+
+
+def test_transfer_amounts_are_exact_end_to_end(client, register, indexer):
+    alice = register('alice')
+    bob = register('bob')
+
+    response = client.post('/api/transactions/transfer', json={'recipient': 'bob', 'amount': '2.3'},
+                           headers=alice['headers'])
+    rejected = client.post('/api/transactions/transfer', json={'recipient': 'bob', 'amount': '1e-19'},
+                           headers=alice['headers'])
+    indexer.sync()
+
+    assert response.status_code == 200
+    assert response.get_json()['amount_units'] == str(23 * 10 ** 17)
+    assert rejected.status_code == 400
+    balance = client.get('/api/transactions/balance', headers=bob['headers']).get_json()
+    assert balance['balance_units'] == str(123 * 10 ** 17)
+    history = client.get('/api/transactions/history', headers=alice['headers']).get_json()['transactions']
+    assert history[0]['amount_units'] == str(23 * 10 ** 17)
+    summary = client.get('/api/transactions/summary', headers=alice['headers']).get_json()
+    assert summary['net_units'] == str(10 * UNITS - 23 * 10 ** 17)
@@ -0,0 +1,118 @@
+"""
+Testes do tracing em arquivo OTLP/JSON (src/utils/tracing.py)
+"""
+import json
+import os
+
+import pytest
+
+from src.config import Config
+
+
+@pytest.fixture
+def traces(tmp_path, monkeypatch):
+    """
+    Liga o tracing com amostragem total e lê os spans gravados
+
+    Returns:
+        function: traces() -> lista de spans OTLP/JSON gravados até agora
+    """
+    from src.utils.tracing import get_exporter
+
+    path = tmp_path / 'traces.jsonl'
+    monkeypatch.setattr(Config, 'TRACE_FILE', str(path))
+    monkeypatch.setattr(Config, 'TRACE_SAMPLE_RATE', 1.0)
+
+    def read():
+        assert get_exporter().flush(timeout=5)
+        if not path.exists():
+            return []
+        return [span
+                for line in path.read_text().splitlines()
+                for resource in json.loads(line)['resourceSpans']
+                for scope in resource['scopeSpans']
+                for span in scope['spans']]
+    return read
+
+
+def test_transfer_trace_covers_controller_db_signing_and_rpc(client, register, traces):
+    alice = register('alice')
+    register('bob')
+    traces()
+
+    response = client.post('/api/transactions/transfer', json={'recipient': 'bob', 'amount': 1},
+                           headers=alice['headers'])
+
+    assert response.status_code == 200
+    written = traces()
+    trace_id = next(span['traceId'] for span in written if span['name'] == 'POST /api/transactions/transfer')
+    spans = [span for span in written if span['traceId'] == trace_id]
+    by_name = {}
+    for span in spans:
+        by_name.setdefault(span['name'], span)
+    parent_of = {span['spanId']: span for span in spans}
+
+    root = by_name['POST /api/transactions/transfer']
+    assert 'parentSpanId' not in root
+    assert {'key': 'http.status_code', 'value': {'intValue': '200'}} in root['attributes']
+    for name in ('TransactionController.transfer_funds', 'contract.balanceOf', 'contract.transfer',
+                 'sqlite SELECT', 'rpc eth_call', 'tx_queue.send', 'sign_transaction',
+                 'rpc eth_sendRawTransaction'):
+        assert name in by_name, name
+    # Assinatura e envio saem da thread da fila, mas ficam sob o span da transferência
+    send = by_name['tx_queue.send']
+    assert parent_of[send['parentSpanId']]['name'] == 'contract.transfer'
+    assert parent_of[by_name['sign_transaction']['parentSpanId']] is send
+    assert all(int(span['endTimeUnixNano']) >= int(span['startTimeUnixNano']) for span in spans)
+
+
+def test_unsampled_requests_write_nothing(client, register, traces, monkeypatch):
+    from src.utils.tracing import get_exporter
+
+    monkeypatch.setattr(Config, 'TRACE_SAMPLE_RATE', 0.0)
+    alice = register('alice')
+    client.get('/api/transactions/balance', headers=alice['headers'])
+
+    assert traces() == []
+    assert get_exporter().stats()['traces'] == 0
+
+
+def test_full_queue_drops_spans_instead_of_blocking(monkeypatch, tmp_path):
+    import src.utils.tracing as tracing
+
+    exporter = tracing.SpanExporter(path=str(tmp_path / 'traces.jsonl'), queue_size=3, flush_interval=60)
+    exporter._thread = object()  # sem thread de gravação: a fila só enche
+    monkeypatch.setattr(tracing, '_exporter', exporter)
+    monkeypatch.setattr(Config, 'TRACE_SAMPLE_RATE', 1.0)
+    monkeypatch.setattr(Config, 'TRACE_MAX_SPANS', 4)
+
+    root = tracing.start_trace('GET /teste')
+    for i in range(6):
+        with tracing.span(f'filho {i}'):
+            pass
+    root.end()
+
+    stats = exporter.stats()
+    assert stats['spans'] == 3
+    assert stats['dropped'] == 1
+    assert stats['truncated'] == 3
+    assert tracing.current_span() is None
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='requer os.fork')
+def test_forked_workers_draw_different_trace_ids():
+    from src.utils.tracing import Trace
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        os.write(write_fd, Trace().trace_id.encode())
+        os._exit(0)
+    os.close(write_fd)
+    child_id = os.read(read_fd, 64).decode()
+    os.close(read_fd)
+    os.waitpid(pid, 0)
+
+    assert len(child_id) == 32
+    assert child_id != Trace().trace_id
@@ -0,0 +1,192 @@
+"""
+Testes das rotas /api/transactions sobre a EVM em processo
+"""
+import time
+
+
+def test_register_grants_initial_balance(client, register):
+    alice = register('alice')
+
+    response = client.get('/api/transactions/balance', headers=alice['headers'])
+
+    assert response.status_code == 200
+    assert response.get_json()['balance'] == 10.0
+
+
+def test_each_test_starts_from_the_deploy_snapshot(chain, register):
+    web3, _ = chain
+    # O mesmo username do teste anterior: banco e EVM foram restaurados
+    alice = register('alice')
+
+    assert web3.eth.block_number <= 4
+    assert alice['id'] == 1
+
+
+def test_transfer_by_username(client, register):
+    alice = register('alice')
+    bob = register('bob')
+
+    response = client.post('/api/transactions/transfer', json={'recipient': 'bob', 'amount': 2.5},
+                           headers=alice['headers'])
+
+    assert response.status_code == 200, response.get_json()
+    assert response.get_json()['to'] == bob['address']
+    assert response.get_json()['to_username'] == 'bob'
+    balance = client.get('/api/transactions/balance', headers=bob['headers']).get_json()['balance']
+    assert balance == 12.5
+
+
+def test_transfer_to_unknown_username(client, register):
+    alice = register('alice')
+
+    response = client.post('/api/transactions/transfer', json={'recipient': 'nobody', 'amount': 1},
+                           headers=alice['headers'])
+
+    assert response.status_code == 404
+
+
+def test_history_labels_counterparties(client, register):
+    alice = register('alice')
+    register('bob')
+    client.post('/api/transactions/transfer', json={'recipient': 'bob', 'amount': 1}, headers=alice['headers'])
+
+    transactions = client.get('/api/transactions/history', headers=alice['headers']).get_json()['transactions']
+
+    assert transactions[0]['type'] == 'sent'
+    assert transactions[0]['to_username'] == 'bob'
+    assert transactions[0]['amount'] == 1.0
+    assert transactions[-1]['type'] == 'received'
+
+
+def test_idempotent_transfer_is_sent_once(client, register):
+    alice = register('alice')
+    bob = register('bob')
+    headers = dict(alice['headers'], **{'Idempotency-Key': 'transfer-1'})
+    body = {'recipient': bob['address'], 'amount': 1}
+
+    first = client.post('/api/transactions/transfer', json=body, headers=headers)
+    replay = client.post('/api/transactions/transfer', json=body, headers=headers)
+    mismatch = client.post('/api/transactions/transfer', json=dict(body, amount=2), headers=headers)
+
+    assert first.status_code == 200
+    assert replay.status_code == 200
+    assert replay.headers.get('Idempotent-Replayed') == 'true'
+    assert replay.get_json() == first.get_json()
+    assert mismatch.status_code == 422
+    assert client.get('/api/transactions/balance', headers=bob['headers']).get_json()['balance'] == 11.0
+
+
+
+def test_idempotency_key_is_released_only_when_nothing_was_sent(client, register, chain, monkeypatch):
+    from src.blockchain.circuit_breaker import get_circuit_breaker
+    from src.config import Config
+
+    web3, _ = chain
+    monkeypatch.setattr(Config, 'RPC_BREAKER_RESET', 0.3)
+    monkeypatch.setattr(Config, 'IDEMPOTENCY_WAIT', 0.2)
+    alice = register('alice')
+    register('bob')
+    body = {'recipient': 'bob', 'amount': 1}
+
+    # Circuito aberto: o saldo nem foi lido, a chave fica livre
+    breaker = get_circuit_breaker()
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure('teste')
+    headers = dict(alice['headers'], **{'Idempotency-Key': 'not-sent'})
+    refused = client.post('/api/transactions/transfer', json=body, headers=headers)
+    time.sleep(Config.RPC_BREAKER_RESET)
+    retried = client.post('/api/transactions/transfer', json=body, headers=headers)
+
+    assert refused.status_code == 503
+    assert retried.status_code == 200
+    assert 'Idempotent-Replayed' not in retried.headers
+
+    # Falha no envio: a transação pode ter chegado ao nó, a chave não é liberada nem gravada
+    def broken_broadcast(make_request, w3):
+        def request(method, params):
+            if method == 'eth_sendRawTransaction':
+                raise ValueError('resposta perdida')
+            return make_request(method, params)
+        return request
+
+    headers = dict(alice['headers'], **{'Idempotency-Key': 'maybe-sent'})
+    web3.middleware_onion.add(broken_broadcast, name='broken_broadcast')
+    try:
+        failed = client.post('/api/transactions/transfer', json=body, headers=headers)
+    finally:
+        web3.middleware_onion.remove('broken_broadcast')
+    duplicate = client.post('/api/transactions/transfer', json=body, headers=headers)
+
+    assert failed.status_code == 500
+    assert duplicate.status_code == 409
+
+
+def test_summary_totals(client, register, indexer):
+    alice = register('alice')
+    register('bob')
+    for amount in (1.5, 0.25):
+        client.post('/api/transactions/transfer', json={'recipient': 'bob', 'amount': amount},
+                    headers=alice['headers'])
+    indexer.sync()
+
+    summary = client.get('/api/transactions/summary', headers=alice['headers']).get_json()
+
+    assert summary['sent_units'] == str(175 * 10 ** 16)
+    assert summary['received_units'] == str(10 * 10 ** 18)
+    assert summary['sent_count'] == 2
+    assert summary['received_count'] == 1
+    assert summary['net'] == 8.25
+
+
+def test_summary_survives_reprocessing(client, register, indexer):
+    alice = register('alice')
+    register('bob')
+    client.post('/api/transactions/transfer', json={'recipient': 'bob', 'amount': 3}, headers=alice['headers'])
+    indexer.sync()
+    before = client.get('/api/transactions/summary', headers=alice['headers']).get_json()
+
+    # Reinício sem snapshot: o indexador regrava todos os blocos
+    indexer.ledger.reset(indexer.ledger.contract_address)
+    indexer.sync()
+    after = client.get('/api/transactions/summary', headers=alice['headers']).get_json()
+
+    for field in ('sent_units', 'received_units', 'sent_count', 'received_count', 'last_block'):
+        assert after[field] == before[field]
+
+
+def test_summary_etag_follows_the_written_summary(client, register, indexer):
+    alice = register('alice')
+    bob = register('bob')
+    register('carol')
+    indexer.sync()
+    listeners = list(indexer.listeners)
+
+    # Ledger à frente de account_summaries (os resumos são gravados depois)
+    indexer.listeners.clear()
+    client.post('/api/transactions/transfer', json={'recipient': 'bob', 'amount': 1}, headers=alice['headers'])
+    indexer.sync()
+    behind = client.get('/api/transactions/summary', headers=alice['headers'])
+    assert behind.get_json()['sent_count'] == 0
+
+    indexer.listeners.extend(listeners)
+    # Um bloco que não toca a alice faz o armazenamento alcançar o ledger
+    client.post('/api/transactions/transfer', json={'recipient': 'carol', 'amount': 1}, headers=bob['headers'])
+    indexer.sync()
+    caught_up = client.get('/api/transactions/summary',
+                           headers=dict(alice['headers'], **{'If-None-Match': behind.headers['ETag']}))
+
+    assert caught_up.status_code == 200
+    assert caught_up.get_json()['sent_count'] == 1
+
+
+def test_balance_units_without_contract_raises(chain, monkeypatch):
+    import pytest
+    from src.blockchain.contract import get_token_balance, get_token_balance_units
+    from src.config import Config
+
+    web3, _ = chain
+    monkeypatch.setattr(Config, 'get_token_contract_address', staticmethod(lambda: None))
+
+    with pytest.raises(Exception, match='não está deployado'):
+        get_token_balance_units(web3.eth.accounts[0])
+    assert get_token_balance(web3.eth.accounts[0]) == 0.0
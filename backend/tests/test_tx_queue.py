@@ -0,0 +1,108 @@
+"""
+Testes da fila de saída de transações (src/blockchain/tx_queue.py)
+"""
+import time
+
+import pytest
+
+from src.blockchain.tx_queue import (
+    OutboundQueue, PRIORITY_TRANSFER, PRIORITY_ONBOARDING, PRIORITY_PAYOUT
+)
+
+
+@pytest.fixture
+def manual_mining(chain):
+    """Desliga a mineração automática: as transações ficam pendentes até mine_blocks"""
+    web3, _ = chain
+    tester = web3.provider.ethereum_tester
+    tester.disable_auto_mine_transactions()
+    yield tester
+    tester.enable_auto_mine_transactions()
+
+
+def payment(web3, value):
+    return {'to': web3.eth.accounts[1], 'value': value, 'gas': 21000}
+
+
+def test_priority_order_and_in_flight_cap(chain, manual_mining):
+    web3, _ = chain
+    queue = OutboundQueue(web3.eth.accounts[0], max_in_flight=1)
+    first_nonce = web3.eth.get_transaction_count(web3.eth.accounts[0])
+
+    # Segura a thread de envio até tudo estar na fila
+    with queue._cond:
+        payout = queue.submit(payment(web3, 1), PRIORITY_PAYOUT)
+        onboarding = queue.submit(payment(web3, 2), PRIORITY_ONBOARDING)
+        transfer = queue.submit(payment(web3, 3), PRIORITY_TRANSFER)
+
+    transfer.wait_sent(timeout=5)
+    time.sleep(0.2)
+    # Limite de 1 em voo: as outras esperam a primeira ser minerada
+    assert queue.stats()['queued'] == {'transfer': 0, 'onboarding': 1, 'payout': 1}
+
+    manual_mining.enable_auto_mine_transactions()
+    manual_mining.mine_blocks(1)
+    for item in (transfer, onboarding, payout):
+        assert item.wait_receipt(timeout=10).status == 1
+    queue.stop()
+
+    assert [transfer.nonce, onboarding.nonce, payout.nonce] == [first_nonce, first_nonce + 1, first_nonce + 2]
+
+
+def test_stuck_transaction_is_replaced_with_higher_fee(chain, manual_mining):
+    web3, _ = chain
+    queue = OutboundQueue(web3.eth.accounts[0], stuck_after=0.2, fee_bump=1.5)
+
+    item = queue.submit(payment(web3, 1), PRIORITY_TRANSFER)
+    original_hash = item.wait_sent(timeout=5)
+    deadline = time.monotonic() + 5
+    while len(item.tx_hashes) < 2 and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    manual_mining.mine_blocks(1)
+    receipt = item.wait_receipt(timeout=10)
+    queue.stop()
+
+    assert item.tx_hashes[0] == original_hash
+    assert len(item.tx_hashes) >= 2
+    assert receipt.transactionHash.hex().removeprefix('0x') != original_hash
+    assert web3.eth.get_transaction(receipt.transactionHash).gasPrice >= 30 * 10 ** 9
+    assert queue.stats()['replaced'] >= 1
+
+
+
+def test_transfer_not_sent_in_time_is_withdrawn_and_never_sent(client, register, chain, monkeypatch):
+    from src.blockchain.contract import get_token_balance_units
+    from src.blockchain.tx_queue import get_tx_queue
+    from src.config import Config
+
+    web3, _ = chain
+    monkeypatch.setattr(Config, 'TX_STUCK_AFTER', 0.5)
+    alice = register('alice')
+    bob = register('bob')
+
+    def hold_queue(make_request, w3):
+        # A fila não consegue ler os nonces; o resto (saldo) funciona
+        def request(method, params):
+            if method == 'eth_getTransactionCount':
+                raise ValueError('nonce indisponível')
+            return make_request(method, params)
+        return request
+
+    web3.middleware_onion.add(hold_queue, name='hold_queue')
+    try:
+        response = client.post('/api/transactions/transfer', json={'recipient': 'bob', 'amount': 2},
+                               headers=alice['headers'])
+    finally:
+        web3.middleware_onion.remove('hold_queue')
+    # Nó de volta: tempo de sobra para a fila enviar o que ainda tivesse
+    time.sleep(1.5)
+
+    assert response.status_code == 503
+    assert response.get_json()['submitted'] is False
+    assert int(response.headers['Retry-After']) >= 1
+    stats = get_tx_queue(alice['address']).stats()
+    assert stats['cancelled'] == 1
+    assert stats['sent'] == 0
+    assert web3.eth.get_transaction_count(alice['address']) == 0
+    assert get_token_balance_units(bob['address']) == 10 * 10 ** 18
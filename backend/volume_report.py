@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Relatório de volume de transferências por hora ou dia
+
+Lê os eventos Transfer já gravados pelo indexador (tabela transfer_events).
+Com --sync, sincroniza o indexador com a blockchain antes de gerar o relatório.
+
+Uso:
+    python volume_report.py --interval day
+    python volume_report.py --interval hour --from 1700000000 --to 1700086400 --format csv
+"""
+import argparse
+import csv
+import json
+import sys
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+
+from src.models.user import init_db
+from src.analytics.volume import INTERVALS, load_columns, volume_by_interval
+
+FORMATS = ('table', 'json', 'csv')
+COLUMNS = ('start', 'count', 'volume', 'volume_units', 'average', 'unique_senders', 'unique_receivers')
+
+
+def sync_indexer():
+    """Sincroniza o indexador (e o armazenamento de eventos) uma vez"""
+    from src.indexer.indexer import get_indexer
+    from src.indexer.event_store import get_event_store
+
+    indexer = get_indexer()
+    indexer.add_listener(get_event_store(indexer).on_events)
+    indexer.restore()
+    indexer.sync()
+    print(f"✅ Indexador sincronizado até o bloco {indexer.ledger.last_block}")
+
+
+def print_table(buckets, interval):
+    if not buckets:
+        print("📭 Nenhuma transferência no período")
+        return
+    fmt = '%Y-%m-%d %H:00' if interval == 'hour' else '%Y-%m-%d'
+    print(f"{'Início (UTC)':<18} {'Qtd':>8} {'Volume (EST)':>22} {'Média (EST)':>18} {'Remet.':>8} {'Dest.':>8}")
+    print("-" * 87)
+    for bucket in buckets:
+        start = datetime.fromtimestamp(bucket['start'], tz=timezone.utc).strftime(fmt)
+        print(f"{start:<18} {bucket['count']:>8} {bucket['volume']:>22,.4f} {bucket['average']:>18,.4f} "
+              f"{bucket['unique_senders']:>8} {bucket['unique_receivers']:>8}")
+    total = sum(int(bucket['volume_units']) for bucket in buckets)
+    print("-" * 87)
+    print(f"{'Total':<18} {sum(b['count'] for b in buckets):>8} {total / 10 ** 18:>22,.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Volume de transferências EST por intervalo')
+    parser.add_argument('--interval', choices=tuple(INTERVALS), default='day')
+    parser.add_argument('--from', dest='start', type=int, help='Timestamp Unix inicial (inclusive)')
+    parser.add_argument('--to', dest='end', type=int, help='Timestamp Unix final (exclusivo)')
+    parser.add_argument('--mints', action='store_true', help='Inclui emissões do contrato')
+    parser.add_argument('--format', choices=FORMATS, default='table')
+    parser.add_argument('--sync', action='store_true', help='Sincroniza o indexador antes')
+    args = parser.parse_args()
+
+    # Mensagens de progresso vão para stderr para não misturar com json/csv
+    with redirect_stdout(sys.stderr):
+        init_db()
+        if args.sync:
+            sync_indexer()
+
+    buckets = volume_by_interval(load_columns(), args.interval, args.start, args.end, args.mints)
+
+    if args.format == 'json':
+        print(json.dumps(buckets, indent=2))
+    elif args.format == 'csv':
+        writer = csv.DictWriter(sys.stdout, fieldnames=COLUMNS)
+        writer.writeheader()
+        writer.writerows(buckets)
+    else:
+        print_table(buckets, args.interval)
+
+
+if __name__ == '__main__':
+    main()
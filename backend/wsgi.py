@@ -1,8 +1,32 @@
 """
 WSGI Entry Point para o servidor Flask
 Este arquivo e usado pelo Gunicorn/Waitress para iniciar a aplicacao
+
+Producao (varios workers, ver gunicorn.conf.py e SHARED_STATE.md):
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Servidor local multi-thread (Windows ou sem Gunicorn):
+    python wsgi.py
 """
-from src.app import app
+import os
+from src.app import create_app, preload, warm_up
+
+# O warm-up completo (no, contrato, indexador) roda em cada worker depois do fork
+app = create_app(warm=False)
+preload(app)
 
 if __name__ == "__main__":
-    app.run()
+    from waitress import serve
+    from src.config import Config
+
+    threads = int(os.getenv('WAITRESS_THREADS', '8'))
+    # Cada conexao SSE prende uma thread do waitress: metade delas, como no Gunicorn
+    Config.SSE_MAX_STREAMS = int(os.getenv('SSE_MAX_STREAMS', max(1, threads // 2)))
+    print(f"SSE: ate {Config.SSE_MAX_STREAMS} conexoes (WAITRESS_THREADS={threads})")
+    warm_up(app)
+    serve(
+        app,
+        host=os.getenv('HOST', '0.0.0.0'),
+        port=int(os.getenv('PORT', '5000')),
+        threads=threads
+    )
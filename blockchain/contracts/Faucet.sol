@@ -0,0 +1,31 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+interface IToken {
+    function transferFrom(address _from, address _to, uint256 _value) external returns (bool success);
+}
+
+contract Faucet {
+    IToken public token;
+
+    constructor(address _token) {
+        token = IToken(_token);
+    }
+
+    // Envia ETH (para gás) e tokens para várias contas novas em uma única transação.
+    // Os tokens saem do saldo de quem chama, que antes aprova este contrato no Token;
+    // o ETH vem do msg.value, que deve ser exatamente _ethAmount por destinatário.
+    function grant(address payable[] calldata _recipients, uint256 _ethAmount, uint256 _tokenAmount) external payable {
+        require(msg.value == _ethAmount * _recipients.length);
+
+        for (uint256 i = 0; i < _recipients.length; i++) {
+            if (_ethAmount > 0) {
+                (bool sent, ) = _recipients[i].call{value: _ethAmount}("");
+                require(sent);
+            }
+            if (_tokenAmount > 0) {
+                require(token.transferFrom(msg.sender, _recipients[i], _tokenAmount));
+            }
+        }
+    }
+}
@@ -1,6 +1,6 @@
 import React, { useEffect, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
-import { getBalance, getTransactionHistory, isAuthenticated, getCurrentUser } from '../services/api';
+import { getBalance, getTransactionHistory, isAuthenticated, getCurrentUser, subscribeToStream } from '../services/api';
 import { logout, formatAddress, formatTokenAmount } from '../utils/auth';
 import { useToast } from '../contexts/ToastContext';
 import Transfer from './Transfer';
@@ -9,6 +9,8 @@ import '../styles/Dashboard.css';
 const Dashboard = () => {
     const [user, setUser] = useState(null);
     const [balance, setBalance] = useState(null);
+    // Bloco do último saldo conhecido quando o nó está indisponível (null = em dia)
+    const [staleBlock, setStaleBlock] = useState(null);
     const [transactions, setTransactions] = useState([]);
     const [loading, setLoading] = useState(true);
     const [showTransfer, setShowTransfer] = useState(false);
@@ -23,6 +25,26 @@ const Dashboard = () => {
         }
 
         fetchDashboardData();
+
+        // Saldo e histórico atualizados pelo servidor a cada Transfer do usuário
+        const unsubscribe = subscribeToStream({
+            onBalance: (data) => {
+                if (data.balance !== null) {
+                    setBalance(data.balance);
+                    setStaleBlock(data.stale ? data.block_number : null);
+                }
+            },
+            onTransfer: (transfer) => {
+                if (transfer.type === 'received') {
+                    const sender = transfer.from_username || formatAddress(transfer.from);
+                    toast.success(`Você recebeu ${formatTokenAmount(transfer.amount)} EST de ${sender}`);
+                }
+                getTransactionHistory(10)
+                    .then((historyData) => setTransactions(historyData.transactions || []))
+                    .catch((err) => console.error('Erro ao atualizar histórico:', err));
+            }
+        });
+        return unsubscribe;
     }, [navigate]);
 
     const fetchDashboardData = async () => {
@@ -36,6 +58,7 @@ const Dashboard = () => {
             // Busca saldo
             const balanceData = await getBalance();
             setBalance(balanceData.balance);
+            setStaleBlock(balanceData.stale ? balanceData.block_number : null);
 
             // Busca histórico de transações
             const historyData = await getTransactionHistory(10);
@@ -122,6 +145,11 @@ const Dashboard = () => {
                             <span className="loading-text">Carregando...</span>
                         )}
                     </div>
+                    {staleBlock !== null && (
+                        <p className="balance-stale">
+                            ⚠️ Blockchain indisponível: saldo do bloco {staleBlock}
+                        </p>
+                    )}
                     <button 
                         onClick={() => setShowTransfer(!showTransfer)} 
                         className="btn-primary"
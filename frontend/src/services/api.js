@@ -129,4 +129,61 @@ export const getTransactionHistory = async (limit = 20) => {
     } catch (error) {
         throw error.response?.data || { error: 'Erro ao obter histórico' };
     }
-};
\ No newline at end of file
+};
+
+// ============ NOTIFICAÇÕES EM TEMPO REAL ============
+
+// Assina /transactions/stream (Server-Sent Events) no lugar de consultar
+// /balance e /history periodicamente. Usa fetch em vez de EventSource para
+// enviar o token no header Authorization. Reconecta sozinho após falhas.
+// Retorna uma função que encerra a assinatura.
+export const subscribeToStream = ({ onBalance, onTransfer }) => {
+    const controller = new AbortController();
+    let retryDelay = 5000;
+
+    const handleMessage = (block) => {
+        let event = 'message';
+        let data = '';
+        for (const line of block.split('\n')) {
+            if (line.startsWith('event: ')) event = line.slice(7);
+            else if (line.startsWith('data: ')) data += line.slice(6);
+            else if (line.startsWith('retry: ')) retryDelay = Number(line.slice(7)) || retryDelay;
+        }
+        if (!data) return;
+        const payload = JSON.parse(data);
+        if (event === 'balance' && onBalance) onBalance(payload);
+        if (event === 'transfer' && onTransfer) onTransfer(payload);
+    };
+
+    const connect = async () => {
+        while (!controller.signal.aborted) {
+            try {
+                const response = await fetch(`${API_URL}/transactions/stream`, {
+                    headers: { Authorization: `Bearer ${localStorage.getItem('token')}` },
+                    signal: controller.signal
+                });
+                if (response.ok) {
+                    const reader = response.body.getReader();
+                    const decoder = new TextDecoder();
+                    let buffer = '';
+                    for (;;) {
+                        const { value, done } = await reader.read();
+                        if (done) break;
+                        buffer += decoder.decode(value, { stream: true });
+                        let end;
+                        while ((end = buffer.indexOf('\n\n')) >= 0) {
+                            handleMessage(buffer.slice(0, end));
+                            buffer = buffer.slice(end + 2);
+                        }
+                    }
+                }
+            } catch (error) {
+                if (controller.signal.aborted) return;
+            }
+            await new Promise((resolve) => setTimeout(resolve, retryDelay));
+        }
+    };
+
+    connect();
+    return () => controller.abort();
+};